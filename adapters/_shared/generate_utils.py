@@ -6,6 +6,7 @@ All adapters import these instead of duplicating the implementations.
 
 from __future__ import annotations
 
+import os
 import re
 import shlex
 import subprocess
@@ -13,7 +14,10 @@ from pathlib import Path
 
 
 def load_config(config_file: str = "", *, project_dir: str = "") -> dict[str, str]:
-    """Load cognitive-core.conf by sourcing it in bash and capturing CC_ variables.
+    """Load cognitive-core.conf and return its CC_ variables.
+
+    The conf is parsed natively when it only uses the plain-assignment subset
+    understood by parse_conf(); anything else is sourced in bash.
 
     Args:
         config_file: Direct path to cognitive-core.conf.
@@ -35,21 +39,232 @@ def load_config(config_file: str = "", *, project_dir: str = "") -> dict[str, st
     if not conf_path:
         return {}
 
-    cmd = f'set -a; source {shlex.quote(conf_path)} 2>/dev/null; env | grep "^CC_"'
+    try:
+        config = parse_conf(Path(conf_path).read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError):
+        config = None
+    if config is not None:
+        return config
+    return load_config_bash(conf_path)
+
+
+def load_config_bash(conf_path: str) -> dict[str, str]:
+    """Source a conf file in bash and capture CC_ variables.
+
+    Values are NUL-delimited so multi-line strings (CC_COMPACT_RULES,
+    CC_ENV_VARS) survive intact.
+    """
+    cmd = (
+        f"set -a; source {shlex.quote(conf_path)} 2>/dev/null; "
+        'for _cc_v in ${!CC_@}; do printf "%s=%s\\0" "$_cc_v" "${!_cc_v}"; done'
+    )
     try:
         result = subprocess.run(
             ["bash", "-c", cmd], capture_output=True, text=True, timeout=5
         )
         config: dict[str, str] = {}
-        for line in result.stdout.strip().split("\n"):
-            if "=" in line:
-                key, _, value = line.partition("=")
+        for entry in result.stdout.split("\0"):
+            if "=" in entry:
+                key, _, value = entry.partition("=")
                 config[key] = value
         return config
     except (subprocess.TimeoutExpired, FileNotFoundError):
         return {}
 
 
+# ---- Native conf parser ----
+#
+# Handles the subset of bash that real confs use: NAME=value assignments
+# (optionally prefixed with "export"), double/single quoted and unquoted
+# words, backslash escapes, multi-line quoted strings, comments, and
+# $VAR / ${VAR} / ${VAR:-default} / ${VAR-default} expansion with a literal
+# default. Anything else (command substitution, conditionals, source, arrays,
+# tilde, special parameters, CRLF line endings) makes parse_conf() return None
+# so the caller falls back to bash.
+
+_CONF_NAME_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_CONF_BRACE_RE = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)(?:(:?-)(.*))?", re.S)
+
+# Variables bash sets or rewrites itself — their value under bash cannot be
+# predicted from os.environ, so referencing one forces the bash fallback.
+_BASH_SHELL_VARS = frozenset({
+    "BASH", "BASHOPTS", "BASHPID", "BASH_ARGC", "BASH_ARGV", "BASH_COMMAND",
+    "BASH_LINENO", "BASH_SOURCE", "BASH_SUBSHELL", "BASH_VERSINFO",
+    "BASH_VERSION", "DIRSTACK", "EPOCHREALTIME", "EPOCHSECONDS", "EUID",
+    "FUNCNAME", "GROUPS", "HOSTNAME", "HOSTTYPE", "IFS", "LINENO", "MACHTYPE",
+    "OLDPWD", "OPTARG", "OPTERR", "OPTIND", "OSTYPE", "PIPESTATUS", "PPID",
+    "PS1", "PS2", "PS4", "PWD", "RANDOM", "SECONDS", "SHELLOPTS", "SHLVL",
+    "SRANDOM", "UID", "_",
+})
+
+
+class _ConfUnsupported(Exception):
+    """Raised when a conf uses syntax parse_conf() cannot prove it handles."""
+
+
+class _ConfParser:
+    def __init__(self, text: str, scope: dict[str, str]):
+        self.text = text
+        self.n = len(text)
+        self.scope = scope
+
+    def run(self) -> None:
+        text, n = self.text, self.n
+        pos = 0
+        while pos < n:
+            pos = self._skip_blanks(pos)
+            if pos >= n:
+                break
+            c = text[pos]
+            if c == "\n":
+                pos += 1
+                continue
+            if c == "#":
+                pos = self._skip_line(pos)
+                continue
+            if text.startswith("export", pos) and text[pos + 6:pos + 7] in (" ", "\t"):
+                pos = self._skip_blanks(pos + 6)
+            m = _CONF_NAME_RE.match(text, pos)
+            if not m or text[m.end():m.end() + 1] != "=":
+                raise _ConfUnsupported(f"not an assignment at offset {pos}")
+            name = m.group(0)
+            value, pos = self._word(m.end() + 1)
+            pos = self._skip_blanks(pos)
+            if pos < n and text[pos] == "#":
+                pos = self._skip_line(pos)
+            elif pos < n and text[pos] != "\n":
+                raise _ConfUnsupported(f"trailing text after {name}=")
+            self.scope[name] = value
+
+    def _skip_blanks(self, pos: int) -> int:
+        while pos < self.n and self.text[pos] in " \t":
+            pos += 1
+        return pos
+
+    def _skip_line(self, pos: int) -> int:
+        end = self.text.find("\n", pos)
+        return self.n if end == -1 else end
+
+    def _word(self, pos: int) -> tuple[str, int]:
+        """Parse one assignment value up to unquoted whitespace."""
+        text, n = self.text, self.n
+        out: list[str] = []
+        while pos < n:
+            c = text[pos]
+            if c in " \t\n":
+                break
+            if c == '"':
+                pos = self._double_quoted(pos + 1, out)
+            elif c == "'":
+                end = text.find("'", pos + 1)
+                if end == -1:
+                    raise _ConfUnsupported("unterminated single quote")
+                out.append(text[pos + 1:end])
+                pos = end + 1
+            elif c == "\\":
+                if pos + 1 >= n:
+                    raise _ConfUnsupported("trailing backslash")
+                if text[pos + 1] != "\n":
+                    out.append(text[pos + 1])
+                pos += 2
+            elif c == "$":
+                value, pos = self._expand(pos, quoted=False)
+                out.append(value)
+            elif c in ";&|<>()`~":
+                raise _ConfUnsupported(f"unsupported character {c!r}")
+            else:
+                out.append(c)
+                pos += 1
+        return "".join(out), pos
+
+    def _double_quoted(self, pos: int, out: list[str]) -> int:
+        text, n = self.text, self.n
+        while True:
+            if pos >= n:
+                raise _ConfUnsupported("unterminated double quote")
+            c = text[pos]
+            if c == '"':
+                return pos + 1
+            if c == "\\":
+                if pos + 1 >= n:
+                    raise _ConfUnsupported("unterminated double quote")
+                nxt = text[pos + 1]
+                if nxt in '$`"\\':
+                    out.append(nxt)
+                    pos += 2
+                elif nxt == "\n":
+                    pos += 2
+                else:
+                    out.append(c)
+                    pos += 1
+            elif c == "$":
+                value, pos = self._expand(pos, quoted=True)
+                out.append(value)
+            elif c == "`":
+                raise _ConfUnsupported("command substitution")
+            else:
+                out.append(c)
+                pos += 1
+
+    def _expand(self, pos: int, quoted: bool) -> tuple[str, int]:
+        """Expand the parameter reference starting at text[pos] == '$'."""
+        text = self.text
+        nxt = text[pos + 1:pos + 2]
+        if nxt == "{":
+            close = text.find("}", pos + 2)
+            if close == -1:
+                raise _ConfUnsupported("unterminated ${")
+            m = _CONF_BRACE_RE.fullmatch(text, pos + 2, close)
+            if not m:
+                raise _ConfUnsupported("unsupported ${...} form")
+            name, op, default = m.groups()
+            if default is not None and any(ch in default for ch in "$`\"'\\{"):
+                raise _ConfUnsupported("non-literal ${...} default")
+            value = self._lookup(name)
+            if op == ":-" and not value:
+                value = default
+            elif op == "-" and value is None:
+                value = default
+            return value or "", close + 1
+        m = _CONF_NAME_RE.match(text, pos + 1)
+        if m:
+            return self._lookup(m.group(0)) or "", m.end()
+        if nxt in ("", " ", "\t", "\n") or (quoted and nxt == '"'):
+            return "$", pos + 1
+        raise _ConfUnsupported(f"unsupported expansion ${nxt}")
+
+    def _lookup(self, name: str) -> str | None:
+        if name in _BASH_SHELL_VARS:
+            raise _ConfUnsupported(f"bash-managed variable ${name}")
+        return self.scope.get(name)
+
+
+def parse_conf(text: str, environ: dict[str, str] | None = None) -> dict[str, str] | None:
+    """Parse cognitive-core.conf text without spawning bash.
+
+    Mirrors ``set -a; source conf`` followed by collecting CC_ variables: the
+    result holds CC_ variables inherited from the environment plus those the
+    conf assigns.
+
+    Args:
+        text: Conf file contents.
+        environ: Environment visible to expansions (default: os.environ).
+
+    Returns:
+        dict of CC_ variables, or None if the conf uses syntax outside the
+        supported subset (caller should fall back to bash).
+    """
+    if "\r" in text:
+        # CRLF confs: bash keeps the CR in values; leave that to bash
+        return None
+    scope = dict(os.environ if environ is None else environ)
+    try:
+        _ConfParser(text, scope).run()
+    except _ConfUnsupported:
+        return None
+    return {k: v for k, v in scope.items() if k.startswith("CC_")}
+
+
 def extract_safety_rules(install_dir: str) -> str:
     """Extract safety rules from validate-bash.sh hook.
 
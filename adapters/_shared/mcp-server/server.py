@@ -7,7 +7,10 @@ Works with Claude Code (.mcp.json), IntelliJ plugins (DevoxxGenie,
 Continue.dev, Cline), and any MCP-compatible client.
 
 Usage:
-  python3 server.py
+  python3 server.py                   # one client on stdio
+  python3 server.py --daemon [--socket <path>] [--http-port <port>] [--idle-timeout <s>]
+                                      # shared per-project daemon (tools/transport.py);
+                                      # stdio clients connect via tools/mcp_bridge.py
 
 Environment:
   CC_PROJECT_DIR  — Project root directory (auto-detected if not set)
@@ -15,11 +18,16 @@ Environment:
 
 See TOOLS.md for tool boundaries and JSON schemas.
 """
+import argparse
+import asyncio
+import contextvars
+import inspect
 import json
 import os
 import shlex
 import subprocess
 import sys
+import time
 from pathlib import Path
 
 # Resolve project paths
@@ -33,6 +41,30 @@ _INSTALL_DIR = os.environ.get(
 _TOOLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools")
 sys.path.insert(0, _TOOLS_DIR)
 
+from tools.admission import ADMISSION, work_class  # noqa: E402
+from tools.capture import OutputCapture, capture_limit, log_dir, read_log  # noqa: E402
+from tools.diagnostics import (  # noqa: E402
+    delta as diagnostic_delta, format_diagnostic, load_snapshot, parse as parse_diagnostics, save_snapshot,
+    structured_command,
+)
+from tools.hook_client import socket_path  # noqa: E402
+from tools.jobs import JobRegistry, current_job  # noqa: E402
+from tools.lint_cache import LINT_CACHE, DEFAULT_MAX_ENTRIES as LINT_CACHE_MAX_ENTRIES  # noqa: E402
+from tools.lint_shards import (  # noqa: E402
+    MAX_ARG_CHARS, list_files, merge_outputs, plan_shards, shard_commands, shard_count,
+)
+from tools.lint_watch import PreLinter  # noqa: E402
+from tools.metrics import Metrics, MetricsExporter  # noqa: E402
+from tools.process import (  # noqa: E402
+    PROCESS_STATS, format_usage, limits_from_config, run_command, stream_shell, sum_usage,
+)
+from tools.projects import ProjectRegistry, current_project, root_paths  # noqa: E402
+from tools.resources import ResourceWatcher, list_resources, read_resource  # noqa: E402
+from tools.run_report import RunReport  # noqa: E402
+from tools.test_impact import plan as plan_affected_tests, record_green, snapshot as test_snapshot  # noqa: E402
+from tools.trace import TraceSink, span as trace_span  # noqa: E402
+from tools.transport import DEFAULT_IDLE_TIMEOUT, DaemonServer, StdioClient, current_client  # noqa: E402
+
 # MCP protocol constants
 JSONRPC_VERSION = "2.0"
 MCP_PROTOCOL_VERSION = "2024-11-05"
@@ -43,28 +75,132 @@ SERVER_INFO = {
     "version": "1.0.0",
 }
 
+# Tool calls in flight, keyed by JSON-RPC request id
+JOBS = JobRegistry()
+
+# Projects this server answers for, with their caches (tools/projects.py)
+PROJECTS = ProjectRegistry(_PROJECT_DIR, _INSTALL_DIR)
+
+# resources/subscribe subscriptions and their file watcher (tools/resources.py)
+RESOURCES = ResourceWatcher()
+
+# Background pre-linter, started by _serve() when CC_LINT_WATCH is "true"
+LINT_WATCH: PreLinter | None = None
+
+# Per-method and per-tool request metrics (cc_server_stats, Prometheus)
+METRICS = Metrics(project=os.path.basename(os.path.abspath(_PROJECT_DIR)))
+
+# JSONL span sink, set up by _serve() when CC_TRACE is "1"
+TRACE: TraceSink | None = None
+# Session recorded on MCP spans (clients may set CLAUDE_SESSION_ID)
+TRACE_SESSION = os.environ.get("CLAUDE_SESSION_ID") or f"mcp-{os.getpid()}-{int(time.time())}"
+
+# The stdio client, and the daemon serving socket/HTTP clients (--daemon)
+STDIO = StdioClient(TRACE_SESSION)
+DAEMON: DaemonServer | None = None
+
+# cc_lint_check time limits (seconds); CC_TEST_TIMEOUT overrides the test one
+LINT_TIMEOUT = 120
+DEFAULT_TEST_TIMEOUT = 120
+# Output carried by one notifications/progress message (tail kept if longer)
+PROGRESS_CHUNK_CHARS = 4000
+# Changed and selected files listed in an affected-tests summary
+AFFECTED_LISTED = 50
+# Findings listed per section of a delta lint response, and the most spilled
+# output parsed for one
+DELTA_LISTED = 200
+DELTA_MAX_PARSE_BYTES = 33554432
+
 # Tool registry
 TOOLS = [
     {
         "name": "cc_lint_check",
-        "description": "Run the project's lint or test command as configured in cognitive-core.conf.",
+        "description": (
+            "Run the project's lint or test command as configured in cognitive-core.conf. "
+            "Test runs send notifications/progress (output chunks, pass/fail counters) when "
+            "the call has a progressToken, and return a compact summary."
+        ),
         "inputSchema": {
             "type": "object",
             "properties": {
                 "mode": {
                     "type": "string",
-                    "enum": ["lint", "test"],
-                    "description": "Run 'lint' or 'test' command",
+                    "enum": ["lint", "test", "affected-tests"],
+                    "description": (
+                        "Run 'lint' or 'test' command, or 'affected-tests': only the tests that "
+                        "import files changed since the last green run or CC_MAIN_BRANCH"
+                    ),
                     "default": "lint",
                 },
+                "since": {
+                    "type": "string",
+                    "enum": ["auto", "last-green", "main"],
+                    "description": (
+                        "affected-tests base: last green test run, merge-base with CC_MAIN_BRANCH, "
+                        "or auto (last green if recorded, else main)"
+                    ),
+                    "default": "auto",
+                },
                 "path": {
                     "type": "string",
                     "description": "Optional file or directory to check (passed as $1)",
                     "default": ".",
                 },
+                "output": {
+                    "type": "string",
+                    "enum": ["full", "delta"],
+                    "description": (
+                        "Lint response: 'full' output, or 'delta': parsed findings added or "
+                        "resolved since the previous delta run for this path, plus an unchanged count"
+                    ),
+                    "default": "full",
+                },
+                "fresh": {
+                    "type": "boolean",
+                    "description": (
+                        "Run the linter now even if the background watcher (CC_LINT_WATCH) "
+                        "has a snapshot for the path"
+                    ),
+                    "default": False,
+                },
+                "shards": {
+                    "type": "integer",
+                    "description": (
+                        "Lint a directory as N parallel batches of its CC_LINT_EXTENSIONS files "
+                        "(default CC_LINT_SHARDS; 0 = one run)"
+                    ),
+                    "minimum": 0,
+                },
             },
         },
     },
+    {
+        "name": "cc_read_log",
+        "description": (
+            "Read a byte range of a full lint/test log spilled by cc_lint_check "
+            "(log_id from its result)."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "log_id": {
+                    "type": "string",
+                    "description": "Log id from a cc_lint_check result",
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "First byte to read; negative counts from the end",
+                    "default": 0,
+                },
+                "length": {
+                    "type": "integer",
+                    "description": "Bytes to read (max 1048576)",
+                    "default": 65536,
+                },
+            },
+            "required": ["log_id"],
+        },
+    },
     {
         "name": "cc_security_validate",
         "description": "Validate a bash command against cognitive-core safety rules. Returns allow/deny with reason.",
@@ -79,6 +215,29 @@ TOOLS = [
             "required": ["command"],
         },
     },
+    {
+        "name": "cc_security_validate_batch",
+        "description": (
+            "Validate many bash commands in one call against cognitive-core safety rules. "
+            "Returns per-command allow/deny decisions and a summary."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "commands": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "The bash commands to validate",
+                },
+                "split": {
+                    "type": "boolean",
+                    "description": "Also validate each &&, ||, ;, | segment of every command",
+                    "default": False,
+                },
+            },
+            "required": ["commands"],
+        },
+    },
     {
         "name": "cc_project_info",
         "description": "Return project configuration, installed agents, skills, and hooks from cognitive-core.",
@@ -120,18 +279,49 @@ TOOLS = [
             "required": ["agent_name"],
         },
     },
+    {
+        "name": "cc_server_stats",
+        "description": "Report server cache statistics (config snapshot, security decision and lint result hits and misses).",
+        "inputSchema": {
+            "type": "object",
+            "properties": {},
+        },
+    },
+    {
+        "name": "cc_server_jobs",
+        "description": "List tool calls currently running in this server, with their subprocesses.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {},
+        },
+    },
 ]
 
+# Every project-scoped tool takes the project to act on (tools/projects.py)
+for _tool in TOOLS:
+    if _tool["name"] not in ("cc_server_stats", "cc_server_jobs"):
+        _tool["inputSchema"]["properties"]["project_dir"] = {
+            "type": "string",
+            "description": (
+                "cognitive-core project to act on, absolute or relative to the server's project "
+                "(default: the first project among the client's MCP roots, else the server's project)"
+            ),
+        }
+
+
+def _load_config(project_dir: str | None = None) -> dict:
+    """Load CC_ variables from cognitive-core.conf (cached by file stat).
 
-def _load_config() -> dict:
-    """Load CC_ variables from cognitive-core.conf."""
+    project_dir defaults to the current request's project.
+    """
+    project_dir = project_dir or _project().root
     try:
         from tools.utils import load_config
-        return load_config(_PROJECT_DIR)
+        return load_config(project_dir)
     except ImportError:
         pass
     # Inline fallback if utils not importable
-    conf_path = os.path.join(_PROJECT_DIR, "cognitive-core.conf")
+    conf_path = os.path.join(project_dir, "cognitive-core.conf")
     if not os.path.isfile(conf_path):
         return {}
     try:
@@ -151,58 +341,497 @@ def _load_config() -> dict:
 
 
 def _list_dir_contents(subdir: str) -> list:
-    """List files in a .cognitive-core subdirectory."""
-    try:
-        from tools.utils import list_dir_contents
-        return list_dir_contents(_INSTALL_DIR, subdir)
-    except ImportError:
-        pass
-    dir_path = os.path.join(_INSTALL_DIR, subdir)
-    if not os.path.isdir(dir_path):
-        return []
-    return sorted(os.listdir(dir_path))
+    """List files in a .cognitive-core subdirectory (cached per project)."""
+    return _project().listing(subdir)
+
+
+def _project():
+    """Project of the current request (the server's own outside requests)."""
+    return current_project.get() or PROJECTS.default
 
 
 # ---- Tool implementations ----
 
-def handle_cc_lint_check(arguments: dict) -> dict:
-    """Run lint or test command."""
+def _progress_notifier(job, report: RunReport):
+    """on_output callback: feed report, and send notifications/progress if asked."""
+    token = job.progress_token if job is not None else None
+    # Output may arrive off the request's task: bind its client now
+    client = current_client.get() or STDIO
+
+    def on_output(chunks: list) -> None:
+        text = "".join(chunk for _stream, chunk in chunks)
+        report.feed(text)
+        if token is None:
+            return
+        if len(text) > PROGRESS_CHUNK_CHARS:
+            text = "...\n" + text[-PROGRESS_CHUNK_CHARS:]
+        client.send(_notification("notifications/progress", {
+            "progressToken": token,
+            "progress": report.bytes,
+            "message": text,
+            "counters": report.counters(),
+        }))
+
+    return on_output
+
+
+async def handle_cc_lint_check(arguments: dict) -> dict:
+    """Run lint or test command.
+
+    Test runs stream: with a progressToken in the call's _meta, output chunks
+    and live pass/fail counters go out as notifications/progress, and the
+    result is a compact summary (counters, failures, last lines) rather than
+    the full log. Lint runs return their output (head and tail when long)
+    and are answered from LINT_CACHE while the linted content is unchanged;
+    with shards (or CC_LINT_SHARDS) a directory is linted in parallel batches.
+    """
     config = _load_config()
     mode = arguments.get("mode", "lint")
     path = arguments.get("path", ".")
 
     if mode == "test":
-        cmd = config.get("CC_TEST_COMMAND", "echo no-tests")
+        template = config.get("CC_TEST_COMMAND", "echo no-tests")
     else:
-        cmd = config.get("CC_LINT_COMMAND", "echo no-lint")
+        template = config.get("CC_LINT_COMMAND", "echo no-lint")
 
     # Substitute $1 with path
-    cmd = cmd.replace("$1", shlex.quote(path))
+    cmd = template.replace("$1", shlex.quote(path))
+
+    if mode == "affected-tests":
+        return await _run_affected_tests(arguments.get("since", "auto"), config)
+    if mode == "test":
+        return await _run_tests(cmd, config, green=path in (".", ""))
+    if arguments.get("output") == "delta":
+        return await _run_lint_delta(cmd, path, config)
+    watched = LINT_WATCH is not None and _project() is PROJECTS.default
+    if watched and not arguments.get("fresh") and LINT_WATCH.covers(path):
+        snapshot = await _lint_snapshot(cmd, path, config, template)
+        if snapshot is not None:
+            return snapshot
+    shards = arguments.get("shards", config.get("CC_LINT_SHARDS"))
+    return await _run_lint(cmd, path, config, template=template, shards=shards)
+
+
+def _lint_text(
+    cmd: str, exit_code: int, stdout: str, stderr: str, cached: bool = False, snapshot: str = "", usage: str = "",
+) -> str:
+    return (
+        f"Command: {cmd}\n"
+        f"Exit code: {exit_code}\n"
+        + (f"Usage: {usage}\n" if usage else "")
+        + ("Cache: hit (file content unchanged)\n" if cached else "")
+        + (f"Snapshot: {snapshot}\n" if snapshot else "")
+        + f"--- stdout ---\n{stdout}\n"
+        f"--- stderr ---\n{stderr}"
+    )
+
+
+async def _lint_snapshot(cmd: str, path: str, config: dict, template: str) -> dict | None:
+    """Answer from the background pre-linter's snapshot, with staleness info.
+
+    A directory is answered only if every lint file under it has a result;
+    per-file outputs are merged as for sharded runs. None if there is no
+    snapshot for the path.
+    """
+    loop = asyncio.get_running_loop()
+    root = _project().root
+    target = os.path.join(root, path)
+    if os.path.isdir(target):
+        extensions = config.get("CC_LINT_EXTENSIONS", "").split()
+        files = await loop.run_in_executor(None, list_files, root, path, extensions)
+    else:
+        files = [path]
+    results = [(rel, LINT_WATCH.lookup(rel, template)) for rel in files]
+    if not results or any(result is None for _rel, result in results):
+        return None
+    stale = [rel for rel, result in results if result["stale"]]
+    pending = sum(1 for _rel, result in results if result["pending"])
+    age = max(result["age_s"] for _rel, result in results)
+    if stale:
+        note = f"stale ({len(stale)} file(s) changed since linted, e.g. {stale[0]}; {pending} re-lint(s) pending)"
+    else:
+        note = "fresh"
+    note += f", linted {age:.1f}s ago by the background watcher"
+    if len(results) == 1:
+        result = results[0][1]
+        stdout, stderr = result["stdout"], result["stderr"]
+    else:
+        stdout = merge_outputs([([rel], result["stdout"]) for rel, result in results], root)
+        stderr = merge_outputs([([rel], result["stderr"]) for rel, result in results], root)
+    exit_code = max(result["exit_code"] for _rel, result in results)
+    return {
+        "content": [{"type": "text", "text": _lint_text(cmd, exit_code, stdout, stderr, snapshot=note)}],
+    }
+
+
+async def _run_lint(cmd: str, path: str, config: dict, template: str = "", shards=None) -> dict:
+    """Run the lint command, answering from LINT_CACHE when the target is unchanged."""
+    result = await _lint_output(cmd, path, config, template=template, shards=shards)
+    if result["timed_out"]:
+        return {
+            "content": [{"type": "text", "text": f"Command timed out after {LINT_TIMEOUT}s: {cmd}"}],
+            "isError": True,
+        }
+    text = _lint_text(
+        cmd, result["exit_code"], result["stdout"], result["stderr"],
+        cached=result["cached"], usage=format_usage(result["usage"]),
+    )
+    if result["logs"]:
+        text += "\n--- full logs (cc_read_log) ---\n" + "\n".join(result["logs"])
+    if result["shards"]:
+        text += "\n--- shards ---\n" + result["shards"]
+    return {
+        "content": [{"type": "text", "text": text}],
+    }
+
+
+async def _run_lint_delta(cmd: str, path: str, config: dict) -> dict:
+    """Lint path and report only findings added or resolved since the last delta run.
+
+    Linters with a JSON format (see tools/diagnostics.py) are asked for it;
+    other output goes through the regex fallback. The full spilled log is
+    parsed when the output outgrew the in-memory capture.
+    """
+    loop = asyncio.get_running_loop()
+    root = _project().root
+    structured, fmt = structured_command(cmd)
+    result = await _lint_output(structured, path, config)
+    if result["timed_out"]:
+        return {
+            "content": [{"type": "text", "text": f"Command timed out after {LINT_TIMEOUT}s: {structured}"}],
+            "isError": True,
+        }
+    stdout = result["stdout"]
+    if result["stdout_log"]:
+        try:
+            stdout = await loop.run_in_executor(
+                None, _read_text, os.path.join(log_dir(root), result["stdout_log"]), DELTA_MAX_PARSE_BYTES,
+            )
+        except OSError:
+            pass
+    default_file = path if os.path.isfile(os.path.join(root, path)) else ""
+    diagnostics, parser = await loop.run_in_executor(
+        None, parse_diagnostics, fmt, stdout, result["stderr"], root, default_file,
+    )
+    previous = await loop.run_in_executor(None, load_snapshot, root, path, structured)
+    await loop.run_in_executor(None, save_snapshot, root, path, structured, diagnostics)
+    change = diagnostic_delta(previous["diagnostics"] if previous else [], diagnostics)
+
+    lines = [
+        f"Command: {structured}",
+        f"Exit code: {result['exit_code']}",
+        f"Parser: {parser}" + (" (cached output)" if result["cached"] else ""),
+        f"Delta: {len(change['added'])} added, {len(change['resolved'])} resolved, "
+        f"{change['unchanged']} unchanged"
+        + (f" (since the delta run {time.time() - previous['created']:.0f}s ago)" if previous
+           else " (first delta run for this path: every finding is listed as added)"),
+    ]
+    if not diagnostics and result["exit_code"] != 0 and (result["stdout"].strip() or result["stderr"].strip()):
+        lines.append("Note: lint failed but no findings were recognised; use output=full to see the output")
+    for title, found in (("added", change["added"]), ("resolved", change["resolved"])):
+        if found:
+            lines.append(f"--- {title} ---")
+            lines.extend(format_diagnostic(d) for d in found[:DELTA_LISTED])
+            if len(found) > DELTA_LISTED:
+                lines.append(f"[... {len(found) - DELTA_LISTED} more {title} ...]")
+    return {
+        "content": [{"type": "text", "text": "\n".join(lines)}],
+    }
+
+
+def _read_text(path: str, limit: int) -> str:
+    with open(path, "rb") as fh:
+        return fh.read(limit).decode("utf-8", errors="replace")
+
+
+async def _lint_output(cmd: str, path: str, config: dict, template: str = "", shards=None) -> dict:
+    """
+    Lint output for cmd on path: from LINT_CACHE, sharded, or one run.
+
+    Returns:
+        dict with exit_code, timed_out, stdout, stderr, cached, logs (spill
+        log lines), stdout_log (log id of a single run's spilled stdout),
+        shards (per-shard report, or None) and usage (CPU time and peak RSS
+        of the lint processes, None when cached).
+    """
+    loop = asyncio.get_running_loop()
+    root = _project().root
+    extensions = config.get("CC_LINT_EXTENSIONS", "").split()
+    # Sharding needs a directory, known extensions and a command taking files as $1
+    files = []
+    if "$1" in template and shard_count(shards, 1):
+        files = await loop.run_in_executor(None, list_files, root, path, extensions)
+    n = shard_count(shards, len(files))
+    # Merged shard output is ordered differently from a single run's
+    cache_cmd = f"{cmd}\n# sharded" if n else cmd
+
+    key = None
+    if (config.get("CC_LINT_CACHE") or "true") == "true":
+        try:
+            LINT_CACHE.max_entries = int(config.get("CC_LINT_CACHE_MAX_ENTRIES") or LINT_CACHE_MAX_ENTRIES)
+        except ValueError:
+            pass
+        key = await loop.run_in_executor(None, LINT_CACHE.key, root, cache_cmd, path, extensions)
+        cached = await loop.run_in_executor(None, LINT_CACHE.get, root, key) if key else None
+        if cached is not None:
+            return dict(cached, timed_out=False, cached=True, logs=[], stdout_log=None, shards=None, usage=None)
+
+    job = current_job.get()
+    notify = _progress_notifier(job, RunReport()) if job is not None and job.progress_token is not None else None
+    if n:
+        result = await _lint_sharded(template, files, n, config, notify)
+    else:
+        result = await _lint_once(cmd, config, notify)
+    result["cached"] = False
+    if result["timed_out"]:
+        return result
+    if key and not result["logs"] and result["exit_code"] >= 0:
+        # Store only if the target did not change while the linter ran
+        if await loop.run_in_executor(None, LINT_CACHE.key, root, cache_cmd, path, extensions) == key:
+            await loop.run_in_executor(None, LINT_CACHE.put, root, key, {
+                "exit_code": result["exit_code"],
+                "stdout": result["stdout"],
+                "stderr": result["stderr"],
+            })
+    return result
+
+
+async def _lint_once(cmd: str, config: dict, notify) -> dict:
+    """One lint run with bounded capture."""
+    limit = capture_limit(config)
+    captures = {
+        stream: OutputCapture(log_dir(_project().root), f"lint-{stream}", limit)
+        for stream in ("stdout", "stderr")
+    }
+
+    def on_output(chunks: list) -> None:
+        for stream, chunk in chunks:
+            captures[stream].write(chunk)
+        if notify is not None:
+            notify(chunks)
 
     try:
-        result = subprocess.run(
-            ["bash", "-c", cmd],
-            capture_output=True, text=True, timeout=120,
-            cwd=_PROJECT_DIR,
+        result = await stream_shell(
+            cmd, on_output, cwd=_project().root, timeout=LINT_TIMEOUT, limits=limits_from_config(config),
         )
+    finally:
+        for capture in captures.values():
+            capture.close()
+    return {
+        "exit_code": result["exit_code"],
+        "timed_out": result["timed_out"],
+        "stdout": captures["stdout"].text(),
+        "stderr": captures["stderr"].text(),
+        "logs": [f"{stream}: {c.log_id} ({c.total} bytes)" for stream, c in captures.items() if c.log_id],
+        "stdout_log": captures["stdout"].log_id,
+        "shards": None,
+        "usage": result["usage"],
+    }
+
+
+async def _lint_sharded(template: str, files: list, n: int, config: dict, notify) -> dict:
+    """
+    Lint files as n concurrent batches and merge their output.
+
+    All shards share the LINT_TIMEOUT budget. The exit code is the highest
+    shard exit code; if any shard spilled its output, the shard outputs are
+    concatenated rather than merged and every spill log is listed.
+    """
+    loop = asyncio.get_running_loop()
+    root = _project().root
+    batches = await loop.run_in_executor(None, plan_shards, root, files, n)
+    limit = capture_limit(config)
+    limits = limits_from_config(config)
+    deadline = time.monotonic() + LINT_TIMEOUT
+
+    async def run_shard(index: int, batch: list) -> dict:
+        captures = {
+            stream: OutputCapture(log_dir(root), f"lint-shard{index}-{stream}", limit)
+            for stream in ("stdout", "stderr")
+        }
+
+        def on_output(chunks: list) -> None:
+            for stream, chunk in chunks:
+                captures[stream].write(chunk)
+            if notify is not None:
+                notify(chunks)
+
+        commands = shard_commands(template, batch)
+        exit_code, timed_out, usages = 0, False, []
+        start = time.monotonic()
+        try:
+            for command in commands:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                result = await stream_shell(command, on_output, cwd=root, timeout=remaining, limits=limits)
+                usages.append(result["usage"])
+                timed_out = result["timed_out"]
+                if timed_out:
+                    break
+                exit_code = max(exit_code, result["exit_code"])
+        finally:
+            for capture in captures.values():
+                capture.close()
         return {
-            "content": [
-                {
-                    "type": "text",
-                    "text": (
-                        f"Command: {cmd}\n"
-                        f"Exit code: {result.returncode}\n"
-                        f"--- stdout ---\n{result.stdout}\n"
-                        f"--- stderr ---\n{result.stderr}"
-                    ),
-                }
-            ],
+            "files": batch,
+            "invocations": len(commands),
+            "seconds": time.monotonic() - start,
+            "exit_code": exit_code,
+            "timed_out": timed_out,
+            "captures": captures,
+            "usage": sum_usage(usages),
+        }
+
+    start = time.monotonic()
+    shards = await asyncio.gather(*(run_shard(i, batch) for i, batch in enumerate(batches, 1)))
+    wall = time.monotonic() - start
+
+    logs = [
+        f"shard {i} {stream}: {c.log_id} ({c.total} bytes)"
+        for i, shard in enumerate(shards, 1) for stream, c in shard["captures"].items() if c.log_id
+    ]
+    streams = {}
+    for stream in ("stdout", "stderr"):
+        outputs = [(shard["files"], shard["captures"][stream].text()) for shard in shards]
+        if logs:
+            streams[stream] = "".join(text for _files, text in outputs)
+        else:
+            streams[stream] = await loop.run_in_executor(None, merge_outputs, outputs, root)
+    report = [
+        f"shard {i}: {len(shard['files'])} files, {shard['invocations']} run(s), "
+        f"{shard['seconds']:.2f}s, exit {shard['exit_code']}"
+        for i, shard in enumerate(shards, 1)
+    ]
+    report.append(f"wall {wall:.2f}s, total {sum(shard['seconds'] for shard in shards):.2f}s")
+    return {
+        "exit_code": max(shard["exit_code"] for shard in shards),
+        "timed_out": any(shard["timed_out"] for shard in shards),
+        "stdout": streams["stdout"],
+        "stderr": streams["stderr"],
+        "logs": logs,
+        "stdout_log": None,
+        "shards": "\n".join(report),
+        "usage": sum_usage(shard["usage"] for shard in shards),
+    }
+
+
+async def _run_affected_tests(since: str, config: dict) -> dict:
+    """Run the tests affected by changes since the last green run or main.
+
+    The selected files replace $1 in CC_TEST_FILES_COMMAND (or in
+    CC_TEST_COMMAND if it has $1). The whole suite runs instead when a
+    project-wide config file or a file outside the import graph (other than
+    docs and tool state, which select no tests) changed, no per-file command is configured, or the file list is too long for
+    one command line.
+    """
+    loop = asyncio.get_running_loop()
+    impact = await loop.run_in_executor(None, plan_affected_tests, _project().root, config, since)
+    if "error" in impact:
+        return {"content": [{"type": "text", "text": f"affected-tests: {impact['error']}"}], "isError": True}
+    affected = {
+        "base": impact["base"],
+        "commit": impact["commit"],
+        "changed": len(impact["changed"]),
+        "changed_files": impact["changed"][:AFFECTED_LISTED],
+        "tests": len(impact["tests"]),
+        "test_files": impact["tests"][:AFFECTED_LISTED],
+        "unmapped": impact["unmapped"][:AFFECTED_LISTED],
+        "no_tests": impact["no_tests"][:AFFECTED_LISTED],
+        "full_run": impact["full_run"],
+        "graph": impact["graph"],
+    }
+    template = config.get("CC_TEST_FILES_COMMAND") or ""
+    if not template and "$1" in config.get("CC_TEST_COMMAND", ""):
+        template = config["CC_TEST_COMMAND"]
+    files = " ".join(shlex.quote(t) for t in impact["tests"])
+    if not affected["full_run"]:
+        if not impact["tests"]:
+            affected["skipped"] = "no affected tests"
+            return {"content": [{"type": "text", "text": json.dumps({"affected": affected}, indent=2)}]}
+        if not template:
+            affected["full_run"] = "CC_TEST_FILES_COMMAND not set"
+        elif len(files) > MAX_ARG_CHARS:
+            affected["full_run"] = f"{len(impact['tests'])} test files exceed one command line"
+    if affected["full_run"]:
+        cmd = config.get("CC_TEST_COMMAND", "echo no-tests").replace("$1", ".")
+    else:
+        cmd = template.replace("$1", files)
+    return await _run_tests(cmd, config, affected=affected, green=True)
+
+
+async def _run_tests(cmd: str, config: dict, affected: dict | None = None, green: bool = False) -> dict:
+    """Stream a test run through RunReport and return its summary.
+
+    The full output is spilled to a log file; summary["log_id"] names it
+    for cc_read_log. With green, a passing run is recorded as the last
+    green run for affected-tests.
+    """
+    root = _project().root
+    try:
+        timeout = float(config.get("CC_TEST_TIMEOUT") or DEFAULT_TEST_TIMEOUT)
+    except ValueError:
+        timeout = DEFAULT_TEST_TIMEOUT
+    report = RunReport()
+    capture = OutputCapture(log_dir(root), "test", capture_limit(config), always_spill=True)
+    notify = _progress_notifier(current_job.get(), report)
+
+    def on_output(chunks: list) -> None:
+        for _stream, chunk in chunks:
+            capture.write(chunk)
+        notify(chunks)
+
+    loop = asyncio.get_running_loop()
+    before = await loop.run_in_executor(None, test_snapshot, root) if green else None
+    started = time.monotonic()
+    try:
+        result = await stream_shell(
+            cmd, on_output, cwd=root, timeout=timeout, limits=limits_from_config(config),
+        )
+    finally:
+        capture.close()
+    if before is not None and result["exit_code"] == 0 and not result["timed_out"]:
+        await loop.run_in_executor(None, record_green, root, before)
+    summary = {
+        "command": cmd,
+        "exit_code": result["exit_code"],
+        "timed_out": result["timed_out"],
+        "duration_s": round(time.monotonic() - started, 3),
+        "usage": result["usage"],
+    }
+    summary.update(report.summary())
+    summary["log_id"] = capture.log_id
+    if affected is not None:
+        summary["affected"] = affected
+    response = {"content": [{"type": "text", "text": json.dumps(summary, indent=2)}]}
+    if result["timed_out"]:
+        response["isError"] = True
+    return response
+
+
+def handle_cc_read_log(arguments: dict) -> dict:
+    """Page through a spilled lint/test log."""
+    try:
+        result = read_log(
+            _project().root,
+            arguments.get("log_id", ""),
+            offset=arguments.get("offset", 0),
+            length=arguments.get("length", 65536),
+        )
+    except (ValueError, TypeError) as e:
+        return {
+            "content": [{"type": "text", "text": f"Error: {e}"}],
+            "isError": True,
         }
-    except subprocess.TimeoutExpired:
+    except OSError:
         return {
-            "content": [{"type": "text", "text": f"Command timed out after 120s: {cmd}"}],
+            "content": [{"type": "text", "text": f"Error: log not found: {arguments.get('log_id')}"}],
             "isError": True,
         }
+    return {
+        "content": [{"type": "text", "text": json.dumps(result, indent=2)}],
+    }
 
 
 def handle_cc_security_validate(arguments: dict) -> dict:
@@ -214,10 +843,13 @@ def handle_cc_security_validate(arguments: dict) -> dict:
             "isError": True,
         }
 
-    # Import the security validation module
+    # Import the security validation module (same engine as the hook host)
     try:
-        import security_validate
-        result = security_validate.validate_command(command)
+        from tools import security_validate
+        result = security_validate.validate_command(
+            command, config=_load_config(), cwd=_project().root,
+            cache=_project().decisions,
+        )
         return {
             "content": [{"type": "text", "text": json.dumps(result, indent=2)}],
         }
@@ -229,13 +861,33 @@ def handle_cc_security_validate(arguments: dict) -> dict:
         }
 
 
+def handle_cc_security_validate_batch(arguments: dict) -> dict:
+    """Validate a list of bash commands with one config load and rule set."""
+    commands = arguments.get("commands")
+    if not isinstance(commands, list) or not all(isinstance(c, str) for c in commands):
+        return {
+            "content": [{"type": "text", "text": "Error: commands must be an array of strings"}],
+            "isError": True,
+        }
+
+    from tools import security_validate
+    result = security_validate.validate_batch(
+        commands, config=_load_config(), cwd=_project().root, split=bool(arguments.get("split", False)),
+        cache=_project().decisions,
+    )
+    # Compact: batches run to hundreds of results
+    return {
+        "content": [{"type": "text", "text": json.dumps(result, separators=(",", ":"))}],
+    }
+
+
 def _inline_security_validate(command: str) -> dict:
     """Inline security validation fallback."""
     import re
     cmd_lower = command.lower()
     # Import from tools module if available, else use inline patterns
     try:
-        import security_validate
+        from tools import security_validate
         return security_validate.validate_command(command)
     except ImportError:
         pass
@@ -286,8 +938,9 @@ def handle_cc_project_info(arguments: dict) -> dict:
     }
 
 
-def handle_cc_hook_run(arguments: dict) -> dict:
+async def handle_cc_hook_run(arguments: dict) -> dict:
     """Execute a cognitive-core hook."""
+    project = _project()
     hook_name = arguments.get("hook_name", "")
     input_json = arguments.get("input_json", "{}")
 
@@ -304,31 +957,28 @@ def handle_cc_hook_run(arguments: dict) -> dict:
             "isError": True,
         }
 
-    hook_path = os.path.join(_INSTALL_DIR, "hooks", f"{hook_name}.sh")
+    hook_path = os.path.join(project.install_dir, "hooks", f"{hook_name}.sh")
     if not os.path.isfile(hook_path):
-        hook_path = os.path.join(_INSTALL_DIR, "hooks", hook_name)
+        hook_path = os.path.join(project.install_dir, "hooks", hook_name)
         if not os.path.isfile(hook_path):
             return {
                 "content": [{"type": "text", "text": f"Error: hook not found: {hook_name}"}],
                 "isError": True,
             }
 
-    try:
-        result = subprocess.run(
-            ["bash", hook_path],
-            input=input_json,
-            capture_output=True, text=True, timeout=30,
-            cwd=_PROJECT_DIR,
-        )
-        output = result.stdout.strip() or "(no output)"
-        return {
-            "content": [{"type": "text", "text": output}],
-        }
-    except subprocess.TimeoutExpired:
+    result = await run_command(
+        ["bash", hook_path], cwd=project.root, timeout=30, input_text=input_json,
+        limits=limits_from_config(_load_config()),
+    )
+    if result["timed_out"]:
         return {
             "content": [{"type": "text", "text": f"Hook timed out after 30s: {hook_name}"}],
             "isError": True,
         }
+    output = result["stdout"].strip() or "(no output)"
+    return {
+        "content": [{"type": "text", "text": output}],
+    }
 
 
 def handle_cc_agent_context(arguments: dict) -> dict:
@@ -349,16 +999,16 @@ def handle_cc_agent_context(arguments: dict) -> dict:
         }
 
     # Try with and without .md extension
+    project = _project()
     candidates = [
-        os.path.join(_INSTALL_DIR, "agents", f"{agent_name}.md"),
-        os.path.join(_INSTALL_DIR, "agents", agent_name),
+        os.path.join(project.install_dir, "agents", f"{agent_name}.md"),
+        os.path.join(project.install_dir, "agents", agent_name),
     ]
 
     for agent_path in candidates:
         if os.path.isfile(agent_path):
             try:
-                with open(agent_path, encoding="utf-8") as f:
-                    content = f.read()
+                content = project.doc(agent_path)
                 return {
                     "content": [{"type": "text", "text": content}],
                 }
@@ -378,36 +1028,89 @@ def handle_cc_agent_context(arguments: dict) -> dict:
     }
 
 
+def handle_cc_server_stats(arguments: dict) -> dict:
+    """Report server cache statistics."""
+    try:
+        from tools.utils import CONFIG_CACHE
+        config_cache = CONFIG_CACHE.stats()
+    except ImportError:
+        config_cache = {"available": False}
+    decision_cache = PROJECTS.default.decisions.stats()
+    stats = {
+        "config_cache": config_cache,
+        "decision_cache": decision_cache,
+        "lint_cache": LINT_CACHE.stats(),
+        "lint_watch": LINT_WATCH.stats() if LINT_WATCH is not None else {"enabled": False},
+        "processes": PROCESS_STATS.stats(),
+        "admission": ADMISSION.stats(),
+        "metrics": METRICS.stats(),
+        "daemon": DAEMON.stats() if DAEMON is not None else {"transport": "stdio"},
+        "projects": PROJECTS.stats(),
+        "doc_bundle": PROJECTS.default.bundle.stats(),
+        "resources": RESOURCES.stats(),
+    }
+    return {
+        "content": [{"type": "text", "text": json.dumps(stats, indent=2)}],
+    }
+
+
+async def handle_cc_server_jobs(arguments: dict) -> dict:
+    """List running tool calls (excluding this one)."""
+    jobs = JOBS.snapshot(exclude=current_job.get())
+    return {
+        "content": [{"type": "text", "text": json.dumps({"jobs": jobs}, indent=2)}],
+    }
+
+
 # ---- Tool dispatch ----
 
 TOOL_HANDLERS = {
     "cc_lint_check": handle_cc_lint_check,
+    "cc_read_log": handle_cc_read_log,
     "cc_security_validate": handle_cc_security_validate,
+    "cc_security_validate_batch": handle_cc_security_validate_batch,
     "cc_project_info": handle_cc_project_info,
     "cc_hook_run": handle_cc_hook_run,
     "cc_agent_context": handle_cc_agent_context,
+    "cc_server_jobs": handle_cc_server_jobs,
+    "cc_server_stats": handle_cc_server_stats,
 }
 
 
 # ---- MCP Protocol ----
 
-def handle_request(request: dict) -> dict:
-    """Handle a single JSON-RPC request."""
+async def handle_request(request: dict) -> dict:
+    """Handle a single JSON-RPC request.
+
+    Tool handlers may be coroutines (subprocess-backed tools) or plain
+    functions; plain handlers run in the default executor so a slow config
+    load never stalls the event loop. Heavy calls (lint, tests, hooks) first
+    wait for an admission slot; interactive ones start right away.
+    """
     method = request.get("method", "")
     req_id = request.get("id")
     params = request.get("params", {})
 
     if method == "initialize":
+        client = current_client.get() or STDIO
+        client.roots_supported = "roots" in (params.get("capabilities") or {})
         return _success(req_id, {
             "protocolVersion": MCP_PROTOCOL_VERSION,
             "capabilities": {
                 "tools": {},
+                "resources": {"subscribe": True, "listChanged": False},
             },
             "serverInfo": SERVER_INFO,
         })
 
-    elif method == "notifications/initialized":
-        # Client acknowledgement — no response needed
+    elif method in ("notifications/initialized", "notifications/roots/list_changed"):
+        # Client acknowledgement (or new workspace folders) — no response needed
+        _refresh_roots(current_client.get() or STDIO)
+        return None
+
+    elif method == "notifications/cancelled":
+        # Client gave up on a request — kill its subprocesses, send no response
+        JOBS.cancel(params.get("requestId"), (current_client.get() or STDIO).key)
         return None
 
     elif method == "tools/list":
@@ -422,11 +1125,34 @@ def handle_request(request: dict) -> dict:
             return _error(req_id, -32601, f"Unknown tool: {tool_name}")
 
         try:
-            result = handler(arguments)
+            await _select_project(arguments.get("project_dir"))
+        except ValueError as e:
+            return _success(req_id, {"content": [{"type": "text", "text": f"Error: {e}"}], "isError": True})
+
+        loop = asyncio.get_running_loop()
+        klass = work_class(tool_name, arguments)
+        job = current_job.get()
+        try:
+            if klass is not None:
+                ADMISSION.configure(await loop.run_in_executor(None, _load_config, _PROJECT_DIR))
+                if job is not None:
+                    job.state = "queued"
+            async with ADMISSION.slot(klass) as waited:
+                if job is not None:
+                    job.state, job.queued_s = "running", waited
+                if inspect.iscoroutinefunction(handler):
+                    result = await handler(arguments)
+                else:
+                    # Carry current_project/current_job into the worker thread
+                    context = contextvars.copy_context()
+                    result = await loop.run_in_executor(None, context.run, handler, arguments)
             return _success(req_id, result)
         except Exception as e:
             return _error(req_id, -32603, f"Tool error: {e}")
 
+    elif method in ("resources/list", "resources/read", "resources/subscribe", "resources/unsubscribe"):
+        return await _handle_resources(method, req_id, params)
+
     elif method == "ping":
         return _success(req_id, {})
 
@@ -434,6 +1160,66 @@ def handle_request(request: dict) -> dict:
         return _error(req_id, -32601, f"Method not found: {method}")
 
 
+async def _select_project(requested: str | None):
+    """Set current_project for this request (see tools/projects.py).
+
+    Raises:
+        ValueError: requested is not a cognitive-core project.
+    """
+    client = current_client.get() or STDIO
+    if client.roots_refresh is not None:
+        await asyncio.wait({client.roots_refresh})
+    project = PROJECTS.resolve(requested, client.roots)
+    current_project.set(project)
+    return project
+
+
+async def _handle_resources(method: str, req_id, params: dict) -> dict:
+    """resources/* requests: agents, skills and config (tools/resources.py)."""
+    project = await _select_project(None)
+    client = current_client.get() or STDIO
+    loop = asyncio.get_running_loop()
+    if method == "resources/list":
+        resources = await loop.run_in_executor(None, list_resources, project)
+        return _success(req_id, {"resources": resources})
+
+    uri = params.get("uri")
+    if not isinstance(uri, str) or not uri:
+        return _error(req_id, -32602, "Missing resource uri")
+    if method == "resources/read":
+        try:
+            result = await loop.run_in_executor(None, read_resource, project, uri, _load_config)
+        except KeyError:
+            return _error(req_id, -32002, f"Resource not found: {uri}")
+        except (OSError, UnicodeDecodeError) as e:
+            return _error(req_id, -32603, f"Error reading resource: {e}")
+        return _success(req_id, result)
+    if method == "resources/unsubscribe":
+        RESOURCES.unsubscribe(client, project, uri)
+        return _success(req_id, {})
+    if not client.can_request:
+        return _error(req_id, -32600, "resources/subscribe needs a stdio or socket connection")
+    await loop.run_in_executor(None, RESOURCES.subscribe, client, project, uri)
+    return _success(req_id, {})
+
+
+def _refresh_roots(client) -> None:
+    """Ask the client for its MCP roots in the background (tools wait for the answer)."""
+    if not client.roots_supported or not client.can_request:
+        return
+
+    async def refresh():
+        try:
+            response = await client.request("roots/list")
+        except asyncio.TimeoutError:
+            return
+        result = response.get("result")
+        if isinstance(result, dict) and isinstance(result.get("roots"), list):
+            client.roots = root_paths(result["roots"])
+
+    client.roots_refresh = asyncio.create_task(refresh())
+
+
 def _success(req_id, result: dict) -> dict:
     return {
         "jsonrpc": JSONRPC_VERSION,
@@ -450,9 +1236,153 @@ def _error(req_id, code: int, message: str) -> dict:
     }
 
 
-def main():
-    """Main loop: read JSON-RPC messages from stdin, write responses to stdout."""
-    for line in sys.stdin:
+def _notification(method: str, params: dict) -> dict:
+    return {
+        "jsonrpc": JSONRPC_VERSION,
+        "method": method,
+        "params": params,
+    }
+
+
+def _write_message(message: dict) -> int:
+    """Send one JSON-RPC message to the current request's client. Returns its size."""
+    return (current_client.get() or STDIO).send(message)
+
+
+async def _dispatch(request, size: int = 0, client=None) -> None:
+    """Handle one request and write its response as soon as it is ready.
+
+    Tool calls are registered in JOBS for the duration of the call so they
+    can be cancelled by id. A cancelled call gets no response, per MCP.
+    Every request is recorded in METRICS; size is its length on the wire.
+    client is the connection the request came from (default: stdio).
+    """
+    client = client or STDIO
+    current_client.set(client)
+    if not isinstance(request, dict):
+        _write_message(_error(None, -32600, "Invalid Request"))
+        return
+    if "method" not in request and ("result" in request or "error" in request):
+        # Answer to one of our requests (roots/list)
+        client.resolve(request)
+        return
+
+    started = time.monotonic()
+    started_at = time.time()
+    method = str(request.get("method", ""))
+    tool = None
+    job = None
+    if method == "tools/call" and request.get("id") is not None:
+        params = request.get("params") or {}
+        token = (params.get("_meta") or {}).get("progressToken")
+        job = JOBS.start(request["id"], params.get("name", ""), asyncio.current_task(), token, client.key)
+        current_job.set(job)
+        # Label unknown names alike, so clients cannot grow the metric set
+        tool = job.tool if job.tool in TOOL_HANDLERS else "unknown"
+
+    response = None
+    try:
+        response = await handle_request(request)
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        response = _error(request.get("id"), -32603, f"Internal error: {e}")
+    finally:
+        if job is not None:
+            JOBS.finish(job)
+
+    sent = _write_message(response) if response is not None else 0
+    error = response is not None and ("error" in response or bool(response.get("result", {}).get("isError")))
+    if response is not None and response.get("error", {}).get("code") == -32601 and tool is None:
+        method = "unknown"
+    METRICS.observe(
+        method, tool, time.monotonic() - started,
+        error=error,
+        timed_out=job is not None and job.timed_out,
+        cancelled=response is None and job is not None and job.cancelled,
+        bytes_in=size,
+        bytes_out=sent,
+    )
+    if TRACE is not None:
+        TRACE.emit(trace_span(
+            "mcp", "mcp", tool or method, started_at, started_at + time.monotonic() - started,
+            session=client.session,
+            method=method,
+            tool=tool,
+            decision=_trace_decision(tool, response),
+            exit=job.exit_code if job is not None else None,
+            error=error,
+            bytes_in=size,
+            bytes_out=sent,
+            subprocesses=job.spawned if job is not None else None,
+        ))
+
+
+def _trace_decision(tool: str | None, response: dict | None) -> str | None:
+    """The validator's decision for cc_security_validate responses."""
+    if tool != "cc_security_validate" or response is None:
+        return None
+    try:
+        return json.loads(response["result"]["content"][0]["text"]).get("decision")
+    except (KeyError, IndexError, TypeError, ValueError, AttributeError):
+        return None
+
+
+async def _serve(daemon: bool = False, daemon_socket: str = "", http_port: int | None = None,
+                 idle_timeout: float | None = None) -> None:
+    """Serve stdio (or, with daemon, the socket/HTTP clients) until done.
+
+    Responses are written in completion order and correlated by JSON-RPC id,
+    so a ping answers immediately even while a test run is still going.
+    """
+    global DAEMON, LINT_WATCH, TRACE
+
+    config = _load_config()
+    PROJECTS.configure(config)
+    if config.get("CC_LINT_WATCH") == "true":
+        watcher = PreLinter(_PROJECT_DIR, _load_config)
+        if watcher.start():
+            LINT_WATCH = watcher
+    exporter = _start_metrics_exporter(config)
+    TRACE = TraceSink.from_config(_PROJECT_DIR, config)
+
+    if daemon:
+        try:
+            DAEMON = DaemonServer(
+                _dispatch, JOBS,
+                daemon_socket or socket_path(_PROJECT_DIR, "mcp"),
+                http_port=http_port if http_port is not None else _int_setting(config, "CC_MCP_HTTP_PORT", 0),
+                idle_timeout=(
+                    idle_timeout if idle_timeout is not None
+                    else _int_setting(config, "CC_MCP_DAEMON_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT)
+                ),
+                on_close=RESOURCES.forget_client,
+            )
+            if not await DAEMON.serve():
+                sys.stderr.write(f"cognitive-core: MCP daemon already running on {DAEMON.socket_path}\n")
+        except OSError as e:
+            sys.stderr.write(f"cognitive-core: MCP daemon failed to start: {e}\n")
+    else:
+        await _serve_stdio()
+
+    RESOURCES.stop()
+    if LINT_WATCH is not None:
+        LINT_WATCH.stop()
+    if exporter is not None:
+        exporter.stop()
+    if TRACE is not None:
+        TRACE.close()
+
+
+async def _serve_stdio() -> None:
+    """Read requests from stdin and dispatch each one as its own task."""
+    loop = asyncio.get_running_loop()
+    pending: set = set()
+
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            break
         line = line.strip()
         if not line:
             continue
@@ -460,15 +1390,56 @@ def main():
         try:
             request = json.loads(line)
         except json.JSONDecodeError:
-            response = _error(None, -32700, "Parse error")
-            sys.stdout.write(json.dumps(response) + "\n")
-            sys.stdout.flush()
+            _write_message(_error(None, -32700, "Parse error"))
             continue
 
-        response = handle_request(request)
-        if response is not None:
-            sys.stdout.write(json.dumps(response) + "\n")
-            sys.stdout.flush()
+        task = asyncio.create_task(_dispatch(request, len(line.encode("utf-8", errors="replace"))))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    # stdin closed — let in-flight calls finish before exiting
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _int_setting(config: dict, key: str, default: int) -> int:
+    try:
+        return int(config.get(key) or default)
+    except ValueError:
+        return default
+
+
+def _start_metrics_exporter(config: dict) -> MetricsExporter | None:
+    """Start the Prometheus endpoint/textfile configured in cognitive-core.conf, if any."""
+    try:
+        port = int(config.get("CC_MCP_METRICS_PORT") or 0)
+    except ValueError:
+        port = 0
+    textfile = config.get("CC_MCP_METRICS_TEXTFILE", "")
+    if textfile:
+        textfile = os.path.join(_PROJECT_DIR, os.path.expanduser(textfile))
+    if not port and not textfile:
+        return None
+    exporter = MetricsExporter(METRICS, port=port, textfile=textfile)
+    try:
+        exporter.start()
+    except OSError as e:
+        # Another server already serves this port: carry on without it
+        sys.stderr.write(f"cognitive-core: metrics port {port} unavailable: {e}\n")
+        exporter = MetricsExporter(METRICS, textfile=textfile)
+        exporter.start()
+    return exporter
+
+
+def main(argv: list | None = None):
+    """Main loop: read JSON-RPC messages from stdin (or serve as a daemon)."""
+    parser = argparse.ArgumentParser(description="cognitive-core MCP server")
+    parser.add_argument("--daemon", action="store_true", help="serve clients on a Unix socket (and HTTP)")
+    parser.add_argument("--socket", default="", help="daemon socket (default: per-user, per-project)")
+    parser.add_argument("--http-port", type=int, default=None, help="streamable HTTP port (default: CC_MCP_HTTP_PORT)")
+    parser.add_argument("--idle-timeout", type=float, default=None)
+    args = parser.parse_args(argv)
+    asyncio.run(_serve(args.daemon, args.socket, args.http_port, args.idle_timeout))
 
 
 if __name__ == "__main__":
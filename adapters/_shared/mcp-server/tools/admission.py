@@ -0,0 +1,169 @@
+"""
+Admission control for cognitive-core MCP server tool calls.
+
+Tool calls run concurrently, but heavy ones (processes that compete for the
+CPU) are admitted through per-class slots so that parallel test runs do not
+thrash the machine:
+
+  class  tool calls                                   limit (cognitive-core.conf)
+  hook   cc_hook_run                                  CC_MCP_MAX_HOOK_JOBS (4)
+  lint   cc_lint_check mode=lint                      CC_MCP_MAX_LINT_JOBS (2)
+  test   cc_lint_check mode=test / affected-tests     CC_MCP_MAX_TEST_JOBS (1)
+
+and CC_MCP_MAX_HEAVY_JOBS (default: CPU count) caps them all together. A call
+that finds no free slot waits in a priority queue: hooks first (the agent is
+blocked on them), then lint, then tests, first come first served within a
+class. A queued call is admitted as soon as its class and the global cap
+have room, so a waiting test never holds back a lint that fits.
+
+Everything else (ping, cc_security_validate, cc_project_info,
+cc_agent_context, the stats and log tools) is interactive and never queues.
+
+Limits are re-read from the config on every heavy call. A per-class limit of
+"0" means unlimited; CC_MCP_MAX_HEAVY_JOBS="0" (or unset) means the CPU count.
+"""
+import asyncio
+import contextlib
+import os
+import time
+
+# class -> (cognitive-core.conf key, default limit, priority; lower runs first)
+CLASSES = {
+    "hook": ("CC_MCP_MAX_HOOK_JOBS", 4, 0),
+    "lint": ("CC_MCP_MAX_LINT_JOBS", 2, 1),
+    "test": ("CC_MCP_MAX_TEST_JOBS", 1, 2),
+}
+TOTAL_KEY = "CC_MCP_MAX_HEAVY_JOBS"
+
+
+def work_class(tool: str, arguments: dict) -> str | None:
+    """Admission class of a tool call, or None for interactive calls."""
+    if tool == "cc_hook_run":
+        return "hook"
+    if tool == "cc_lint_check":
+        return "test" if arguments.get("mode") in ("test", "affected-tests") else "lint"
+    return None
+
+
+def _limit(config: dict, key: str, default: int) -> int:
+    try:
+        value = int(config.get(key) or default)
+    except ValueError:
+        return default
+    return max(value, 0)
+
+
+class _ClassStats:
+    def __init__(self):
+        self.admitted = 0
+        self.queued = 0
+        self.wait_s = 0.0
+        self.max_wait_s = 0.0
+        self.max_depth = 0
+
+
+class Admission:
+    """Per-class and global slots for heavy tool calls (one event loop)."""
+
+    def __init__(self):
+        self.limits = {name: default for name, (_key, default, _prio) in CLASSES.items()}
+        self.total = os.cpu_count() or 1
+        self.running = {name: 0 for name in CLASSES}
+        self._waiting: list = []
+        self._seq = 0
+        self._stats = {name: _ClassStats() for name in CLASSES}
+
+    def configure(self, config: dict) -> None:
+        """Apply the limits in config (admitting waiters if they were raised)."""
+        for name, (key, default, _prio) in CLASSES.items():
+            self.limits[name] = _limit(config, key, default)
+        self.total = _limit(config, TOTAL_KEY, 0) or (os.cpu_count() or 1)
+        self._admit()
+
+    def _fits(self, name: str) -> bool:
+        limit = self.limits[name]
+        return (not limit or self.running[name] < limit) and sum(self.running.values()) < self.total
+
+    def _admit(self) -> None:
+        for waiter in sorted(self._waiting):
+            _prio, _seq, name, future = waiter
+            if future.done():
+                self._waiting.remove(waiter)
+            elif self._fits(name):
+                self._waiting.remove(waiter)
+                self.running[name] += 1
+                future.set_result(None)
+
+    def _depth(self, name: str) -> int:
+        return sum(1 for waiter in self._waiting if waiter[2] == name)
+
+    async def acquire(self, name: str) -> float:
+        """Wait for a slot of class name. Returns the seconds spent queued."""
+        stats = self._stats[name]
+        if not self._waiting and self._fits(name):
+            self.running[name] += 1
+            stats.admitted += 1
+            return 0.0
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._seq += 1
+        self._waiting.append((CLASSES[name][2], self._seq, name, future))
+        stats.queued += 1
+        stats.max_depth = max(stats.max_depth, self._depth(name))
+        # Lower-priority waiters may fit where earlier ones do not
+        self._admit()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(name)
+            else:
+                future.cancel()
+                self._admit()
+            raise
+        waited = time.monotonic() - start
+        stats.admitted += 1
+        stats.wait_s += waited
+        stats.max_wait_s = max(stats.max_wait_s, waited)
+        return waited
+
+    def release(self, name: str) -> None:
+        self.running[name] -= 1
+        self._admit()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, name: str | None):
+        """Hold a slot of class name for the duration of the block (None: no-op)."""
+        if name is None:
+            yield 0.0
+            return
+        waited = await self.acquire(name)
+        try:
+            yield waited
+        finally:
+            self.release(name)
+
+    def stats(self) -> dict:
+        classes = {}
+        for name, stats in self._stats.items():
+            classes[name] = {
+                "limit": self.limits[name],
+                "running": self.running[name],
+                "queue_depth": self._depth(name),
+                "max_queue_depth": stats.max_depth,
+                "admitted": stats.admitted,
+                "queued": stats.queued,
+                "wait_s_total": round(stats.wait_s, 3),
+                "wait_s_avg": round(stats.wait_s / stats.queued, 3) if stats.queued else 0.0,
+                "wait_s_max": round(stats.max_wait_s, 3),
+            }
+        return {
+            "max_heavy_jobs": self.total,
+            "running": sum(self.running.values()),
+            "queue_depth": sum(1 for waiter in self._waiting if not waiter[3].done()),
+            "classes": classes,
+        }
+
+
+# Admission state shared by every tool call of this server
+ADMISSION = Admission()
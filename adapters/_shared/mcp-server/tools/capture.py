@@ -0,0 +1,195 @@
+"""
+Bounded output capture for cognitive-core MCP server.
+
+Lint and test commands can print hundreds of megabytes. OutputCapture keeps
+only a fixed head and a tail ring buffer in memory; once the output outgrows
+them, the full stream is spilled to a log file under
+<project>/.claude/cognitive-core/logs/ and the tool result carries the file's
+log id, which cc_read_log pages through by byte range.
+
+Only the newest MAX_LOGS spill files are kept.
+"""
+import os
+import re
+import tempfile
+import threading
+
+DEFAULT_LIMIT = 65536  # bytes kept in memory per stream: 1/4 head, 3/4 tail
+DEFAULT_READ_BYTES = 65536
+MAX_READ_BYTES = 1048576
+MAX_LOGS = 20
+
+_LOG_ID = re.compile(r"^[A-Za-z0-9_-]+\.log$")
+_prune_lock = threading.Lock()
+
+
+def log_dir(project_dir: str) -> str:
+    """Directory holding spilled logs for a project."""
+    return os.path.join(project_dir, ".claude", "cognitive-core", "logs")
+
+
+def capture_limit(config: dict) -> int:
+    """CC_MCP_OUTPUT_BYTES from config, or DEFAULT_LIMIT."""
+    try:
+        limit = int(config.get("CC_MCP_OUTPUT_BYTES") or DEFAULT_LIMIT)
+    except ValueError:
+        return DEFAULT_LIMIT
+    return max(limit, 1024)
+
+
+def _prune(directory: str) -> None:
+    """Delete all but the newest MAX_LOGS spill files."""
+    with _prune_lock:
+        try:
+            names = [n for n in os.listdir(directory) if _LOG_ID.match(n)]
+        except OSError:
+            return
+        paths = [os.path.join(directory, n) for n in names]
+        stamped = []
+        for path in paths:
+            try:
+                stamped.append((os.stat(path).st_mtime_ns, path))
+            except OSError:
+                pass
+        stamped.sort(reverse=True)
+        for _mtime, path in stamped[MAX_LOGS:]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+class OutputCapture:
+    """
+    Head + tail of one output stream, with the whole stream spilled to disk
+    once it exceeds the in-memory limit.
+
+    Args:
+        directory: Where to create the spill file ("" never spills).
+        label: Spill file name prefix (e.g. "test", "lint-stdout").
+        limit: In-memory bytes (head gets a quarter, tail the rest).
+        always_spill: Spill from the first byte, so a log id exists even
+            for short output (test runs, whose result shows only a digest).
+    """
+
+    def __init__(self, directory: str, label: str, limit: int = DEFAULT_LIMIT, always_spill: bool = False):
+        self.directory = directory
+        self.label = label
+        self.head_limit = limit // 4
+        self.tail_limit = limit - self.head_limit
+        self.always_spill = always_spill
+        self.total = 0
+        self.log_id = None
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._file = None
+        self._spill_failed = False
+
+    def write(self, text: str) -> None:
+        """Append output."""
+        if not text:
+            return
+        data = text.encode("utf-8", errors="replace")
+        self.total += len(data)
+        if self._file is None and not self._spill_failed and (
+            self.always_spill or self.total > self.head_limit + self.tail_limit
+        ):
+            self._spill()
+        if self._file is not None:
+            self._file.write(data)
+
+        room = self.head_limit - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if data:
+            self._tail += data
+            # Trim in bulk so appends stay amortised O(1)
+            if len(self._tail) > 2 * self.tail_limit:
+                del self._tail[:len(self._tail) - self.tail_limit]
+
+    def _spill(self) -> None:
+        if not self.directory:
+            self._spill_failed = True
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, path = tempfile.mkstemp(prefix=f"{self.label}-", suffix=".log", dir=self.directory)
+            self._file = os.fdopen(fd, "wb")
+        except OSError:
+            self._spill_failed = True
+            return
+        self.log_id = os.path.basename(path)
+        self._file.write(bytes(self._head) + bytes(self._tail))
+        _prune(self.directory)
+
+    def close(self) -> None:
+        """Finish the spill file (idempotent)."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self._head) + min(len(self._tail), self.tail_limit)
+
+    def text(self) -> str:
+        """Captured output: all of it, or head + omission marker + tail."""
+        head = bytes(self._head)
+        tail = bytes(self._tail[-self.tail_limit:]) if self._tail else b""
+        if not self.truncated:
+            return (head + tail).decode("utf-8", errors="replace")
+        omitted = self.total - len(head) - len(tail)
+        # Drop a UTF-8 sequence cut by the ring buffer
+        tail = tail.lstrip(bytes(range(0x80, 0xC0)))
+        where = f"; full log: cc_read_log log_id={self.log_id}" if self.log_id else ""
+        return (
+            head.decode("utf-8", errors="replace")
+            + f"\n[... {omitted} bytes omitted{where} ...]\n"
+            + tail.decode("utf-8", errors="replace")
+        )
+
+    def to_dict(self) -> dict:
+        """Size and log id (None unless spilled)."""
+        return {"bytes": self.total, "truncated": self.truncated, "log_id": self.log_id}
+
+
+def read_log(project_dir: str, log_id: str, offset: int = 0, length: int = DEFAULT_READ_BYTES) -> dict:
+    """
+    Read a byte range of a spilled log.
+
+    Args:
+        project_dir: Project root directory.
+        log_id: Log id from a cc_lint_check result.
+        offset: First byte to read (negative: from the end).
+        length: Bytes to read (capped at MAX_READ_BYTES).
+
+    Returns:
+        dict with log_id, size, offset, length, next_offset, eof, text.
+
+    Raises:
+        ValueError: invalid log id.
+        FileNotFoundError: no such log (it may have been pruned).
+    """
+    if not _LOG_ID.match(log_id or ""):
+        raise ValueError(f"invalid log id: {log_id!r}")
+    path = os.path.join(log_dir(project_dir), log_id)
+    length = max(0, min(int(length), MAX_READ_BYTES))
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        offset = int(offset)
+        if offset < 0:
+            offset = max(0, size + offset)
+        offset = min(offset, size)
+        fh.seek(offset)
+        data = fh.read(length)
+    end = offset + len(data)
+    return {
+        "log_id": log_id,
+        "size": size,
+        "offset": offset,
+        "length": len(data),
+        "next_offset": end,
+        "eof": end >= size,
+        "text": data.decode("utf-8", errors="replace"),
+    }
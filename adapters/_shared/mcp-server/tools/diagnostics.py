@@ -0,0 +1,313 @@
+"""
+Structured lint diagnostics for cognitive-core MCP server.
+
+cc_lint_check output=delta parses lint output into diagnostics
+(file, line, column, code, severity, message) and answers with only the
+findings added or resolved since the previous delta run for the same path
+and command, plus a count of unchanged ones.
+
+Parsing, in order of preference:
+  JSON      for linters that have a machine format, the command is rewritten
+            to request it: ruff (--output-format=json), eslint (--format
+            json), golangci-lint (--out-format=json), shellcheck (-f json),
+            cargo clippy (--message-format=json). Only simple commands are
+            rewritten: no pipes, lists, redirections or $(...).
+  text      a regex fallback for everything else: "path:line[:col]: msg"
+            (ruff, golangci-lint, gcc-style), "path(line,col): msg" (tsc,
+            dotnet), eslint stylish blocks, shellcheck tty blocks and
+            perlcritic's "... at line N, column M."
+
+A diagnostic's identity ignores its line and column, so findings that only
+move (code inserted above them) count as unchanged. Snapshots are stored in
+<project>/.claude/cognitive-core/lint-snapshots/, newest MAX_SNAPSHOTS kept.
+"""
+import collections
+import hashlib
+import json
+import os
+import re
+import shlex
+import tempfile
+import time
+
+MAX_SNAPSHOTS = 200
+
+_SHELL_SYNTAX = re.compile(r"[|&;<>`]|\$\(")
+_ENV_ASSIGN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*=")
+
+# path:line[:col]: message
+_COLON = re.compile(r"^(?P<file>[^\s:][^:]*?):(?P<line>\d+)(?::(?P<col>\d+))?:\s*(?P<msg>.+)$")
+# path(line,col): message
+_PAREN = re.compile(r"^(?P<file>[^\s(][^(]*?)\((?P<line>\d+)(?:,(?P<col>\d+))?\):\s*(?P<msg>.+)$")
+# eslint stylish: "  3:1  error  message  rule-id"
+_STYLISH = re.compile(r"^\s+(?P<line>\d+):(?P<col>\d+)\s+(?P<sev>error|warning)\s+(?P<msg>.+?)(?:\s{2,}(?P<code>\S+))?$")
+# shellcheck tty: "In path line 3:" ... "  ^-- SC2086 (info): message"
+_SC_HEAD = re.compile(r"^In (?P<file>.+) line (?P<line>\d+):$")
+_SC_NOTE = re.compile(r"^(?P<pad>\s*)\^-*\^? (?P<code>SC\d+) \((?P<sev>\w+)\): (?P<msg>.+)$")
+# perlcritic: "[path: ]message at line 3, column 1.  explanation  (Severity: 4)"
+_PERLCRITIC = re.compile(r"^(?:(?P<file>\S+): )?(?P<msg>.+?) at line (?P<line>\d+), column (?P<col>\d+)\.\s*(?P<rest>.*)$")
+# A leading rule code in a message: F401, SC2086, E0602, no-unused-vars, ...
+_CODE = re.compile(r"^(?P<code>[A-Z]+[0-9]+|[a-z]+(?:-[a-z]+)+|@?[\w-]+/[\w-]+)\b:?\s*(?:\[\*\]\s*)?(?P<msg>.*)$")
+_SEVERITY = re.compile(r"^(?P<sev>error|warning|info|note|style)\b:?\s*(?P<msg>.*)$", re.IGNORECASE)
+
+
+def structured_command(cmd: str) -> tuple:
+    """
+    (command, format) with the linter's JSON output requested, or
+    (cmd, None) when the command is not one we can rewrite.
+    """
+    if _SHELL_SYNTAX.search(cmd):
+        return cmd, None
+    try:
+        tokens = shlex.split(cmd)
+    except ValueError:
+        return cmd, None
+    i = 0
+    while i < len(tokens) and _ENV_ASSIGN.match(tokens[i]):
+        i += 1
+    if i < len(tokens) and tokens[i] == "npx":
+        i += 1
+    elif i + 2 < len(tokens) and os.path.basename(tokens[i]).startswith("python") and tokens[i + 1] == "-m":
+        i += 2
+    if i >= len(tokens):
+        return cmd, None
+    tool, args = os.path.basename(tokens[i]), tokens[i + 1:]
+
+    def with_flags(flags: list, taken: tuple) -> str | None:
+        if any(a == t or a.startswith(t + "=") for a in args for t in taken):
+            return None
+        # Edit the text rather than re-joining tokens, so quoting, $VARs and
+        # globs stay as written
+        flag_text = " ".join(shlex.quote(f) for f in flags)
+        if "--" not in args:
+            return f"{cmd.rstrip()} {flag_text}"
+        at = cmd.find(" -- ")
+        return f"{cmd[:at]} {flag_text}{cmd[at:]}" if at >= 0 else None
+
+    rewritten, fmt = None, None
+    if tool == "ruff" and "format" not in args[:1]:
+        rewritten, fmt = with_flags(["--output-format=json"], ("--output-format", "--format")), "ruff"
+    elif tool == "eslint":
+        rewritten, fmt = with_flags(["--format", "json"], ("-f", "--format", "-o", "--output-file")), "eslint"
+    elif tool == "golangci-lint" and args[:1] == ["run"]:
+        rewritten, fmt = with_flags(["--out-format=json"], ("--out-format", "--output.json.path")), "golangci"
+    elif tool == "shellcheck":
+        rewritten, fmt = with_flags(["-f", "json"], ("-f", "--format")), "shellcheck"
+    elif tool == "cargo" and args[:1] == ["clippy"]:
+        rewritten, fmt = with_flags(["--message-format=json"], ("--message-format",)), "clippy"
+    if rewritten is None:
+        return cmd, None
+    return rewritten, fmt
+
+
+def _relative(path: str, project_dir: str) -> str:
+    if os.path.isabs(path):
+        path = os.path.relpath(path, project_dir)
+    return os.path.normpath(path)
+
+
+def _diagnostic(file: str, line, col, code: str, severity: str, message: str) -> dict:
+    return {
+        "file": file,
+        "line": int(line or 0),
+        "column": int(col or 0),
+        "code": code or "",
+        "severity": (severity or "").lower(),
+        "message": " ".join(message.split()),
+    }
+
+
+def _parse_json(fmt: str, text: str, project_dir: str) -> list:
+    found = []
+    if fmt == "clippy":
+        for line in text.splitlines():
+            if not line.startswith("{"):
+                continue
+            record = json.loads(line)
+            message = record.get("message") or {}
+            if record.get("reason") != "compiler-message":
+                continue
+            spans = [s for s in message.get("spans", []) if s.get("is_primary")]
+            if not spans:
+                continue
+            found.append(_diagnostic(
+                _relative(spans[0]["file_name"], project_dir), spans[0]["line_start"], spans[0]["column_start"],
+                (message.get("code") or {}).get("code", ""), message.get("level", ""), message.get("message", ""),
+            ))
+        return found
+    data = json.loads(text)
+    if fmt == "ruff":
+        for d in data:
+            location = d.get("location") or {}
+            found.append(_diagnostic(
+                _relative(d["filename"], project_dir), location.get("row"), location.get("column"),
+                d.get("code") or "", "error", d.get("message", ""),
+            ))
+    elif fmt == "eslint":
+        for entry in data:
+            for m in entry.get("messages", []):
+                found.append(_diagnostic(
+                    _relative(entry["filePath"], project_dir), m.get("line"), m.get("column"),
+                    m.get("ruleId") or "", "error" if m.get("severity") == 2 else "warning", m.get("message", ""),
+                ))
+    elif fmt == "golangci":
+        for issue in data.get("Issues") or []:
+            pos = issue.get("Pos") or {}
+            found.append(_diagnostic(
+                _relative(pos.get("Filename", ""), project_dir), pos.get("Line"), pos.get("Column"),
+                issue.get("FromLinter", ""), issue.get("Severity") or "error", issue.get("Text", ""),
+            ))
+    elif fmt == "shellcheck":
+        for d in data:
+            found.append(_diagnostic(
+                _relative(d["file"], project_dir), d.get("line"), d.get("column"),
+                f"SC{d['code']}" if d.get("code") else "", d.get("level", ""), d.get("message", ""),
+            ))
+    return found
+
+
+def _split_message(msg: str) -> tuple:
+    """(code, severity, message) from the text after a location."""
+    severity = ""
+    match = _SEVERITY.match(msg)
+    if match:
+        severity, msg = match.group("sev"), match.group("msg")
+    match = _CODE.match(msg)
+    if match and match.group("msg"):
+        return match.group("code"), severity, match.group("msg")
+    return "", severity, msg
+
+
+def parse_text(text: str, project_dir: str, default_file: str = "") -> list:
+    """Diagnostics from human-readable lint output (regex fallback)."""
+    found = []
+    current_file, sc_line = None, None
+    for raw in text.splitlines():
+        line = raw.rstrip()
+        if not line.strip():
+            continue
+        match = _SC_HEAD.match(line)
+        if match:
+            current_file, sc_line = _relative(match.group("file"), project_dir), int(match.group("line"))
+            continue
+        match = _SC_NOTE.match(line)
+        if match and current_file and sc_line is not None:
+            found.append(_diagnostic(
+                current_file, sc_line, len(match.group("pad")) + 1,
+                match.group("code"), match.group("sev"), match.group("msg"),
+            ))
+            continue
+        match = _STYLISH.match(line)
+        if match and current_file:
+            found.append(_diagnostic(
+                current_file, match.group("line"), match.group("col"),
+                match.group("code") or "", match.group("sev"), match.group("msg"),
+            ))
+            continue
+        match = _PERLCRITIC.match(line)
+        if match:
+            file = match.group("file") or default_file
+            found.append(_diagnostic(
+                _relative(file, project_dir) if file else "", match.group("line"), match.group("col"),
+                "", "", match.group("msg"),
+            ))
+            continue
+        match = _COLON.match(line) or _PAREN.match(line)
+        if match:
+            code, severity, msg = _split_message(match.group("msg"))
+            found.append(_diagnostic(
+                _relative(match.group("file"), project_dir), match.group("line"), match.group("col"),
+                code, severity, msg,
+            ))
+            continue
+        if line[0] not in " \t":
+            # Possible eslint stylish header (a bare file path)
+            candidate = line.strip()
+            full = candidate if os.path.isabs(candidate) else os.path.join(project_dir, candidate)
+            if os.path.isfile(full):
+                current_file, sc_line = _relative(candidate, project_dir), None
+    return found
+
+
+def parse(fmt: str | None, stdout: str, stderr: str, project_dir: str, default_file: str = "") -> tuple:
+    """
+    Diagnostics from a lint run.
+
+    Returns:
+        (diagnostics, parser) where parser is the JSON format used, or
+        "text" when the regex fallback parsed stdout and stderr.
+    """
+    if fmt:
+        try:
+            return _parse_json(fmt, stdout, project_dir), fmt
+        except (ValueError, KeyError, TypeError, AttributeError):
+            pass
+    return parse_text(stdout + "\n" + stderr, project_dir, default_file), "text"
+
+
+def fingerprint(d: dict) -> tuple:
+    """Identity of a finding across runs (position excluded)."""
+    return (d["file"], d["code"], d["message"])
+
+
+def delta(old: list, new: list) -> dict:
+    """Findings added and resolved between two runs, counted as multisets."""
+    before = collections.Counter(fingerprint(d) for d in old)
+    after = collections.Counter(fingerprint(d) for d in new)
+    added_left = after - before
+    resolved_left = before - after
+    added, resolved = [], []
+    for d in new:
+        key = fingerprint(d)
+        if added_left[key] > 0:
+            added_left[key] -= 1
+            added.append(d)
+    for d in old:
+        key = fingerprint(d)
+        if resolved_left[key] > 0:
+            resolved_left[key] -= 1
+            resolved.append(d)
+    return {"added": added, "resolved": resolved, "unchanged": len(new) - len(added)}
+
+
+def format_diagnostic(d: dict) -> str:
+    location = f"{d['file']}:{d['line']}:{d['column']}" if d["file"] else f"line {d['line']}:{d['column']}"
+    label = " ".join(part for part in (d["severity"], d["code"]) if part)
+    return f"{location}: {label + ' ' if label else ''}{d['message']}"
+
+
+def snapshot_dir(project_dir: str) -> str:
+    """Directory holding the last delta snapshot per path and command."""
+    return os.path.join(project_dir, ".claude", "cognitive-core", "lint-snapshots")
+
+
+def _snapshot_path(project_dir: str, path: str, command: str) -> str:
+    key = hashlib.sha256(f"{os.path.normpath(path)}\n{command}".encode("utf-8", "surrogateescape")).hexdigest()
+    return os.path.join(snapshot_dir(project_dir), f"{key}.json")
+
+
+def load_snapshot(project_dir: str, path: str, command: str) -> dict | None:
+    """Previous snapshot ({created, diagnostics}) for path and command, or None."""
+    try:
+        with open(_snapshot_path(project_dir, path, command), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def save_snapshot(project_dir: str, path: str, command: str, diagnostics: list) -> None:
+    """Store the current diagnostics (atomically), keeping the newest MAX_SNAPSHOTS."""
+    directory = snapshot_dir(project_dir)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({"path": path, "command": command, "created": time.time(), "diagnostics": diagnostics}, fh)
+        os.replace(tmp, _snapshot_path(project_dir, path, command))
+        names = [n for n in os.listdir(directory) if n.endswith(".json")]
+        if len(names) > MAX_SNAPSHOTS:
+            stamped = sorted((os.stat(os.path.join(directory, n)).st_mtime_ns, n) for n in names)
+            for _mtime, name in stamped[:len(stamped) - MAX_SNAPSHOTS]:
+                os.unlink(os.path.join(directory, name))
+    except OSError:
+        pass
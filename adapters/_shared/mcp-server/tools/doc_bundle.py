@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Agent and skill document bundle for cognitive-core MCP server.
+
+Installed agents and skills are hundreds of small files. install.sh packs
+them into one file, <install_dir>/docs.bundle, which the server maps with
+mmap and serves documents from as slices, instead of opening and reading a
+file per request:
+
+  header   MAGIC, the index length (10 digits) and a newline
+  index    JSON: "sources" (agents/ and skills/ directory mtimes) and "docs",
+           each key (agents/<file>, skills/<name>/SKILL.md, skills/<file>)
+           mapped to offset, length, sha256, the source's mtime_ns and size,
+           and its frontmatter
+  data     the documents, back to back (offsets are from the start of data)
+
+A bundle is stale when a source file's (mtime_ns, size) or either directory's
+mtime differs from the index. DocBundle.get() checks the requested document
+and the directories and rebuilds the bundle when stale; the rebuilt file
+replaces the old one atomically, so readers still mapping it are unaffected.
+When the rebuild fails (a read-only install dir) get() raises OSError and the
+caller reads the file itself; the rebuild is not retried for REBUILD_RETRY_S.
+
+Usage:
+  python3 doc_bundle.py [--install-dir <dir>] [--list]
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.resources import frontmatter  # noqa: E402
+
+BUNDLE_NAME = "docs.bundle"
+# Seconds before a failed rebuild (read-only install dir) is tried again
+REBUILD_RETRY_S = 30.0
+MAGIC = b"CCDOCS1 "
+_HEADER_BYTES = len(MAGIC) + 11
+
+
+def _stamp(path: str) -> list | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def source_files(install_dir: str) -> list:
+    """(key, path) of every agent and skill document, sorted by key."""
+    found = []
+    agents = os.path.join(install_dir, "agents")
+    skills = os.path.join(install_dir, "skills")
+    for name in sorted(os.listdir(agents)) if os.path.isdir(agents) else ():
+        path = os.path.join(agents, name)
+        if name.endswith(".md") and os.path.isfile(path):
+            found.append((f"agents/{name}", path))
+    for name in sorted(os.listdir(skills)) if os.path.isdir(skills) else ():
+        path = os.path.join(skills, name)
+        if os.path.isfile(os.path.join(path, "SKILL.md")):
+            found.append((f"skills/{name}/SKILL.md", os.path.join(path, "SKILL.md")))
+        elif name.endswith(".md") and os.path.isfile(path):
+            found.append((f"skills/{name}", path))
+    return found
+
+
+def _source_dirs(install_dir: str) -> dict:
+    return {sub: _stamp(os.path.join(install_dir, sub)) for sub in ("agents", "skills")}
+
+
+def build(install_dir: str, output: str | None = None) -> dict:
+    """Write the bundle for install_dir (atomically). Returns its index."""
+    output = output or os.path.join(install_dir, BUNDLE_NAME)
+    dirs = _source_dirs(install_dir)
+    docs = {}
+    blobs = []
+    offset = 0
+    for key, path in source_files(install_dir):
+        stamp = _stamp(path)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+        except OSError:
+            continue
+        docs[key] = {
+            "offset": offset,
+            "length": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "mtime_ns": stamp[0] if stamp else 0,
+            "size": stamp[1] if stamp else len(data),
+            "frontmatter": frontmatter(data.decode("utf-8", errors="replace")),
+        }
+        blobs.append(data)
+        offset += len(data)
+    index = json.dumps({"sources": dirs, "docs": docs}, separators=(",", ":")).encode("utf-8")
+    tmp = f"{output}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(MAGIC + b"%010d\n" % len(index))
+            fh.write(index)
+            for data in blobs:
+                fh.write(data)
+        os.replace(tmp, output)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return {"sources": dirs, "docs": docs}
+
+
+class DocBundle:
+    """
+    A memory-mapped docs.bundle, rebuilt when its sources change.
+
+    Args:
+        install_dir: cognitive-core install dir holding agents/ and skills/.
+    """
+
+    def __init__(self, install_dir: str):
+        self.install_dir = install_dir
+        self.path = os.path.join(install_dir, BUNDLE_NAME)
+        self.rebuilds = 0
+        self.failures = 0
+        self.hits = 0
+        self._retry_at = 0.0
+        self._map = None
+        self._index: dict = {}
+        self._data = 0
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether the install has a bundle to serve from."""
+        return self._map is not None or os.path.isfile(self.path)
+
+    def _load(self) -> None:
+        with open(self.path, "rb") as fh:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"not a document bundle: {self.path}")
+        length = int(mapped[len(MAGIC):_HEADER_BYTES - 1])
+        index = json.loads(mapped[_HEADER_BYTES:_HEADER_BYTES + length])
+        if not isinstance(index, dict) or not isinstance(index.get("docs"), dict):
+            raise ValueError(f"corrupt document bundle index: {self.path}")
+        self._index = index
+        self._data = _HEADER_BYTES + length
+        # The previous map is released once no slice of it is still referenced
+        self._map = mapped
+
+    def _fresh(self, key: str | None) -> bool:
+        if self._index.get("sources") != _source_dirs(self.install_dir):
+            return False
+        entry = self._index["docs"].get(key) if key else None
+        if entry is None:
+            return True
+        return _stamp(os.path.join(self.install_dir, key)) == [entry["mtime_ns"], entry["size"]]
+
+    def _ensure(self, key: str | None = None) -> None:
+        """Map the bundle, rebuilding it first if it is missing or stale (lock held).
+
+        Raises:
+            OSError: The bundle cannot be read, or rebuilt (read-only install dir).
+            ValueError: The bundle is corrupt and cannot be rebuilt.
+        """
+        if self._map is None:
+            try:
+                self._load()
+            except (OSError, ValueError):
+                self._index = {}
+        if self._map is None or not self._fresh(key):
+            if time.monotonic() < self._retry_at:
+                raise OSError(f"document bundle is stale and could not be rebuilt: {self.path}")
+            try:
+                build(self.install_dir, self.path)
+            except OSError:
+                self.failures += 1
+                self._retry_at = time.monotonic() + REBUILD_RETRY_S
+                raise
+            self.rebuilds += 1
+            self._load()
+
+    def get(self, key: str) -> memoryview | None:
+        """The document stored under key (e.g. "agents/x.md"), as a slice of the map."""
+        with self._lock:
+            self._ensure(key)
+            entry = self._index["docs"].get(key)
+            if entry is None:
+                return None
+            self.hits += 1
+            start = self._data + entry["offset"]
+            return memoryview(self._map)[start:start + entry["length"]]
+
+    def text(self, key: str) -> str | None:
+        view = self.get(key)
+        if view is None:
+            return None
+        try:
+            return str(view, "utf-8")
+        finally:
+            view.release()
+
+    def index(self) -> dict:
+        """key -> offset, length, sha256, mtime_ns, size and frontmatter."""
+        with self._lock:
+            self._ensure()
+            return self._index["docs"]
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "docs": len(self._index.get("docs", {})),
+            "bytes": len(self._map) if self._map is not None else 0,
+            "hits": self.hits,
+            "rebuilds": self.rebuilds,
+            "failures": self.failures,
+        }
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Pack installed agent and skill docs into docs.bundle")
+    parser.add_argument(
+        "--install-dir",
+        default=os.environ.get("CC_INSTALL_DIR")
+        or os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    )
+    parser.add_argument("--list", action="store_true", help="print the bundle index instead of building")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        bundle = DocBundle(args.install_dir)
+        for key, entry in bundle.index().items():
+            print(f"{entry['offset']:>10} {entry['length']:>8}  {entry['sha256'][:12]}  {key}")
+        return 0
+    index = build(args.install_dir)
+    total = sum(entry["length"] for entry in index["docs"].values())
+    print(f"Bundled {len(index['docs'])} documents ({total} bytes) into "
+          f"{os.path.join(args.install_dir, BUNDLE_NAME)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Hook client shim for the cognitive-core warm hook host.
+
+Claude Code settings invoke this instead of the hook script when
+CC_HOOK_HOST="true":
+
+  python3 .cognitive-core/mcp-server/tools/hook_client.py validate-bash
+
+The hook's stdin JSON is forwarded to the project's hook host over a Unix
+socket and the host's stdout, stderr and exit code are replayed verbatim, so
+the hook protocol is unchanged, as is the hook's environment (the variables
+hooks read are forwarded with each call). The socket lives in a per-user 0700
+directory and is only used if this user owns it. If no host is listening, one is started in
+the background and this invocation runs the bash hook directly.
+
+Kept to stdlib imports that load in a few milliseconds — no asyncio here,
+and subprocess/tempfile are only imported on the fallback paths.
+"""
+import hashlib
+import json
+import os
+import socket
+import stat
+import sys
+
+CONNECT_TIMEOUT = 0.5
+# Claude Code's own hook timeout is 60s — allow the host slightly longer
+RESPONSE_TIMEOUT = 65
+
+# Environment forwarded to the host for each call: what hooks and the lint
+# commands they run read, never the rest of the session's (tokens, keys)
+_FORWARD_NAMES = frozenset((
+    "PATH", "HOME", "USER", "LOGNAME", "SHELL", "TMPDIR", "TZ", "TERM",
+    "LANG", "LANGUAGE", "VIRTUAL_ENV", "CONDA_PREFIX",
+))
+_FORWARD_PREFIXES = ("CLAUDE_", "CC_", "LC_")
+
+
+def forwarded_env(environ) -> dict:
+    """The part of environ a hook run through the host gets."""
+    return {k: v for k, v in environ.items() if k in _FORWARD_NAMES or k.startswith(_FORWARD_PREFIXES)}
+
+
+def check_owned(path: str, private: bool = False) -> os.stat_result:
+    """
+    lstat() path and check it belongs to this user (and, if private, that
+    group and others have no access).
+
+    Raises:
+        OSError: path is missing (FileNotFoundError), or is a symlink, owned
+            by another user or not private (PermissionError).
+    """
+    st = os.lstat(path)
+    if stat.S_ISLNK(st.st_mode) or st.st_uid != os.getuid() or (private and st.st_mode & 0o077):
+        raise PermissionError(f"not owned by and private to this user: {path}")
+    return st
+
+
+def runtime_dir() -> str:
+    """
+    Per-user directory for the hook host and MCP daemon sockets (mode 0700).
+
+    Under $XDG_RUNTIME_DIR, or the temp dir, where another user could have
+    created it first: it is used only if this user owns it and it is private.
+
+    Raises:
+        OSError: The directory cannot be created, or is not private to this user.
+    """
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if not base:
+        import tempfile
+
+        base = tempfile.gettempdir()
+    path = os.path.join(base, f"cc-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    if not stat.S_ISDIR(check_owned(path, private=True).st_mode):
+        raise NotADirectoryError(path)
+    return path
+
+
+def socket_path(project_dir: str, name: str = "hook-host") -> str:
+    """
+    Per-project socket path for the hook host (or the MCP daemon) in runtime_dir().
+
+    Raises:
+        OSError: No private runtime directory (see runtime_dir()).
+    """
+    digest = hashlib.sha1(os.path.realpath(project_dir).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(runtime_dir(), f"{name}-{digest}.sock")
+
+
+def _request(path: str, header: dict, body: bytes = b"") -> tuple | None:
+    """Send one request to the host. Returns (header, stdout bytes) or None."""
+    try:
+        check_owned(path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(path)
+    except OSError:
+        return None
+    try:
+        sock.settimeout(RESPONSE_TIMEOUT)
+        sock.sendall(json.dumps(header).encode("utf-8") + b"\n" + body)
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+    data = b"".join(chunks)
+    head, sep, rest = data.partition(b"\n")
+    if not sep:
+        return None
+    try:
+        return json.loads(head), rest
+    except ValueError:
+        return None
+
+
+def _spawn_host(project_dir: str, hooks_dir: str) -> None:
+    """Start a detached hook host for this project."""
+    import subprocess
+
+    host = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hook_host.py")
+    if not os.path.isfile(host):
+        return
+    try:
+        subprocess.Popen(
+            [sys.executable, host, "--project-dir", project_dir, "--hooks-dir", hooks_dir],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            cwd=project_dir,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
+def _run_direct(hooks_dir: str, hook_name: str, stdin_data: bytes) -> int:
+    """Run the bash hook in-process-tree (no host available)."""
+    hook_path = os.path.join(hooks_dir, f"{hook_name}.sh")
+    if not os.path.isfile(hook_path):
+        sys.stderr.write(f"cognitive-core: hook not found: {hook_name}\n")
+        return 1
+    import subprocess
+
+    return subprocess.run(["bash", hook_path], input=stdin_data).returncode
+
+
+def main(argv: list) -> int:
+    if len(argv) < 2:
+        sys.stderr.write("usage: hook_client.py <hook-name> | --stop | --stats\n")
+        return 1
+
+    project_dir = os.environ.get("CLAUDE_PROJECT_DIR") or os.getcwd()
+    hooks_dir = os.path.join(project_dir, ".claude", "hooks")
+    try:
+        path = socket_path(project_dir)
+    except OSError as exc:
+        # No private socket directory: never talk to a host through it
+        sys.stderr.write(f"cognitive-core: hook host disabled: {exc}\n")
+        path = None
+
+    if argv[1] == "--stop":
+        if path is not None:
+            _request(path, {"control": "stop"})
+        return 0
+    if argv[1] == "--stats":
+        response = _request(path, {"control": "stats"}) if path is not None else None
+        if response is None:
+            sys.stderr.write("cognitive-core: no hook host running\n")
+            return 1
+        sys.stdout.write(response[1].decode("utf-8") + "\n")
+        return 0
+
+    hook_name = argv[1]
+    if "/" in hook_name or ".." in hook_name:
+        sys.stderr.write("cognitive-core: invalid hook name\n")
+        return 1
+
+    stdin_data = sys.stdin.buffer.read()
+    if path is None:
+        return _run_direct(hooks_dir, hook_name, stdin_data)
+    header = {
+        "hook": hook_name,
+        "cwd": os.getcwd(),
+        # The hook runs with this session's PATH, HOME, locale and virtualenv,
+        # not those of whichever client started the host
+        "env": forwarded_env(os.environ),
+    }
+    response = _request(path, header, stdin_data)
+    if response is None:
+        _spawn_host(project_dir, hooks_dir)
+        return _run_direct(hooks_dir, hook_name, stdin_data)
+    if "exit_code" not in response[0]:
+        return _run_direct(hooks_dir, hook_name, stdin_data)
+
+    meta, stdout = response
+    sys.stdout.buffer.write(stdout)
+    sys.stdout.flush()
+    if meta.get("stderr"):
+        sys.stderr.write(meta["stderr"])
+    return int(meta.get("exit_code", 0))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Warm hook host for cognitive-core.
+
+A long-lived per-project process that answers hook invocations forwarded by
+hook_client.py over a Unix socket. It keeps state that every hook run would
+otherwise rebuild: the parsed cognitive-core.conf (stat-invalidated) and any
+native hook handlers registered in NATIVE_HOOKS (validate-bash runs through
+tools/security_validate.py without forking).
+
+Hooks without a native handler run as `bash <hook>.sh` with the conf already
+exported (CC_CONFIG_PRELOADED=1 tells _lib.sh to skip sourcing it), so the
+stdin/stdout JSON protocol is exactly the script's own. With CC_TRACE on, the
+host writes each hook's trace span itself (CC_TRACE_HOSTED=1 tells _lib.sh
+not to).
+
+Wire protocol (one request per connection):
+  client → host: JSON header line {"hook", "cwd", "env"} + raw hook stdin
+                 ("env" is the client's PATH, HOME, locale, CLAUDE_*, CC_*
+                 and so on; hooks run with it, not the host's)
+  host → client: JSON header line {"exit_code", "stderr"} + raw hook stdout
+  Control requests send {"control": "stop"} or {"control": "stats"} (the
+  latter answers with JSON statistics as stdout).
+
+Usage:
+  python3 hook_host.py --project-dir <dir> [--hooks-dir <dir>] [--idle-timeout <s>]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.hook_client import socket_path  # noqa: E402
+from tools.process import limits_from_config, run_command  # noqa: E402
+from tools.security_validate import (  # noqa: E402
+    DECISION_CACHE, PARITY_HOOK_SHA256, run_hook as validate_bash_hook,
+)
+from tools.trace import TraceSink, hook_decision, session_of, span, trace_enabled, trace_path  # noqa: E402
+from tools.utils import CONFIG_CACHE  # noqa: E402
+
+HOOK_TIMEOUT = 60
+DEFAULT_IDLE_TIMEOUT = 1800
+
+
+def _validate_bash(host, stdin_text: str, client_env: dict, cwd: str) -> tuple | None:
+    """validate-bash in-process, while the installed script is the mirrored revision."""
+    if host.hook_digest("validate-bash") != PARITY_HOOK_SHA256:
+        return None  # locally modified hook: its own logic must run
+    env = host.hook_env(client_env)
+    project_dir = env.get("CLAUDE_PROJECT_DIR") or host.project_dir
+    return validate_bash_hook(stdin_text, env, cwd, project_dir, cache=DECISION_CACHE)
+
+
+# Native hook handlers: name -> callable(host, stdin_text, env, cwd) returning
+# (stdout, stderr, exit_code), or None to run the bash script after all.
+NATIVE_HOOKS: dict = {
+    "validate-bash": _validate_bash,
+}
+
+
+def hook_conf_path(project_dir: str) -> str:
+    """Conf file _lib.sh's _cc_load_config would source, or ""."""
+    for candidate in (
+        os.path.join(project_dir, "cognitive-core.conf"),
+        os.path.join(project_dir, ".claude", "cognitive-core.conf"),
+        os.path.join(os.path.expanduser("~"), ".cognitive-core", "defaults.conf"),
+    ):
+        if os.path.isfile(candidate):
+            return candidate
+    return ""
+
+
+class HookHost:
+    """Serves hook calls for one project directory."""
+
+    def __init__(self, project_dir: str, hooks_dir: str, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.project_dir = project_dir
+        self.hooks_dir = hooks_dir
+        self.idle_timeout = idle_timeout
+        self.socket_path = socket_path(project_dir)
+        self.calls = 0
+        self._digests: dict = {}
+        self._stop = None
+        self._last_activity = 0.0
+        self._trace = None
+
+    def config(self) -> dict:
+        """Current CC_ config for hooks (cached, reloaded on conf change)."""
+        conf_path = hook_conf_path(self.project_dir)
+        return CONFIG_CACHE.load(conf_path) if conf_path else {}
+
+    def hook_digest(self, hook_name: str) -> str:
+        """sha256 of an installed hook script (cached until the file changes)."""
+        path = os.path.join(self.hooks_dir, f"{hook_name}.sh")
+        try:
+            st = os.stat(path)
+        except OSError:
+            return ""
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        cached = self._digests.get(path)
+        if cached is None or cached[0] != stamp:
+            with open(path, "rb") as fh:
+                cached = (stamp, hashlib.sha256(fh.read()).hexdigest())
+            self._digests[path] = cached
+        return cached[1]
+
+    def stats(self) -> dict:
+        """Call count and cache statistics for `hook_client.py --stats`."""
+        return {
+            "calls": self.calls,
+            "config_cache": CONFIG_CACHE.stats(),
+            "decision_cache": DECISION_CACHE.stats(),
+            "trace": self._trace.stats() if self._trace is not None else {"enabled": False},
+        }
+
+    def hook_env(self, client_env: dict) -> dict:
+        """Environment for one hook call: the client's, plus the preloaded conf."""
+        if "PATH" in client_env:
+            env = dict(client_env)
+        else:
+            # Older client shims forward only CLAUDE_* and CC_* values
+            env = dict(os.environ)
+            env.update(client_env)
+        env.setdefault("CLAUDE_PROJECT_DIR", self.project_dir)
+        env.update(self.config())
+        env["CC_CONFIG_PRELOADED"] = "1"
+        env["CC_TRACE_HOSTED"] = "1"
+        return env
+
+    async def run_hook(self, hook_name: str, stdin_text: str, client_env: dict, cwd: str) -> tuple:
+        """Run one hook (traced if CC_TRACE is on). Returns (stdout, stderr, exit_code)."""
+        start = time.time()
+        stdout, stderr, exit_code, spawned = await self._run_hook(hook_name, stdin_text, client_env, cwd)
+        self._trace_hook(hook_name, stdin_text, start, stdout, exit_code, spawned)
+        return stdout, stderr, exit_code
+
+    def _trace_hook(
+        self, hook_name: str, stdin_text: str, start: float, stdout: str, exit_code: int, spawned: int,
+    ) -> None:
+        config = self.config()
+        if not trace_enabled(config):
+            return
+        if self._trace is None or self._trace.path != trace_path(self.project_dir, config):
+            if self._trace is not None:
+                self._trace.close()
+            self._trace = TraceSink.from_config(self.project_dir, config)
+        self._trace.emit(span(
+            "hook", "hook-host", hook_name, start, time.time(),
+            session=session_of(stdin_text),
+            decision=hook_decision(stdout, exit_code),
+            exit=exit_code,
+            bytes_in=len(stdin_text.encode("utf-8")),
+            bytes_out=len(stdout.encode("utf-8")),
+            subprocesses=spawned,
+        ))
+
+    async def _run_hook(self, hook_name: str, stdin_text: str, client_env: dict, cwd: str) -> tuple:
+        """Returns (stdout, stderr, exit_code, subprocesses started)."""
+        if not hook_name or "/" in hook_name or ".." in hook_name:
+            return "", "cognitive-core: invalid hook name\n", 1, 0
+        if not os.path.isdir(cwd):
+            cwd = self.project_dir
+
+        native = NATIVE_HOOKS.get(hook_name)
+        if native is not None:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, native, self, stdin_text, client_env, cwd)
+            if result is not None:
+                return result + (0,)
+
+        hook_path = os.path.join(self.hooks_dir, f"{hook_name}.sh")
+        if not os.path.isfile(hook_path):
+            return "", f"cognitive-core: hook not found: {hook_name}\n", 1, 0
+        result = await run_command(
+            ["bash", hook_path],
+            cwd=cwd,
+            timeout=HOOK_TIMEOUT,
+            input_text=stdin_text,
+            env=self.hook_env(client_env),
+            limits=limits_from_config(self.config()),
+        )
+        exit_code = result["exit_code"] if result["exit_code"] >= 0 else 1
+        return result["stdout"], result["stderr"], exit_code, 1
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._last_activity = asyncio.get_running_loop().time()
+        try:
+            header = json.loads(await reader.readline() or b"{}")
+            body = await reader.read()
+            if header.get("control") == "stop":
+                self._stop.set()
+                meta, stdout = {"exit_code": 0}, ""
+            elif header.get("control") == "stats":
+                meta, stdout = {"exit_code": 0}, json.dumps(self.stats())
+            else:
+                self.calls += 1
+                stdout, stderr, code = await self.run_hook(
+                    header.get("hook", ""),
+                    body.decode("utf-8", errors="replace"),
+                    header.get("env") or {},
+                    header.get("cwd") or self.project_dir,
+                )
+                meta = {"exit_code": code, "stderr": stderr}
+            writer.write(json.dumps(meta).encode("utf-8") + b"\n" + stdout.encode("utf-8"))
+            await writer.drain()
+        except (ValueError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _socket_in_use(self) -> bool:
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.settimeout(0.5)
+            probe.connect(self.socket_path)
+            return True
+        except OSError:
+            return False
+        finally:
+            probe.close()
+
+    async def serve(self) -> None:
+        """Listen until stopped or idle for idle_timeout seconds."""
+        if os.path.exists(self.socket_path):
+            if self._socket_in_use():
+                return  # another host already serves this project
+            os.unlink(self.socket_path)
+
+        loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._last_activity = loop.time()
+        # The socket's directory is private (runtime_dir()); no umask change,
+        # which would affect every thread of the process
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=min(self.idle_timeout, 30))
+                except asyncio.TimeoutError:
+                    pass
+                if loop.time() - self._last_activity > self.idle_timeout:
+                    break
+        finally:
+            server.close()
+            await server.wait_closed()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+            if self._trace is not None:
+                self._trace.close()
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description="cognitive-core warm hook host")
+    parser.add_argument("--project-dir", default=os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()))
+    parser.add_argument("--hooks-dir", default="")
+    parser.add_argument("--idle-timeout", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    hooks_dir = args.hooks_dir or os.path.join(args.project_dir, ".claude", "hooks")
+    try:
+        host = HookHost(args.project_dir, hooks_dir)
+    except OSError as exc:
+        sys.stderr.write(f"cognitive-core: hook host not started: {exc}\n")
+        return 1
+    if args.idle_timeout is not None:
+        host.idle_timeout = args.idle_timeout
+    else:
+        configured = os.environ.get("CC_HOOK_HOST_IDLE_TIMEOUT") or host.config().get(
+            "CC_HOOK_HOST_IDLE_TIMEOUT", ""
+        )
+        try:
+            host.idle_timeout = float(configured)
+        except ValueError:
+            pass
+    asyncio.run(host.serve())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,8 @@ Executes cognitive-core hooks with provided input, sanitizing hook names
 to prevent path traversal attacks.
 """
 import os
-import subprocess
+
+from tools.process import run_sync
 
 
 def run_hook(
@@ -14,6 +15,7 @@ def run_hook(
     input_json: str = "{}",
     project_dir: str = ".",
     timeout: int = 30,
+    limits: dict | None = None,
 ) -> dict:
     """
     Execute a cognitive-core hook.
@@ -24,9 +26,10 @@ def run_hook(
         input_json: JSON string to pass as stdin.
         project_dir: Working directory for the hook.
         timeout: Max execution time in seconds.
+        limits: rlimits as returned by process.limits_from_config().
 
     Returns:
-        dict with output, exit_code, error.
+        dict with output, exit_code, error, usage.
     """
     # Sanitize hook name
     if "/" in hook_name or ".." in hook_name:
@@ -48,28 +51,23 @@ def run_hook(
             }
 
     try:
-        result = subprocess.run(
-            ["bash", hook_path],
-            input=input_json,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=project_dir,
-        )
-        return {
-            "output": result.stdout.strip(),
-            "exit_code": result.returncode,
-            "error": result.stderr.strip() if result.returncode != 0 else "",
-        }
-    except subprocess.TimeoutExpired:
+        result = run_sync(["bash", hook_path], cwd=project_dir, timeout=timeout, input_text=input_json, limits=limits)
+    except FileNotFoundError:
         return {
             "output": "",
             "exit_code": -1,
-            "error": f"Hook timed out after {timeout}s",
+            "error": "bash not found",
         }
-    except FileNotFoundError:
+    if result["timed_out"]:
         return {
             "output": "",
             "exit_code": -1,
-            "error": "bash not found",
+            "error": f"Hook timed out after {timeout}s",
+            "usage": result["usage"],
         }
+    return {
+        "output": result["stdout"].strip(),
+        "exit_code": result["exit_code"],
+        "error": result["stderr"].strip() if result["exit_code"] != 0 else "",
+        "usage": result["usage"],
+    }
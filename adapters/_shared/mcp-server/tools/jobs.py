@@ -0,0 +1,107 @@
+"""
+In-flight tool call registry for cognitive-core MCP server.
+
+Every tools/call runs as an asyncio task tracked here by client and JSON-RPC
+request id, so a client's notifications/cancelled can cancel the task (which
+kills its subprocess group) and cc_server_jobs can report what is currently
+running.
+"""
+import asyncio
+import contextvars
+import time
+
+# Job of the tool call running in the current task (None outside tool calls)
+current_job: contextvars.ContextVar = contextvars.ContextVar("cc_current_job", default=None)
+
+
+class Job:
+    """A running tool call and the subprocesses it has started."""
+
+    def __init__(self, request_id, tool: str, task: asyncio.Task, progress_token=None, client=None):
+        self.request_id = request_id
+        # Key of the connection the call came from (None on stdio); request
+        # ids are only unique per client
+        self.client = client
+        self.tool = tool
+        self.task = task
+        # params._meta.progressToken of the call: set if the client wants
+        # notifications/progress while it runs
+        self.progress_token = progress_token
+        self.started = time.monotonic()
+        self.started_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        self.processes: dict = {}
+        self.cancelled = False
+        # Set when a command of this call hit its timeout (for metrics)
+        self.timed_out = False
+        # Subprocesses started, and the exit code of the last one (for traces)
+        self.spawned = 0
+        self.exit_code = None
+        # "queued" while waiting for an admission slot (tools/admission.py)
+        self.state = "running"
+        self.queued_s = 0.0
+
+    def add_process(self, pid: int, command: str) -> None:
+        """Record a subprocess started on behalf of this job."""
+        self.processes[pid] = command[:200]
+        self.spawned += 1
+
+    def remove_process(self, pid: int, exit_code: int | None = None) -> None:
+        """Forget a subprocess once it has exited."""
+        self.processes.pop(pid, None)
+        if exit_code is not None:
+            self.exit_code = exit_code
+
+    def to_dict(self) -> dict:
+        described = {
+            "id": self.request_id,
+            "tool": self.tool,
+            "state": self.state,
+            "queued_s": round(self.queued_s, 3),
+            "started_at": self.started_at,
+            "elapsed_s": round(time.monotonic() - self.started, 3),
+            "processes": [
+                {"pid": pid, "command": cmd} for pid, cmd in self.processes.items()
+            ],
+        }
+        if self.client is not None:
+            described["client"] = self.client
+        return described
+
+
+class JobRegistry:
+    """Tool calls in flight, keyed by client and JSON-RPC request id."""
+
+    def __init__(self):
+        self._jobs: dict = {}
+
+    def start(self, request_id, tool: str, task: asyncio.Task, progress_token=None, client=None) -> Job:
+        job = Job(request_id, tool, task, progress_token, client)
+        self._jobs[(client, request_id)] = job
+        return job
+
+    def finish(self, job: Job) -> None:
+        key = (job.client, job.request_id)
+        if self._jobs.get(key) is job:
+            del self._jobs[key]
+
+    def cancel(self, request_id, client=None) -> bool:
+        """Cancel a running job. Returns False if no such job is running."""
+        job = self._jobs.get((client, request_id))
+        if job is None or job.task.done():
+            return False
+        job.cancelled = True
+        job.task.cancel()
+        return True
+
+    def cancel_client(self, client) -> int:
+        """Cancel every running job of a client that went away. Returns the count."""
+        return sum(self.cancel(job.request_id, client) for job in list(self._jobs.values()) if job.client == client)
+
+    def snapshot(self, exclude: Job | None = None) -> list:
+        """Describe running jobs, oldest first."""
+        jobs = [j for j in self._jobs.values() if j is not exclude]
+        jobs.sort(key=lambda j: j.started)
+        return [j.to_dict() for j in jobs]
+
+    def __len__(self) -> int:
+        return len(self._jobs)
@@ -0,0 +1,227 @@
+"""
+Persistent lint result cache for cognitive-core MCP server.
+
+cc_lint_check results are stored under <project>/.claude/cognitive-core/lint-cache/
+keyed by sha256 over:
+  - the lint command as run (CC_LINT_COMMAND with the path substituted)
+  - the lint tool configuration (LINT_CONFIG_FILES at the project root)
+  - the content of what was linted: the file, or for a directory the
+    relative path and content hash of every CC_LINT_EXTENSIONS file under it
+
+so an unchanged file (after a no-op edit, a repeated check, or switching back
+to a branch) is answered from disk without running the linter. Directory runs
+without CC_LINT_EXTENSIONS are never cached: their inputs are unknown.
+
+The store is shared with core/hooks/post-edit-lint.sh (its entries are
+<key>.txt, these are <key>.json) and is an LRU by file mtime: a hit touches
+the entry, and writes evict the least recently used entries beyond
+max_entries. Results larger than MAX_ENTRY_BYTES are not stored.
+"""
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+# Lint tool configuration read from the project root; keep in sync with
+# post-edit-lint.sh
+LINT_CONFIG_FILES = (
+    "ruff.toml", ".ruff.toml", "pyproject.toml", "setup.cfg", "tox.ini", ".flake8",
+    ".pylintrc", "pylintrc", "mypy.ini",
+    ".eslintrc", ".eslintrc.js", ".eslintrc.cjs", ".eslintrc.json", ".eslintrc.yml", ".eslintrc.yaml",
+    "eslint.config.js", "eslint.config.mjs", "eslint.config.cjs", "tsconfig.json", ".prettierrc",
+    ".golangci.yml", ".golangci.yaml", ".golangci.toml",
+    ".rubocop.yml", ".perlcriticrc", "checkstyle.xml", "clippy.toml", ".editorconfig",
+)
+
+DEFAULT_MAX_ENTRIES = 1000
+MAX_ENTRY_BYTES = 262144
+# Memoised file hashes kept in memory (least recently used dropped first)
+MAX_MEMO_ENTRIES = 50000
+
+# Directories never walked when hashing a directory lint target
+SKIP_DIRS = {".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".tox", "build", "dist", "target"}
+
+
+def lint_files(directory: str, extensions: list):
+    """Yield CC_LINT_EXTENSIONS files under directory, in sorted walk order."""
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+        for name in sorted(files):
+            if os.path.splitext(name)[1] in extensions:
+                yield os.path.join(root, name)
+
+
+def cache_dir(project_dir: str) -> str:
+    """Lint cache directory for a project."""
+    return os.path.join(project_dir, ".claude", "cognitive-core", "lint-cache")
+
+
+class LintCache:
+    """
+    On-disk LRU of lint results with an in-process file hash memo.
+
+    File hashes are memoised on (mtime_ns, size, inode), so re-checking an
+    unchanged tree costs a stat() per file. The memo is an LRU of at most
+    max_memo_entries files, and a file that can no longer be stat()ed or
+    read (deleted, renamed) is dropped from it. Thread-safe.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_memo_entries: int = MAX_MEMO_ENTRIES):
+        self.max_entries = max_entries
+        self.max_memo_entries = max_memo_entries
+        self._digests: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.memo_evictions = 0
+
+    def file_digest(self, path: str) -> str:
+        """sha256 of a file's content ("" if unreadable)."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._digests.pop(path, None)
+            return ""
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        with self._lock:
+            cached = self._digests.get(path)
+            if cached is not None and cached[0] == stamp:
+                self._digests.move_to_end(path)
+                return cached[1]
+        digest = hashlib.sha256()
+        try:
+            with open(path, "rb") as fh:
+                for block in iter(lambda: fh.read(1048576), b""):
+                    digest.update(block)
+        except OSError:
+            with self._lock:
+                self._digests.pop(path, None)
+            return ""
+        with self._lock:
+            self._digests[path] = (stamp, digest.hexdigest())
+            self._digests.move_to_end(path)
+            while len(self._digests) > self.max_memo_entries:
+                self._digests.popitem(last=False)
+                self.memo_evictions += 1
+        return digest.hexdigest()
+
+    def config_digest(self, project_dir: str) -> str:
+        """Hash of the lint tool configuration files present at the root."""
+        digest = hashlib.sha256()
+        for name in LINT_CONFIG_FILES:
+            path = os.path.join(project_dir, name)
+            if os.path.isfile(path):
+                digest.update(f"{name}\n{self.file_digest(path)}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def target_digest(self, project_dir: str, path: str, extensions: list) -> str | None:
+        """Content hash of a lint target, or None if it cannot be cached."""
+        target = os.path.normpath(os.path.join(project_dir, path))
+        if os.path.isfile(target):
+            return self.file_digest(target) or None
+        if not os.path.isdir(target) or not extensions:
+            return None
+        manifest = hashlib.sha256()
+        for full in lint_files(target, extensions):
+            rel = os.path.relpath(full, target)
+            manifest.update(f"{rel}\0{self.file_digest(full)}\n".encode("utf-8", "surrogateescape"))
+        return manifest.hexdigest()
+
+    def key(self, project_dir: str, command: str, path: str, extensions: list) -> str | None:
+        """Cache key for running command on path, or None if uncacheable."""
+        target = self.target_digest(project_dir, path, extensions)
+        if target is None:
+            return None
+        material = f"mcp\n{command}\n{self.config_digest(project_dir)}\n{target}\n"
+        return hashlib.sha256(material.encode("utf-8", "surrogateescape")).hexdigest()
+
+    def get(self, project_dir: str, key: str) -> dict | None:
+        """Stored result for key (and mark it recently used), or None."""
+        path = os.path.join(cache_dir(project_dir), f"{key}.json")
+        try:
+            with open(path, encoding="utf-8") as fh:
+                result = json.load(fh)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def put(self, project_dir: str, key: str, result: dict) -> None:
+        """Store a result (atomically) and evict beyond max_entries."""
+        data = json.dumps(result).encode("utf-8")
+        if len(data) > MAX_ENTRY_BYTES or self.max_entries <= 0:
+            return
+        directory = cache_dir(project_dir)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, os.path.join(directory, f"{key}.json"))
+        except OSError:
+            return
+        with self._lock:
+            self.stores += 1
+        self._evict(directory)
+
+    def _evict(self, directory: str) -> None:
+        try:
+            names = [n for n in os.listdir(directory) if n.endswith((".json", ".txt"))]
+        except OSError:
+            return
+        if len(names) <= self.max_entries:
+            return
+        stamped = []
+        for name in names:
+            try:
+                stamped.append((os.stat(os.path.join(directory, name)).st_mtime_ns, name))
+            except OSError:
+                pass
+        stamped.sort()
+        for _mtime, name in stamped[:len(stamped) - self.max_entries]:
+            try:
+                os.unlink(os.path.join(directory, name))
+                with self._lock:
+                    self.evictions += 1
+            except OSError:
+                pass
+
+    def memo_entries(self, root: str) -> int:
+        """Memoised file hashes under root."""
+        prefix = os.path.join(root, "")
+        with self._lock:
+            return sum(1 for path in self._digests if path.startswith(prefix))
+
+    def forget(self, root: str) -> None:
+        """Drop the memoised file hashes under root (its project was evicted)."""
+        prefix = os.path.join(root, "")
+        with self._lock:
+            for path in [p for p in self._digests if p.startswith(prefix)]:
+                del self._digests[path]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "max_entries": self.max_entries,
+                "memo_entries": len(self._digests),
+                "memo_evictions": self.memo_evictions,
+            }
+
+
+# Process-wide cache used by cc_lint_check
+LINT_CACHE = LintCache()
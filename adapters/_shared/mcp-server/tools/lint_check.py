@@ -2,16 +2,57 @@
 Lint/test command runner for cognitive-core MCP server.
 
 Executes the project's configured lint or test command and returns the output.
+Output is captured through tools/capture.py: at most `limit` bytes per stream
+are held in memory, and longer output is spilled to a log file whose id is
+returned as stdout_log / stderr_log. Commands run supervised by
+tools/process.py (own process group, optional rlimits, usage reporting).
 """
 import shlex
 import subprocess
 
+from tools.capture import DEFAULT_LIMIT, OutputCapture, log_dir
+from tools.process import run_sync
+
+
+def _run_captured(argv: list, project_dir: str, timeout: int, label: str, limit: int, limits: dict | None) -> dict:
+    """Run argv with bounded stdout/stderr capture. Returns exit_code, captures and usage."""
+    captures = {
+        stream: OutputCapture(log_dir(project_dir), f"{label}-{stream}", limit)
+        for stream in ("stdout", "stderr")
+    }
+    try:
+        result = run_sync(
+            argv, cwd=project_dir, timeout=timeout, limits=limits,
+            on_output=lambda stream, text: captures[stream].write(text),
+        )
+    finally:
+        for capture in captures.values():
+            capture.close()
+    if result["timed_out"]:
+        raise subprocess.TimeoutExpired(argv, timeout)
+    return {"exit_code": result["exit_code"], "captures": captures, "usage": result["usage"]}
+
+
+def _result(cmd: str, run: dict) -> dict:
+    captures = run["captures"]
+    return {
+        "command": cmd,
+        "exit_code": run["exit_code"],
+        "stdout": captures["stdout"].text(),
+        "stderr": captures["stderr"].text(),
+        "stdout_log": captures["stdout"].log_id,
+        "stderr_log": captures["stderr"].log_id,
+        "usage": run["usage"],
+    }
+
 
 def run_lint(
     project_dir: str,
     lint_command: str,
     path: str = ".",
     timeout: int = 120,
+    limit: int = DEFAULT_LIMIT,
+    limits: dict | None = None,
 ) -> dict:
     """
     Run a lint command in the project directory.
@@ -21,26 +62,18 @@ def run_lint(
         lint_command: The lint command template (may contain $1).
         path: File/directory to check (replaces $1).
         timeout: Max execution time in seconds.
+        limit: In-memory bytes kept per stream (head + tail).
+        limits: rlimits as returned by process.limits_from_config().
 
     Returns:
-        dict with command, exit_code, stdout, stderr.
+        dict with command, exit_code, stdout, stderr, stdout_log, stderr_log
+        (log ids for cc_read_log, None unless the stream was spilled) and
+        usage (CPU time and peak RSS).
     """
     cmd = lint_command.replace("$1", shlex.quote(path))
 
     try:
-        result = subprocess.run(
-            ["bash", "-c", cmd],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=project_dir,
-        )
-        return {
-            "command": cmd,
-            "exit_code": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-        }
+        return _result(cmd, _run_captured(["bash", "-c", cmd], project_dir, timeout, "lint", limit, limits))
     except subprocess.TimeoutExpired:
         return {
             "command": cmd,
@@ -61,6 +94,8 @@ def run_test(
     project_dir: str,
     test_command: str,
     timeout: int = 300,
+    limit: int = DEFAULT_LIMIT,
+    limits: dict | None = None,
 ) -> dict:
     """
     Run the project's test command.
@@ -69,24 +104,16 @@ def run_test(
         project_dir: Project root directory.
         test_command: The test command to execute.
         timeout: Max execution time in seconds.
+        limit: In-memory bytes kept per stream (head + tail).
+        limits: rlimits as returned by process.limits_from_config().
 
     Returns:
-        dict with command, exit_code, stdout, stderr.
+        dict with command, exit_code, stdout, stderr, stdout_log, stderr_log, usage.
     """
     try:
-        result = subprocess.run(
-            ["bash", "-c", test_command],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=project_dir,
+        return _result(
+            test_command, _run_captured(["bash", "-c", test_command], project_dir, timeout, "test", limit, limits),
         )
-        return {
-            "command": test_command,
-            "exit_code": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-        }
     except subprocess.TimeoutExpired:
         return {
             "command": test_command,
@@ -0,0 +1,149 @@
+"""
+Sharded directory lint for cognitive-core MCP server.
+
+Linters without built-in parallelism (shellcheck, perlcritic, ...) lint a
+directory on one core. In sharded mode cc_lint_check lists the directory's
+CC_LINT_EXTENSIONS files, splits them into N size-balanced batches and runs
+CC_LINT_COMMAND on each batch concurrently, with $1 replaced by the batch's
+file list. The command must accept several files in place of $1.
+
+Shard outputs are merged deterministically: diagnostic blocks (a line that
+starts with a linted file's path plus the indented lines under it) are
+ordered by file path, line and column; every other line (summaries such as
+"Found 3 errors.") follows, in shard order. The merged output is the same
+whatever N is, as long as the linter reports each file independently.
+"""
+import os
+import re
+import shlex
+
+from tools.lint_cache import lint_files
+
+# Longest file list passed in one invocation; larger shards run in several
+MAX_ARG_CHARS = 65536
+
+
+def shard_count(value, files: int) -> int:
+    """Shards to use: value is an int, "auto" (CPU count) or falsy (off)."""
+    if value in (None, "", 0, "0"):
+        return 0
+    if value == "auto":
+        n = os.cpu_count() or 1
+    else:
+        try:
+            n = int(value)
+        except (TypeError, ValueError):
+            return 0
+    return max(0, min(n, files))
+
+
+def list_files(project_dir: str, path: str, extensions: list) -> list:
+    """Lint files under path, relative to project_dir, sorted."""
+    target = os.path.normpath(os.path.join(project_dir, path))
+    if not os.path.isdir(target) or not extensions:
+        return []
+    return [os.path.relpath(full, project_dir) for full in lint_files(target, extensions)]
+
+
+def plan_shards(project_dir: str, files: list, n: int) -> list:
+    """
+    Split files into n batches of similar total size.
+
+    Largest file first onto the lightest batch (ties: lowest index), so the
+    plan depends only on the file list and sizes. Each batch is sorted.
+    """
+    sized = []
+    for rel in files:
+        try:
+            size = os.path.getsize(os.path.join(project_dir, rel))
+        except OSError:
+            size = 0
+        sized.append((size, rel))
+    sized.sort(key=lambda item: (-item[0], item[1]))
+    loads = [0] * n
+    batches: list = [[] for _ in range(n)]
+    for size, rel in sized:
+        i = min(range(n), key=lambda k: (loads[k], k))
+        loads[i] += size + 1
+        batches[i].append(rel)
+    return [sorted(batch) for batch in batches if batch]
+
+
+def shard_commands(template: str, batch: list) -> list:
+    """The command(s) linting one batch: $1 -> quoted file list, chunked."""
+    commands, chunk, length = [], [], 0
+    for rel in batch:
+        quoted = shlex.quote(rel)
+        if chunk and length + len(quoted) + 1 > MAX_ARG_CHARS:
+            commands.append(template.replace("$1", " ".join(chunk)))
+            chunk, length = [], 0
+        chunk.append(quoted)
+        length += len(quoted) + 1
+    if chunk:
+        commands.append(template.replace("$1", " ".join(chunk)))
+    return commands
+
+
+# Leading path of a diagnostic line: "path:3:1: ...", "path(3): ...",
+# "In path line 3:" (shellcheck), or a bare "path" header (eslint stylish)
+_HEAD = re.compile(r"^(?:In )?([^:(]+?)(?: line \d+)?(?:[:(]|$)")
+
+
+def _header_file(line: str, known: dict, project_dir: str) -> tuple | None:
+    """(file, rest of line) if line starts with a linted file's path."""
+    match = _HEAD.match(line)
+    if not match:
+        return None
+    token = match.group(1).strip()
+    if os.path.isabs(token):
+        token = os.path.relpath(token, project_dir)
+    elif token.startswith("./"):
+        token = token[2:]
+    if token not in known:
+        return None
+    return token, line[match.end(1):]
+
+
+def merge_outputs(shards: list, project_dir: str = ".") -> str:
+    """
+    Merge shard outputs into one deterministic report.
+
+    Args:
+        shards: [(files, text)] per shard, in shard order.
+        project_dir: Directory the file paths are relative to.
+
+    Returns:
+        Diagnostic blocks sorted by (file, line, column), then the remaining
+        lines of each shard in shard order.
+    """
+    order = {rel: i for i, rel in enumerate(sorted({rel for files, _text in shards for rel in files}))}
+
+    blocks, other = [], []
+    for shard_index, (_files, text) in enumerate(shards):
+        current = None
+        for line in text.splitlines():
+            header = _header_file(line, order, project_dir)
+            if header:
+                numbers = [int(n) for n in re.findall(r"\d+", header[1])[:2]]
+                numbers += [0] * (2 - len(numbers))
+                current = [(order[header[0]], *numbers, shard_index, len(blocks)), [line]]
+                blocks.append(current)
+            elif current is not None and line.strip() and line[0] in " \t":
+                current[1].append(line)
+            else:
+                current = None
+                if line.strip():
+                    other.append(line)
+    blocks.sort(key=lambda block: block[0])
+    lines = []
+    for _key, block_lines in blocks:
+        lines.extend(block_lines)
+        if len(block_lines) > 1:
+            lines.append("")  # multi-line blocks (eslint, shellcheck) stay separated
+    if other:
+        if lines and lines[-1]:
+            lines.append("")
+        lines.extend(other)
+    while lines and not lines[-1]:
+        lines.pop()
+    return "\n".join(lines) + ("\n" if lines else "")
@@ -0,0 +1,343 @@
+"""
+Background pre-linting for cognitive-core MCP server.
+
+With CC_LINT_WATCH="true" the server watches CC_SRC_ROOT and CC_TEST_ROOT
+(the project root if neither exists) and lints CC_LINT_EXTENSIONS files as
+they change, so cc_lint_check can answer from the latest diagnostics instead
+of running the linter on the agent's critical path.
+
+  watcher   inotify (Linux, via ctypes) or, where inotify is unavailable or
+            out of watches, a stat() poll every POLL_INTERVAL seconds
+  debounce  a file is linted once no event for it arrived for
+            CC_LINT_WATCH_DEBOUNCE_MS (bursts of saves lint once)
+  worker    one thread, linting one file at a time under `nice`, with
+            CC_LINT_COMMAND ($1 = the file); results go to the snapshot and
+            to LINT_CACHE, and unchanged files are answered from LINT_CACHE
+
+The snapshot holds, per file, the last result and the (mtime, size) the file
+had when its lint started; lookup() reports a result as stale when the file
+has changed since.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import shlex
+import shutil
+import struct
+import threading
+import time
+
+from tools.capture import OutputCapture, capture_limit
+from tools.lint_cache import LINT_CACHE, SKIP_DIRS, lint_files
+from tools.process import limits_from_config, run_sync
+
+DEFAULT_DEBOUNCE_MS = 300
+POLL_INTERVAL = 1.0
+LINT_TIMEOUT = 120
+
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_IGNORED = 0x8000
+_IN_ISDIR = 0x40000000
+_IN_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+def _stamp(path: str) -> tuple | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class Inotify:
+    """Recursive inotify watch over some directories (Linux only)."""
+
+    def __init__(self, roots: list):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: dict = {}
+        # Watches added with recursive=False: their new subdirectories are not followed
+        self._flat: set = set()
+        try:
+            for root in roots:
+                self._watch_tree(root)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def add(self, directory: str, recursive: bool = True) -> None:
+        """Also watch directory (and, if recursive, the directories below it)."""
+        if recursive:
+            self._watch_tree(directory)
+        else:
+            self._flat.add(self._watch(directory))
+
+    def _watch(self, directory: str) -> int:
+        wd = self._add(self.fd, os.fsencode(directory), _IN_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {directory}")
+        self.dirs[wd] = directory
+        return wd
+
+    def _watch_tree(self, root: str) -> None:
+        for directory, dirs, _files in os.walk(root):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+            self._flat.discard(self._watch(directory))
+
+    def read(self, timeout: float) -> set:
+        """Paths with events within timeout (new directories are watched and their files reported)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return set()
+        paths = set()
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & _IN_IGNORED:
+                self.dirs.pop(wd, None)
+                self._flat.discard(wd)
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & _IN_ISDIR:
+                if wd in self._flat:
+                    paths.add(path)
+                elif mask & (_IN_CREATE | _IN_MOVED_TO) and os.path.basename(path) not in SKIP_DIRS:
+                    self._watch_tree(path)
+                    paths.update(os.path.join(d, f) for d, _dirs, files in os.walk(path) for f in files)
+                continue
+            paths.add(path)
+        return paths
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _Poller:
+    """stat() scan of lint files under some directories."""
+
+    def __init__(self, roots: list, extensions: list):
+        self.roots = roots
+        self.extensions = extensions
+        self.stamps = self._scan()
+
+    def _scan(self) -> dict:
+        return {path: _stamp(path) for root in self.roots for path in lint_files(root, self.extensions)}
+
+    def read(self, timeout: float) -> set:
+        time.sleep(timeout)
+        stamps = self._scan()
+        changed = {p for p in stamps.keys() | self.stamps.keys() if stamps.get(p) != self.stamps.get(p)}
+        self.stamps = stamps
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class PreLinter:
+    """
+    Watches a project and keeps a per-file lint snapshot up to date.
+
+    Args:
+        project_dir: Project root.
+        load_config: Callable returning the current cognitive-core.conf values
+            (read on every batch, so command changes apply without a restart).
+        cache: LintCache shared with cc_lint_check.
+    """
+
+    def __init__(self, project_dir: str, load_config, cache=LINT_CACHE):
+        self.project_dir = project_dir
+        self.load_config = load_config
+        self.cache = cache
+        self.backend = None
+        self.roots: list = []
+        self._snapshot: dict = {}
+        self._pending: dict = {}
+        self._cond = threading.Condition()
+        self._stopped = threading.Event()
+        self._source = None
+        self._running = None
+        self.runs = 0
+        self.cache_hits = 0
+        self.events = 0
+
+    def start(self) -> bool:
+        """Start watching (False if there is nothing to lint)."""
+        config = self.load_config()
+        extensions = config.get("CC_LINT_EXTENSIONS", "").split()
+        if not extensions or "$1" not in config.get("CC_LINT_COMMAND", ""):
+            return False
+        roots = [
+            os.path.join(self.project_dir, config.get(key, default))
+            for key, default in (("CC_SRC_ROOT", "src"), ("CC_TEST_ROOT", "tests"))
+        ]
+        self.roots = sorted({os.path.normpath(r) for r in roots if os.path.isdir(r)}) or [self.project_dir]
+        try:
+            self._source = Inotify(self.roots)
+            self.backend = "inotify"
+        except (OSError, AttributeError):
+            self._source = _Poller(self.roots, extensions)
+            self.backend = "poll"
+        # Warm up: everything is linted (or found in LINT_CACHE) once
+        now = time.monotonic()
+        for root in self.roots:
+            for path in lint_files(root, extensions):
+                self._pending[path] = now
+        threading.Thread(target=self._watch, name="lint-watch", daemon=True).start()
+        threading.Thread(target=self._work, name="lint-prelint", daemon=True).start()
+        return True
+
+    def stop(self) -> None:
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _watch(self) -> None:
+        interval = POLL_INTERVAL if self.backend == "poll" else 0.5
+        while not self._stopped.is_set():
+            try:
+                paths = self._source.read(interval)
+            except OSError:
+                # Out of inotify watches (or similar): carry on by polling
+                extensions = self.load_config().get("CC_LINT_EXTENSIONS", "").split()
+                self._source.close()
+                self._source = _Poller(self.roots, extensions)
+                self.backend = "poll"
+                interval = POLL_INTERVAL
+                continue
+            if paths:
+                now = time.monotonic()
+                with self._cond:
+                    self.events += len(paths)
+                    for path in paths:
+                        self._pending[path] = now
+                    self._cond.notify()
+
+    def _debounce(self) -> float:
+        try:
+            return int(self.load_config().get("CC_LINT_WATCH_DEBOUNCE_MS") or DEFAULT_DEBOUNCE_MS) / 1000
+        except ValueError:
+            return DEFAULT_DEBOUNCE_MS / 1000
+
+    def _work(self) -> None:
+        while not self._stopped.is_set():
+            debounce = self._debounce()
+            with self._cond:
+                if not self._pending:
+                    self._cond.wait(1.0)
+                    continue
+                now = time.monotonic()
+                ready = sorted(p for p, t in self._pending.items() if now - t >= debounce)
+                if not ready:
+                    self._cond.wait(min(self._pending.values()) + debounce - now + 0.01)
+                    continue
+                path = ready[0]
+                del self._pending[path]
+                self._running = path
+            try:
+                self._lint(path)
+            finally:
+                with self._cond:
+                    self._running = None
+
+    def _lint(self, path: str) -> None:
+        config = self.load_config()
+        template = config.get("CC_LINT_COMMAND", "")
+        extensions = config.get("CC_LINT_EXTENSIONS", "").split()
+        rel = os.path.relpath(path, self.project_dir)
+        stamp = _stamp(path)
+        if stamp is None or rel.startswith(".claude" + os.sep) or os.path.splitext(path)[1] not in extensions or "$1" not in template:
+            with self._cond:
+                self._snapshot.pop(rel, None)
+            return
+        cmd = template.replace("$1", shlex.quote(rel))
+        key = self.cache.key(self.project_dir, cmd, rel, extensions)
+        result = self.cache.get(self.project_dir, key) if key else None
+        if result is not None:
+            self.cache_hits += 1
+        else:
+            result = self._run(cmd, capture_limit(config), limits_from_config(config))
+            self.runs += 1
+            # Store only if the file did not change while the linter ran
+            if key and result["exit_code"] >= 0 and self.cache.key(self.project_dir, cmd, rel, extensions) == key:
+                self.cache.put(self.project_dir, key, result)
+        with self._cond:
+            self._snapshot[rel] = dict(result, template=template, stamp=stamp, linted_at=time.time())
+
+    def _run(self, cmd: str, limit: int, limits: dict) -> dict:
+        argv = ["bash", "-c", cmd]
+        if shutil.which("nice"):
+            argv = ["nice", "-n", "10"] + argv
+        captures = {stream: OutputCapture("", "", limit) for stream in ("stdout", "stderr")}
+        try:
+            result = run_sync(
+                argv, cwd=self.project_dir, timeout=LINT_TIMEOUT, limits=limits,
+                on_output=lambda stream, text: captures[stream].write(text),
+            )
+        except OSError as e:
+            return {"exit_code": -1, "stdout": "", "stderr": str(e)}
+        if result["timed_out"]:
+            return {"exit_code": -1, "stdout": "", "stderr": f"Command timed out after {LINT_TIMEOUT}s"}
+        return {"exit_code": result["exit_code"], "stdout": captures["stdout"].text(), "stderr": captures["stderr"].text()}
+
+    def lookup(self, rel: str, template: str) -> dict | None:
+        """
+        Latest result for a file, or None if it has none for this command.
+
+        Returns:
+            dict with exit_code, stdout, stderr, age_s (since the lint
+            finished), stale (file changed since its lint started) and
+            pending (a re-lint is queued or running).
+        """
+        path = os.path.normpath(os.path.join(self.project_dir, rel))
+        rel = os.path.relpath(path, self.project_dir)
+        with self._cond:
+            entry = self._snapshot.get(rel)
+            pending = path in self._pending or path == self._running
+        if entry is None or entry["template"] != template:
+            return None
+        return {
+            "exit_code": entry["exit_code"],
+            "stdout": entry["stdout"],
+            "stderr": entry["stderr"],
+            "age_s": round(time.time() - entry["linted_at"], 3),
+            "stale": _stamp(path) != entry["stamp"],
+            "pending": pending,
+        }
+
+    def covers(self, path: str) -> bool:
+        """Whether path is under a watched root."""
+        full = os.path.normpath(os.path.join(self.project_dir, path))
+        return any(full == root or full.startswith(root + os.sep) for root in self.roots)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "backend": self.backend,
+                "roots": [os.path.relpath(r, self.project_dir) for r in self.roots],
+                "files": len(self._snapshot),
+                "pending": len(self._pending) + (1 if self._running else 0),
+                "events": self.events,
+                "runs": self.runs,
+                "cache_hits": self.cache_hits,
+            }
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+stdio bridge to the cognitive-core MCP daemon.
+
+MCP clients that only speak stdio run this instead of server.py when
+CC_MCP_DAEMON="true":
+
+  python3 .cognitive-core/mcp-server/tools/mcp_bridge.py
+
+It connects to the project's daemon (`server.py --daemon`) over its Unix
+socket and copies JSON-RPC lines both ways, so every session and IDE window
+of the project shares one warm server. If no daemon is listening, one is
+started in the background; if it still cannot be reached within
+START_TIMEOUT seconds, the bridge runs server.py on stdio itself. It only
+connects to a socket the user owns, in a directory private to the user.
+
+HTTP clients of a daemon started with CC_MCP_HTTP_PORT need its URL and
+bearer token; `--http-config` prints them as an MCP server entry (url and
+Authorization header) for the client's configuration.
+
+Usage:
+  python3 mcp_bridge.py [--socket <path>] [--http-config]
+"""
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.hook_client import check_owned, socket_path  # noqa: E402
+from tools.transport import read_http_credentials  # noqa: E402
+
+CONNECT_TIMEOUT = 0.5
+START_TIMEOUT = 5.0
+
+_SERVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server.py")
+
+
+def _connect(path: str) -> socket.socket | None:
+    """Connect to the daemon, only through a socket this user owns in a private directory."""
+    try:
+        check_owned(os.path.dirname(path) or ".", private=True)
+        check_owned(path)
+    except OSError:
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def _spawn_daemon(project_dir: str, path: str) -> None:
+    """Start a detached daemon for this project."""
+    import subprocess
+
+    env = dict(os.environ, CC_PROJECT_DIR=project_dir)
+    try:
+        subprocess.Popen(
+            [sys.executable, _SERVER, "--daemon", "--socket", path],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            cwd=project_dir,
+            env=env,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
+def _to_stdout(sock: socket.socket) -> None:
+    out = sys.stdout.buffer
+    try:
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            out.write(chunk)
+            out.flush()
+    except OSError:
+        pass
+
+
+def bridge(sock: socket.socket) -> int:
+    """Copy stdin to the socket and the socket to stdout until both end."""
+    reader = threading.Thread(target=_to_stdout, args=(sock,), daemon=True)
+    reader.start()
+    stdin = sys.stdin.buffer
+    try:
+        while True:
+            line = stdin.readline()
+            if not line:
+                break
+            sock.sendall(line)
+        # EOF: the daemon finishes in-flight calls, then closes
+        sock.shutdown(socket.SHUT_WR)
+    except OSError:
+        return 1
+    reader.join()
+    sock.close()
+    return 0
+
+
+def main(argv: list | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    project_dir = os.path.realpath(
+        os.environ.get("CC_PROJECT_DIR") or os.environ.get("CLAUDE_PROJECT_DIR") or os.getcwd()
+    )
+    if "--socket" in argv[:-1]:
+        path = argv[argv.index("--socket") + 1]
+    else:
+        try:
+            path = socket_path(project_dir, "mcp")
+        except OSError as exc:
+            # No private socket directory: never use a daemon through it
+            print(f"cognitive-core: MCP daemon disabled: {exc}", file=sys.stderr)
+            path = None
+
+    if "--http-config" in argv:
+        credentials = read_http_credentials(path) if path is not None else None
+        if credentials is None:
+            print("No daemon serving HTTP for this project (set CC_MCP_HTTP_PORT)", file=sys.stderr)
+            return 1
+        print(json.dumps({
+            "url": credentials["url"],
+            "headers": {"Authorization": f"Bearer {credentials['token']}"},
+        }, indent=2))
+        return 0
+
+    sock = _connect(path) if path is not None else None
+    if sock is None and path is not None:
+        _spawn_daemon(project_dir, path)
+        deadline = time.monotonic() + START_TIMEOUT
+        while sock is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+            sock = _connect(path)
+    if sock is None:
+        # No daemon: serve this client on stdio as usual
+        os.environ["CC_PROJECT_DIR"] = project_dir
+        os.execv(sys.executable, [sys.executable, _SERVER])
+    return bridge(sock)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
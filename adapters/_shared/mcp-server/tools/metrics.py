@@ -0,0 +1,228 @@
+"""
+Request metrics for cognitive-core MCP server.
+
+Every JSON-RPC request is recorded per method, and tools/call requests also
+per tool: call count, errors, timeouts, cancellations, request and response
+bytes, and a latency histogram.
+
+  cc_server_stats       "metrics": count, errors, timeouts, cancelled,
+                        bytes_in/out, mean and p50/p95/p99 (exact, over the
+                        last RECENT calls of each method or tool)
+  Prometheus            cc_mcp_request_* / cc_mcp_tool_* counters and
+                        duration histograms (BUCKETS), labelled with the
+                        project directory's name
+
+The Prometheus text exposition is optional: CC_MCP_METRICS_PORT serves it on
+http://127.0.0.1:<port>/metrics, and CC_MCP_METRICS_TEXTFILE writes it to a
+file every TEXTFILE_INTERVAL seconds (and on exit) for node_exporter's
+textfile collector, which cicd/monitoring already scrapes.
+"""
+import bisect
+import collections
+import http.server
+import os
+import tempfile
+import threading
+
+# Upper bounds (seconds) of the latency histogram buckets; hooks and pings
+# land in the low buckets, test runs in the high ones
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+RECENT = 1024
+TEXTFILE_INTERVAL = 15.0
+
+
+class _Series:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.sum_s = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.recent = collections.deque(maxlen=RECENT)
+
+    def summary(self) -> dict:
+        recent = sorted(self.recent)
+
+        def quantile(q: float) -> float:
+            return round(recent[min(len(recent) - 1, int(q * len(recent)))], 4) if recent else 0.0
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "mean_s": round(self.sum_s / self.count, 4) if self.count else 0.0,
+            "p50_s": quantile(0.50),
+            "p95_s": quantile(0.95),
+            "p99_s": quantile(0.99),
+        }
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metrics:
+    """Per-method and per-tool request metrics (thread-safe)."""
+
+    def __init__(self, project: str = ""):
+        self.project = project
+        self._lock = threading.Lock()
+        self._series = {"method": {}, "tool": {}}
+
+    def observe(
+        self,
+        method: str,
+        tool: str | None,
+        seconds: float,
+        error: bool = False,
+        timed_out: bool = False,
+        cancelled: bool = False,
+        bytes_in: int = 0,
+        bytes_out: int = 0,
+    ) -> None:
+        """Record one request (and its tool, for tools/call)."""
+        with self._lock:
+            keys = [("method", method)] + ([("tool", tool)] if tool else [])
+            for kind, name in keys:
+                series = self._series[kind].get(name)
+                if series is None:
+                    series = self._series[kind][name] = _Series()
+                series.count += 1
+                series.errors += int(error)
+                series.timeouts += int(timed_out)
+                series.cancelled += int(cancelled)
+                series.bytes_in += bytes_in
+                series.bytes_out += bytes_out
+                series.sum_s += seconds
+                series.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+                series.recent.append(seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "methods": {name: s.summary() for name, s in sorted(self._series["method"].items())},
+                "tools": {name: s.summary() for name, s in sorted(self._series["tool"].items())},
+            }
+
+    def exposition(self) -> str:
+        """Prometheus text format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            for kind, prefix in (("method", "cc_mcp_request"), ("tool", "cc_mcp_tool")):
+                series = sorted(self._series[kind].items())
+                what = "JSON-RPC requests" if kind == "method" else "MCP tool calls"
+                for metric, attr, text in (
+                    ("total", "count", what),
+                    ("errors_total", "errors", f"{what} answered with an error"),
+                    ("timeouts_total", "timeouts", f"{what} whose command timed out"),
+                    ("cancelled_total", "cancelled", f"{what} cancelled by the client"),
+                    ("bytes_in_total", "bytes_in", f"Bytes received in {what}"),
+                    ("bytes_out_total", "bytes_out", f"Bytes sent in responses to {what}"),
+                ):
+                    name = f"{prefix}_{metric}"
+                    lines.append(f"# HELP {name} {text}.")
+                    lines.append(f"# TYPE {name} counter")
+                    for label, s in series:
+                        labels = f'project="{_label(self.project)}",{kind}="{_label(label)}"'
+                        lines.append(f"{name}{{{labels}}} {getattr(s, attr)}")
+                name = f"{prefix}_duration_seconds"
+                lines.append(f"# HELP {name} Latency of {what}.")
+                lines.append(f"# TYPE {name} histogram")
+                for label, s in series:
+                    labels = f'project="{_label(self.project)}",{kind}="{_label(label)}"'
+                    cumulative = 0
+                    for bound, n in zip(BUCKETS + (float("inf"),), s.buckets):
+                        cumulative += n
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+                    lines.append(f"{name}_sum{{{labels}}} {s.sum_s:.6f}")
+                    lines.append(f"{name}_count{{{labels}}} {s.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """Atomically write the exposition to path (node_exporter textfile collector)."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".cc-metrics-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(self.exposition())
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+
+class MetricsExporter:
+    """
+    Optional Prometheus exposition of a Metrics instance.
+
+    Args:
+        metrics: Metrics to expose.
+        port: Serve /metrics on 127.0.0.1:port (0 = no HTTP endpoint).
+        textfile: Rewrite this file every TEXTFILE_INTERVAL seconds ("" = none).
+    """
+
+    def __init__(self, metrics: Metrics, port: int = 0, textfile: str = ""):
+        self.metrics = metrics
+        self.port = port
+        self.textfile = textfile
+        self._server = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Start the endpoint and textfile writer (OSError if the port is taken)."""
+        if self.port:
+            metrics = self.metrics
+
+            class Handler(http.server.BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = metrics.exposition().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            self._server = http.server.ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+            self._server.daemon_threads = True
+            threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        if self.textfile:
+            threading.Thread(target=self._write_loop, name="metrics-textfile", daemon=True).start()
+
+    def _write_loop(self) -> None:
+        while True:
+            try:
+                self.metrics.write_textfile(self.textfile)
+            except OSError:
+                pass
+            if self._stopped.wait(TEXTFILE_INTERVAL):
+                return
+
+    def stop(self) -> None:
+        """Stop serving and write the textfile a last time."""
+        self._stopped.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self.textfile:
+            try:
+                self.metrics.write_textfile(self.textfile)
+            except OSError:
+                pass
@@ -0,0 +1,525 @@
+"""
+Subprocess supervision for cognitive-core MCP server.
+
+Every command a tool call shells out to (lint, test, hooks, the background
+pre-linter) runs through these helpers:
+
+  - it starts in its own session (process group); on timeout or
+    cancellation the whole group is killed, and once the command itself
+    exits any process it left behind in its group is killed too, so
+    grandchildren such as Gradle's JVM or pytest-xdist workers never
+    outlive the call
+  - optional rlimits from cognitive-core.conf (limits_from_config) are
+    applied as soft limits by a `ulimit` prefix that then execs the command;
+    they are inherited by every process the command starts
+  - the command is reaped with wait4(), so each call reports the CPU time
+    and peak RSS of the command and the descendants it waited for
+    ("usage"); PROCESS_STATS aggregates them for cc_server_stats
+
+The async helpers keep the server's event loop answering cheap requests
+while a long command is in flight; run_sync() is the blocking equivalent for
+code that runs in worker threads.
+"""
+import asyncio
+import codecs
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+from tools.jobs import current_job
+
+_POSIX = os.name == "posix"
+_WAIT4 = hasattr(os, "wait4")
+
+# stream_command() hands output over early once this much is waiting
+_MAX_PENDING = 1048576
+
+# cognitive-core.conf key -> (ulimit flag, multiplier to ulimit's unit)
+LIMIT_KEYS = {
+    "CC_MCP_LIMIT_CPU_SECONDS": ("-t", 1),
+    "CC_MCP_LIMIT_MEMORY_MB": ("-v", 1024),
+    "CC_MCP_LIMIT_OPEN_FILES": ("-n", 1),
+}
+
+
+def limits_from_config(config: dict) -> dict:
+    """Positive CC_MCP_LIMIT_* values from config ({key: int})."""
+    limits = {}
+    for key in LIMIT_KEYS:
+        try:
+            value = int(config.get(key) or 0)
+        except ValueError:
+            continue
+        if value > 0:
+            limits[key] = value
+    return limits
+
+
+def _limited(argv: list, limits: dict | None) -> list:
+    """argv prefixed with a bash `ulimit -S ...; exec` wrapper, if limits."""
+    if not limits or not _POSIX:
+        return argv
+    settings = " ".join(
+        f"ulimit -S {LIMIT_KEYS[key][0]} {value * LIMIT_KEYS[key][1]};"
+        for key, value in sorted(limits.items())
+    )
+    return ["bash", "-c", f'{settings} exec "$@"', "cc-limits"] + list(argv)
+
+
+class ProcessStats:
+    """Totals over supervised commands (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.cpu_s = 0.0
+        self.max_rss_kb = 0
+
+    def record(self, usage: dict | None, timed_out: bool = False, cancelled: bool = False) -> None:
+        with self._lock:
+            self.runs += 1
+            self.timeouts += int(timed_out)
+            self.cancelled += int(cancelled)
+            if usage:
+                self.cpu_s += usage["cpu_s"]
+                self.max_rss_kb = max(self.max_rss_kb, usage["max_rss_kb"])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "timeouts": self.timeouts,
+                "cancelled": self.cancelled,
+                "cpu_s": round(self.cpu_s, 3),
+                "max_rss_kb": self.max_rss_kb,
+            }
+
+
+# Process-wide totals reported by cc_server_stats
+PROCESS_STATS = ProcessStats()
+
+
+def _usage(rusage) -> dict | None:
+    if rusage is None:
+        return None
+    rss = rusage.ru_maxrss // 1024 if sys.platform == "darwin" else rusage.ru_maxrss  # bytes on macOS
+    return {
+        "cpu_s": round(rusage.ru_utime + rusage.ru_stime, 3),
+        "user_s": round(rusage.ru_utime, 3),
+        "sys_s": round(rusage.ru_stime, 3),
+        "max_rss_kb": rss,
+    }
+
+
+def format_usage(usage: dict | None) -> str:
+    """One-line summary of a usage dict ("" if unknown)."""
+    if not usage:
+        return ""
+    return f"cpu {usage['cpu_s']:.2f}s, peak RSS {usage['max_rss_kb'] / 1024:.1f} MB"
+
+
+def sum_usage(usages) -> dict | None:
+    """Usage of several commands together: CPU times add up, peak RSS is the largest."""
+    usages = [u for u in usages if u]
+    if not usages:
+        return None
+    return {
+        "cpu_s": round(sum(u["cpu_s"] for u in usages), 3),
+        "user_s": round(sum(u["user_s"] for u in usages), 3),
+        "sys_s": round(sum(u["sys_s"] for u in usages), 3),
+        "max_rss_kb": max(u["max_rss_kb"] for u in usages),
+    }
+
+
+def _spawn(argv: list, cwd: str, env: dict | None, limits: dict | None, stdin) -> subprocess.Popen:
+    return subprocess.Popen(
+        _limited(argv, limits),
+        stdin=stdin,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=cwd,
+        env=env,
+        start_new_session=_POSIX,
+    )
+
+
+def _kill_group(proc) -> None:
+    """Kill a subprocess and every process in its group."""
+    try:
+        if _POSIX:
+            os.killpg(proc.pid, signal.SIGKILL)
+            return
+    except (ProcessLookupError, PermissionError):
+        pass
+    if proc.returncode is None:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+
+
+class _Reaper:
+    """
+    Waits for a Popen in a thread with wait4(), keeping its rusage.
+
+    Args:
+        proc: The process (its returncode is set once reaped).
+        loop: Event loop to resolve self.future on, for async callers.
+    """
+
+    def __init__(self, proc: subprocess.Popen, loop=None):
+        self.proc = proc
+        self.rusage = None
+        self.done = threading.Event()
+        self.future = loop.create_future() if loop is not None else None
+        self._loop = loop
+        threading.Thread(target=self._wait, name=f"reap-{proc.pid}", daemon=True).start()
+
+    def _wait(self) -> None:
+        if _POSIX and hasattr(os, "waitid"):
+            # Wait for the exit without reaping: while the command is a zombie
+            # its pid (and group id) cannot be reused, so killing the group
+            # cannot hit an unrelated process
+            while True:
+                try:
+                    os.waitid(os.P_PID, self.proc.pid, os.WEXITED | os.WNOWAIT)
+                    break
+                except InterruptedError:
+                    continue
+                except ChildProcessError:
+                    break
+            self._kill_rest()
+        if _WAIT4:
+            while True:
+                try:
+                    _pid, status, self.rusage = os.wait4(self.proc.pid, 0)
+                    break
+                except InterruptedError:
+                    continue
+                except ChildProcessError:
+                    status = 0
+                    break
+            self.proc.returncode = os.waitstatus_to_exitcode(status)
+        else:
+            self.proc.wait()
+        self.done.set()
+        if self.future is not None:
+            self._loop.call_soon_threadsafe(self._resolve)
+
+    def _kill_rest(self) -> None:
+        """Kill whatever the command left running in its group."""
+        try:
+            os.killpg(self.proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(self.proc.returncode)
+
+    @property
+    def usage(self) -> dict | None:
+        return _usage(self.rusage)
+
+
+async def _pipe_reader(pipe) -> asyncio.StreamReader:
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=2 ** 20)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+    return reader
+
+
+def _feed(pipe, data: bytes) -> None:
+    try:
+        pipe.write(data)
+    except (BrokenPipeError, OSError):
+        pass
+    finally:
+        try:
+            pipe.close()
+        except OSError:
+            pass
+
+
+async def _start(argv: list, cwd: str, env: dict | None, limits: dict | None, input_text: str | None):
+    """Spawn argv; returns (proc, reaper, stdout reader, stderr reader)."""
+    loop = asyncio.get_running_loop()
+    proc = _spawn(argv, cwd, env, limits, subprocess.PIPE if input_text is not None else subprocess.DEVNULL)
+    reaper = _Reaper(proc, loop)
+    stdout = await _pipe_reader(proc.stdout)
+    stderr = await _pipe_reader(proc.stderr)
+    if input_text is not None:
+        loop.run_in_executor(None, _feed, proc.stdin, input_text.encode("utf-8"))
+    job = current_job.get()
+    if job is not None:
+        job.add_process(proc.pid, " ".join(argv))
+    return proc, reaper, stdout, stderr
+
+
+def _discard(future) -> None:
+    """Cancel a gather of readers whose result is no longer wanted."""
+    future.cancel()
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+
+async def _stop(proc, reaper: _Reaper) -> None:
+    """Kill the process group and wait until the command is reaped."""
+    _kill_group(proc)
+    await asyncio.shield(reaper.future)
+
+
+async def run_command(
+    argv: list,
+    cwd: str = ".",
+    timeout: float = 120,
+    input_text: str | None = None,
+    env: dict | None = None,
+    limits: dict | None = None,
+) -> dict:
+    """
+    Run a command without blocking the event loop.
+
+    Args:
+        argv: Command and arguments (e.g., ["bash", "-c", cmd]).
+        cwd: Working directory for the command.
+        timeout: Max execution time in seconds.
+        input_text: Optional text passed on stdin.
+        env: Environment for the command (default: inherit).
+        limits: rlimits from limits_from_config() (default: none).
+
+    Returns:
+        dict with exit_code, stdout, stderr, timed_out, usage (cpu_s,
+        user_s, sys_s, max_rss_kb; None where wait4() is unavailable).
+
+    Raises:
+        asyncio.CancelledError: if the calling task is cancelled; the
+            process group is killed before the error propagates.
+    """
+    try:
+        proc, reaper, stdout, stderr = await _start(argv, cwd, env, limits, input_text)
+    except FileNotFoundError:
+        return {
+            "exit_code": -1,
+            "stdout": "",
+            "stderr": f"{argv[0]} not found",
+            "timed_out": False,
+            "usage": None,
+        }
+
+    job = current_job.get()
+    gathered = asyncio.gather(stdout.read(), stderr.read(), asyncio.shield(reaper.future))
+    try:
+        out, err, _code = await asyncio.wait_for(gathered, timeout)
+    except asyncio.TimeoutError:
+        _discard(gathered)
+        await _stop(proc, reaper)
+        PROCESS_STATS.record(reaper.usage, timed_out=True)
+        if job is not None:
+            job.timed_out = True
+        return {
+            "exit_code": -1,
+            "stdout": "",
+            "stderr": f"Command timed out after {timeout}s",
+            "timed_out": True,
+            "usage": reaper.usage,
+        }
+    except asyncio.CancelledError:
+        _discard(gathered)
+        await _stop(proc, reaper)
+        PROCESS_STATS.record(reaper.usage, cancelled=True)
+        raise
+    finally:
+        if job is not None:
+            job.remove_process(proc.pid, proc.returncode)
+
+    PROCESS_STATS.record(reaper.usage)
+    return {
+        "exit_code": proc.returncode,
+        "stdout": out.decode("utf-8", errors="replace"),
+        "stderr": err.decode("utf-8", errors="replace"),
+        "timed_out": False,
+        "usage": reaper.usage,
+    }
+
+
+async def stream_command(
+    argv: list,
+    on_output,
+    cwd: str = ".",
+    timeout: float = 120,
+    env: dict | None = None,
+    interval: float = 0.5,
+    limits: dict | None = None,
+) -> dict:
+    """
+    Run a command, handing its output to on_output while it runs.
+
+    Output is batched: on_output(chunks) is called once per interval (sooner
+    if more than 1 MB is waiting, and once more at exit) with the
+    [(stream, text)] read since the last call, stream being "stdout" or
+    "stderr". Nothing is accumulated here.
+
+    Args:
+        argv: Command and arguments.
+        on_output: Callable taking a list of (stream, text) tuples.
+        cwd: Working directory for the command.
+        timeout: Max execution time in seconds.
+        env: Environment for the command (default: inherit).
+        interval: Seconds between on_output batches.
+        limits: rlimits from limits_from_config() (default: none).
+
+    Returns:
+        dict with exit_code, timed_out, usage.
+
+    Raises:
+        asyncio.CancelledError: as for run_command().
+    """
+    try:
+        proc, reaper, stdout, stderr = await _start(argv, cwd, env, limits, None)
+    except FileNotFoundError:
+        on_output([("stderr", f"{argv[0]} not found")])
+        return {"exit_code": -1, "timed_out": False, "usage": None}
+
+    job = current_job.get()
+    pending: list = []
+    pending_size = 0
+
+    def flush() -> None:
+        nonlocal pending_size
+        if pending:
+            chunks = pending[:]
+            pending.clear()
+            pending_size = 0
+            on_output(chunks)
+
+    async def pump(stream, name: str) -> None:
+        nonlocal pending_size
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        while True:
+            data = await stream.read(65536)
+            text = decoder.decode(data, final=not data)
+            if text:
+                pending.append((name, text))
+                pending_size += len(text)
+                if pending_size > _MAX_PENDING:
+                    flush()  # fast producers: bound memory, not just latency
+            if not data:
+                return
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    readers = asyncio.gather(pump(stdout, "stdout"), pump(stderr, "stderr"), asyncio.shield(reaper.future))
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            done, _ = await asyncio.wait({readers}, timeout=min(interval, remaining))
+            flush()
+            if done:
+                break
+    except asyncio.TimeoutError:
+        _discard(readers)
+        await _stop(proc, reaper)
+        flush()
+        PROCESS_STATS.record(reaper.usage, timed_out=True)
+        if job is not None:
+            job.timed_out = True
+        return {"exit_code": -1, "timed_out": True, "usage": reaper.usage}
+    except asyncio.CancelledError:
+        _discard(readers)
+        await _stop(proc, reaper)
+        PROCESS_STATS.record(reaper.usage, cancelled=True)
+        raise
+    finally:
+        if job is not None:
+            job.remove_process(proc.pid, proc.returncode)
+
+    PROCESS_STATS.record(reaper.usage)
+    return {"exit_code": proc.returncode, "timed_out": False, "usage": reaper.usage}
+
+
+def run_sync(
+    argv: list,
+    cwd: str = ".",
+    timeout: float = 120,
+    input_text: str | None = None,
+    env: dict | None = None,
+    limits: dict | None = None,
+    on_output=None,
+) -> dict:
+    """
+    Blocking run_command() for worker threads and synchronous tools.
+
+    Args:
+        on_output: Optional callable (stream, text) receiving output as it
+            arrives; without it, output is collected and returned.
+
+    Returns:
+        dict with exit_code, stdout, stderr (empty when on_output is
+        given), timed_out, usage.
+
+    Raises:
+        FileNotFoundError: argv[0] does not exist.
+    """
+    proc = _spawn(argv, cwd, env, limits, subprocess.PIPE if input_text is not None else subprocess.DEVNULL)
+    reaper = _Reaper(proc)
+    collected = {"stdout": [], "stderr": []}
+
+    def pump(pipe, name: str) -> None:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        with pipe:
+            for data in iter(lambda: pipe.read1(65536), b""):
+                text = decoder.decode(data)
+                if on_output is not None:
+                    on_output(name, text)
+                else:
+                    collected[name].append(text)
+
+    threads = [
+        threading.Thread(target=pump, args=(proc.stdout, "stdout"), daemon=True),
+        threading.Thread(target=pump, args=(proc.stderr, "stderr"), daemon=True),
+    ]
+    if input_text is not None:
+        threads.append(threading.Thread(target=_feed, args=(proc.stdin, input_text.encode("utf-8")), daemon=True))
+    for thread in threads:
+        thread.start()
+    timed_out = not reaper.done.wait(timeout)
+    if timed_out:
+        _kill_group(proc)
+        reaper.done.wait()
+    for thread in threads:
+        thread.join(timeout=5)
+    PROCESS_STATS.record(reaper.usage, timed_out=timed_out)
+    return {
+        "exit_code": -1 if timed_out else proc.returncode,
+        "stdout": "".join(collected["stdout"]),
+        "stderr": "".join(collected["stderr"]) or (f"Command timed out after {timeout}s" if timed_out else ""),
+        "timed_out": timed_out,
+        "usage": reaper.usage,
+    }
+
+
+async def run_shell(
+    cmd: str,
+    cwd: str = ".",
+    timeout: float = 120,
+    input_text: str | None = None,
+    env: dict | None = None,
+    limits: dict | None = None,
+) -> dict:
+    """Run a shell command string through ``bash -c``."""
+    return await run_command(
+        ["bash", "-c", cmd], cwd=cwd, timeout=timeout, input_text=input_text, env=env, limits=limits,
+    )
+
+
+async def stream_shell(
+    cmd: str, on_output, cwd: str = ".", timeout: float = 120, env: dict | None = None, limits: dict | None = None,
+) -> dict:
+    """Stream a shell command string run through ``bash -c`` (see stream_command)."""
+    return await stream_command(["bash", "-c", cmd], on_output, cwd=cwd, timeout=timeout, env=env, limits=limits)
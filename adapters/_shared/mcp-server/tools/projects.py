@@ -0,0 +1,288 @@
+"""
+Per-project state for cognitive-core MCP server.
+
+One server process can serve several cognitive-core projects (a monorepo
+with a project per service, or a daemon shared by a workspace). The project
+of a request is, in order:
+
+  1. the tool call's project_dir argument (absolute, or relative to the
+     server's own project)
+  2. the client's MCP roots (roots/list): the first root that is a
+     cognitive-core project
+  3. the server's own project (CC_PROJECT_DIR)
+
+A project directory holds cognitive-core.conf or .cognitive-core/. Since a
+project's config names the commands the server runs, a project is only
+accepted when it is the server's own project or one of the client's MCP
+roots (or lies inside one), and when the directory, its conf and its
+install dir are owned by the server's user and not group- or
+world-writable; anything else is refused. Each Project keeps its own caches:
+
+  decisions   security decision LRU, so projects with different rule sets
+              stop emptying each other's cache
+  listings    .cognitive-core/<subdir> listings (agents, skills, hooks),
+              keyed on the directory's mtime
+  docs        agent and skill docs: slices of the install's mmapped
+              docs.bundle (tools/doc_bundle.py) where there is one, else
+              file reads keyed on (mtime_ns, size, inode)
+
+Config snapshots and lint file hashes stay in the process-wide CONFIG_CACHE
+and LINT_CACHE, keyed by path; evicting a project drops its entries there
+too. ProjectRegistry keeps at most CC_MCP_MAX_PROJECTS projects (default 16)
+and evicts the least recently used ones while the estimated size of all
+caches exceeds CC_MCP_PROJECT_CACHE_MB (default 64). Limits are checked when
+a request switches project. The server's own project is never evicted.
+"""
+import contextvars
+import os
+import stat
+import sys
+import threading
+import time
+import urllib.parse
+
+from tools.doc_bundle import DocBundle
+from tools.lint_cache import LINT_CACHE
+from tools.security_validate import DECISION_CACHE, DecisionCache
+from tools.utils import CONFIG_CACHE
+
+DEFAULT_MAX_PROJECTS = 16
+DEFAULT_MAX_MB = 64
+# Rough in-memory cost of one cached decision and one memoised file hash
+_DECISION_BYTES = 1024
+_DIGEST_BYTES = 256
+
+# Project of the request running in the current task (None: the server's own)
+current_project: contextvars.ContextVar = contextvars.ContextVar("cc_current_project", default=None)
+
+
+def is_project(root: str) -> bool:
+    return os.path.isfile(os.path.join(root, "cognitive-core.conf")) or os.path.isdir(
+        os.path.join(root, ".cognitive-core")
+    )
+
+
+def is_trusted(root: str) -> bool:
+    """Whether root and its config are owned by this user and writable by nobody else."""
+    for path in (root, os.path.join(root, "cognitive-core.conf"), os.path.join(root, ".cognitive-core")):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        except OSError:
+            return False
+        if st.st_uid != os.getuid() or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            return False
+    return True
+
+
+def _within(path: str, parents) -> bool:
+    return any(path == parent or path.startswith(parent.rstrip(os.sep) + os.sep) for parent in parents)
+
+
+def root_paths(roots: list) -> list:
+    """Local directories of MCP roots ({"uri": "file:///..."}); other schemes are skipped."""
+    paths = []
+    for root in roots:
+        uri = root.get("uri", "") if isinstance(root, dict) else ""
+        parts = urllib.parse.urlsplit(uri)
+        if parts.scheme == "file" and parts.path:
+            paths.append(urllib.parse.unquote(parts.path))
+    return paths
+
+
+class Project:
+    """A cognitive-core project and its caches (thread-safe)."""
+
+    def __init__(self, root: str, install_dir: str, decisions: DecisionCache):
+        self.root = root
+        self.install_dir = install_dir
+        self.decisions = decisions
+        self.bundle = DocBundle(install_dir)
+        self.requests = 0
+        self.last_used = time.monotonic()
+        self._listings: dict = {}
+        self._docs: dict = {}
+        self._lock = threading.Lock()
+
+    def listing(self, subdir: str) -> list:
+        """Sorted file names in <install_dir>/<subdir> ([] if missing)."""
+        path = os.path.join(self.install_dir, subdir)
+        try:
+            stamp = os.stat(path).st_mtime_ns
+        except OSError:
+            return []
+        with self._lock:
+            cached = self._listings.get(subdir)
+        if cached is not None and cached[0] == stamp:
+            return list(cached[1])
+        try:
+            names = sorted(os.listdir(path))
+        except OSError:
+            return []
+        with self._lock:
+            self._listings[subdir] = (stamp, names)
+        return list(names)
+
+    def doc(self, path: str) -> str:
+        """Text of a doc file, re-read only when it changes (OSError if unreadable)."""
+        key = os.path.relpath(path, self.install_dir)
+        if not key.startswith("..") and self.bundle.available():
+            # The bundle only speeds reads up: a stale bundle in a read-only
+            # install dir, or a corrupt one, falls back to the file
+            try:
+                text = self.bundle.text(key)
+            except (OSError, ValueError):
+                text = None
+            if text is not None:
+                return text
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        with self._lock:
+            cached = self._docs.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        with open(path, encoding="utf-8") as fh:
+            text = fh.read()
+        with self._lock:
+            self._docs[path] = (stamp, text)
+        return text
+
+    def size(self) -> int:
+        """Estimated bytes held by this project's caches."""
+        with self._lock:
+            total = sum(sys.getsizeof(text) for _stamp, text in self._docs.values())
+            total += sum(sys.getsizeof(name) for _stamp, names in self._listings.values() for name in names)
+        total += self.decisions.stats()["entries"] * _DECISION_BYTES
+        total += LINT_CACHE.memo_entries(self.root) * _DIGEST_BYTES
+        return total
+
+    def clear(self) -> None:
+        with self._lock:
+            self._listings.clear()
+            self._docs.clear()
+        self.decisions.clear()
+        self.bundle = DocBundle(self.install_dir)
+
+
+class ProjectRegistry:
+    """
+    LRU of the projects a server has answered for.
+
+    Args:
+        root: The server's own project (never evicted).
+        install_dir: Its cognitive-core install dir (CC_INSTALL_DIR).
+    """
+
+    def __init__(self, root: str, install_dir: str):
+        self.default = Project(root, install_dir, DECISION_CACHE)
+        self._default_key = os.path.realpath(root)
+        self.max_projects = DEFAULT_MAX_PROJECTS
+        self.max_bytes = DEFAULT_MAX_MB * 1048576
+        self.evictions = 0
+        self._projects: dict = {}
+        self._last = self.default
+        self._lock = threading.Lock()
+
+    def configure(self, config: dict) -> None:
+        """Apply CC_MCP_MAX_PROJECTS and CC_MCP_PROJECT_CACHE_MB."""
+        try:
+            self.max_projects = max(1, int(config.get("CC_MCP_MAX_PROJECTS") or DEFAULT_MAX_PROJECTS))
+        except ValueError:
+            self.max_projects = DEFAULT_MAX_PROJECTS
+        try:
+            self.max_bytes = max(0, int(config.get("CC_MCP_PROJECT_CACHE_MB") or DEFAULT_MAX_MB)) * 1048576
+        except ValueError:
+            self.max_bytes = DEFAULT_MAX_MB * 1048576
+
+    def resolve(self, requested: str | None = None, roots: list | None = None) -> Project:
+        """
+        Project of a request: requested (a project_dir argument), else the
+        first trusted cognitive-core project among roots, else the default.
+        requested must be the default project or one of roots, or lie inside
+        one of them.
+
+        Raises:
+            ValueError: requested is not an allowed cognitive-core project.
+        """
+        allowed = [self._default_key] + [os.path.realpath(r) for r in roots or ()]
+        if requested:
+            root = os.path.realpath(os.path.join(self._default_key, os.path.expanduser(requested)))
+            if not is_project(root):
+                raise ValueError(f"not a cognitive-core project: {requested}")
+            if root != self._default_key:
+                if not _within(root, allowed):
+                    raise ValueError(f"not the server's project or one of the client's roots: {requested}")
+                if not is_trusted(root):
+                    raise ValueError(f"project is writable by other users or not owned by this user: {requested}")
+            return self.get(root)
+        for root in allowed[1:]:
+            if is_project(root) and is_trusted(root):
+                return self.get(root)
+        return self.get(self._default_key)
+
+    def get(self, root: str) -> Project:
+        """The Project for an existing project root, as a real path (created on first use)."""
+        with self._lock:
+            if root == self._default_key:
+                project = self.default
+            else:
+                project = self._projects.pop(root, None)
+                if project is None:
+                    project = Project(root, os.path.join(root, ".cognitive-core"), DecisionCache())
+                self._projects[root] = project  # most recently used last
+            project.requests += 1
+            project.last_used = time.monotonic()
+            switched = project is not self._last
+            self._last = project
+        if switched:
+            self._enforce()
+        return project
+
+    def _enforce(self) -> None:
+        with self._lock:
+            while len(self._projects) + 1 > self.max_projects:
+                oldest = next(iter(self._projects))
+                if self._projects[oldest] is self._last:
+                    break
+                self._evict(oldest)
+            if not self._projects:
+                return
+            sizes = {root: p.size() for root, p in self._projects.items()}
+            total = sum(sizes.values()) + self.default.size()
+            for root in list(self._projects):
+                if total <= self.max_bytes or self._projects[root] is self._last:
+                    break
+                total -= sizes[root]
+                self._evict(root)
+
+    def _evict(self, root: str) -> None:
+        project = self._projects.pop(root)
+        project.clear()
+        CONFIG_CACHE.forget(root)
+        LINT_CACHE.forget(root)
+        self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            projects = [self.default] + list(self._projects.values())
+            now = time.monotonic()
+            entries = [
+                {
+                    "root": p.root,
+                    "requests": p.requests,
+                    "idle_s": round(now - p.last_used, 1),
+                    "bytes": p.size(),
+                    "decision_cache": p.decisions.stats(),
+                    "doc_bundle": p.bundle.stats(),
+                }
+                for p in projects
+            ]
+            return {
+                "projects": len(projects),
+                "max_projects": self.max_projects,
+                "bytes": sum(e["bytes"] for e in entries),
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "entries": entries,
+            }
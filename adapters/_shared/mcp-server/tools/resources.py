@@ -0,0 +1,238 @@
+"""
+MCP resources for cognitive-core MCP server.
+
+Agents, skills and the effective config are exposed as MCP resources, so
+clients can read them with resources/read and subscribe to changes instead
+of polling cc_project_info and cc_agent_context:
+
+  cc://config          effective cognitive-core.conf values (JSON)
+  cc://agents/<name>   <install_dir>/agents/<name>.md
+  cc://skills/<name>   <install_dir>/skills/<name>/SKILL.md (or <name>.md)
+
+URIs are relative to the request's project (tools/projects.py).
+
+resources/subscribe registers the URI with ResourceWatcher. One thread
+watches the subscribed projects (their root, flat, for cognitive-core.conf
+and the install dir recursively) with inotify, or, where inotify is not
+available, re-checks every POLL_INTERVAL seconds. After a change it compares
+each subscribed resource's fingerprint (sha256 of the file, or of the parsed
+config) with the last one sent, and pushes notifications/resources/updated
+only when it differs: saving a file unchanged, touching it, or editing a
+comment in cognitive-core.conf notifies nobody.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from tools.lint_watch import POLL_INTERVAL, Inotify
+from tools.utils import find_config, load_config
+
+CONFIG_URI = "cc://config"
+AGENT_PREFIX = "cc://agents/"
+SKILL_PREFIX = "cc://skills/"
+# Quiet time after the last event before fingerprints are compared (bursts of
+# writes from one save notify once)
+SETTLE_S = 0.1
+
+
+def frontmatter(text: str) -> dict:
+    """Top-level `key: value` pairs of a document's leading --- block."""
+    if not text.startswith("---"):
+        return {}
+    fields = {}
+    for line in text.splitlines()[1:]:
+        if line.strip() == "---":
+            break
+        key, sep, value = line.partition(":")
+        if sep and key and not key[0].isspace():
+            fields[key.strip()] = value.strip().strip("\"'")
+    return fields
+
+
+def resource_path(project, uri: str) -> str | None:
+    """File behind an agent or skill URI (None if unknown or missing)."""
+    for prefix, subdir in ((AGENT_PREFIX, "agents"), (SKILL_PREFIX, "skills")):
+        if not uri.startswith(prefix):
+            continue
+        name = uri[len(prefix):]
+        if not name or "/" in name or name.startswith("."):
+            return None
+        base = os.path.join(project.install_dir, subdir)
+        candidates = (
+            [os.path.join(base, f"{name}.md"), os.path.join(base, name)] if subdir == "agents"
+            else [os.path.join(base, name, "SKILL.md"), os.path.join(base, f"{name}.md")]
+        )
+        return next((path for path in candidates if os.path.isfile(path)), None)
+    return None
+
+
+def list_resources(project) -> list:
+    """MCP resource descriptors for the project's config, agents and skills."""
+    resources = [{
+        "uri": CONFIG_URI,
+        "name": "cognitive-core.conf",
+        "description": "Effective cognitive-core configuration (CC_* values)",
+        "mimeType": "application/json",
+    }]
+    for subdir, prefix in (("agents", AGENT_PREFIX), ("skills", SKILL_PREFIX)):
+        for entry in project.listing(subdir):
+            name = entry[:-3] if entry.endswith(".md") else entry
+            uri = prefix + name
+            path = resource_path(project, uri)
+            if path is None:
+                continue
+            try:
+                description = frontmatter(project.doc(path)).get("description", "")
+            except (OSError, UnicodeDecodeError):
+                continue
+            resources.append({"uri": uri, "name": name, "description": description, "mimeType": "text/markdown"})
+    return resources
+
+
+def read_resource(project, uri: str, config_loader=load_config) -> dict:
+    """
+    resources/read result for a URI.
+
+    Raises:
+        KeyError: Unknown URI, or the document no longer exists.
+        OSError: The document could not be read.
+    """
+    if uri == CONFIG_URI:
+        text = json.dumps(config_loader(project.root), indent=2, sort_keys=True)
+        return {"contents": [{"uri": uri, "mimeType": "application/json", "text": text}]}
+    path = resource_path(project, uri)
+    if path is None:
+        raise KeyError(uri)
+    return {"contents": [{"uri": uri, "mimeType": "text/markdown", "text": project.doc(path)}]}
+
+
+class ResourceWatcher:
+    """
+    Resource subscriptions and the watch thread that serves them.
+
+    Args:
+        load_config: Callable(project_dir) returning CC_* values (cached).
+    """
+
+    def __init__(self, load_config=load_config):
+        self.load_config = load_config
+        self.backend = None
+        self.events = 0
+        self.checks = 0
+        self.notified = 0
+        # (client key, project root, uri) -> [client, project, uri, fingerprint]
+        self._subs: dict = {}
+        self._watched: set = set()
+        self._source = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def _fingerprint(self, project, uri: str) -> str | None:
+        if uri == CONFIG_URI:
+            if not find_config(project.root):
+                return None
+            data = json.dumps(self.load_config(project.root), sort_keys=True).encode("utf-8")
+        else:
+            path = resource_path(project, uri)
+            if path is None:
+                return None
+            try:
+                with open(path, "rb") as fh:
+                    data = fh.read()
+            except OSError:
+                return None
+        return hashlib.sha256(data).hexdigest()
+
+    def subscribe(self, client, project, uri: str) -> None:
+        fingerprint = self._fingerprint(project, uri)
+        with self._lock:
+            self._subs[(client.key, project.root, uri)] = [client, project, uri, fingerprint]
+            if self._thread is None:
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="resource-watch", daemon=True)
+                self._thread.start()
+
+    def unsubscribe(self, client, project, uri: str) -> None:
+        with self._lock:
+            self._subs.pop((client.key, project.root, uri), None)
+
+    def forget_client(self, key) -> None:
+        """Drop every subscription of a client that went away."""
+        with self._lock:
+            for sub in [sub for sub in self._subs if sub[0] == key]:
+                del self._subs[sub]
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _watch_projects(self) -> None:
+        """Add watches for newly subscribed projects (and install dirs created since)."""
+        with self._lock:
+            projects = {sub[1].root: sub[1] for sub in self._subs.values()}
+        for root, project in projects.items():
+            for path, recursive in ((root, False), (project.install_dir, True)):
+                if path in self._watched or not os.path.isdir(path):
+                    continue
+                self._source.add(path, recursive)
+                self._watched.add(path)
+
+    def _run(self) -> None:
+        try:
+            self._source = Inotify([])
+            self.backend = "inotify"
+        except (OSError, AttributeError):
+            self.backend = "poll"
+        while not self._stopped.is_set():
+            if self.backend == "inotify":
+                try:
+                    self._watch_projects()
+                    paths = self._source.read(0.5)
+                    while paths:
+                        self.events += len(paths)
+                        paths = self._source.read(SETTLE_S)
+                        if not paths:
+                            self._check()
+                except OSError:
+                    # Out of inotify watches (or similar): carry on by polling
+                    self._source.close()
+                    self._source = None
+                    self.backend = "poll"
+                    self._check()
+            else:
+                self._stopped.wait(POLL_INTERVAL)
+                self._check()
+        if self._source is not None:
+            self._source.close()
+
+    def _check(self) -> None:
+        """Notify subscribers whose resource's fingerprint changed."""
+        self.checks += 1
+        with self._lock:
+            subs = list(self._subs.values())
+        for sub in subs:
+            client, project, uri, last = sub
+            fingerprint = self._fingerprint(project, uri)
+            if fingerprint == last:
+                continue
+            sub[3] = fingerprint
+            try:
+                client.send({
+                    "jsonrpc": "2.0",
+                    "method": "notifications/resources/updated",
+                    "params": {"uri": uri},
+                })
+            except (OSError, ValueError):
+                continue
+            self.notified += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "subscriptions": len(self._subs),
+                "events": self.events,
+                "checks": self.checks,
+                "notified": self.notified,
+            }
@@ -0,0 +1,114 @@
+"""
+Incremental test output digest for cognitive-core MCP server.
+
+cc_lint_check feeds a test command's output through RunReport as it streams,
+so progress notifications can carry live pass/fail counters and the final
+tool result can be a compact summary rather than the whole log.
+
+Counters come from two kinds of lines, after ANSI colour codes are removed:
+  per-test markers   pytest -v, go test -v, cargo test, TAP, jest, and the
+                     PASS/FAIL lines of cognitive-core's own bash suites
+  summary lines      pytest's "== 3 passed, 1 failed in 2s ==", jest's
+                     "Tests:", cargo's "test result:", mocha's "N passing",
+                     the bash suites' "Results:"
+Summary totals are summed (one per test binary/suite) and win over marker
+counts once any has been seen; markers alone keep counters moving before the
+runner prints its summary.
+"""
+import collections
+import re
+
+_ANSI = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+
+# line -> outcome for runners that print one line per test
+_MARKERS = [
+    (re.compile(r"::\S+ (PASSED|FAILED|SKIPPED|ERROR|XFAIL|XPASS)\b"), {
+        "PASSED": "passed", "XPASS": "passed", "FAILED": "failed",
+        "SKIPPED": "skipped", "XFAIL": "skipped", "ERROR": "errors",
+    }),
+    (re.compile(r"^\s*--- (PASS|FAIL|SKIP):"), {"PASS": "passed", "FAIL": "failed", "SKIP": "skipped"}),
+    (re.compile(r"^test \S+ \.\.\. (ok|FAILED|ignored)$"), {"ok": "passed", "FAILED": "failed", "ignored": "skipped"}),
+    (re.compile(r"^(ok|not ok) \d+\b"), {"ok": "passed", "not ok": "failed"}),
+    (re.compile(r"^\s*(PASS|FAIL|SKIP)\s"), {"PASS": "passed", "FAIL": "failed", "SKIP": "skipped"}),
+    (re.compile(r"^\s*(✓|✕|○)\s"), {"✓": "passed", "✕": "failed", "○": "skipped"}),
+]
+
+# Lines that report totals for a whole run (or one test binary/suite)
+_SUMMARY = re.compile(
+    r"^=+ .*\d+ (passed|failed|error).* in [\d.]+s"
+    r"|^Tests:\s"
+    r"|^test result: "
+    r"|^Results: \d+ passed"
+    r"|^\s+\d+ (passing|failing|pending)\b"
+)
+_COUNT = re.compile(r"(\d+) (passed|passing|xpassed|failed|failing|skipped|ignored|pending|xfailed|errors?)\b")
+_COUNT_KEY = {
+    "passed": "passed", "passing": "passed", "xpassed": "passed",
+    "failed": "failed", "failing": "failed",
+    "skipped": "skipped", "ignored": "skipped", "pending": "skipped", "xfailed": "skipped",
+    "error": "errors", "errors": "errors",
+}
+
+TAIL_LINES = 40
+MAX_FAILURES = 20
+
+
+class RunReport:
+    """Running digest of a command's output: counters, failures and tail."""
+
+    def __init__(self, tail_lines: int = TAIL_LINES):
+        self.lines = 0
+        self.bytes = 0
+        self._partial = ""
+        self._marked = dict.fromkeys(("passed", "failed", "skipped", "errors"), 0)
+        self._reported = dict(self._marked)
+        self._summaries = 0
+        self.failures: list = []
+        self.tail: collections.deque = collections.deque(maxlen=tail_lines)
+
+    def feed(self, text: str) -> None:
+        """Add a chunk of output (any split; partial lines are held back)."""
+        self.bytes += len(text.encode("utf-8", errors="replace"))
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self._line(line)
+
+    def close(self) -> None:
+        """Flush a trailing line without a newline."""
+        if self._partial:
+            self._line(self._partial)
+            self._partial = ""
+
+    def _line(self, raw: str) -> None:
+        line = _ANSI.sub("", raw).rstrip("\r")
+        self.lines += 1
+        self.tail.append(line)
+        if _SUMMARY.search(line):
+            self._summaries += 1
+            for count, word in _COUNT.findall(line):
+                self._reported[_COUNT_KEY[word]] += int(count)
+            return
+        for rx, outcomes in _MARKERS:
+            match = rx.search(line)
+            if match:
+                outcome = outcomes[match.group(1)]
+                self._marked[outcome] += 1
+                if outcome in ("failed", "errors") and len(self.failures) < MAX_FAILURES:
+                    self.failures.append(line.strip())
+                return
+
+    def counters(self) -> dict:
+        """passed/failed/skipped/errors so far."""
+        return dict(self._reported if self._summaries else self._marked)
+
+    def summary(self) -> dict:
+        """Compact result: counters, first failures and the last lines."""
+        self.close()
+        return {
+            "counters": self.counters(),
+            "output_lines": self.lines,
+            "output_bytes": self.bytes,
+            "failures": list(self.failures),
+            "tail": "\n".join(self.tail),
+        }
@@ -1,112 +1,1465 @@
 """
 Security validation for bash commands.
 
-Ports the safety patterns from cognitive-core's validate-bash.sh hook to Python.
-Returns allow/deny decisions matching the hook protocol.
+Native implementation of cognitive-core's validate-bash.sh hook. One engine
+backs both the cc_security_validate MCP tool and the hook host's in-process
+validate-bash handler, and returns the decision the shell hook would return.
+
+The hook runs every check as `echo "$x" | grep -qE '<ERE>'`. This module
+keeps the hook's patterns verbatim as POSIX ERE and reproduces those
+semantics:
+  - patterns match line by line, so no match spans a newline
+  - quote stripping and `bash -c` / `eval` unwrapping happen exactly as the
+    hook's `tr` and `sed` pipelines do them
+  - [[:space:]] follows the locale: ASCII under C/POSIX, with glibc's Unicode
+    spaces under UTF-8. Matching is byte-wise under C/POSIX.
+  - `echo "$x"` prints nothing when x is only -n/-e/-E flags
+
+A CC_BLOCKED_PATTERNS entry that falls outside the translated ERE subset is
+matched with grep itself, so even exotic patterns keep the hook's semantics.
+
+tests/suites/27-validate-bash-parity.sh checks that this module and the hook
+reach identical decisions on a generated corpus. PARITY_HOOK_SHA256 pins the
+hook revision this module mirrors.
 """
+import collections
+import functools
+import hashlib
+import json
+import os
 import re
+import subprocess
+import threading
+import time
 
+# sha256 of core/hooks/validate-bash.sh that this engine reproduces. The hook
+# host only runs the native engine when the installed hook still matches.
+PARITY_HOOK_SHA256 = "015fd3da09f4fa5c3ceea901321c81f7a4f37a7ee61838736aab6c654e39489a"
 
-# Built-in safety patterns (always active)
+# Built-in safety patterns (always active), verbatim from validate-bash.sh
+# in evaluation order: (name, ERE, reason). {main_branch} is substituted.
 BUILTIN_PATTERNS = [
-    # rm targeting system-critical paths
     (
-        r'rm\s+(-[a-z]*f[a-z]*\s+)?(/|/etc|/usr|/var|/home|/System|/Library)(\s|$)',
-        "rm targeting system-critical path",
+        "rm-system-path",
+        r"""rm[[:space:]]+(-[a-z]*f[a-z]*[[:space:]]+)?(/|/etc|/usr|/var|/home|/System|/Library)([[:space:]]|$|["'])""",
+        "Blocked: rm targeting system-critical path",
+    ),
+    (
+        "force-push-main",
+        r"git[[:space:]]+push[[:space:]]+.*--force.*[[:space:]]+(master|main)([[:space:]]|$)"
+        r"|git[[:space:]]+push[[:space:]]+.*-f[[:space:]]+.*(master|main)([[:space:]]|$)",
+        "Blocked: force push to {main_branch}",
+    ),
+    (
+        "git-reset-hard",
+        r"git[[:space:]]+reset[[:space:]]+--hard",
+        "Blocked: git reset --hard (destructive, may lose work)",
     ),
-    # git push --force to main/master
     (
-        r'git\s+push\s+.*--force.*\s+(master|main)(\s|$)|'
-        r'git\s+push\s+.*-f\s+.*(master|main)(\s|$)',
-        "force push to main/master",
+        "drop-table",
+        r"(drop|truncate)[[:space:]]+table",
+        "Blocked: DROP/TRUNCATE TABLE (destructive database operation)",
     ),
-    # git reset --hard
-    (r'git\s+reset\s+--hard', "git reset --hard (destructive, may lose work)"),
-    # DROP TABLE / TRUNCATE TABLE
-    (r'(drop|truncate)\s+table', "DROP/TRUNCATE TABLE (destructive database operation)"),
-    # DELETE FROM without WHERE
     (
-        r'delete\s+from\s+[a-zA-Z0-9_]+\s*$|delete\s+from\s+[a-zA-Z0-9_]+\s*;',
-        "DELETE FROM without WHERE clause",
+        "delete-without-where",
+        r"delete[[:space:]]+from[[:space:]]+[a-zA-Z0-9_]+[[:space:]]*$"
+        r"|delete[[:space:]]+from[[:space:]]+[a-zA-Z0-9_]+[[:space:]]*;",
+        "Blocked: DELETE FROM without WHERE clause (would delete all rows). "
+        "Add a WHERE clause to limit scope",
+    ),
+    (
+        "rm-git-dir",
+        r"rm[[:space:]]+(-[a-z]*[[:space:]]+)?\.git([[:space:]]|$|/)",
+        "Blocked: removing .git directory",
+    ),
+    (
+        "chmod-777",
+        r"chmod[[:space:]]+777",
+        "Blocked: chmod 777 (world-writable is insecure). "
+        "Use 755 for directories, 644 for files, or 700 for private",
     ),
-    # rm .git
-    (r'rm\s+(-[a-z]*\s+)?\.git(\s|$|/)', "removing .git directory"),
-    # chmod 777
-    (r'chmod\s+777', "chmod 777 (insecure permissions)"),
-    # git clean -f (without dry-run)
-    # Note: checked separately due to negative lookahead logic
 ]
 
+# git clean -f is denied unless a dry-run flag appears (two separate greps)
+GIT_CLEAN_FORCE = r"git[[:space:]]+clean[[:space:]]+-[a-z]*f"
+GIT_CLEAN_DRY_RUN = r"git[[:space:]]+clean[[:space:]]+-[a-z]*n"
+GIT_CLEAN_REASON = (
+    "Blocked: git clean -f (removes untracked files). "
+    "Use 'git clean -n' to preview first, then 'git clean -fd' if confirmed"
+)
+
 # Standard level patterns (exfiltration, encoded commands, pipe-to-shell)
 STANDARD_PATTERNS = [
-    # Exfiltration
-    (r'curl\s+.*-d\s+.*@', "potential data exfiltration (curl -d @file)"),
-    (r'cat\s+.*\|.*curl', "potential data exfiltration (cat | curl)"),
-    (r'cat\s+.*\|.*(\s|^)nc(\s|$)', "potential data exfiltration (cat | nc)"),
-    (r'(^|\s)env\s*\|', "environment variable leak (env |)"),
-    # Encoded command bypass
-    (r'base64.*-d.*\|.*(ba)?sh', "encoded command execution (base64 -d | sh)"),
-    (r'echo\s+.*\|.*base64.*-d', "encoded command execution (echo | base64 -d)"),
-    (r'(^|\s)eval\s+.*\$\(', "eval with command substitution"),
-    # Pipe-to-shell
-    (r'curl\s+.*\|.*(ba)?sh', "pipe-to-shell (curl | sh) — supply chain risk"),
-    (r'wget\s+.*\|.*(ba)?sh', "pipe-to-shell (wget | sh) — supply chain risk"),
-    (r'wget\s+.*-O-\s*\|', "pipe-to-shell (wget -O- |) — supply chain risk"),
+    ("curl-data-file", r"curl[[:space:]]+.*-d[[:space:]]+.*@",
+     "Blocked: potential data exfiltration (curl -d @file)"),
+    ("cat-to-curl", r"cat[[:space:]]+.*\|.*curl",
+     "Blocked: potential data exfiltration (cat | curl)"),
+    ("cat-to-nc", r"cat[[:space:]]+.*\|.*([[:space:]]|^)nc([[:space:]]|$)",
+     "Blocked: potential data exfiltration (cat | nc)"),
+    ("env-pipe", r"(^|[[:space:]])env[[:space:]]*\|",
+     "Blocked: environment variable leak (env |)"),
+    ("base64-to-shell", r"base64.*-d.*\|.*(ba)?sh",
+     "Blocked: encoded command execution (base64 -d | sh)"),
+    ("echo-to-base64", r"echo[[:space:]]+.*\|.*base64.*-d",
+     "Blocked: encoded command execution (echo | base64 -d)"),
+    ("eval-substitution", r"(^|[[:space:]])eval[[:space:]]+.*\$\(",
+     "Blocked: eval with command substitution"),
+    ("curl-to-shell", r"curl[[:space:]]+.*\|.*(ba)?sh",
+     "Blocked: pipe-to-shell (curl | sh) — supply chain risk"),
+    ("wget-to-shell", r"wget[[:space:]]+.*\|.*(ba)?sh",
+     "Blocked: pipe-to-shell (wget | sh) — supply chain risk"),
+    ("wget-stdout-pipe", r"wget[[:space:]]+.*-O-[[:space:]]*\|",
+     "Blocked: pipe-to-shell (wget -O- |) — supply chain risk"),
 ]
 
+# Checks with no reason of their own (guards, extraction, unwrapping)
+_HELPER_PATTERNS = {
+    "interpreter": (
+        r"(^|[;&|])[[:space:]]*(bash|sh|zsh|dash|python[23]?|perl|ruby)[[:space:]]+-c[[:space:]]*$"
+        r"|(^|[;&|])[[:space:]]*eval[[:space:]]*$"
+    ),
+    "git-commit": r"git[[:space:]]+commit",
+    "git-commit-message": r"git[[:space:]]+commit.*-m",
+    "allowed-commit-type": r"(chore|docs|revert|ci|build|style)[[:space:]]*(\(|:)",
+    "gh-issue-close": r"gh[[:space:]]+issue[[:space:]]+close",
+    "gh-api": r"gh[[:space:]]+api[[:space:]]",
+    "gh-api-close": r"state[^a-z]*closed|closeissue",
+    "push-shared": r"git[[:space:]]+push[[:space:]]+(origin[[:space:]]+)?(develop|master|main)([[:space:]]|$)",
+    "shared-branch-name": r"(develop|master|main)",
+    "git-merge": r"git[[:space:]]+merge",
+    "jira-transition": r"curl.*atlassian\.net.*/transitions",
+    "jira-ticket": r"[A-Z]+-[0-9]+",
+    "curl-body-single": r"(-d|--data|--data-raw|--data-binary)[[:space:]]+'[^']*'",
+    "curl-body-double": r'(-d|--data|--data-raw|--data-binary)[[:space:]]+"[^"]*"',
+    "transition-id": r'"id"[[:space:]]*:[[:space:]]*"[0-9]+"',
+    "digits": r"[0-9]+",
+    "cd-prefix": r"^[[:space:]]*cd[[:space:]]+",
+}
+
+# The hook runs these two with grep -i
+_CASE_INSENSITIVE = {"drop-table", "delete-without-where"}
+
+# Characters glibc's iswspace() adds to [[:space:]] in UTF-8 locales
+_UNICODE_SPACES = "\u1680\u2000-\u2006\u2008-\u200a\u2028\u2029\u205f\u3000"
+_UNICODE_BLANKS = "\u1680\u2000-\u2006\u2008-\u200a\u205f\u3000"
+
+# POSIX bracket classes in the C locale
+_POSIX_CLASSES = {
+    "space": r" \t\n\r\f\v",
+    "blank": r" \t",
+    "digit": r"0-9",
+    "xdigit": r"0-9A-Fa-f",
+    "upper": r"A-Z",
+    "lower": r"a-z",
+    "alpha": r"a-zA-Z",
+    "alnum": r"a-zA-Z0-9",
+    "punct": r"!-/:-@\[-`{-~",
+    "cntrl": r"\x00-\x1f\x7f",
+    "print": r"\x20-\x7e",
+    "graph": r"\x21-\x7e",
+}
+# Classes whose UTF-8 meaning is known exactly; others defer to grep
+_UTF8_CLASSES = {
+    "space": _POSIX_CLASSES["space"] + _UNICODE_SPACES,
+    "blank": _POSIX_CLASSES["blank"] + _UNICODE_BLANKS,
+    "digit": _POSIX_CLASSES["digit"],
+    "xdigit": _POSIX_CLASSES["xdigit"],
+}
+
+_INTERVAL = re.compile(r"\{(\d{1,3})(,(\d{0,3}))?\}|\{,(\d{1,3})\}")
+_ECHO_FLAGS = re.compile(r"-[neE]+")
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+_CLASS_SPECIAL = set("\\]^-[&|~")
+_GREP_TIMEOUT = 10
+_TICKET_ANCHOR = re.compile(r"[A-Z]-[0-9]")
+_DIGITS = re.compile(r"[0-9]*")
+
+# Validation budgets (CC_VALIDATE_MAX_BYTES, CC_VALIDATE_TIMEOUT_MS); a
+# command over either one is denied
+DEFAULT_MAX_BYTES = 1048576
+DEFAULT_TIMEOUT_MS = 3000
+# Longest line a blocked pattern outside the linear matcher is run on
+_REGEX_LINE_LIMIT = 4096
+
+
+def _bracket_escape(ch: str) -> str:
+    return "\\" + ch if ch in _CLASS_SPECIAL else ch
+
+
+def _translate_bracket(pattern: str, start: int, utf8: bool) -> tuple:
+    """Translate the bracket expression at pattern[start]. Returns (end, regex|None)."""
+    n = len(pattern)
+    i = start + 1
+    negate = i < n and pattern[i] == "^"
+    if negate:
+        i += 1
+    items = []
+    first = True
+    while True:
+        if i >= n:
+            return n, None
+        ch = pattern[i]
+        if ch == "]" and not first:
+            i += 1
+            break
+        first = False
+        if ch == "[" and i + 1 < n and pattern[i + 1] in ":=.":
+            kind = pattern[i + 1]
+            end = pattern.find(kind + "]", i + 2)
+            if kind != ":" or end < 0:
+                return n, None
+            members = (_UTF8_CLASSES if utf8 else _POSIX_CLASSES).get(pattern[i + 2:end])
+            if members is None:
+                return n, None
+            items.append(members)
+            i = end + 2
+            continue
+        if i + 2 < n and pattern[i + 1] == "-" and pattern[i + 2] != "]":
+            low, high = ch, pattern[i + 2]
+            if high == "[" or ord(low) > ord(high):
+                return n, None
+            items.append(_bracket_escape(low) + "-" + _bracket_escape(high))
+            i += 3
+            continue
+        items.append(_bracket_escape(ch))
+        i += 1
+    return i, "[" + ("^" if negate else "") + "".join(items) + "]"
+
+
+def _tokenize_ere(pattern: str, utf8: bool) -> list | None:
+    """
+    Split an ERE into (kind, python_source) tokens, or None outside the subset.
+
+    Kinds: "char" (matches one character), "assert" (^, $, word boundaries),
+    "quant" (*, +, ?, {m,n}), "open", "close", "alt" and "backref".
+    """
+    tokens = []
+    i, n = 0, len(pattern)
+    repeatable = False  # previous token is an atom that may take */+/?/{}
+    while i < n:
+        ch = pattern[i]
+        if ch == "[":
+            i, cls = _translate_bracket(pattern, i, utf8)
+            if cls is None:
+                return None
+            tokens.append(("char", cls))
+            repeatable = True
+            continue
+        if ch == "\\":
+            if i + 1 >= n:
+                return None
+            nxt = pattern[i + 1]
+            if nxt in ".[]()*+?{}|^$\\":
+                tokens.append(("char", "\\" + nxt))
+                repeatable = True
+            elif nxt in "123456789":
+                tokens.append(("backref", "\\" + nxt))
+                repeatable = True
+            elif nxt in "sS":
+                space = (_UTF8_CLASSES if utf8 else _POSIX_CLASSES)["space"]
+                tokens.append(("char", "[" + ("^" if nxt == "S" else "") + space + "]"))
+                repeatable = True
+            elif not utf8 and nxt in "wW":
+                tokens.append(("char", "\\" + nxt))
+                repeatable = True
+            elif not utf8 and nxt in "bB<>":
+                tokens.append(("assert", {"b": r"\b", "B": r"\B", "<": r"\b(?=\w)", ">": r"\b(?<=\w)"}[nxt]))
+                repeatable = False
+            else:
+                return None
+            i += 2
+            continue
+        if ch in "*+?":
+            if not repeatable:
+                return None
+            tokens.append(("quant", ch))
+            repeatable = False
+            i += 1
+            continue
+        if ch == "{":
+            m = _INTERVAL.match(pattern, i)
+            if m is None or not repeatable:
+                return None
+            if m.group(3) and int(m.group(1)) > int(m.group(3)):
+                return None
+            tokens.append(("quant", m.group(0)))
+            repeatable = False
+            i = m.end()
+            continue
+        if ch in "^$":
+            tokens.append(("assert", ch))
+            repeatable = False
+        elif ch in "(|":
+            tokens.append(("open" if ch == "(" else "alt", ch))
+            repeatable = False
+        elif ch == ")":
+            tokens.append(("close", ch))
+            repeatable = True
+        elif ch == ".":
+            tokens.append(("char", "."))
+            repeatable = True
+        else:
+            tokens.append(("char", re.escape(ch)))
+            repeatable = True
+        i += 1
+    try:
+        re.compile("".join(source for _kind, source in tokens))
+    except re.error:
+        return None
+    return tokens
+
+
+def translate_ere(pattern: str, utf8: bool = False) -> str | None:
+    """
+    Translate a POSIX ERE (GNU grep -E dialect) to an equivalent Python regex.
+
+    Only constructs whose match semantics are identical in both engines are
+    translated; anything else returns None so the caller can defer to grep.
+
+    Args:
+        pattern: ERE as written in validate-bash.sh or CC_BLOCKED_PATTERNS.
+        utf8: Translate for a UTF-8 locale instead of C/POSIX.
+
+    Returns:
+        Python regex source, or None if the pattern is outside the subset.
+    """
+    tokens = _tokenize_ere(pattern, utf8)
+    if tokens is None:
+        return None
+    return "".join(source for _kind, source in tokens)
+
+
+# ---- Linear-time matcher ----
+# Python's backtracking engine is quadratic or worse on patterns such as
+# `base64.*-d.*\|.*(ba)?sh` over long lines, where grep's DFA is linear.
+# _Automaton compiles the same token stream into a Thompson NFA and runs it
+# as a lazily built DFA: one cached transition per character, so matching
+# time is bounded by line length whatever the input looks like.
+
+_NFA_LIMIT = 20000  # NFA nodes per pattern (large {m,n} intervals)
+_DFA_LIMIT = 5000  # cached DFA states before the cache is reset
+_BUDGET_CHECK = 8192  # characters between deadline checks
+_CHAR, _SPLIT, _ASSERT, _MATCH = range(4)
+_IS_WORD = re.compile(r"\w", re.ASCII).fullmatch
+
+
+class BudgetExceeded(Exception):
+    """Validation ran past its time budget; the caller fails closed."""
+
+
+def _parse_tokens(tokens: list) -> tuple | None:
+    """_tokenize_ere output as a tree, or None if it holds a backreference."""
+    pos = 0
+
+    def alternation():
+        nonlocal pos
+        branches = [sequence()]
+        while pos < len(tokens) and tokens[pos][0] == "alt":
+            pos += 1
+            branches.append(sequence())
+        return branches[0] if len(branches) == 1 else ("alt", branches)
+
+    def sequence():
+        nonlocal pos
+        items = []
+        while pos < len(tokens) and tokens[pos][0] not in ("alt", "close"):
+            kind, source = tokens[pos]
+            pos += 1
+            if kind == "backref":
+                raise ValueError(source)
+            if kind == "open":
+                node = alternation()
+                pos += 1  # the matching "close"; _tokenize_ere checked balance
+            else:
+                node = (kind, source)
+            if pos < len(tokens) and tokens[pos][0] == "quant":
+                node = ("rep", node, *_bounds(tokens[pos][1]))
+                pos += 1
+            items.append(node)
+        return ("cat", items)
+
+    try:
+        return alternation()
+    except ValueError:
+        return None
+
+
+def _bounds(quant: str) -> tuple:
+    """(min, max) repetitions of a quantifier; max None is unbounded."""
+    if quant in ("*", "+", "?"):
+        return {"*": (0, None), "+": (1, None), "?": (0, 1)}[quant]
+    low, comma, high = quant[1:-1].partition(",")
+    low = int(low or 0)
+    if not comma:
+        return low, low
+    return low, int(high) if high else None
+
+
+class _DState:
+    """One lazily built DFA state: unclosed NFA kernel plus line context."""
+
+    __slots__ = ("kernel", "bol", "prevword", "trans", "final")
+
+    def __init__(self, kernel: frozenset, bol: bool, prevword: bool):
+        self.kernel = kernel
+        self.bol = bol
+        self.prevword = prevword
+        self.trans = {}  # char -> (next state, rules accepted before it or None)
+        self.final = None
+
+
+class _Automaton:
+    """Several EREs compiled into one NFA, searched with a lazy DFA."""
+
+    def __init__(self, patterns: list, utf8: bool):
+        """
+        Args:
+            patterns: (name, ere, icase) tuples; every ere must compile (see
+                _automaton()).
+            utf8: Match for a UTF-8 locale instead of C/POSIX.
+        """
+        self.nodes = []  # [op, arg, out1, out2]
+        self.preds = []
+        pred_index = {}
+        self.word = False
+        flags = 0 if utf8 else re.ASCII
+        starts = []
+        for name, ere, icase in patterns:
+            tree = _parse_tokens(_tokenize_ere(ere, utf8))
+            self._limit = len(self.nodes) + _NFA_LIMIT
+            match = self._add(_MATCH, name)
+            starts.append(self._build(tree, match, flags | (re.IGNORECASE if icase else 0), pred_index))
+        self._limit = len(self.nodes) + len(starts) + 1
+        start = starts[-1] if starts else self._add(_SPLIT, None)
+        for other in reversed(starts[:-1]):
+            start = self._add(_SPLIT, None, other, start)
+        self.start = start
+        self.names = frozenset(name for name, _ere, _icase in patterns)
+        self.states = {}
+        # Automata are shared by the server's worker threads: new states and
+        # the cache reset happen under the lock; cached transitions are read
+        # without it (a state cut loose by a reset still steps correctly)
+        self._lock = threading.Lock()
+        self.initial = self._state(frozenset((start,)), True, False)
+
+    def _add(self, op: int, arg, out1=None, out2=None) -> int:
+        if len(self.nodes) >= self._limit:
+            raise OverflowError("pattern too large")
+        self.nodes.append([op, arg, out1, out2])
+        return len(self.nodes) - 1
+
+    def _build(self, tree: tuple, nxt: int, flags: int, pred_index: dict) -> int:
+        """Add the NFA for tree in front of node nxt; returns its entry node."""
+        kind = tree[0]
+        if kind == "char":
+            key = (tree[1], flags)
+            if key not in pred_index:
+                pred_index[key] = len(self.preds)
+                self.preds.append(re.compile(tree[1], flags).fullmatch)
+            return self._add(_CHAR, pred_index[key], nxt)
+        if kind == "assert":
+            self.word = self.word or tree[1] not in ("^", "$")
+            return self._add(_ASSERT, tree[1], nxt)
+        if kind == "cat":
+            for item in reversed(tree[1]):
+                nxt = self._build(item, nxt, flags, pred_index)
+            return nxt
+        if kind == "alt":
+            entries = [self._build(branch, nxt, flags, pred_index) for branch in tree[1]]
+            entry = entries[-1]
+            for other in reversed(entries[:-1]):
+                entry = self._add(_SPLIT, None, other, entry)
+            return entry
+        _rep, body, low, high = tree
+        if high is None:
+            tail = self._add(_SPLIT, None, None, nxt)
+            self.nodes[tail][2] = self._build(body, tail, flags, pred_index)
+        else:
+            tail = nxt
+            for _ in range(high - low):
+                tail = self._add(_SPLIT, None, self._build(body, tail, flags, pred_index), tail)
+        for _ in range(low):
+            tail = self._build(body, tail, flags, pred_index)
+        return tail
+
+    def _state(self, kernel: frozenset, bol: bool, prevword: bool) -> _DState:
+        """The cached DFA state for a kernel and line context (lock held)."""
+        key = (kernel, bol, prevword)
+        state = self.states.get(key)
+        if state is None:
+            if len(self.states) >= _DFA_LIMIT:
+                for old in self.states.values():
+                    old.trans.clear()
+                self.states.clear()
+                self.states[(self.initial.kernel, True, False)] = self.initial
+            state = self.states[key] = _DState(kernel, bol, prevword)
+        return state
+
+    def _closure(self, state: _DState, eol: bool, nextword: bool) -> tuple:
+        """(CHAR nodes, accepted rule names) reachable from state's kernel."""
+        nodes = self.nodes
+        stack = list(state.kernel)
+        seen = set(stack)
+        chars, accepts = [], set()
+        while stack:
+            op, arg, out1, out2 = nodes[stack.pop()]
+            if op == _CHAR:
+                chars.append((arg, out1))
+                continue
+            if op == _MATCH:
+                accepts.add(arg)
+                continue
+            if op == _ASSERT:
+                if arg == "^":
+                    ok = state.bol
+                elif arg == "$":
+                    ok = eol
+                elif arg == r"\b":
+                    ok = state.prevword != nextword
+                elif arg == r"\B":
+                    ok = state.prevword == nextword
+                elif arg == r"\b(?=\w)":
+                    ok = nextword and not state.prevword
+                else:
+                    ok = state.prevword and not nextword
+                outs = (out1,) if ok else ()
+            else:
+                outs = (out1, out2)
+            for out in outs:
+                if out not in seen:
+                    seen.add(out)
+                    stack.append(out)
+        return chars, accepts
+
+    def _step(self, state: _DState, ch: str) -> tuple:
+        if ch == "\n":
+            # End of line: accept at $, then start the next line afresh
+            step = (self.initial, self._final(state) or None)
+            with self._lock:
+                state.trans[ch] = step
+            return step
+        nextword = self.word and _IS_WORD(ch) is not None
+        chars, accepts = self._closure(state, False, nextword)
+        preds = self.preds
+        kernel = frozenset([out for pred, out in chars if preds[pred](ch)] + [self.start])
+        with self._lock:
+            step = (self._state(kernel, False, nextword), frozenset(accepts) or None)
+            state.trans[ch] = step
+        return step
+
+    def _final(self, state: _DState) -> frozenset:
+        if state.final is None:
+            state.final = frozenset(self._closure(state, True, False)[1])
+        return state.final
+
+    def search(self, text: str, deadline: float | None = None) -> set:
+        """
+        Names of the patterns that match somewhere in a line of text.
+
+        Lines are separated by "\n", as grep reads them.
+
+        Raises:
+            BudgetExceeded: time.monotonic() passed deadline mid-text.
+        """
+        state = self.initial
+        hits = set()
+        step = self._step
+        for offset in range(0, len(text), _BUDGET_CHECK):
+            for ch in text[offset:offset + _BUDGET_CHECK]:
+                state, accepts = state.trans.get(ch) or step(state, ch)
+                if accepts is not None:
+                    hits |= accepts
+            if len(hits) == len(self.names):
+                return hits
+            if deadline is not None and time.monotonic() > deadline:
+                raise BudgetExceeded(f"matching stopped at offset {offset + _BUDGET_CHECK}")
+        return hits | self._final(state)
+
+
+def _automaton(patterns: list, utf8: bool) -> _Automaton | None:
+    """_Automaton for (name, ere, icase) patterns, or None if one cannot run in it."""
+    for _name, ere, _icase in patterns:
+        tokens = _tokenize_ere(ere, utf8)
+        if tokens is None or _parse_tokens(tokens) is None:
+            return None
+    try:
+        return _Automaton(patterns, utf8)
+    except OverflowError:
+        return None
+
+
+class _Scanner:
+    """Several EREs matched in one linear-time pass over each line."""
+
+    def __init__(self, patterns: list, utf8: bool):
+        self.automaton = _automaton(patterns, utf8)
+        if self.automaton is None:
+            raise ValueError("pattern outside the linear matcher subset")
+
+    def scan(self, text: str, deadline: float | None = None) -> set:
+        """Names of the patterns `echo "$text" | grep -qE` would match."""
+        output = _echo(text)
+        if not output:
+            return set()
+        return self.automaton.search(output[:-1] if output.endswith("\n") else output, deadline)
+
+
+# Policy-guard checks, run against the lowercased unstripped command
+_LOWER_CHECKS = (
+    "git-commit-message", "allowed-commit-type", "gh-issue-close", "gh-api",
+    "gh-api-close", "push-shared", "git-merge", "jira-transition",
+)
+
+
+class _RuleSet:
+    """Rule-independent helper patterns compiled for one locale mode."""
+
+    def __init__(self, utf8: bool):
+        self.utf8 = utf8
+        self.flags = 0 if utf8 else re.ASCII
+        # Extraction only (match text, not just a hit); each is linear in re
+        self.rx = {name: re.compile(translate_ere(ere, utf8), self.flags) for name, ere in _HELPER_PATTERNS.items()}
+        self.interpreter_scan = _Scanner([("interpreter", _HELPER_PATTERNS["interpreter"], False)], utf8)
+        self.lower_scan = _Scanner([(name, _HELPER_PATTERNS[name], False) for name in _LOWER_CHECKS], utf8)
+        space = (_UTF8_CLASSES if utf8 else _POSIX_CLASSES)["space"]
+        self.cd_arg_stop = re.compile("[" + space + ";&|]")
+
+
+_RULE_SETS: dict = {}
+
+
+def _rules(utf8: bool) -> _RuleSet:
+    if utf8 not in _RULE_SETS:
+        _RULE_SETS[utf8] = _RuleSet(utf8)
+    return _RULE_SETS[utf8]
+
+
+class CompiledRules:
+    """
+    Deny rules for one (locale, security level, CC_BLOCKED_PATTERNS) rule set.
+
+    Built-in, standard-level and blocked patterns share one _Scanner over the
+    checked command text. Blocked patterns the linear matcher cannot run
+    (backreferences, huge intervals) keep their own Python regex;
+    untranslatable ones run through grep.
+    """
+
+    def __init__(self, utf8: bool, security_level: str, blocked_patterns: tuple):
+        ordered = list(BUILTIN_PATTERNS) + [("git-clean-force", GIT_CLEAN_FORCE, GIT_CLEAN_REASON)]
+        if security_level != "minimal":
+            ordered += STANDARD_PATTERNS
+        self.deny_rules = [(name, reason) for name, _ere, reason in ordered]
+
+        patterns = [(name, ere, name in _CASE_INSENSITIVE) for name, ere, _ in ordered]
+        patterns.append(("git-clean-dry-run", GIT_CLEAN_DRY_RUN, False))
+        patterns.append(("git-commit", _HELPER_PATTERNS["git-commit"], False))
+
+        # (pattern, kind, target): kind "scan" (scanner name), "regex" or "grep"
+        self.blocked = []
+        for i, pattern in enumerate(blocked_patterns):
+            ere = pattern if utf8 else _byte_text(pattern)
+            source = None if pattern.startswith("-") else translate_ere(ere, utf8)
+            if source is None:
+                self.blocked.append((pattern, "grep", None))
+            elif _automaton([(pattern, ere, False)], utf8) is None:
+                self.blocked.append((pattern, "regex", re.compile(source, 0 if utf8 else re.ASCII)))
+            else:
+                self.blocked.append((pattern, "scan", f"blocked:{i}"))
+                patterns.append((f"blocked:{i}", ere, False))
+        self.check_scan = _Scanner(patterns, utf8)
+
+    def first_deny(self, hits: set) -> tuple:
+        """(rule, reason) of the first built-in/standard rule in hits, or ("", "")."""
+        for name, reason in self.deny_rules:
+            if name in hits and not (name == "git-clean-force" and "git-clean-dry-run" in hits):
+                return name, reason
+        return "", ""
+
+
+@functools.lru_cache(maxsize=32)
+def compile_rules(utf8: bool, security_level: str, blocked_patterns: tuple) -> CompiledRules:
+    """Compiled rule set, built once per (locale, level, patterns) and reused."""
+    return CompiledRules(utf8, security_level, blocked_patterns)
+
+
+def _utf8_locale(env) -> bool:
+    """True if the environment selects a UTF-8 LC_CTYPE."""
+    for var in ("LC_ALL", "LC_CTYPE", "LANG"):
+        value = env.get(var)
+        if value:
+            return "utf-8" in value.lower() or "utf8" in value.lower()
+    return False
+
+
+def _byte_text(text: str) -> str:
+    """Represent text's UTF-8 bytes one char per byte (C-locale matching)."""
+    return text.encode("utf-8", "surrogateescape").decode("latin-1")
+
+
+def _from_byte_text(text: str) -> str:
+    return text.encode("latin-1").decode("utf-8", "surrogateescape")
+
+
+def _echo(text: str) -> str:
+    """What bash's `echo "$text"` writes."""
+    if _ECHO_FLAGS.fullmatch(text):
+        return "" if "n" in text else "\n"
+    return text + "\n"
+
+
+def _lines(output: str) -> list:
+    """Lines grep reads from output."""
+    if not output:
+        return []
+    return output[:-1].split("\n") if output.endswith("\n") else output.split("\n")
+
+
+def _capture(output: str) -> str:
+    """$(...) strips trailing newlines."""
+    return output.rstrip("\n")
+
+
+def _grep(rx, text: str) -> bool:
+    """Emulate `echo "$text" | grep -q`."""
+    return any(rx.search(line) for line in _lines(_echo(text)))
+
+
+def _strip_heredoc_substitutions(line: str) -> str:
+    """
+    sed 's/"\$(cat <<[^)]*)"//g' without backtracking.
+
+    As a regex every failed start rescans up to the next ")", which is
+    quadratic on long lines. All starts before that ")" fail together, so the
+    scan resumes after it.
+    """
+    out = []
+    pos = 0
+    start = line.find('"$(cat <<')
+    while start >= 0:
+        close = line.find(")", start + 9)
+        if close < 0:
+            break
+        if line.startswith('"', close + 1):
+            out.append(line[pos:start])
+            pos = close + 2
+            start = line.find('"$(cat <<', pos)
+        else:
+            start = line.find('"$(cat <<', close + 1)
+    out.append(line[pos:])
+    return "".join(out)
+
+
+def _strip_quotes(line: str) -> str:
+    """The hook's quote-stripping sed, applied to one line."""
+    line = _strip_heredoc_substitutions(line)
+    line = re.sub(r'"[^"]*"', "", line)
+    return re.sub(r"'[^']*'", "", line)
+
+
+def _jira_ticket(text: str) -> str:
+    """
+    First `[A-Z]+-[0-9]+` in text (grep -oE | head -1), or "".
+
+    Searching for the pattern directly backtracks quadratically over long
+    runs of capitals; the leftmost match starts at the run that precedes the
+    first "X-9" and takes every digit after it.
+    """
+    anchor = _TICKET_ANCHOR.search(text)
+    if anchor is None:
+        return ""
+    start = anchor.start()
+    while start > 0 and "A" <= text[start - 1] <= "Z":
+        start -= 1
+    return text[start:anchor.end()] + _DIGITS.match(text, anchor.end()).group(0)
+
+
+def _grep_fallback(pattern: str, text: str, env) -> bool:
+    """Run `echo "$text" | grep -qE "$pattern"` for real."""
+    try:
+        result = subprocess.run(
+            ["grep", "-qE", pattern],
+            input=_echo(text).encode("utf-8", "surrogateescape"),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            timeout=_GREP_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+
+def _git_stdout(args: list, cwd: str, env) -> str:
+    """Captured stdout of `git <args> 2>/dev/null`, whatever the exit code."""
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=_GREP_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+    return _capture(result.stdout.decode("utf-8", "surrogateescape"))
+
+
+def _target_dir(rules: _RuleSet, command: str, cwd: str) -> str:
+    """_cc_target_dir_from_cmd: directory of a leading `cd <path>`, or ""."""
+    first_line = command.split("\n", 1)[0]
+    prefix = rules.rx["cd-prefix"].match(first_line)
+    if prefix is None:
+        return ""
+    start = prefix.end()
+    # grep -o reports the longest alternative: "…", '…' or an unquoted word
+    candidates = []
+    for quote in "\"'":
+        if first_line.startswith(quote, start):
+            close = first_line.find(quote, start + 1)
+            if close > start + 1:
+                candidates.append(close + 1)
+    stop = rules.cd_arg_stop.search(first_line, start)
+    word_end = stop.start() if stop else len(first_line)
+    if word_end > start:
+        candidates.append(word_end)
+    if not candidates:
+        return ""
+    raw = first_line[start:max(candidates)]
+    for quote in "\"'":
+        if len(raw) >= 2 and raw[0] == quote and raw[-1] == quote:
+            raw = raw[1:-1]
+    if not rules.utf8:
+        raw = _from_byte_text(raw)
+    if raw and os.path.isdir(os.path.join(cwd, raw)):
+        return raw
+    return ""
+
+
+def _branch(rules: _RuleSet, command: str, cwd: str, env, trace: dict) -> str:
+    """_cc_branch_from_cmd: current branch, honoring a leading `cd <dir>`."""
+    trace["volatile"] = True  # the decision now depends on the working tree
+    target = _target_dir(rules, command, cwd)
+    if target:
+        branch = _git_stdout(["-C", target, "rev-parse", "--abbrev-ref", "HEAD"], cwd, env)
+        if branch:
+            return branch
+    return _git_stdout(["rev-parse", "--abbrev-ref", "HEAD"], cwd, env)
+
+
+def split_patterns(value: str) -> list:
+    """Split CC_BLOCKED_PATTERNS the way `for p in $CC_BLOCKED_PATTERNS` does."""
+    return [p for p in re.split(r"[ \t\n]+", value or "") if p]
+
+
+def _decision(reason: str, rule: str, category: str = "security",
+              retryable: bool = False, suggestion: str = "", log=None) -> dict:
+    return {
+        "decision": "deny",
+        "reason": reason,
+        "rule": rule,
+        "category": category,
+        "retryable": retryable,
+        "suggestion": suggestion,
+        "log": log or [],
+    }
+
+
+def _budget(config, key: str, default: int) -> int:
+    """Positive integer budget from config, or default."""
+    value = str(config.get(key) or "").strip()
+    return int(value) if value.isdigit() and int(value) > 0 else default
+
+
+def evaluate(command: str, config=None, cwd: str | None = None, env=None) -> dict:
+    """
+    Decide a command exactly as validate-bash.sh would.
+
+    Matching runs in time linear in the command length. Commands larger than
+    CC_VALIDATE_MAX_BYTES, or that take longer than CC_VALIDATE_TIMEOUT_MS
+    to decide, are denied (rule "validation-budget") instead.
+
+    Args:
+        command: The bash command (hook's $CMD).
+        config: CC_* settings (conf merged over the environment).
+        cwd: Directory the command would run in (branch lookups).
+        env: Environment for locale detection and git/grep subprocesses.
+
+    Returns:
+        dict with decision ("allow"/"deny"), reason, rule, category,
+        retryable, suggestion, log — (level, event, detail) entries the
+        hook would write to security.log — and volatile: True if the
+        decision read the current git branch or ran out of time, so the
+        same command may be decided differently later.
+    """
+    config = config or {}
+    env = env if env is not None else os.environ
+    cwd = cwd or os.getcwd()
+    if not command:
+        return {"decision": "allow", "reason": "Empty command", "rule": "", "log": [], "volatile": False}
+
+    max_bytes = _budget(config, "CC_VALIDATE_MAX_BYTES", DEFAULT_MAX_BYTES)
+    timeout_ms = _budget(config, "CC_VALIDATE_TIMEOUT_MS", DEFAULT_TIMEOUT_MS)
+    size = len(command.encode("utf-8", "surrogatepass"))
+    trace = {"volatile": False}
+    if size > max_bytes:
+        reason = f"Blocked: command is {size} bytes, over the {max_bytes}-byte validation limit"
+    else:
+        try:
+            result = _evaluate(command, config, cwd, env, time.monotonic() + timeout_ms / 1000, trace)
+            result["volatile"] = trace["volatile"]
+            return result
+        except BudgetExceeded:
+            reason = f"Blocked: command could not be validated within {timeout_ms} ms"
+            trace["volatile"] = True
+    result = _decision(
+        reason, "validation-budget", "security", True,
+        "Split the command, or write long scripts to a file and run the file",
+        [("DENY", "bash-blocked", f"{reason} | cmd={command[:200]}")],
+    )
+    result["volatile"] = trace["volatile"]
+    return result
+
+
+def _evaluate(command: str, config, cwd: str, env, deadline: float, trace: dict) -> dict:
+    """evaluate() for a non-empty command, raising BudgetExceeded past deadline."""
+    log = []
+    rules = _rules(_utf8_locale(env))
+    rx = rules.rx
+    cmd = command if rules.utf8 else _byte_text(command)
+    main_branch = config.get("CC_MAIN_BRANCH") or "main"
+
+    # Lowercase, then strip quoted strings so commit messages and echo
+    # content do not trip the patterns
+    cmd_lower = _capture(_echo(cmd).translate(_ASCII_LOWER))
+    cmd_stripped = _capture("".join(_strip_quotes(line) + "\n" for line in _lines(_echo(cmd_lower))))
+
+    # Interpreter wrapping (bash -c "...", eval "..."): the payload was inside
+    # the stripped quotes, so check the unstripped text instead
+    check = cmd_lower if rules.interpreter_scan.scan(cmd_stripped, deadline) else cmd_stripped
+
+    # --- Built-in safety patterns (always active), then level-gated ones ---
+    # One scan of the checked text covers every deny rule and blocked pattern;
+    # the first rule in hook order wins
+    level = config.get("CC_SECURITY_LEVEL") or "standard"
+    compiled = compile_rules(rules.utf8, level, tuple(split_patterns(config.get("CC_BLOCKED_PATTERNS", ""))))
+    hits = compiled.check_scan.scan(check, deadline)
+    rule, reason = compiled.first_deny(hits)
+    reason = reason.format(main_branch=main_branch)
+    lower = rules.lower_scan.scan(cmd_lower, deadline) if not reason else set()
+
+    # --- Branch guard: no direct feature/fix commits to main ---
+    if not reason and "git-commit" in hits:
+        current = _branch(rules, cmd, cwd, env, trace)
+        if current and current == main_branch:
+            if "git-commit-message" in lower and "allowed-commit-type" not in lower:
+                reason = (
+                    f"Blocked: direct feat/fix commit to {main_branch}. "
+                    "Create a feature branch first: git checkout -b feat/N-description"
+                )
+                return _decision(
+                    reason, "branch-guard", "policy", True,
+                    "Create a branch with 'git checkout -b feat/N-slug' or 'fix/N-slug', "
+                    "commit there, then open a PR",
+                    log + [("DENY", "branch-guard", f"{reason} | cmd={command}")],
+                )
+
+    # --- Closure guard: no direct gh issue close ---
+    closure_default = config.get("CC_REQUIRE_HUMAN_APPROVAL") or "true"
+    if not reason and (config.get("CC_REQUIRE_CLOSURE_VERIFICATION") or closure_default) == "true":
+        if "gh-issue-close" in lower:
+            if "Canceled:" not in command and "Approved by @" not in command:
+                reason = "Blocked: direct gh issue close bypasses closure guard"
+                return _decision(
+                    reason, "closure-guard", "policy", True,
+                    "Use '/project-board approve N' for verified issues or "
+                    "'/project-board close N' for unverified",
+                    log + [("DENY", "closure-guard", f"{reason} | cmd={command}")],
+                )
+        if "gh-api" in lower and "gh-api-close" in lower:
+            if "Canceled:" not in command:
+                reason = (
+                    "Blocked: gh api call attempts to close issue via REST/GraphQL, "
+                    "bypassing closure guard"
+                )
+                return _decision(
+                    reason, "closure-guard-api", "policy", True,
+                    "Use '/project-board approve N' for verified issues or "
+                    "'/project-board close N --comment \"Approved by @user\"' to close with exemption",
+                    log + [("DENY", "closure-guard-api", f"{reason} | cmd={command}")],
+                )
+
+    # --- Shared-state gate: pushes/merges to shared branches, Jira transitions ---
+    if not reason and (config.get("CC_REQUIRE_SHARED_STATE_APPROVAL") or "true") == "true":
+        if "push-shared" in lower:
+            target = rx["shared-branch-name"].search(cmd_lower).group(0)
+            reason = f"Blocked: pushing to shared branch '{target}' requires user approval"
+            return _decision(
+                reason, "shared-state-push", "policy", True,
+                f"Ask the user to confirm before pushing to {target}",
+                log + [("DENY", "shared-state-push", f"{reason} | cmd={command}")],
+            )
+
+        if "git-merge" in lower:
+            current = _branch(rules, cmd, cwd, env, trace)
+            if current in ("develop", "master", "main"):
+                reason = f"Blocked: merging into shared branch '{current}' requires user approval"
+                return _decision(
+                    reason, "shared-state-merge", "policy", True,
+                    f"Ask the user to confirm the merge into {current}",
+                    log + [("DENY", "shared-state-merge", f"{reason} | cmd={command}")],
+                )
+
+        if "jira-transition" in lower:
+            ticket = _jira_ticket(cmd) or "unknown"
+            body = rx["curl-body-single"].search(cmd) or rx["curl-body-double"].search(cmd)
+            transition = ""
+            if body:
+                id_match = rx["transition-id"].search(body.group(0))
+                if id_match:
+                    transition = rx["digits"].search(id_match.group(0)).group(0)
+            allowed = config.get("CC_JIRA_ALLOWED_TRANSITIONS") or ""
+            if transition and allowed and f",{transition}," in f",{allowed},":
+                log.append((
+                    "ALLOW", "shared-state-jira",
+                    f"Allowed transition {transition} for {ticket} | cmd={command}",
+                ))
+            else:
+                reason = f"Blocked: Jira status transition for {ticket} requires user approval"
+                if transition:
+                    reason = f"Blocked: Jira transition {transition} for {ticket} requires user approval"
+                return _decision(
+                    reason, "shared-state-jira", "policy", True,
+                    f"Ask the user to confirm the Jira transition for {ticket}",
+                    log + [("DENY", "shared-state-jira", f"{reason} | cmd={command}")],
+                )
+
+    # --- Project-specific blocked patterns (from config) ---
+    if not reason:
+        for pattern, kind, target in compiled.blocked:
+            if kind == "scan":
+                matched = target in hits
+            elif kind == "regex":
+                # Backtracking regex: only on lines short enough to bound it
+                if max(map(len, _lines(_echo(check))), default=0) > _REGEX_LINE_LIMIT:
+                    raise BudgetExceeded(f"line too long for blocked pattern {pattern!r}")
+                matched = _grep(target, check)
+            else:
+                matched = _grep_fallback(pattern, check if rules.utf8 else _from_byte_text(check), env)
+            if matched:
+                reason = (
+                    f"Blocked: matches project safety rule '{pattern}'. "
+                    "Check CC_BLOCKED_PATTERNS in cognitive-core.conf"
+                )
+                rule = "blocked-pattern"
+                break
+
+    if reason:
+        return _decision(reason, rule, log=log + [("DENY", "bash-blocked", f"{reason} | cmd={command}")])
+    return {"decision": "allow", "reason": "Command passes safety validation", "rule": "", "log": log}
+
+
+# CC_* settings evaluate() reads; with the locale mode and the hook revision
+# they fingerprint a rule set for DecisionCache
+_DECISION_SETTINGS = (
+    "CC_SECURITY_LEVEL", "CC_BLOCKED_PATTERNS", "CC_MAIN_BRANCH",
+    "CC_REQUIRE_HUMAN_APPROVAL", "CC_REQUIRE_CLOSURE_VERIFICATION",
+    "CC_REQUIRE_SHARED_STATE_APPROVAL", "CC_JIRA_ALLOWED_TRANSITIONS",
+    "CC_VALIDATE_MAX_BYTES", "CC_VALIDATE_TIMEOUT_MS",
+)
+DEFAULT_DECISION_CACHE_SIZE = 1024
+# Longer commands are decided every time (they rarely repeat)
+_CACHE_MAX_COMMAND = 4096
+
+
+def rule_fingerprint(config, env, revision: str = "") -> str:
+    """
+    Identity of the rule set evaluate() applies for config and env.
+
+    Args:
+        config: CC_* settings (conf merged over the environment).
+        env: Environment (locale mode).
+        revision: Hook revision the decisions mirror (validate-bash.sh
+            sha256), when the caller serves the hook.
+
+    Returns:
+        Hex digest; equal fingerprints decide every command the same way.
+    """
+    parts = [revision, "utf8" if _utf8_locale(env) else "c"]
+    parts += [f"{key}={config.get(key) or ''}" for key in _DECISION_SETTINGS]
+    return hashlib.sha256("\0".join(parts).encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class DecisionCache:
+    """
+    Bounded LRU of evaluate() results, keyed by rule fingerprint and command.
+
+    A changed cognitive-core.conf (new settings) or validate-bash.sh (new
+    revision) changes the fingerprint; the first lookup under a new
+    fingerprint drops every entry. Decisions that read the git branch or hit
+    the time budget are never stored. Keys are the exact command text:
+    case, whitespace and newlines all matter to some rule. Thread-safe.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_DECISION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self._fingerprint = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        self.invalidations = 0
+
+    def evaluate(self, command: str, config=None, cwd: str | None = None, env=None,
+                 revision: str = "") -> dict:
+        """evaluate(), answered from the cache when the same rule set saw command before."""
+        config = config or {}
+        env = env if env is not None else os.environ
+        fingerprint = rule_fingerprint(config, env, revision)
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                if self._fingerprint is not None:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._fingerprint = fingerprint
+            cached = self._entries.get(command)
+            if cached is not None:
+                self._entries.move_to_end(command)
+                self.hits += 1
+                return dict(cached, log=list(cached["log"]))
+            self.misses += 1
+
+        result = evaluate(command, config, cwd, env)
+        with self._lock:
+            if result["volatile"] or len(command) > _CACHE_MAX_COMMAND:
+                self.uncacheable += 1
+            elif self.maxsize > 0 and fingerprint == self._fingerprint:
+                self._entries[command] = dict(result, log=list(result["log"]))
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._fingerprint = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "uncacheable": self.uncacheable,
+                "invalidations": self.invalidations,
+            }
+
+
+# Process-wide cache shared by the MCP server handlers and the hook host
+DECISION_CACHE = DecisionCache()
+
+
+def _settings(security_level: str | None, blocked_patterns: list | None, config: dict | None) -> dict:
+    """config with explicit level/pattern overrides applied."""
+    settings = dict(config or {})
+    if security_level is not None:
+        settings["CC_SECURITY_LEVEL"] = security_level
+    if blocked_patterns is not None:
+        settings["CC_BLOCKED_PATTERNS"] = " ".join(blocked_patterns)
+    return settings
+
+
+def _decide(command: str, settings: dict, cwd: str | None, cache: DecisionCache | None) -> dict:
+    """validate_command() result for already-merged settings."""
+    if not command or not command.strip():
+        return {"decision": "allow", "reason": "Empty command"}
+    result = cache.evaluate(command, settings, cwd) if cache is not None else evaluate(command, settings, cwd)
+    if result["decision"] == "allow":
+        return {"decision": "allow", "reason": result["reason"]}
+    denied = {key: result[key] for key in ("decision", "reason", "rule", "category", "retryable")}
+    if result["suggestion"]:
+        denied["suggestion"] = result["suggestion"]
+    return denied
+
 
 def validate_command(
     command: str,
-    security_level: str = "standard",
+    security_level: str | None = None,
     blocked_patterns: list | None = None,
+    config: dict | None = None,
+    cwd: str | None = None,
+    cache: DecisionCache | None = None,
 ) -> dict:
     """
     Validate a bash command against cognitive-core safety rules.
 
     Args:
         command: The bash command to validate.
-        security_level: One of "minimal", "standard", "strict". Default "standard".
-        blocked_patterns: Additional regex patterns to block.
+        security_level: One of "minimal", "standard", "strict".
+            Default: config's CC_SECURITY_LEVEL, else "standard".
+        blocked_patterns: Additional ERE patterns to block.
+            Default: config's CC_BLOCKED_PATTERNS.
+        config: CC_* settings from cognitive-core.conf (branch guard,
+            closure and shared-state gates, Jira allowlist).
+        cwd: Directory used for branch lookups (default: current directory).
+        cache: DecisionCache to answer repeated commands from (e.g.
+            DECISION_CACHE); None decides every call afresh.
 
     Returns:
         dict with keys:
             decision: "allow" or "deny"
             reason: Human-readable reason
+            rule, category, retryable, suggestion: set on deny
     """
-    if not command or not command.strip():
-        return {"decision": "allow", "reason": "Empty command"}
+    return _decide(command, _settings(security_level, blocked_patterns, config), cwd, cache)
 
-    cmd_lower = command.lower()
 
-    # Check built-in patterns
-    for pattern, reason in BUILTIN_PATTERNS:
-        if re.search(pattern, cmd_lower):
-            return {"decision": "deny", "reason": f"Blocked: {reason}"}
+_SEPARATORS = ("&&", "||", ";", "|", "\n")
+_HEREDOC = re.compile(r"<<(-?)[ \t]*(?:'([^'\n]*)'|\"([^\"\n]*)\"|\\?([^\s;&|<>()]+))")
 
-    # git clean -f without -n (special two-step check)
-    if re.search(r'git\s+clean\s+-[a-z]*f', cmd_lower):
-        if not re.search(r'git\s+clean\s+-[a-z]*n', cmd_lower):
-            return {
-                "decision": "deny",
-                "reason": "Blocked: git clean -f (removes untracked files)",
-            }
 
-    # Standard level patterns
-    if security_level != "minimal":
-        for pattern, reason in STANDARD_PATTERNS:
-            if re.search(pattern, cmd_lower):
-                return {"decision": "deny", "reason": f"Blocked: {reason}"}
-
-    # Project-specific blocked patterns
-    if blocked_patterns:
-        for pattern in blocked_patterns:
-            try:
-                if re.search(pattern, cmd_lower):
-                    return {
-                        "decision": "deny",
-                        "reason": f"Blocked: matches project safety rule: {pattern}",
-                    }
-            except re.error:
+def split_segments(command: str) -> list:
+    """
+    Split a command into the simple commands of its &&, ||, ;, | chains.
+
+    Separators inside quotes, $(...), (...) and backticks do not split, and a
+    here-document body stays with the command that opened it.
+
+    Args:
+        command: Shell command or script.
+
+    Returns:
+        Non-empty segments, stripped, in order.
+    """
+    segments, current = [], []
+    stack = []  # open quotes / substitutions: "'", '"', "(", "`"
+    heredocs = []  # (delimiter, strip_tabs) waiting for the end of the line
+    i, n = 0, len(command)
+    while i < n:
+        ch = command[i]
+        top = stack[-1] if stack else ""
+        if top == "'":
+            if ch == "'":
+                stack.pop()
+        elif ch == "\\":
+            current.append(command[i:i + 2])
+            i += 2
+            continue
+        elif top == "`":
+            if ch == "`":
+                stack.pop()
+        elif top == '"':
+            if ch == '"':
+                stack.pop()
+            elif ch == "`" or command.startswith("$(", i):
+                stack.append("(" if ch == "$" else "`")
+        elif ch in "'\"`(":
+            stack.append(ch)
+        elif ch == ")" and top == "(":
+            stack.pop()
+        elif not stack and command.startswith("<<", i) and not command.startswith("<<<", i):
+            match = _HEREDOC.match(command, i)
+            if match:
+                delimiter = next(group for group in match.groups()[1:] if group is not None)
+                heredocs.append((delimiter, match.group(1) == "-"))
+                current.append(match.group(0))
+                i = match.end()
                 continue
+        elif not stack:
+            separator = next((sep for sep in _SEPARATORS if command.startswith(sep, i)), None)
+            if separator == "\n" and heredocs:
+                # Body lines up to each delimiter belong to this segment
+                end = i
+                for delimiter, strip_tabs in heredocs:
+                    while end < n:
+                        line_end = command.find("\n", end + 1)
+                        line_end = n if line_end < 0 else line_end
+                        line = command[end + 1:line_end]
+                        end = line_end
+                        if (line.lstrip("\t") if strip_tabs else line) == delimiter:
+                            break
+                heredocs = []
+                current.append(command[i:end])
+                i = end
+                continue
+            if separator:
+                segments.append("".join(current))
+                current = []
+                i += len(separator)
+                continue
+        current.append(ch)
+        i += 1
+    segments.append("".join(current))
+    return [segment.strip() for segment in segments if segment.strip()]
+
+
+def _cd_target(segment: str, cwd: str) -> str | None:
+    """Directory a bare `cd <dir>` segment moves to, if it exists."""
+    parts = segment.split()
+    if len(parts) != 2 or parts[0] != "cd":
+        return None
+    target = os.path.join(cwd, os.path.expanduser(parts[1].strip("\"'")))
+    return target if os.path.isdir(target) else None
+
+
+def validate_batch(
+    commands: list,
+    security_level: str | None = None,
+    blocked_patterns: list | None = None,
+    config: dict | None = None,
+    cwd: str | None = None,
+    split: bool = False,
+    cache: DecisionCache | None = None,
+) -> dict:
+    """
+    Validate many commands against one rule set.
+
+    Settings are merged and the rule set compiled once for the whole batch.
+    With split, each command is also checked segment by segment (see
+    split_segments()); a segment denied on its own denies the command, and
+    a bare `cd <dir>` segment moves the directory used by later segments.
+
+    Args:
+        commands: Commands to validate (strings).
+        security_level: As for validate_command().
+        blocked_patterns: As for validate_command().
+        config: As for validate_command().
+        cwd: As for validate_command().
+        split: Also validate each &&, ||, ;, | segment.
+        cache: As for validate_command().
+
+    Returns:
+        dict with keys:
+            results: One validate_command() result per command, in order;
+                with split, plus "segments" (segment, decision, and rule
+                on deny) when a command has more than one segment
+            summary: total, allowed and denied counts
+
+    Raises:
+        TypeError: commands is not a list of strings.
+    """
+    if not isinstance(commands, list) or not all(isinstance(c, str) for c in commands):
+        raise TypeError("commands must be a list of strings")
+    settings = _settings(security_level, blocked_patterns, config)
+    cwd = cwd or os.getcwd()
+    results = []
+    for command in commands:
+        result = _decide(command, settings, cwd, cache)
+        segments = split_segments(command) if split else []
+        if len(segments) > 1:
+            checked, segment_cwd = [], cwd
+            for segment in segments:
+                decided = _decide(segment, settings, segment_cwd, cache)
+                entry = {"segment": segment, "decision": decided["decision"]}
+                if decided["decision"] == "deny":
+                    entry["rule"] = decided["rule"]
+                    if result["decision"] == "allow":
+                        result = dict(decided, segment=segment)
+                checked.append(entry)
+                segment_cwd = _cd_target(segment, segment_cwd) or segment_cwd
+            result["segments"] = checked
+        results.append(result)
+    denied = sum(1 for result in results if result["decision"] == "deny")
+    return {
+        "results": results,
+        "summary": {"total": len(results), "allowed": len(results) - denied, "denied": denied},
+    }
+
+
+def _jq_json(value) -> str:
+    """Serialize like `jq -n` (2-space indent, raw UTF-8, DEL escaped)."""
+    return json.dumps(value, indent=2, ensure_ascii=False).replace("\x7f", "\\u007f") + "\n"
+
+
+def deny_output(result: dict) -> str:
+    """_cc_json_pretool_deny_structured output for a deny decision."""
+    output = {
+        "hookEventName": "PreToolUse",
+        "permissionDecision": "deny",
+        "permissionDecisionReason": result["reason"],
+        "errorCategory": result["category"],
+        "isRetryable": result["retryable"],
+    }
+    if result["suggestion"]:
+        output["suggestion"] = result["suggestion"]
+    return _jq_json({"hookSpecificOutput": output})
+
+
+def security_log(project_dir: str, level: str, event: str, detail: str) -> None:
+    """_cc_security_log: append to security.log, keep the last 500 lines past 1MB."""
+    logfile = os.path.join(project_dir, ".claude", "cognitive-core", "security.log")
+    timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    try:
+        os.makedirs(os.path.dirname(logfile), exist_ok=True)
+        with open(logfile, "ab") as fh:
+            fh.write(f"{timestamp} [{level}] {event}: {detail}\n".encode("utf-8", "surrogateescape"))
+        if os.path.getsize(logfile) > 1048576:
+            with open(logfile, "rb") as fh:
+                data = fh.read()
+            lines = data.split(b"\n")
+            tail = lines[-501:] if data.endswith(b"\n") else lines[-500:]
+            with open(logfile + ".tmp", "wb") as fh:
+                fh.write(b"\n".join(tail))
+            os.replace(logfile + ".tmp", logfile)
+    except OSError:
+        pass
+
+
+def run_hook(stdin_text: str, env, cwd: str, project_dir: str,
+             cache: DecisionCache | None = None) -> tuple | None:
+    """
+    Run validate-bash natively with the hook's stdin/stdout protocol.
+
+    Args:
+        stdin_text: Hook input JSON.
+        env: Hook environment (CC_* config already merged in).
+        cwd: Hook working directory.
+        project_dir: CC_PROJECT_DIR (security.log location).
+        cache: DecisionCache to reuse decisions from; entries are tied to
+            PARITY_HOOK_SHA256, the hook revision this engine mirrors.
+
+    Returns:
+        (stdout, stderr, exit_code), or None when the input takes a path the
+        native engine does not model (malformed JSON, non-string command) and
+        the bash hook should run instead.
+    """
+    try:
+        node = json.loads(stdin_text)
+    except ValueError:
+        return None
+    # jq -r '.tool_input.command // ""'
+    for key in ("tool_input", "command"):
+        if node is None:
+            break
+        if not isinstance(node, dict):
+            return None
+        node = node.get(key)
+    if node is None or node is False:
+        command = ""
+    elif isinstance(node, str):
+        command = node
+    else:
+        return None
+    try:
+        command.encode("utf-8")
+    except UnicodeEncodeError:
+        return None
+    # Bash drops NUL bytes and $(...) strips trailing newlines
+    command = _capture(command.replace("\x00", ""))
+    if not command:
+        return "", "", 0
 
-    return {"decision": "allow", "reason": "Command passes safety validation"}
+    if cache is not None:
+        result = cache.evaluate(command, env, cwd, env, revision=PARITY_HOOK_SHA256)
+    else:
+        result = evaluate(command, env, cwd, env)
+    for level, event, detail in result["log"]:
+        security_log(project_dir, level, event, detail)
+    if result["decision"] == "deny":
+        return deny_output(result), "", 0
+    return "", "", 0
@@ -0,0 +1,445 @@
+"""
+Test impact analysis for cognitive-core MCP server.
+
+cc_lint_check mode=affected-tests runs only the tests that can see a change:
+
+  1. changed files: `git diff` of the working tree against a base commit
+     (the last green test run, or the merge-base with CC_MAIN_BRANCH) plus
+     untracked files
+  2. an import graph of the project's Python and JS/TS files, persisted in
+     <project>/.claude/cognitive-core/test-impact.json
+  3. the test files that import a changed file, directly or transitively,
+     plus changed test files themselves
+
+The graph stores each file's raw import specifiers with its (mtime, size),
+so an update re-parses only files that changed since the last call. Imports
+are resolved against the current file list on every query: Python with
+`ast` (absolute imports from the project root, CC_SRC_ROOT, CC_TEST_ROOT or
+the importing file's directory; relative imports; parent packages'
+__init__.py), JS/TS by scanning import/export/require/import() specifiers
+(relative ones only; packages are not tracked).
+
+Changes the graph cannot attribute to files (a conftest.py, pyproject.toml,
+package.json, ...) select a wider set: a conftest.py selects every test below
+it, a project-wide config file selects the full suite. Documentation and
+editor, agent or hook state (README.md, docs/, .claude/, ... — NO_TEST_FILES
+and NO_TEST_DIRS) select no tests, unless they sit under CC_TEST_ROOT. Any
+other changed file outside the graph (test data, Go/Java/Rust sources, files
+outside CC_SRC_ROOT and CC_TEST_ROOT) selects the full suite: nothing can
+tell which tests read it, and skipping them would let the next green run
+bless the change untested.
+"""
+import ast
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import subprocess
+import tempfile
+import threading
+
+from tools.lint_cache import lint_files
+
+GRAPH_VERSION = 1
+
+PYTHON_EXTENSIONS = (".py",)
+JS_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs")
+SOURCE_EXTENSIONS = PYTHON_EXTENSIONS + JS_EXTENSIONS
+
+# Changing one of these can change any test's outcome
+GLOBAL_FILES = (
+    "pyproject.toml", "setup.py", "setup.cfg", "pytest.ini", "tox.ini", "requirements*.txt",
+    "package.json", "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "tsconfig*.json",
+    "jest.config.*", "vitest.config.*", "babel.config.*", ".babelrc",
+)
+
+# Changing one of these cannot change a test's outcome (outside CC_TEST_ROOT,
+# where tests may read them as data)
+NO_TEST_FILES = (
+    "*.md", "*.markdown", "*.rst", "*.adoc", "*.txt", "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg",
+    "LICENSE*", "COPYING*", "AUTHORS*", "CHANGELOG*", "NOTICE*", "CODEOWNERS",
+    ".gitignore", ".gitattributes", ".editorconfig", ".mailmap",
+)
+NO_TEST_DIRS = ("docs/", ".claude/", ".cognitive-core/", ".github/", ".vscode/", ".idea/")
+
+_JS_IMPORT = re.compile(
+    r"""(?:\bimport\s+(?:[\w*${},\s]+?\s+from\s+)?|\bexport\s+[\w*${},\s]+?\s+from\s+|"""
+    r"""\brequire\s*\(\s*|\bimport\s*\(\s*)['"]([^'"\n]+)['"]"""
+)
+
+_lock = threading.Lock()
+
+
+def state_path(project_dir: str) -> str:
+    """Where the import graph and last green run are persisted."""
+    return os.path.join(project_dir, ".claude", "cognitive-core", "test-impact.json")
+
+
+def python_imports(source: str) -> list:
+    """
+    Import specifiers of a Python module, as dotted names with leading dots
+    for relative imports ("pkg.mod", "..util"). Every dotted prefix is
+    included, and `from m import name` adds "m.name" in case name is a
+    submodule. Unparseable source yields [].
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            base = "." * node.level + (node.module or "")
+            sep = "" if base.endswith(".") else "."
+            modules = [base] + [base + sep + alias.name for alias in node.names if alias.name != "*"]
+        else:
+            continue
+        for module in modules:
+            dots = len(module) - len(module.lstrip("."))
+            parts = module[dots:].split(".") if module[dots:] else []
+            names.add("." * dots)
+            for i in range(1, len(parts) + 1):
+                names.add("." * dots + ".".join(parts[:i]))
+    names.discard("")
+    return sorted(names)
+
+
+def js_imports(source: str) -> list:
+    """Relative import specifiers of a JS/TS module ("./util", "../lib/x.js")."""
+    return sorted({spec for spec in _JS_IMPORT.findall(source) if spec.startswith(".")})
+
+
+def _expand_braces(pattern: str) -> list:
+    match = re.search(r"\{([^{}]*)\}", pattern)
+    if not match:
+        return [pattern]
+    return [
+        expanded
+        for option in match.group(1).split(",")
+        for expanded in _expand_braces(pattern[:match.start()] + option + pattern[match.end():])
+    ]
+
+
+def _glob_regex(pattern: str) -> str:
+    out, i = [], 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+def test_matcher(test_pattern: str):
+    """
+    Predicate for test files (relative paths).
+
+    A file is a test if it matches CC_TEST_PATTERN (space-separated globs with
+    ** and {a,b}) and, for Python, pytest's default test_*.py / *_test.py
+    naming. Without a pattern, JS/TS tests are *.test.* / *.spec.* files or
+    files under __tests__/.
+    """
+    globs = [g for p in test_pattern.split() for g in _expand_braces(p)]
+    rx = re.compile("|".join(f"(?:{_glob_regex(g)})" for g in globs)) if globs else None
+
+    def is_test(rel: str) -> bool:
+        name = os.path.basename(rel)
+        if rel.endswith(PYTHON_EXTENSIONS) and not (name.startswith("test_") or name.endswith("_test.py")):
+            return False
+        if rx is not None:
+            return rx.fullmatch(rel) is not None
+        if rel.endswith(JS_EXTENSIONS):
+            return ".test." in name or ".spec." in name or "/__tests__/" in f"/{rel}"
+        return True
+
+    return is_test
+
+
+class ImportGraph:
+    """
+    Persisted, incrementally updated import graph of one project.
+
+    Args:
+        project_dir: Project root.
+        roots: Directories (relative) that absolute Python imports resolve
+            from, besides the project root and the importing file's dir.
+    """
+
+    def __init__(self, project_dir: str, roots: tuple = ()):
+        self.project_dir = project_dir
+        self.roots = [""] + [r.strip("/") for r in roots if r and r.strip("/")]
+        self.files: dict = {}
+        self.green: dict = {}
+        self.parsed = 0
+
+    def load(self) -> None:
+        try:
+            with open(state_path(self.project_dir), encoding="utf-8") as fh:
+                state = json.load(fh)
+        except (OSError, ValueError):
+            return
+        if state.get("version") == GRAPH_VERSION:
+            self.files = state.get("files", {})
+            self.green = state.get("green", {})
+
+    def save(self) -> None:
+        path = state_path(self.project_dir)
+        state = {"version": GRAPH_VERSION, "files": self.files, "green": self.green}
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(state, fh)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def update(self) -> int:
+        """Re-parse new or modified files, drop deleted ones. Returns files parsed."""
+        seen = {}
+        parsed = 0
+        for full in lint_files(self.project_dir, SOURCE_EXTENSIONS):
+            rel = os.path.relpath(full, self.project_dir)
+            if rel.startswith(".claude" + os.sep):
+                continue
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            stamp = [st.st_mtime_ns, st.st_size]
+            entry = self.files.get(rel)
+            if entry is None or entry["stamp"] != stamp:
+                try:
+                    with open(full, encoding="utf-8", errors="replace") as fh:
+                        source = fh.read()
+                except OSError:
+                    continue
+                imports = python_imports(source) if rel.endswith(PYTHON_EXTENSIONS) else js_imports(source)
+                entry = {"stamp": stamp, "imports": imports}
+                parsed += 1
+            seen[rel] = entry
+        self.files = seen
+        self.parsed = parsed
+        return parsed
+
+    def _resolve_python(self, rel: str, spec: str, known) -> list:
+        dots = len(spec) - len(spec.lstrip("."))
+        path = spec[dots:].replace(".", "/")
+        if dots:
+            base = os.path.dirname(rel)
+            for _ in range(dots - 1):
+                base = os.path.dirname(base)
+            bases = [base]
+        else:
+            bases = self.roots + [os.path.dirname(rel)]
+        found = []
+        for base in bases:
+            stem = os.path.normpath(os.path.join(base, path)) if path else os.path.normpath(base or ".")
+            for candidate in (f"{stem}.py", os.path.join(stem, "__init__.py")):
+                candidate = os.path.normpath(candidate)
+                if candidate in known and candidate != rel:
+                    found.append(candidate)
+        return found
+
+    @staticmethod
+    def _resolve_js(rel: str, spec: str, known) -> list:
+        stem = os.path.normpath(os.path.join(os.path.dirname(rel), spec))
+        candidates = [stem] + [stem + ext for ext in JS_EXTENSIONS]
+        root, ext = os.path.splitext(stem)
+        if ext in (".js", ".jsx", ".mjs", ".cjs"):
+            candidates += [root + ".ts", root + ".tsx"]  # TS ESM import of ./x.js
+        candidates += [os.path.join(stem, "index" + e) for e in JS_EXTENSIONS]
+        for candidate in candidates:
+            if candidate in known:
+                return [candidate]
+        return []
+
+    def dependents(self, changed: set) -> set:
+        """Files that import any of changed, transitively (changed included)."""
+        known = set(self.files) | set(changed)
+        importers: dict = {}
+        for rel, entry in self.files.items():
+            resolve = self._resolve_python if rel.endswith(PYTHON_EXTENSIONS) else self._resolve_js
+            for spec in entry["imports"]:
+                for dep in resolve(rel, spec, known):
+                    importers.setdefault(dep, set()).add(rel)
+        result = set(changed)
+        frontier = list(changed)
+        while frontier:
+            for importer in importers.get(frontier.pop(), ()):
+                if importer not in result:
+                    result.add(importer)
+                    frontier.append(importer)
+        return result
+
+
+def _git(project_dir: str, *args: str) -> str | None:
+    try:
+        proc = subprocess.run(
+            ["git", *args], cwd=project_dir, capture_output=True, text=True, timeout=30,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return proc.stdout if proc.returncode == 0 else None
+
+
+def _digest(path: str) -> str:
+    try:
+        with open(path, "rb") as fh:
+            return hashlib.sha256(fh.read()).hexdigest()
+    except OSError:
+        return ""
+
+
+def _dirty_files(project_dir: str, commit: str) -> list | None:
+    """Files differing from commit in the working tree, plus untracked files."""
+    diff = _git(project_dir, "diff", "--name-only", "-z", commit, "--")
+    untracked = _git(project_dir, "ls-files", "--others", "--exclude-standard", "-z")
+    if diff is None or untracked is None:
+        return None
+    # The server's own state (this graph, logs, lint cache) is not a change
+    return sorted({f for f in (diff + untracked).split("\0") if f and not f.startswith(".claude/cognitive-core/")})
+
+
+def changed_files(project_dir: str, since: str, main_branch: str, green: dict) -> dict:
+    """
+    Files changed since the base commit.
+
+    Args:
+        since: "last-green", "main" or "auto" (last green run if recorded,
+            else the merge-base with main_branch).
+        green: Last green run record ({"commit", "digests"}).
+
+    Returns:
+        dict with base ("last-green" or the branch), commit and files; or
+        error when git cannot answer.
+    """
+    commit = None
+    base = None
+    if since in ("auto", "last-green") and green.get("commit"):
+        if _git(project_dir, "cat-file", "-e", f"{green['commit']}^{{commit}}") is not None:
+            commit, base = green["commit"], "last-green"
+    if commit is None and since == "last-green":
+        return {"error": "no green test run recorded yet; use since=main"}
+    if commit is None:
+        merge_base = _git(project_dir, "merge-base", "HEAD", main_branch)
+        if not merge_base:
+            return {"error": f"cannot find merge-base of HEAD and {main_branch} (CC_MAIN_BRANCH)"}
+        commit, base = merge_base.strip(), main_branch
+    files = _dirty_files(project_dir, commit)
+    if files is None:
+        return {"error": "git diff failed"}
+    if base == "last-green":
+        # Files already dirty at the green run are changed only if edited since
+        digests = green.get("digests", {})
+        files = [f for f in files if f not in digests or digests[f] != _digest(os.path.join(project_dir, f))]
+    return {"base": base, "commit": commit, "files": files}
+
+
+def _is_global(rel: str) -> bool:
+    name = os.path.basename(rel)
+    return any(fnmatch.fnmatch(name, pattern) for pattern in GLOBAL_FILES)
+
+
+def _selects_no_tests(rel: str, test_root: str) -> bool:
+    if test_root and (rel + "/").startswith(test_root + "/"):
+        return False
+    if rel.startswith(NO_TEST_DIRS):
+        return True
+    name = os.path.basename(rel)
+    return any(fnmatch.fnmatch(name, pattern) for pattern in NO_TEST_FILES)
+
+
+def plan(project_dir: str, config: dict, since: str = "auto") -> dict:
+    """
+    Work out which tests a change affects.
+
+    Args:
+        project_dir: Project root.
+        config: cognitive-core.conf values (CC_MAIN_BRANCH, CC_TEST_PATTERN,
+            CC_SRC_ROOT, CC_TEST_ROOT).
+        since: "auto", "last-green" or "main".
+
+    Returns:
+        dict with base, commit, changed (files), tests (selected test files),
+        full_run (reason the whole suite is needed, or None; set whenever
+        unmapped is not empty), unmapped (changed files outside the graph),
+        no_tests (changed docs and tool state, which select nothing),
+        graph (files, parsed); or error.
+    """
+    with _lock:
+        graph = ImportGraph(project_dir, (config.get("CC_SRC_ROOT", "src"), config.get("CC_TEST_ROOT", "tests")))
+        graph.load()
+        graph.update()
+        graph.save()
+    changes = changed_files(project_dir, since, config.get("CC_MAIN_BRANCH", "main"), graph.green)
+    if "error" in changes:
+        return changes
+    changed = changes["files"]
+    is_test = test_matcher(config.get("CC_TEST_PATTERN", ""))
+    tests = set()
+    full_run = None
+    unmapped = []
+    no_tests = []
+    sources = set()
+    test_root = config.get("CC_TEST_ROOT", "tests").strip("/")
+    for rel in changed:
+        if os.path.basename(rel) == "conftest.py":
+            scope = os.path.dirname(rel)
+            tests.update(f for f in graph.files if is_test(f) and (not scope or f.startswith(scope + "/")))
+        elif _is_global(rel):
+            full_run = full_run or f"{rel} changed"
+        elif rel.endswith(SOURCE_EXTENSIONS) and rel in graph.files:
+            sources.add(rel)
+        elif _selects_no_tests(rel, test_root):
+            no_tests.append(rel)
+        else:
+            unmapped.append(rel)
+    if unmapped and full_run is None:
+        full_run = f"{len(unmapped)} changed file{'s' if len(unmapped) != 1 else ''} outside the import graph"
+    tests.update(f for f in graph.dependents(sources) if is_test(f) and f in graph.files)
+    return {
+        "base": changes["base"],
+        "commit": changes["commit"],
+        "changed": changed,
+        "tests": sorted(tests),
+        "full_run": full_run,
+        "unmapped": unmapped,
+        "no_tests": no_tests,
+        "graph": {"files": len(graph.files), "parsed": graph.parsed},
+    }
+
+
+def snapshot(project_dir: str) -> dict | None:
+    """HEAD and the digests of dirty files, taken before a test run starts."""
+    head = _git(project_dir, "rev-parse", "HEAD")
+    if not head:
+        return None
+    files = _dirty_files(project_dir, head.strip()) or []
+    return {
+        "commit": head.strip(),
+        "digests": {f: _digest(os.path.join(project_dir, f)) for f in files},
+    }
+
+
+def record_green(project_dir: str, green: dict) -> None:
+    """Remember a snapshot() whose test run passed as the last green run."""
+    with _lock:
+        graph = ImportGraph(project_dir)
+        graph.load()
+        graph.green = green
+        graph.save()
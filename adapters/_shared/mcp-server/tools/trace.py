@@ -0,0 +1,182 @@
+"""
+Opt-in JSONL tracing for cognitive-core hooks and MCP tool calls.
+
+With CC_TRACE="1" every hook run and every MCP request appends one span to
+.claude/cognitive-core/trace.jsonl (CC_TRACE_FILE overrides the path):
+
+  {"ts": "2026-01-01T12:00:00", "start": 1767268800.123, "dur_ms": 12.3,
+   "kind": "hook" | "mcp", "source": "bash" | "hook-host" | "mcp",
+   "name": "validate-bash", "session": "...", "decision": "deny",
+   "exit": 0, "bytes_in": 512, "bytes_out": 230, "subprocesses": 1,
+   "pid": 4242}
+
+ts is UTC. decision is the hook's permissionDecision ("block" for exit 2,
+null otherwise) or, for cc_security_validate, the validator's decision.
+session is the hook input's session_id; MCP requests carry
+CLAUDE_SESSION_ID if the client set it, else a per-server-process id.
+Fields a writer cannot know are omitted (bash hooks do not count
+subprocesses or output bytes). MCP spans add method, tool and error.
+
+Writers in one project share the file:
+  - core/hooks/_lib.sh: hooks run directly by Claude Code, one line
+    appended per run
+  - TraceSink: the MCP server and the hook host, whose hook runs bash
+    skips via CC_TRACE_HOSTED; spans are buffered and appended every
+    FLUSH_INTERVAL seconds, at FLUSH_SPANS spans, and on exit
+
+Each line is written with a single O_APPEND write, so concurrent writers
+do not interleave. Once the file would exceed CC_TRACE_MAX_BYTES (default
+10 MB) it is rotated to trace.jsonl.1 .. .KEEP. tools/trace_report.py
+summarises the spans.
+"""
+import json
+import os
+import re
+import threading
+import time
+
+DEFAULT_MAX_BYTES = 10485760
+KEEP = 3
+FLUSH_SPANS = 64
+FLUSH_INTERVAL = 2.0
+
+_SESSION_RE = re.compile(r'"session_id"\s*:\s*"([^"]*)"')
+
+
+def trace_enabled(config: dict) -> bool:
+    return config.get("CC_TRACE", "") in ("1", "true")
+
+
+def trace_path(project_dir: str, config: dict) -> str:
+    """Trace file for a project (CC_TRACE_FILE is relative to the project)."""
+    path = config.get("CC_TRACE_FILE", "")
+    if not path:
+        return os.path.join(project_dir, ".claude", "cognitive-core", "trace.jsonl")
+    return os.path.join(project_dir, os.path.expanduser(path))
+
+
+def session_of(hook_input: str) -> str:
+    """session_id of a hook's stdin JSON ("" if absent)."""
+    match = _SESSION_RE.search(hook_input[:4096])
+    return match.group(1) if match else ""
+
+
+def hook_decision(stdout: str, exit_code: int) -> str | None:
+    """permissionDecision of a hook's output ("block" for exit code 2)."""
+    if exit_code == 2:
+        return "block"
+    if '"permissionDecision"' not in stdout:
+        return None
+    try:
+        return json.loads(stdout)["hookSpecificOutput"]["permissionDecision"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def span(kind: str, source: str, name: str, start: float, end: float, **fields) -> dict:
+    """A span dict; fields that are None are left out."""
+    record = {
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(start)),
+        "start": round(start, 3),
+        "dur_ms": round((end - start) * 1000, 3),
+        "kind": kind,
+        "source": source,
+        "name": name,
+    }
+    record.update((key, value) for key, value in fields.items() if value is not None)
+    record["pid"] = os.getpid()
+    return record
+
+
+def rotate(path: str, keep: int = KEEP) -> None:
+    """Shift path to path.1, path.1 to path.2, ... dropping path.<keep>."""
+    for i in range(keep - 1, 0, -1):
+        try:
+            os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+        except FileNotFoundError:
+            pass
+    try:
+        os.replace(path, f"{path}.1")
+    except FileNotFoundError:
+        pass
+
+
+class TraceSink:
+    """
+    Buffered, size-rotated JSONL span writer (thread-safe).
+
+    Args:
+        path: Trace file.
+        max_bytes: Rotate before the file would grow past this size.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._buffer: list = []
+        self._stopped = threading.Event()
+        self._flusher = None
+        self.spans = 0
+        self.write_errors = 0
+
+    @classmethod
+    def from_config(cls, project_dir: str, config: dict):
+        """Sink configured by cognitive-core.conf, or None if CC_TRACE is off."""
+        if not trace_enabled(config):
+            return None
+        try:
+            max_bytes = int(config.get("CC_TRACE_MAX_BYTES") or DEFAULT_MAX_BYTES)
+        except ValueError:
+            max_bytes = DEFAULT_MAX_BYTES
+        return cls(trace_path(project_dir, config), max_bytes)
+
+    def emit(self, record: dict) -> None:
+        """Queue one span (written within FLUSH_INTERVAL seconds)."""
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._buffer.append(line)
+            self.spans += 1
+            full = len(self._buffer) >= FLUSH_SPANS
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="trace-flush", daemon=True)
+                self._flusher.start()
+        if full:
+            self.flush()
+
+    def _flush_loop(self) -> None:
+        while not self._stopped.wait(FLUSH_INTERVAL):
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+            if not lines:
+                return
+            data = "".join(lines).encode("utf-8")
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                try:
+                    size = os.path.getsize(self.path)
+                except OSError:
+                    size = 0
+                if size and size + len(data) > self.max_bytes:
+                    rotate(self.path)
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    # One write per line: other writers append between lines,
+                    # never inside one
+                    for line in lines:
+                        os.write(fd, line.encode("utf-8"))
+                finally:
+                    os.close(fd)
+            except OSError:
+                self.write_errors += 1
+
+    def close(self) -> None:
+        """Stop the flusher and write what is buffered."""
+        self._stopped.set()
+        self.flush()
+
+    def stats(self) -> dict:
+        return {"path": self.path, "spans": self.spans, "write_errors": self.write_errors}
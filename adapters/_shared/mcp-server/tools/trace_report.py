@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Summarise cognitive-core trace spans (CC_TRACE=1, see tools/trace.py).
+
+Prints the slowest hook runs, latency percentiles per hook and MCP tool, and
+the time each session spent in hooks and tool calls. Reads the trace file and
+its rotations (trace.jsonl.1 ...) unless files are given.
+
+Usage:
+  python3 trace_report.py [--project-dir <dir>] [--top N] [--json] [file ...]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+
+
+def load_spans(paths: list) -> list:
+    """Spans from JSONL files, oldest first; unparseable lines are skipped."""
+    spans = []
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as fh:
+                for line in fh:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict) and "dur_ms" in record and "name" in record:
+                        spans.append(record)
+        except OSError:
+            continue
+    spans.sort(key=lambda s: s.get("start", 0))
+    return spans
+
+
+def default_paths(project_dir: str) -> list:
+    trace = os.path.join(project_dir, ".claude", "cognitive-core", "trace.jsonl")
+    rotated = sorted(glob.glob(trace + ".[0-9]*"), key=lambda p: -int(p.rsplit(".", 1)[1]))
+    return rotated + [trace]
+
+
+def _percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def report(spans: list, top: int = 10) -> dict:
+    """Slowest hooks, percentiles per (kind, name) and time per session."""
+    hooks = [s for s in spans if s.get("kind") == "hook"]
+    slowest = sorted(hooks, key=lambda s: s["dur_ms"], reverse=True)[:top]
+
+    groups: dict = {}
+    for s in spans:
+        groups.setdefault((s.get("kind", ""), s["name"]), []).append(s)
+    by_name = []
+    for (kind, name), members in groups.items():
+        durations = [s["dur_ms"] for s in members]
+        by_name.append({
+            "kind": kind,
+            "name": name,
+            "count": len(members),
+            "p50_ms": round(_percentile(durations, 0.50), 1),
+            "p95_ms": round(_percentile(durations, 0.95), 1),
+            "max_ms": round(max(durations), 1),
+            "total_ms": round(sum(durations), 1),
+            # Hook exit 2 is a block decision, not a failure
+            "errors": sum(
+                1 for s in members
+                if (s.get("error") if kind == "mcp" else s.get("exit") not in (None, 0, 2))
+            ),
+            "denied": sum(1 for s in members if s.get("decision") in ("deny", "block")),
+        })
+    by_name.sort(key=lambda g: g["p95_ms"], reverse=True)
+
+    sessions: dict = {}
+    for s in spans:
+        entry = sessions.setdefault(s.get("session") or "(none)", {
+            "spans": 0, "hook_ms": 0.0, "mcp_ms": 0.0, "first": s.get("start", 0), "last": s.get("start", 0),
+        })
+        entry["spans"] += 1
+        entry["hook_ms" if s.get("kind") == "hook" else "mcp_ms"] += s["dur_ms"]
+        start = s.get("start", 0)
+        entry["first"] = min(entry["first"], start)
+        entry["last"] = max(entry["last"], start + s["dur_ms"] / 1000)
+    per_session = [
+        {
+            "session": name,
+            "spans": e["spans"],
+            "hook_s": round(e["hook_ms"] / 1000, 3),
+            "mcp_s": round(e["mcp_ms"] / 1000, 3),
+            "wall_s": round(e["last"] - e["first"], 3),
+        }
+        for name, e in sessions.items()
+    ]
+    per_session.sort(key=lambda e: e["hook_s"] + e["mcp_s"], reverse=True)
+
+    return {
+        "spans": len(spans),
+        "slowest_hooks": [
+            {key: s.get(key) for key in ("ts", "name", "dur_ms", "decision", "exit", "session", "source")}
+            for s in slowest
+        ],
+        "by_name": by_name,
+        "sessions": per_session,
+    }
+
+
+def format_report(result: dict) -> str:
+    lines = [f"{result['spans']} spans"]
+    lines.append("")
+    lines.append("Slowest hooks")
+    lines.append(f"  {'ms':>9}  {'hook':<28} {'decision':<8} {'exit':>4}  {'ts':<19}  session")
+    for s in result["slowest_hooks"]:
+        lines.append(
+            f"  {s['dur_ms']:>9.1f}  {s['name']:<28} {s.get('decision') or '-':<8} "
+            f"{s['exit'] if s.get('exit') is not None else '-':>4}  {s.get('ts') or '':<19}  {s.get('session') or '-'}"
+        )
+    lines.append("")
+    lines.append("Latency by hook / tool (slowest p95 first)")
+    lines.append(
+        f"  {'kind':<5} {'name':<28} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} "
+        f"{'errors':>6} {'denied':>6}"
+    )
+    for g in result["by_name"]:
+        lines.append(
+            f"  {g['kind']:<5} {g['name']:<28} {g['count']:>6} {g['p50_ms']:>9.1f} {g['p95_ms']:>9.1f} "
+            f"{g['max_ms']:>9.1f} {g['errors']:>6} {g['denied']:>6}"
+        )
+    lines.append("")
+    lines.append("Time per session")
+    lines.append(f"  {'session':<38} {'spans':>6} {'hooks s':>9} {'mcp s':>9} {'wall s':>9}")
+    for e in result["sessions"]:
+        lines.append(f"  {e['session']:<38} {e['spans']:>6} {e['hook_s']:>9.3f} {e['mcp_s']:>9.3f} {e['wall_s']:>9.3f}")
+    return "\n".join(lines)
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Summarise cognitive-core trace spans")
+    parser.add_argument("files", nargs="*", help="trace files (default: the project's trace.jsonl and rotations)")
+    parser.add_argument("--project-dir", default=os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()))
+    parser.add_argument("--top", type=int, default=10, help="slowest hook runs listed")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    spans = load_spans(args.files or default_paths(args.project_dir))
+    if not spans:
+        print("No trace spans found (set CC_TRACE=\"1\" in cognitive-core.conf)", file=sys.stderr)
+        return 1
+    result = report(spans, top=args.top)
+    print(json.dumps(result, indent=2) if args.json else format_report(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
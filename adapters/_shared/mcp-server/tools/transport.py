@@ -0,0 +1,533 @@
+"""
+Client connections for cognitive-core MCP server.
+
+By default server.py serves one client over stdio. `server.py --daemon`
+instead serves every client of the project from one warm process, so they
+share the config, lint and decision caches, the pre-linter and the
+admission slots:
+
+  Unix socket   per-project path (mode 0600) in a directory private to the
+                user (tools/hook_client.py runtime_dir()), line-delimited
+                JSON-RPC exactly as on stdio; tools/mcp_bridge.py connects
+                stdio-only clients to it
+  HTTP          with --http-port, MCP streamable HTTP on
+                http://127.0.0.1:<port>/mcp: POST one message, answered with
+                application/json, or text/event-stream (progress
+                notifications, then the response) when the client accepts it.
+                Every request needs `Authorization: Bearer <token>`; the
+                daemon writes a fresh token and the URL to <socket>.http
+                (mode 0600), so only the user who could reach the socket can
+                use HTTP; it is read only if that user owns it and it is
+                still private. Every request but initialize needs the
+                Mcp-Session-Id it returned, and Host and Origin must be local
+
+Each request runs with current_client set to the connection it came from,
+so its response and progress notifications go back there. Request ids are
+only unique per client: jobs are keyed by Client.key (the connection, or
+the Mcp-Session-Id), and a client can only cancel its own calls. A socket
+client that disconnects has its running calls cancelled.
+
+The daemon exits on SIGTERM, or after idle_timeout seconds with no
+connected socket client and no call in flight.
+"""
+import asyncio
+import collections
+import contextvars
+import hmac
+import http.server
+import itertools
+import json
+import os
+import queue
+import secrets
+import signal
+import socket
+import stat
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+
+from tools.hook_client import check_owned
+
+# Longest request accepted: a line on the socket, a body over HTTP
+MAX_LINE_BYTES = 67108864
+# Seconds a server-to-client request (roots/list) waits for its answer
+REQUEST_TIMEOUT = 10.0
+DEFAULT_IDLE_TIMEOUT = 1800
+# Streamable HTTP sessions remembered (oldest dropped first)
+MAX_HTTP_SESSIONS = 256
+_LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+_REQUEST_IDS = itertools.count(1)
+
+
+class Client:
+    """A connection that JSON-RPC messages are sent to."""
+
+    transport = "stdio"
+    # Whether server-initiated messages (roots/list, resource updates) can
+    # reach the client
+    can_request = True
+
+    def __init__(self, key=None, session: str = ""):
+        self.key = key
+        self.session = session
+        # Local directories of the client's MCP roots (tools/projects.py),
+        # refreshed by roots_refresh when the client declares roots support
+        self.roots: list = []
+        self.roots_supported = False
+        self.roots_refresh: asyncio.Task | None = None
+        self._requests: dict = {}
+
+    async def request(self, method: str, params: dict | None = None, timeout: float = REQUEST_TIMEOUT) -> dict:
+        """Send a request to the client and wait for its response message."""
+        request_id = f"cc-{next(_REQUEST_IDS)}"
+        future = asyncio.get_running_loop().create_future()
+        self._requests[request_id] = future
+        try:
+            self.send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._requests.pop(request_id, None)
+
+    def resolve(self, message: dict) -> bool:
+        """Hand a response message to the request() waiting for it."""
+        future = self._requests.get(message.get("id"))
+        if future is None or future.done():
+            return False
+        future.set_result(message)
+        return True
+
+    def send(self, message: dict) -> int:
+        """Write one message (from any thread). Returns its size on the wire."""
+        line = json.dumps(message) + "\n"
+        self.write(line)
+        return len(line)
+
+    def write(self, line: str) -> None:
+        raise NotImplementedError
+
+
+class StdioClient(Client):
+    def __init__(self, session: str):
+        super().__init__(None, session)
+        self._lock = threading.Lock()
+
+    def write(self, line: str) -> None:
+        with self._lock:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+
+
+class StreamClient(Client):
+    """A Unix socket connection."""
+
+    transport = "socket"
+
+    def __init__(self, key: str, writer: asyncio.StreamWriter, on_gone):
+        super().__init__(key, key)
+        self._writer = writer
+        self._on_gone = on_gone
+        self._loop = asyncio.get_running_loop()
+        self._thread = threading.get_ident()
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def write(self, line: str) -> None:
+        if self._writer.is_closing():
+            # The peer went away after half-closing: stop its other calls
+            if self._on_gone is not None:
+                self._loop.call_soon_threadsafe(self._on_gone, self.key)
+                self._on_gone = None
+            return
+        data = line.encode("utf-8")
+        if threading.get_ident() == self._thread:
+            self._writer.write(data)
+        else:
+            self._loop.call_soon_threadsafe(self._writer.write, data)
+
+
+class HttpExchange(Client):
+    """One streamable-HTTP POST: messages are queued for the handler thread."""
+
+    transport = "http"
+    # No standalone SSE stream: a request sent here would have nowhere to go
+    can_request = False
+
+    def __init__(self, session: str):
+        super().__init__(session, session)
+        self.messages: queue.Queue = queue.Queue()
+
+    def write(self, line: str) -> None:
+        self.messages.put(line)
+
+
+# Client of the request running in the current task (None: stdio)
+current_client: contextvars.ContextVar = contextvars.ContextVar("cc_current_client", default=None)
+
+
+def _error(code: int, message: str) -> dict:
+    return {"jsonrpc": "2.0", "id": None, "error": {"code": code, "message": message}}
+
+
+def _local_origin(origin: str | None) -> bool:
+    """True for requests without Origin or from a localhost page (no DNS rebinding)."""
+    if not origin:
+        return True
+    return urllib.parse.urlsplit(origin).hostname in _LOCAL_HOSTS
+
+
+def _local_host(host: str | None) -> bool:
+    """True if the Host header names the loopback interface (no DNS rebinding)."""
+    if not host:
+        return False
+    try:
+        return urllib.parse.urlsplit(f"//{host}").hostname in _LOCAL_HOSTS
+    except ValueError:
+        return False
+
+
+def http_credentials_path(socket_path: str) -> str:
+    """File holding the daemon's HTTP URL and bearer token (next to its socket)."""
+    return f"{socket_path}.http"
+
+
+def read_http_credentials(socket_path: str) -> dict | None:
+    """{"url": ..., "token": ...} of a daemon serving HTTP, or None.
+
+    Only a regular file owned by this user and private to it is trusted:
+    anything else could point HTTP clients, and their token, elsewhere.
+    """
+    try:
+        fd = os.open(http_credentials_path(socket_path), os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+    except OSError:
+        return None
+    try:
+        with os.fdopen(fd, encoding="utf-8") as fh:
+            st = os.fstat(fh.fileno())
+            if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+                return None
+            credentials = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return credentials if isinstance(credentials, dict) and credentials.get("token") else None
+
+
+class DaemonServer:
+    """
+    Serves MCP clients on a Unix socket and, optionally, streamable HTTP.
+
+    Args:
+        dispatch: Coroutine function (request, size, client) that handles one
+            request and sends its response to client.
+        jobs: The server's JobRegistry (calls of departed clients are cancelled).
+        socket_path: Unix socket to listen on.
+        http_port: Also serve streamable HTTP on 127.0.0.1:http_port (0 = no).
+        idle_timeout: Exit after this many seconds without clients or calls.
+        on_close: Called with a socket client's key once it has disconnected.
+    """
+
+    def __init__(self, dispatch, jobs, socket_path: str, http_port: int = 0,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT, on_close=None):
+        self.dispatch = dispatch
+        self.jobs = jobs
+        self.on_close = on_close
+        self.socket_path = socket_path
+        self.http_port = http_port
+        self.idle_timeout = idle_timeout
+        self.connections = 0
+        self.requests = 0
+        self._ids = itertools.count(1)
+        self._clients: dict = {}
+        self._inflight = 0
+        self._sessions: collections.OrderedDict = collections.OrderedDict()
+        self._sessions_lock = threading.Lock()
+        self._http = None
+        self._token = ""
+        self._loop = None
+        self._stop = None
+        self._last_activity = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "transport": "daemon",
+            "socket": self.socket_path,
+            "http_port": self.http_port or None,
+            "clients": len(self._clients),
+            "connections": self.connections,
+            "http_sessions": len(self._sessions),
+            "requests": self.requests,
+            "in_flight": self._inflight,
+        }
+
+    async def _run(self, request, size: int, client: Client):
+        self.requests += 1
+        self._inflight += 1
+        self._last_activity = self._loop.time()
+        try:
+            await self.dispatch(request, size, client)
+        finally:
+            self._inflight -= 1
+            self._last_activity = self._loop.time()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        client = StreamClient(f"socket-{os.getpid()}-{next(self._ids)}", writer, self.jobs.cancel_client)
+        self.connections += 1
+        self._clients[client] = asyncio.current_task()
+        pending: set = set()
+        departed = False
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    client.send(_error(-32600, "Request too large"))
+                    break
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    client.send(_error(-32700, "Parse error"))
+                    continue
+                task = asyncio.create_task(self._run(request, len(line), client))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except ConnectionError:
+            departed = True
+        # Half-closed: finish the client's calls as stdio does at EOF; gone
+        # altogether: nobody will read the answers
+        if departed or writer.is_closing():
+            self.jobs.cancel_client(client.key)
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._clients.pop(client, None)
+        if self.on_close is not None:
+            self.on_close(client.key)
+        self._last_activity = self._loop.time()
+        try:
+            writer.close()
+        except (ConnectionError, RuntimeError):
+            pass
+
+    def _socket_in_use(self) -> bool:
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.settimeout(0.5)
+            probe.connect(self.socket_path)
+            return True
+        except OSError:
+            return False
+        finally:
+            probe.close()
+
+    async def serve(self) -> bool:
+        """
+        Listen until idle. Returns False if another daemon holds the socket.
+
+        Raises:
+            OSError: The socket's directory is not owned by and private to this
+                user (anyone else could squat or swap the socket), or binding failed.
+        """
+        check_owned(os.path.dirname(self.socket_path) or ".", private=True)
+        if os.path.exists(self.socket_path):
+            if self._socket_in_use():
+                return False
+            os.unlink(self.socket_path)
+
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._last_activity = self._loop.time()
+        # The directory is private already; no umask change, which would
+        # affect every thread of the process
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path, limit=MAX_LINE_BYTES)
+        os.chmod(self.socket_path, 0o600)
+        try:
+            self._loop.add_signal_handler(signal.SIGTERM, self._stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+        try:
+            if self.http_port:
+                self._start_http()
+            while not self._stop.is_set():
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=min(self.idle_timeout, 30))
+                except asyncio.TimeoutError:
+                    pass
+                idle = not self._clients and not self._inflight
+                if idle and self._loop.time() - self._last_activity > self.idle_timeout:
+                    break
+        finally:
+            if self._http is not None:
+                self._http.shutdown()
+                self._http.server_close()
+                try:
+                    os.unlink(http_credentials_path(self.socket_path))
+                except OSError:
+                    pass
+            server.close()
+            # Hang up on connected clients; their handlers cancel what is running
+            handlers = list(self._clients.values())
+            for client in list(self._clients):
+                client.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await server.wait_closed()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+        return True
+
+    # ---- streamable HTTP ----
+
+    def _session(self, session_id: str | None, create: bool) -> str | None:
+        """A new session id (create), the known session_id, or None if unknown."""
+        with self._sessions_lock:
+            if create:
+                session_id = uuid.uuid4().hex
+                self._sessions[session_id] = time.time()
+                while len(self._sessions) > MAX_HTTP_SESSIONS:
+                    self._sessions.popitem(last=False)
+                return session_id
+            if session_id in self._sessions:
+                self._sessions.move_to_end(session_id)
+                return session_id
+            return None
+
+    def _end_session(self, session_id: str) -> bool:
+        with self._sessions_lock:
+            if self._sessions.pop(session_id, None) is None:
+                return False
+        self._loop.call_soon_threadsafe(self.jobs.cancel_client, session_id)
+        return True
+
+    def _start_http(self) -> None:
+        daemon = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status: int, body: bytes = b"", headers: dict | None = None) -> None:
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _checked(self) -> bool:
+                if self.path.split("?")[0] != "/mcp":
+                    self._reply(404)
+                    return False
+                if not _local_host(self.headers.get("Host")) or not _local_origin(self.headers.get("Origin")):
+                    self._reply(403)
+                    return False
+                scheme, _, token = (self.headers.get("Authorization") or "").partition(" ")
+                if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip(), daemon._token):
+                    self._reply(401, headers={"WWW-Authenticate": "Bearer"})
+                    return False
+                return True
+
+            def do_GET(self):
+                # No server-initiated stream: every message answers a POST
+                if self._checked():
+                    self._reply(405, headers={"Allow": "POST, DELETE"})
+
+            def do_DELETE(self):
+                if self._checked():
+                    ended = daemon._end_session(self.headers.get("Mcp-Session-Id", ""))
+                    self._reply(200 if ended else 404)
+
+            def do_POST(self):
+                if not self._checked():
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0 or length > MAX_LINE_BYTES:
+                    # Refused unread: the connection cannot be reused after it
+                    self.close_connection = True
+                    self._reply(413 if length > 0 else 400, headers={"Connection": "close"})
+                    return
+                try:
+                    body = self.rfile.read(length)
+                    request = json.loads(body)
+                except ValueError:
+                    error = json.dumps(_error(-32700, "Parse error")).encode("utf-8")
+                    self._reply(400, error, {"Content-Type": "application/json"})
+                    return
+                initialize = isinstance(request, dict) and request.get("method") == "initialize"
+                if not initialize and not self.headers.get("Mcp-Session-Id"):
+                    error = json.dumps(_error(-32600, "Missing Mcp-Session-Id: call initialize first")).encode("utf-8")
+                    self._reply(400, error, {"Content-Type": "application/json"})
+                    return
+                session = daemon._session(self.headers.get("Mcp-Session-Id"), create=initialize)
+                if session is None:
+                    self._reply(404)
+                    return
+                headers = {"Mcp-Session-Id": session}
+                exchange = HttpExchange(session)
+                future = asyncio.run_coroutine_threadsafe(daemon._run(request, len(body), exchange), daemon._loop)
+                if not isinstance(request, dict) or request.get("id") is None or "method" not in request:
+                    # Notifications and client responses: accepted, no body
+                    self._reply(202, headers=headers)
+                    return
+                if "text/event-stream" in self.headers.get("Accept", ""):
+                    self._stream(future, exchange, request["id"], headers)
+                    return
+                future.result()
+                # Only the response is returned; progress needs event-stream
+                response = b""
+                while not exchange.messages.empty():
+                    line = exchange.messages.get()
+                    if "id" in json.loads(line):
+                        response = line.encode("utf-8")
+                if not response:
+                    self._reply(202, headers=headers)  # cancelled: no response, per MCP
+                    return
+                self._reply(200, response, {**headers, "Content-Type": "application/json"})
+
+            def _stream(self, future, exchange: HttpExchange, request_id, headers: dict) -> None:
+                self.send_response(200)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                try:
+                    while True:
+                        try:
+                            line = exchange.messages.get(timeout=0.2)
+                        except queue.Empty:
+                            if future.done() and exchange.messages.empty():
+                                break
+                            continue
+                        self.wfile.write(b"event: message\ndata: " + line.rstrip("\n").encode("utf-8") + b"\n\n")
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    daemon._loop.call_soon_threadsafe(daemon.jobs.cancel, request_id, exchange.key)
+
+            def log_message(self, *args):
+                pass
+
+        self._token = secrets.token_urlsafe(32)
+        self._http = http.server.ThreadingHTTPServer(("127.0.0.1", self.http_port), Handler)
+        self._http.daemon_threads = True
+        # Credentials readable by the socket's owner only
+        path = http_credentials_path(self.socket_path)
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({"url": f"http://127.0.0.1:{self.http_port}/mcp", "token": self._token}, fh)
+        threading.Thread(target=self._http.serve_forever, name="mcp-http", daemon=True).start()
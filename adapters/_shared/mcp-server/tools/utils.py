@@ -3,17 +3,102 @@ Shared utilities for cognitive-core MCP server tools.
 """
 import os
 import sys
+import threading
 from pathlib import Path
 
-# Import load_config from the canonical shared module (#139 P3)
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
-from generate_utils import load_config as _load_config
+# Import load_config from the canonical shared module (#139 P3).
+# Source tree: adapters/_shared/generate_utils.py (three levels up).
+# Installed:   .cognitive-core/mcp-server/generate_utils.py (two levels up).
+_HERE = Path(__file__).resolve().parent
+for _candidate in (_HERE.parent.parent, _HERE.parent):
+    if (_candidate / "generate_utils.py").is_file():
+        sys.path.insert(0, str(_candidate))
+        break
+from generate_utils import load_config as _load_config  # noqa: E402
+
+
+def find_config(project_dir: str) -> str:
+    """Return the cognitive-core.conf path load_config would use, or ""."""
+    for candidate in (
+        os.path.join(project_dir, "cognitive-core.conf"),
+        os.path.join(project_dir, ".cognitive-core", "cognitive-core.conf"),
+    ):
+        if os.path.isfile(candidate):
+            return candidate
+    return ""
+
+
+class ConfigCache:
+    """In-process cognitive-core.conf snapshots with stat-based invalidation.
+
+    Entries are keyed on the conf path and validated against its mtime, size
+    and inode, so a repeated lookup costs one stat() instead of a bash fork.
+    Safe to share between the event loop and executor threads.
+    """
+
+    def __init__(self, loader=None):
+        self._loader = loader or _load_config
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, project_dir: str) -> dict:
+        """Return CC_* variables for project_dir, reloading only on change."""
+        conf_path = find_config(project_dir)
+        if not conf_path:
+            return {}
+        return self.load(conf_path)
+
+    def load(self, conf_path: str) -> dict:
+        """Return CC_* variables for a specific conf file, reloading only on change."""
+        try:
+            st = os.stat(conf_path)
+        except OSError:
+            return {}
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+        with self._lock:
+            entry = self._entries.get(conf_path)
+            if entry is not None and entry[0] == stamp:
+                self.hits += 1
+                return dict(entry[1])
+            self.misses += 1
+            config = self._loader(conf_path)
+            self._entries[conf_path] = (stamp, config)
+            return dict(config)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def forget(self, root: str) -> None:
+        """Drop the snapshots of conf files under root (its project was evicted)."""
+        prefix = os.path.join(root, "")
+        with self._lock:
+            for path in [p for p in self._entries if p.startswith(prefix)]:
+                del self._entries[path]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+# Process-wide cache shared by the server handlers and tool modules
+CONFIG_CACHE = ConfigCache()
 
 
 def load_config(project_dir: str) -> dict:
     """Load CC_ variables from cognitive-core.conf.
 
-    Delegates to generate_utils.load_config() — single source of truth.
+    Delegates to generate_utils.load_config() — single source of truth —
+    through the process-wide CONFIG_CACHE.
 
     Args:
         project_dir: Project root directory.
@@ -21,7 +106,7 @@ def load_config(project_dir: str) -> dict:
     Returns:
         dict of CC_* environment variables.
     """
-    return _load_config(project_dir=project_dir)
+    return CONFIG_CACHE.get(project_dir)
 
 
 def list_dir_contents(install_dir: str, subdir: str) -> list[str]:
@@ -88,6 +88,14 @@ _adapter_generate_settings() {
 SETEOF
         info "Generated settings.json (no template found, used defaults)."
     fi
+
+    # Route hooks through the warm hook host client (see TOOLS.md "Hook Host")
+    if [ "${CC_HOOK_HOST:-false}" = "true" ]; then
+        sed -i.bak -E \
+            's|"(\$CLAUDE_PROJECT_DIR/)?\.claude/hooks/([A-Za-z0-9_-]+)\.sh"|"python3 $CLAUDE_PROJECT_DIR/.cognitive-core/mcp-server/tools/hook_client.py \2"|g' \
+            "$settings_file" && rm -f "${settings_file}.bak"
+        info "Hooks routed through the warm hook host (CC_HOOK_HOST=true)."
+    fi
 }
 
 _adapter_generate_project_readme() {
@@ -201,6 +209,7 @@ _adapter_post_install() {
         local target_mcp="${project_dir}/.cognitive-core/mcp-server"
         mkdir -p "$target_mcp/tools"
         cp "$shared_mcp/server.py" "$target_mcp/"
+        cp "${SCRIPT_DIR}/adapters/_shared/generate_utils.py" "$target_mcp/" 2>/dev/null || true
         cp "$shared_mcp/requirements.txt" "$target_mcp/" 2>/dev/null || true
         cp "$shared_mcp/TOOLS.md" "$target_mcp/" 2>/dev/null || true
         cp "$shared_mcp/tools/"*.py "$target_mcp/tools/" 2>/dev/null || true
@@ -210,12 +219,17 @@ _adapter_post_install() {
     # Generate .mcp.json for Claude Code MCP integration
     local mcp_json="${project_dir}/.mcp.json"
     if [ ! -f "$mcp_json" ] || [ "${FORCE:-false}" = "true" ]; then
-        cat > "$mcp_json" << 'MCPEOF'
+        # Share one warm server per project (see TOOLS.md "Daemon")
+        local mcp_entry=".cognitive-core/mcp-server/server.py"
+        if [ "${CC_MCP_DAEMON:-false}" = "true" ]; then
+            mcp_entry=".cognitive-core/mcp-server/tools/mcp_bridge.py"
+        fi
+        cat > "$mcp_json" << MCPEOF
 {
   "mcpServers": {
     "cognitive-core": {
       "command": "python3",
-      "args": [".cognitive-core/mcp-server/server.py"],
+      "args": ["${mcp_entry}"],
       "env": {
         "CC_PROJECT_DIR": ".",
         "CC_INSTALL_DIR": ".cognitive-core"
@@ -158,6 +158,7 @@ _adapter_post_install() {
     local mcp_dst="${CC_INSTALL_DIR}/mcp-server"
     if [ -d "$mcp_src" ]; then
         cp -R "${mcp_src}/"* "${mcp_dst}/" 2>/dev/null || true
+        cp "${SCRIPT_DIR}/adapters/_shared/generate_utils.py" "${mcp_dst}/" 2>/dev/null || true
         info "Installed MCP server to .cognitive-core/mcp-server/"
     fi
 
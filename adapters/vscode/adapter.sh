@@ -38,6 +38,10 @@ _adapter_generate_settings() {
         info "Generated .vscode/mcp.json via generate.py"
     else
         # Fallback: generate minimal .vscode/mcp.json directly
+        local mcp_entry=".cognitive-core/mcp-server/server.py"
+        if [ "${CC_MCP_DAEMON:-false}" = "true" ]; then
+            mcp_entry=".cognitive-core/mcp-server/tools/mcp_bridge.py"
+        fi
         cat > "$settings_file" << SETTINGSEOF
 {
   "servers": {
@@ -45,7 +49,7 @@ _adapter_generate_settings() {
       "type": "stdio",
       "command": "python3",
       "args": [
-        ".cognitive-core/mcp-server/server.py"
+        "${mcp_entry}"
       ],
       "env": {
         "CC_PROJECT_DIR": ".",
@@ -151,6 +155,7 @@ _adapter_post_install() {
     if [ -d "$mcp_src" ]; then
         mkdir -p "${mcp_dst}/tools"
         cp "$mcp_src/server.py" "${mcp_dst}/"
+        cp "${SCRIPT_DIR}/adapters/_shared/generate_utils.py" "${mcp_dst}/" 2>/dev/null || true
         cp "$mcp_src/requirements.txt" "${mcp_dst}/" 2>/dev/null || true
         cp "$mcp_src/TOOLS.md" "${mcp_dst}/" 2>/dev/null || true
         cp "$mcp_src/tools/"*.py "${mcp_dst}/tools/" 2>/dev/null || true
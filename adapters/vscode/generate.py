@@ -28,6 +28,10 @@ def generate_settings(project_dir: str, install_dir: str, config: dict) -> None:
     vscode_dir = Path(project_dir) / ".vscode"
     vscode_dir.mkdir(parents=True, exist_ok=True)
     settings_path = vscode_dir / "mcp.json"
+    # CC_MCP_DAEMON: connect through the bridge to the shared per-project daemon
+    entry = ".cognitive-core/mcp-server/server.py"
+    if config.get("CC_MCP_DAEMON") == "true":
+        entry = ".cognitive-core/mcp-server/tools/mcp_bridge.py"
 
     mcp_config = {
         "servers": {
@@ -35,7 +39,7 @@ def generate_settings(project_dir: str, install_dir: str, config: dict) -> None:
                 "type": "stdio",
                 "command": "python3",
                 "args": [
-                    ".cognitive-core/mcp-server/server.py"
+                    entry
                 ],
                 "env": {
                     "CC_PROJECT_DIR": ".",
@@ -13,7 +13,12 @@ fi
 CC_PROJECT_DIR="${CLAUDE_PROJECT_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)}"
 
 # Load configuration (resolution order: project root > .claude/ > user defaults > env)
+# Skipped when the warm hook host already exported the parsed conf (CC_CONFIG_PRELOADED=1)
 _cc_load_config() {
+    if [ "${CC_CONFIG_PRELOADED:-}" = "1" ]; then
+        _cc_trace_init
+        return 0
+    fi
     local conf=""
     if [ -f "${CC_PROJECT_DIR}/cognitive-core.conf" ]; then
         conf="${CC_PROJECT_DIR}/cognitive-core.conf"
@@ -26,6 +31,72 @@ _cc_load_config() {
         # shellcheck disable=SC1090
         source "$conf"
     fi
+    _cc_trace_init
+}
+
+# Opt-in tracing (CC_TRACE=1): one JSONL span per hook run, appended on exit
+# to the trace file the MCP server and hook host also write (format and
+# rotation: adapters/_shared/mcp-server/tools/trace.py). Needs bash 5
+# (EPOCHREALTIME); skipped under the hook host, which traces hooks itself.
+_CC_TRACE_T0="${EPOCHREALTIME:-}"
+_CC_TRACE_ON=""
+_CC_TRACE_DECISION=""
+
+_cc_trace_init() {
+    case "${CC_TRACE:-}" in 1|true) ;; *) return 0 ;; esac
+    [ -n "$_CC_TRACE_T0" ] && [ "${CC_TRACE_HOSTED:-}" != "1" ] || return 0
+    [ -n "$_CC_TRACE_ON" ] && return 0
+    _CC_TRACE_ON=1
+    trap _cc_trace_end EXIT
+}
+
+# Re-install the span writer after a hook replaced the EXIT trap
+_cc_trace_rearm() {
+    [ -n "$_CC_TRACE_ON" ] && trap _cc_trace_end EXIT
+    return 0
+}
+
+_cc_trace_end() {
+    local code=$?
+    [ -n "$_CC_TRACE_ON" ] || return 0
+    _CC_TRACE_ON=""
+    local t0="${_CC_TRACE_T0//[.,]/}" t1="${EPOCHREALTIME//[.,]/}"
+    local dur=$(( t1 - t0 ))
+    local name="${0##*/}"
+    name="${name%.sh}"
+    local session="" decision="$_CC_TRACE_DECISION" bytes_in ts
+    if [[ "${INPUT:-}" =~ \"session_id\"[[:space:]]*:[[:space:]]*\"([^\"]*)\" ]]; then
+        session="${BASH_REMATCH[1]}"
+    fi
+    [ "$code" -eq 2 ] && decision="block"
+    [ -n "$decision" ] && decision="\"${decision}\"" || decision="null"
+    # Byte length, not characters (the locale only changes as the hook exits)
+    local LC_ALL=C
+    bytes_in="${#INPUT}"
+    local file="${CC_TRACE_FILE:-.claude/cognitive-core/trace.jsonl}"
+    case "$file" in
+        /*) ;;
+        "~/"*) file="${HOME}/${file#\~/}" ;;
+        *) file="${CC_PROJECT_DIR}/${file}" ;;
+    esac
+    [ -d "${file%/*}" ] || mkdir -p "${file%/*}" 2>/dev/null || return 0
+    TZ=UTC printf -v ts '%(%Y-%m-%dT%H:%M:%S)T' "${t0:0:${#t0}-6}"
+    printf '{"ts":"%s","start":%s.%s,"dur_ms":%d.%03d,"kind":"hook","source":"bash","name":"%s","session":"%s","decision":%s,"exit":%d,"bytes_in":%d,"pid":%d}\n' \
+        "$ts" "${t0:0:${#t0}-6}" "${t0: -6:3}" "$((dur / 1000))" "$((dur % 1000))" \
+        "$name" "${session//[\\\"]/}" "$decision" "$code" "$bytes_in" "$$" >> "$file" 2>/dev/null || return 0
+    # Rotation check on about 1 run in 32 (wc forks; the bound is approximate)
+    if (( RANDOM % 32 == 0 )); then
+        local max="${CC_TRACE_MAX_BYTES:-10485760}" size i
+        case "$max" in ''|*[!0-9]*) max=10485760 ;; esac
+        size=$(wc -c < "$file" 2>/dev/null | tr -d ' ')
+        if [ "${size:-0}" -gt "$max" ]; then
+            for i in 2 1; do
+                [ -f "${file}.${i}" ] && mv -f "${file}.${i}" "${file}.$((i + 1))" 2>/dev/null || true
+            done
+            mv -f "$file" "${file}.1" 2>/dev/null || true
+        fi
+    fi
+    return 0
 }
 
 # Recursive grep using ripgrep when available, falling back to grep -r
@@ -114,6 +185,7 @@ _cc_json_session_context() {
 
 _cc_json_pretool_deny() {
     local reason="$1"
+    _CC_TRACE_DECISION="deny"
     if command -v jq &>/dev/null; then
         jq -n --arg reason "$reason" '{
             hookSpecificOutput: {
@@ -138,6 +210,7 @@ _cc_json_pretool_deny_structured() {
     local category="${2:-security}"
     local retryable="${3:-false}"
     local suggestion="${4:-}"
+    _CC_TRACE_DECISION="deny"
 
     if command -v jq &>/dev/null; then
         if [ -n "$suggestion" ]; then
@@ -197,6 +270,7 @@ _cc_json_posttool_context() {
 # PreToolUse "ask" decision (escalate to human)
 _cc_json_pretool_ask() {
     local reason="$1"
+    _CC_TRACE_DECISION="ask"
     if command -v jq &>/dev/null; then
         jq -n --arg reason "$reason" '{
             hookSpecificOutput: {
@@ -280,6 +354,63 @@ _cc_compute_sha256() {
     fi
 }
 
+# SHA256 of stdin (same tool detection as _cc_compute_sha256)
+_cc_sha256_stdin() {
+    if command -v sha256sum &>/dev/null; then
+        sha256sum | awk '{print $1}'
+    elif command -v shasum &>/dev/null; then
+        shasum -a 256 | awk '{print $1}'
+    else
+        openssl dgst -sha256 | awk '{print $NF}'
+    fi
+}
+
+# Lint result cache, shared with the MCP server's cc_lint_check
+# (adapters/_shared/mcp-server/tools/lint_cache.py, which documents the
+# layout). Entries are keyed by lint command + lint tool config + file
+# content and evicted least-recently-used beyond CC_LINT_CACHE_MAX_ENTRIES.
+# Keep the config file list in sync with LINT_CONFIG_FILES there.
+_CC_LINT_CONFIG_FILES="ruff.toml .ruff.toml pyproject.toml setup.cfg tox.ini .flake8 \
+.pylintrc pylintrc mypy.ini \
+.eslintrc .eslintrc.js .eslintrc.cjs .eslintrc.json .eslintrc.yml .eslintrc.yaml \
+eslint.config.js eslint.config.mjs eslint.config.cjs tsconfig.json .prettierrc \
+.golangci.yml .golangci.yaml .golangci.toml \
+.rubocop.yml .perlcriticrc checkstyle.xml clippy.toml .editorconfig"
+
+# Print the cache entry path for linting a file with a command
+# Usage: entry=$(_cc_lint_cache_entry "$LINT_CMD" "$FILE_PATH")
+_cc_lint_cache_entry() {
+    local lint_cmd="$1" file="$2"
+    local cache_dir="${CC_PROJECT_DIR}/.claude/cognitive-core/lint-cache"
+    local name conf_digest content_digest key
+    conf_digest=$(for name in $_CC_LINT_CONFIG_FILES; do
+        [ -f "${CC_PROJECT_DIR}/${name}" ] && \
+            printf '%s\n%s\n' "$name" "$(_cc_compute_sha256 "${CC_PROJECT_DIR}/${name}")"
+    done | _cc_sha256_stdin)
+    content_digest=$(_cc_compute_sha256 "$file")
+    [ -n "$content_digest" ] || return 0
+    key=$(printf 'hook\n%s\n%s\n%s\n' "$lint_cmd" "$conf_digest" "$content_digest" | _cc_sha256_stdin)
+    echo "${cache_dir}/${key}.txt"
+}
+
+# Store lint output in a cache entry, then evict the least recently used
+# Usage: _cc_lint_cache_store "$entry" "$LINT_OUTPUT"
+_cc_lint_cache_store() {
+    local entry="$1" output="$2"
+    local cache_dir max
+    cache_dir=$(dirname "$entry")
+    max="${CC_LINT_CACHE_MAX_ENTRIES:-1000}"
+    case "$max" in ''|*[!0-9]*) max=1000 ;; esac
+    # Large outputs are not worth keeping (same bound as lint_cache.py)
+    [ "${#output}" -le 262144 ] || return 0
+    mkdir -p "$cache_dir" 2>/dev/null || return 0
+    printf '%s' "$output" > "${entry}.$$" && mv "${entry}.$$" "$entry"
+    if [ "$(ls -1 "$cache_dir" | wc -l | tr -d ' ')" -gt "$max" ]; then
+        # Entry names are hex digests: safe to pass through ls/xargs
+        (cd "$cache_dir" && ls -1t | tail -n +"$((max + 1))" | xargs rm -f)
+    fi
+}
+
 # Guard wrapper: isolates guard execution, catches errors
 _cc_guard_run() {
     local guard_name="$1"
@@ -45,8 +45,20 @@ fi
 
 # Run configured lint command (substitute $1 with file path)
 LINT_CMD="${CC_LINT_COMMAND//\$1/$FILE_PATH}"
-# shellcheck disable=SC2086
-LINT_OUTPUT=$(${LINT_CMD} 2>&1 || true)
+
+# Unchanged content, command and lint config: reuse the cached output
+CACHE_ENTRY=""
+if [ "${CC_LINT_CACHE:-true}" = "true" ]; then
+    CACHE_ENTRY=$(_cc_lint_cache_entry "$LINT_CMD" "$FILE_PATH")
+fi
+if [ -n "$CACHE_ENTRY" ] && [ -f "$CACHE_ENTRY" ]; then
+    LINT_OUTPUT=$(cat "$CACHE_ENTRY")
+    touch "$CACHE_ENTRY"
+else
+    # shellcheck disable=SC2086
+    LINT_OUTPUT=$(${LINT_CMD} 2>&1 || true)
+    [ -n "$CACHE_ENTRY" ] && _cc_lint_cache_store "$CACHE_ENTRY" "$LINT_OUTPUT"
+fi
 
 if [ -z "$LINT_OUTPUT" ]; then
     exit 0
@@ -22,7 +22,7 @@ if [ -n "$_TOFU_CONF" ] && ! grep -qE '^CC_FRAMEWORK_ROOT=' "$_TOFU_CONF" 2>/dev
     mkdir -p "$(dirname "$_ANCHOR_LOCKDIR")" 2>/dev/null || true
     if mkdir "$_ANCHOR_LOCKDIR" 2>/dev/null; then
         # shellcheck disable=SC2064
-        trap "rm -rf '${_ANCHOR_LOCKDIR}' 2>/dev/null || true" EXIT
+        trap "rm -rf '${_ANCHOR_LOCKDIR}' 2>/dev/null || true; _cc_trace_end" EXIT
         _TOFU_VERSION_JSON="${CC_PROJECT_DIR}/.claude/cognitive-core/version.json"
         if [ -f "$_TOFU_VERSION_JSON" ]; then
             if command -v jq &>/dev/null; then
@@ -45,6 +45,7 @@ if [ -n "$_TOFU_CONF" ] && ! grep -qE '^CC_FRAMEWORK_ROOT=' "$_TOFU_CONF" 2>/dev
         fi
         rm -rf "$_ANCHOR_LOCKDIR" 2>/dev/null || true
         trap - EXIT
+        _cc_trace_rearm
     fi
 fi
 
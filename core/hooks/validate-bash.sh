@@ -289,13 +289,17 @@ if [ -z "$REASON" ] && [ "$_SHARED_GATE" = "true" ]; then
 fi
 
 # --- Project-specific blocked patterns (from config) ---
+# set -f: split on whitespace only — a regex like 'rm.*' must not glob-expand
+# against files in the current directory.
 if [ -z "$REASON" ] && [ -n "${CC_BLOCKED_PATTERNS:-}" ]; then
+    set -f
     for pattern in $CC_BLOCKED_PATTERNS; do
         if echo "$_CMD_CHECK" | grep -qE "$pattern"; then
             REASON="Blocked: matches project safety rule '${pattern}'. Check CC_BLOCKED_PATTERNS in cognitive-core.conf"
             break
         fi
     done
+    set +f
 fi
 
 # Output deny JSON if blocked, otherwise silent exit 0
@@ -968,6 +968,17 @@ fi
 # ---- Adapter post-install ----
 _adapter_post_install "$PROJECT_DIR"
 
+# ---- Bundle agent and skill docs for the MCP server ----
+# One mmapped file instead of a read per doc (rebuilt by the server on change)
+DOC_BUNDLER="${PROJECT_DIR}/.cognitive-core/mcp-server/tools/doc_bundle.py"
+if [ -f "$DOC_BUNDLER" ] && command -v python3 &>/dev/null; then
+    if python3 "$DOC_BUNDLER" --install-dir "${PROJECT_DIR}/.cognitive-core" >/dev/null 2>&1; then
+        info "Bundled agent and skill docs (.cognitive-core/docs.bundle)"
+    else
+        warn "Could not bundle agent and skill docs (MCP server reads the files instead)"
+    fi
+fi
+
 # ---- Summary ----
 header "Installation complete"
 
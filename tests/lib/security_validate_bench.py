@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the validate-bash native engine.
+
+Default mode compares two ways of running the built-in, standard-level and
+CC_BLOCKED_PATTERNS rules over the checked command text:
+
+  per-rule   one compiled regex per rule, each searched line by line in hook
+             order until the first deny (the engine before rule sets were
+             combined)
+  combined   security_validate.compile_rules(): one scan per line reports
+             every matching rule, then the first deny is taken in hook order
+
+Commands come from the parity corpus (tests/lib/validate_bash_corpus.py),
+fragment x wrapper, so the mix is mostly benign traffic with some denies.
+Both variants must agree on every command; the script exits 1 otherwise.
+
+--adversarial runs security_validate.evaluate() on generated commands built
+to make a backtracking engine blow up (long runs that almost match `.*`
+rules, unclosed heredoc substitutions, capital runs for the Jira ticket
+extraction), at --size bytes and a quarter of that. Latency must stay
+linear: the script exits 1 if any case is denied by the validation budget.
+
+Usage:
+  python3 tests/lib/security_validate_bench.py [--rounds N] [--level L] [--blocked P]
+  python3 tests/lib/security_validate_bench.py --adversarial [--size BYTES]
+
+Prints one line per variant (default) or per generated command:
+  <variant> <commands> commands in <seconds>s: <commands/sec> commands/sec
+  <case> <bytes> bytes: <ms> ms (<MB/s> MB/s) <decision> <rule>
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import validate_bash_corpus as corpus  # noqa: E402
+from security_validate import (  # noqa: E402
+    BUILTIN_PATTERNS, GIT_CLEAN_DRY_RUN, GIT_CLEAN_FORCE, STANDARD_PATTERNS,
+    _CASE_INSENSITIVE, _ASCII_LOWER, _byte_text, _capture, _echo, _grep, _lines,
+    _strip_quotes, compile_rules, evaluate, split_patterns, translate_ere,
+)
+
+DEFAULT_BLOCKED = "terraform[[:space:]]+destroy kubectl[[:space:]]+delete docker[[:space:]]+system[[:space:]]+prune"
+
+
+def commands() -> list:
+    """Corpus fragments in every wrapper, with placeholder paths filled in."""
+    paths = {"{repo}": "/srv/repo", "{feature}": "/srv/feature", "{spaced}": "/srv/my repo"}
+    out = []
+    for fragment in corpus.FRAGMENTS:
+        for wrapper in corpus.WRAPPERS:
+            command = wrapper.replace("{c}", fragment)
+            for placeholder, path in paths.items():
+                command = command.replace(placeholder, path)
+            out.append(command)
+    return out
+
+
+def checked_text(command: str) -> str:
+    """The lowercased, quote-stripped text the deny rules see (C locale)."""
+    cmd_lower = _capture(_echo(_byte_text(command)).translate(_ASCII_LOWER))
+    return _capture("".join(_strip_quotes(line) + "\n" for line in _lines(_echo(cmd_lower))))
+
+
+class PerRule:
+    """One regex per rule, searched separately in hook order."""
+
+    def __init__(self, level: str, blocked: tuple):
+        def compile_ere(name, ere):
+            flags = re.ASCII | (re.IGNORECASE if name in _CASE_INSENSITIVE else 0)
+            return re.compile(translate_ere(ere), flags)
+
+        self.builtin = [(name, compile_ere(name, ere)) for name, ere, _ in BUILTIN_PATTERNS]
+        self.clean_force = compile_ere("git-clean-force", GIT_CLEAN_FORCE)
+        self.clean_dry_run = compile_ere("git-clean-dry-run", GIT_CLEAN_DRY_RUN)
+        self.standard = []
+        if level != "minimal":
+            self.standard = [(name, compile_ere(name, ere)) for name, ere, _ in STANDARD_PATTERNS]
+        self.blocked = [re.compile(translate_ere(p), re.ASCII) for p in blocked]
+
+    def decide(self, check: str) -> str:
+        for name, rx in self.builtin:
+            if _grep(rx, check):
+                return name
+        if _grep(self.clean_force, check) and not _grep(self.clean_dry_run, check):
+            return "git-clean-force"
+        for name, rx in self.standard:
+            if _grep(rx, check):
+                return name
+        for rx in self.blocked:
+            if _grep(rx, check):
+                return "blocked-pattern"
+        return ""
+
+
+class Combined:
+    """compile_rules(): one scan, first deny in hook order."""
+
+    def __init__(self, level: str, blocked: tuple):
+        self.level, self.patterns = level, blocked
+
+    def decide(self, check: str) -> str:
+        compiled = compile_rules(False, self.level, self.patterns)
+        hits = compiled.check_scan.scan(check)
+        rule, _reason = compiled.first_deny(hits)
+        if rule:
+            return rule
+        for _pattern, _kind, target in compiled.blocked:
+            if target in hits:
+                return "blocked-pattern"
+        return ""
+
+
+# name -> (prefix, repeated unit, suffix)
+ADVERSARIAL = {
+    "cat-no-pipe": ("", "cat ", ""),
+    "push-no-branch": ("", "git push --force ", ""),
+    "curl-data-no-at": ("", "curl -d ", ""),
+    "base64-no-shell": ("", "base64-d|", ""),
+    "cat-pipe-no-curl": ("", "cat |", ""),
+    "eval-no-subst": ("", "eval $", ""),
+    "heredoc-commit": ("git commit -m \"$(cat <<'EOF'\n", "feat: line with | curl and -d @x\n", "EOF\n)\""),
+    "heredoc-unclosed": ("", "\"$(cat <<", ""),
+    "python-one-liner": ("python3 -c '", "import os;os.system(x);", "'"),
+    "quote-run": ("", "\"'", ""),
+    "jira-capitals": ("curl https://x.atlassian.net/rest/api/3/issue/transitions ", "A", ""),
+    "blocked-near-miss": ("", "terraform  destro ", ""),
+}
+
+
+def adversarial(size: int, level: str, blocked: str) -> int:
+    config = {"CC_SECURITY_LEVEL": level, "CC_BLOCKED_PATTERNS": blocked}
+    env = {"LC_ALL": "C"}
+    failed = 0
+    for name, (prefix, unit, suffix) in ADVERSARIAL.items():
+        timings = []
+        for length in (size // 4, size):
+            body = unit * ((length - len(prefix) - len(suffix)) // len(unit) + 1)
+            command = prefix + body[:length - len(prefix) - len(suffix)] + suffix
+            start = time.perf_counter()
+            result = evaluate(command, config, cwd="/", env=env)
+            elapsed = time.perf_counter() - start
+            timings.append(elapsed)
+            print(f"{name:18s} {len(command):8d} bytes: {elapsed * 1000:8.1f} ms "
+                  f"({len(command) / elapsed / 1e6:5.2f} MB/s) {result['decision']} {result['rule']}")
+            if result["rule"] == "validation-budget":
+                failed += 1
+        print(f"{name:18s} growth x{timings[1] / timings[0]:.1f} for x4 input")
+    if failed:
+        print(f"BUDGET {failed} commands hit the validation budget")
+        return 1
+    print(f"bounded: all {len(ADVERSARIAL) * 2} adversarial commands decided within the budget")
+    return 0
+
+
+def measure(variant, checks: list, rounds: int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        decisions = [variant.decide(check) for check in checks]
+    return time.perf_counter() - start, decisions
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--level", default="standard")
+    parser.add_argument("--blocked", default=DEFAULT_BLOCKED)
+    parser.add_argument("--adversarial", action="store_true")
+    parser.add_argument("--size", type=int, default=1000000)
+    args = parser.parse_args(argv)
+    if args.adversarial:
+        return adversarial(args.size, args.level, args.blocked)
+
+    blocked = tuple(split_patterns(args.blocked))
+    checks = [checked_text(command) for command in commands()]
+    total = len(checks) * args.rounds
+    results = {}
+    for label, variant in (("per-rule", PerRule(args.level, blocked)), ("combined", Combined(args.level, blocked))):
+        elapsed, decisions = measure(variant, checks, args.rounds)
+        results[label] = decisions
+        print(f"{label:9s} {total} commands in {elapsed:.3f}s: {total / elapsed:,.0f} commands/sec")
+
+    if results["per-rule"] != results["combined"]:
+        diff = sum(a != b for a, b in zip(results["per-rule"], results["combined"]))
+        print(f"MISMATCH {diff} commands decided differently")
+        return 1
+    denies = sum(1 for rule in results["combined"] if rule)
+    print(f"agree on all {len(checks)} commands ({denies} denied)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
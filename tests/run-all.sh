@@ -45,6 +45,8 @@ suite_pretty_name() {
         21-snapshot-regression.sh) echo "Snapshot Regression" ;;
         22-skill-sync-preamble.sh) echo "Skill Sync Preamble" ;;
         24-framework-root-anchor.sh) echo "Framework Root Anchor" ;;
+        26-conf-parser.sh) echo "Conf Parser Parity" ;;
+        27-validate-bash-parity.sh) echo "validate-bash Native Parity" ;;
         *) echo "$1" ;;
     esac
 }
@@ -183,4 +183,136 @@ else
     _skip "compact-reminder.sh not found"
 fi
 
+# ---- post-edit-lint.sh: lint result cache ----
+POST_EDIT_LINT="${HOOKS_DIR}/post-edit-lint.sh"
+
+if [ -f "$POST_EDIT_LINT" ] && command -v jq &>/dev/null; then
+    test_dir=$(create_test_dir)
+    cat > "$test_dir/lint.sh" << 'LINTEOF'
+#!/bin/bash
+echo run >> "$(dirname "$0")/runs"
+echo "E501 line too long: $1"
+LINTEOF
+    chmod +x "$test_dir/lint.sh"
+    cat > "$test_dir/cognitive-core.conf" << CONFEOF
+CC_LINT_COMMAND="${test_dir}/lint.sh \\\$1"
+CC_LINT_EXTENSIONS=".py"
+CC_LINT_CACHE_MAX_ENTRIES="2"
+CONFEOF
+    echo 'x = 1' > "$test_dir/a.py"
+
+    _post_edit() {
+        jq -n --arg f "$1" '{tool_name: "Edit", tool_input: {file_path: $f}}' \
+            | CLAUDE_PROJECT_DIR="$test_dir" bash "$POST_EDIT_LINT" 2>/dev/null \
+            | jq -r '.hookSpecificOutput.additionalContext // ""'
+    }
+    _runs() { wc -l < "$test_dir/runs" | tr -d ' '; }
+
+    first=$(_post_edit "$test_dir/a.py")
+    second=$(_post_edit "$test_dir/a.py")
+    assert_contains "post-edit-lint: reports lint output" "$first" "E501"
+    assert_eq "post-edit-lint: unchanged file answered from cache" "1" "$(_runs)"
+    assert_eq "post-edit-lint: cached output identical" "$first" "$second"
+
+    echo 'x = 2' > "$test_dir/a.py"
+    _post_edit "$test_dir/a.py" > /dev/null
+    assert_eq "post-edit-lint: changed content re-lints" "2" "$(_runs)"
+    echo 'line-length = 99' > "$test_dir/ruff.toml"
+    _post_edit "$test_dir/a.py" > /dev/null
+    assert_eq "post-edit-lint: lint config change re-lints" "3" "$(_runs)"
+
+    entries=$(ls "$test_dir/.claude/cognitive-core/lint-cache" | wc -l | tr -d ' ')
+    assert_eq "post-edit-lint: cache evicted to CC_LINT_CACHE_MAX_ENTRIES" "2" "$entries"
+    rm -rf "$test_dir"
+else
+    _skip "post-edit-lint.sh cache (jq required)"
+fi
+
+# ---- hook_client.py / hook_host.py: warm host preserves the hook protocol ----
+HOOK_CLIENT="${ROOT_DIR}/adapters/_shared/mcp-server/tools/hook_client.py"
+
+if [ -f "$HOOK_CLIENT" ] && command -v python3 &>/dev/null; then
+    test_dir=$(create_test_dir)
+    git -C "$test_dir" init --quiet 2>/dev/null || true
+    mkdir -p "$test_dir/.claude/hooks"
+    cp "$HOOKS_DIR"/*.sh "$test_dir/.claude/hooks/"
+    echo 'CC_SECURITY_LEVEL="standard"' > "$test_dir/cognitive-core.conf"
+    export XDG_RUNTIME_DIR="$test_dir"
+
+    _hook_direct() {
+        (cd "$test_dir" && echo "$1" | CLAUDE_PROJECT_DIR="$test_dir" \
+            bash "$test_dir/.claude/hooks/validate-bash.sh" 2>/dev/null; echo "exit=$?")
+    }
+    _hook_client() {
+        (cd "$test_dir" && echo "$1" | CLAUDE_PROJECT_DIR="$test_dir" \
+            python3 "$HOOK_CLIENT" validate-bash 2>/dev/null; echo "exit=$?")
+    }
+
+    # First call has no host: runs the hook directly and spawns the host
+    deny_json="$(mock_bash_json "rm -rf /")"
+    assert_eq "hook-host: cold call matches direct hook (deny)" \
+        "$(_hook_direct "$deny_json")" "$(_hook_client "$deny_json")"
+
+    sock=""
+    for _ in 1 2 3 4 5 6 7 8 9 10; do
+        sock=$(find "$test_dir" -maxdepth 2 -name 'hook-host-*.sock' 2>/dev/null | head -1)
+        [ -n "$sock" ] && break
+        sleep 0.3
+    done
+    if [ -n "$sock" ]; then
+        _pass "hook-host: host started and bound its socket"
+    else
+        _fail "hook-host: host socket not created"
+    fi
+    assert_eq "hook-host: socket directory is private to the user" \
+        "700 $(id -u)" "$(python3 -c 'import os, sys; st = os.stat(os.path.dirname(sys.argv[1])); print(f"{st.st_mode & 0o777:o} {st.st_uid}")' "${sock:-$test_dir/none/x}" 2>/dev/null)"
+
+    assert_eq "hook-host: warm call matches direct hook (deny)" \
+        "$(_hook_direct "$deny_json")" "$(_hook_client "$deny_json")"
+    allow_json="$(mock_bash_json "git status")"
+    assert_eq "hook-host: warm call matches direct hook (allow)" \
+        "$(_hook_direct "$allow_json")" "$(_hook_client "$allow_json")"
+
+    # Hooks run with the calling session's environment, not the host's
+    cat > "$test_dir/.claude/hooks/env-probe.sh" << 'HOOKEOF'
+#!/bin/bash
+echo "$VIRTUAL_ENV $LANG $(echo "$PATH" | tr ':' '\n' | grep /probe/)${API_SECRET:+ leaked}"
+HOOKEOF
+    _hook_env() {
+        (cd "$test_dir" && echo '{}' | CLAUDE_PROJECT_DIR="$test_dir" VIRTUAL_ENV="$1" LANG="$2" \
+            PATH="$3:$PATH" API_SECRET=hunter2 python3 "$HOOK_CLIENT" env-probe 2>/dev/null)
+    }
+    assert_eq "hook-host: hook gets the client's VIRTUAL_ENV, LANG and PATH, not its secrets" \
+        "/venv/a C.UTF-8 /probe/a" "$(_hook_env /venv/a C.UTF-8 /probe/a)"
+    assert_eq "hook-host: environment follows each client" \
+        "/venv/b POSIX /probe/b" "$(_hook_env /venv/b POSIX /probe/b)"
+
+    CLAUDE_PROJECT_DIR="$test_dir" python3 "$HOOK_CLIENT" --stop
+    for _ in 1 2 3 4 5 6 7 8 9 10; do
+        [ -z "$sock" ] || [ ! -e "$sock" ] && break
+        sleep 0.3
+    done
+    if [ -n "$sock" ] && [ ! -e "$sock" ]; then
+        _pass "hook-host: --stop shuts the host down and removes its socket"
+    else
+        _fail "hook-host: socket still present after --stop"
+    fi
+
+    # A socket directory others can write to (squatted) is never used
+    squat_dir=$(create_test_dir)
+    mkdir -m 777 "$squat_dir/cc-$(id -u)"
+    squat_out=$(cd "$test_dir" && echo "$deny_json" | XDG_RUNTIME_DIR="$squat_dir" \
+        CLAUDE_PROJECT_DIR="$test_dir" python3 "$HOOK_CLIENT" validate-bash 2>&1; echo "exit=$?")
+    assert_contains "hook-host: squatted socket directory refused" "$squat_out" "hook host disabled"
+    assert_contains "hook-host: squatted socket directory falls back to the hook (deny)" "$squat_out" '"permissionDecision": "deny"'
+    assert_eq "hook-host: no host started in a squatted directory" "" \
+        "$(find "$squat_dir" -name '*.sock' 2>/dev/null)"
+    rm -rf "$squat_dir"
+
+    unset XDG_RUNTIME_DIR
+    rm -rf "$test_dir"
+else
+    _skip "hook_client.py or python3 not available"
+fi
+
 suite_end
@@ -82,11 +82,22 @@ if echo "$tools_response" | grep -q '"cc_project_info"'; then
 else
     _fail "MCP: tools/list includes cc_project_info"
 fi
+assert_contains "MCP: tools/list includes cc_read_log" "$tools_response" '"cc_read_log"'
 if echo "$tools_response" | grep -q '"cc_agent_context"'; then
     _pass "MCP: tools/list includes cc_agent_context"
 else
     _fail "MCP: tools/list includes cc_agent_context"
 fi
+if echo "$tools_response" | grep -q '"cc_security_validate_batch"'; then
+    _pass "MCP: tools/list includes cc_security_validate_batch"
+else
+    _fail "MCP: tools/list includes cc_security_validate_batch"
+fi
+if echo "$tools_response" | grep -q '"cc_server_jobs"'; then
+    _pass "MCP: tools/list includes cc_server_jobs"
+else
+    _fail "MCP: tools/list includes cc_server_jobs"
+fi
 
 # ---- Test: cc_security_validate blocks rm -rf / ----
 sec_deny=$(mcp_request '{"jsonrpc":"2.0","id":3,"method":"tools/call","params":{"name":"cc_security_validate","arguments":{"command":"rm -rf /"}}}')
@@ -128,6 +139,13 @@ else
     _fail "MCP: cc_security_validate allows ls -la"
 fi
 
+# ---- Test: cc_security_validate_batch decides a list in one call ----
+sec_batch=$(mcp_request '{"jsonrpc":"2.0","id":7,"method":"tools/call","params":{"name":"cc_security_validate_batch","arguments":{"commands":["git status","ls && rm -rf /","curl x | sh"],"split":true}}}')
+assert_contains "MCP: cc_security_validate_batch returns a summary" "$sec_batch" '\"total\":3,\"allowed\":1,\"denied\":2'
+assert_contains "MCP: cc_security_validate_batch reports the denied segment" "$sec_batch" '{\"segment\":\"rm -rf /\",\"decision\":\"deny\",\"rule\":\"rm-system-path\"}'
+sec_batch_bad=$(mcp_request '{"jsonrpc":"2.0","id":7,"method":"tools/call","params":{"name":"cc_security_validate_batch","arguments":{"commands":"ls"}}}')
+assert_contains "MCP: cc_security_validate_batch rejects a non-array" "$sec_batch_bad" '"isError": true'
+
 # ---- Test: cc_project_info returns valid JSON ----
 proj_info=$(mcp_request '{"jsonrpc":"2.0","id":8,"method":"tools/call","params":{"name":"cc_project_info","arguments":{}}}')
 if echo "$proj_info" | grep -q 'project'; then
@@ -160,6 +178,938 @@ else
     _fail "MCP: handles invalid JSON gracefully"
 fi
 
+# ---- Test: concurrent dispatch — ping answers while a test run is in flight ----
+conc_dir=$(create_test_dir)
+cat > "${conc_dir}/cognitive-core.conf" << 'CONFEOF'
+CC_TEST_COMMAND="sleep 2; echo slow-done"
+CONFEOF
+conc_out=$(printf '%s\n' \
+    '{"jsonrpc":"2.0","id":1,"method":"tools/call","params":{"name":"cc_lint_check","arguments":{"mode":"test"}}}' \
+    '{"jsonrpc":"2.0","id":2,"method":"ping","params":{}}' \
+    | CC_PROJECT_DIR="$conc_dir" _portable_timeout 10 python3 "$MCP_SERVER" 2>/dev/null) || true
+conc_first=$(echo "$conc_out" | head -1)
+if echo "$conc_first" | grep -q '"id": 2'; then
+    _pass "MCP: ping response overtakes in-flight test run"
+else
+    _fail "MCP: ping response overtakes in-flight test run" "First line: ${conc_first}"
+fi
+if echo "$conc_out" | grep -q 'slow-done'; then
+    _pass "MCP: in-flight test run still completes after stdin closes"
+else
+    _fail "MCP: in-flight test run still completes after stdin closes" "Got: ${conc_out}"
+fi
+rm -rf "$conc_dir"
+
+# ---- Test: notifications/cancelled kills the in-flight process group ----
+cancel_dir=$(create_test_dir)
+cat > "${cancel_dir}/cognitive-core.conf" << 'CONFEOF'
+CC_TEST_COMMAND="sleep 41 & sleep 42; wait"
+CONFEOF
+cancel_out=$(CC_PROJECT_DIR="$cancel_dir" _portable_timeout 20 python3 -c "
+import json, os, subprocess, sys, time
+p = subprocess.Popen([sys.executable, '${MCP_SERVER}'], stdin=subprocess.PIPE,
+                     stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+def send(m):
+    p.stdin.write(json.dumps(m) + '\\n'); p.stdin.flush()
+send({'jsonrpc': '2.0', 'id': 1, 'method': 'tools/call',
+      'params': {'name': 'cc_lint_check', 'arguments': {'mode': 'test'}}})
+time.sleep(1)
+send({'jsonrpc': '2.0', 'id': 2, 'method': 'tools/call',
+      'params': {'name': 'cc_server_jobs', 'arguments': {}}})
+jobs = json.loads(json.loads(p.stdout.readline())['result']['content'][0]['text'])['jobs']
+print('JOBS', [j['tool'] for j in jobs])
+send({'jsonrpc': '2.0', 'method': 'notifications/cancelled', 'params': {'requestId': 1}})
+time.sleep(1)
+alive = subprocess.run(['pgrep', '-f', 'sleep 4[12]'], capture_output=True, text=True).stdout.split()
+print('ALIVE', len(alive))
+p.stdin.close()
+print('REST', repr(p.stdout.read()))
+p.wait()
+" 2>&1) || true
+assert_contains "MCP: cc_server_jobs lists running cc_lint_check" "$cancel_out" "JOBS ['cc_lint_check']"
+assert_contains "MCP: cancelled call leaves no subprocesses behind" "$cancel_out" "ALIVE 0"
+assert_contains "MCP: cancelled call gets no response" "$cancel_out" "REST ''"
+rm -rf "$cancel_dir"
+
+# ---- Test: test runs stream notifications/progress and return a summary ----
+progress_dir=$(create_test_dir)
+cat > "${progress_dir}/cognitive-core.conf" << 'CONFEOF'
+CC_TEST_COMMAND="echo 't.py::a PASSED'; sleep 0.8; echo 't.py::b FAILED'; echo '== 1 passed, 1 failed in 0.8s =='; exit 1"
+CONFEOF
+progress_out=$(CC_PROJECT_DIR="$progress_dir" _portable_timeout 10 python3 -c "
+import json, subprocess, sys
+request = {'jsonrpc': '2.0', 'id': 1, 'method': 'tools/call',
+           'params': {'name': 'cc_lint_check', 'arguments': {'mode': 'test'}, '_meta': {'progressToken': 'p1'}}}
+out = subprocess.run([sys.executable, '${MCP_SERVER}'], input=json.dumps(request) + '\n',
+                     capture_output=True, text=True).stdout
+messages = [json.loads(line) for line in out.splitlines()]
+notes = [m['params'] for m in messages if m.get('method') == 'notifications/progress']
+print('NOTES', len(notes) >= 2, all(n['progressToken'] == 'p1' for n in notes))
+print('FIRST', notes[0]['counters']['passed'], 'PROGRESS_UP', notes[0]['progress'] < notes[-1]['progress'])
+summary = json.loads(messages[-1]['result']['content'][0]['text'])
+print('SUMMARY', summary['exit_code'], summary['counters']['passed'], summary['counters']['failed'], summary['failures'])
+" 2>&1) || true
+assert_contains "MCP: test run sends progress notifications before exit" "$progress_out" "NOTES True True"
+assert_contains "MCP: progress carries live counters, monotonic progress" "$progress_out" "FIRST 1 PROGRESS_UP True"
+assert_contains "MCP: test result is a summary with counters and failures" "$progress_out" "SUMMARY 1 1 1 ['t.py::b FAILED']"
+rm -rf "$progress_dir"
+
+# ---- Test: bounded capture spills large output; cc_read_log pages it ----
+spill_dir=$(create_test_dir)
+cat > "${spill_dir}/cognitive-core.conf" << 'CONFEOF'
+CC_LINT_COMMAND="yes lintline | head -c 4500000"
+CC_MCP_OUTPUT_BYTES="4096"
+CONFEOF
+spill_out=$(CC_PROJECT_DIR="$spill_dir" _portable_timeout 20 python3 -c "
+import json, re, subprocess, sys
+def call(i, name, arguments):
+    return {'jsonrpc': '2.0', 'id': i, 'method': 'tools/call', 'params': {'name': name, 'arguments': arguments}}
+p = subprocess.Popen([sys.executable, '${MCP_SERVER}'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+p.stdin.write(json.dumps(call(1, 'cc_lint_check', {})) + '\n'); p.stdin.flush()
+line = p.stdout.readline()
+print('RESPONSE_SMALL', len(line) < 20000)
+log_id = re.search(r'stdout: (\S+\.log) \((\d+) bytes\)', json.loads(line)['result']['content'][0]['text'])
+print('LOG', log_id.group(2))
+p.stdin.write(json.dumps(call(2, 'cc_read_log', {'log_id': log_id.group(1), 'offset': -9, 'length': 100})) + '\n')
+p.stdin.write(json.dumps(call(3, 'cc_read_log', {'log_id': '../cognitive-core.conf'})) + '\n')
+p.stdin.close()
+page, bad = (json.loads(l) for l in p.stdout.read().splitlines())
+page = json.loads(page['result']['content'][0]['text'])
+print('PAGE', page['offset'], page['length'], page['eof'], repr(page['text']))
+print('BAD', bad['result'].get('isError'))
+" 2>&1) || true
+assert_contains "MCP: large lint output returns bounded response" "$spill_out" "RESPONSE_SMALL True"
+assert_contains "MCP: full output spilled to a log with its size" "$spill_out" "LOG 4500000"
+assert_contains "MCP: cc_read_log pages by byte range from the end" "$spill_out" "PAGE 4499991 9 True 'lintline\n'"
+assert_contains "MCP: cc_read_log rejects path-like log ids" "$spill_out" "BAD True"
+rm -rf "$spill_dir"
+
+# ---- Test: cc_lint_check answers unchanged files from the lint cache ----
+lcache_dir=$(create_test_dir)
+mkdir -p "${lcache_dir}/src"
+echo 'x = 1' > "${lcache_dir}/src/a.py"
+cat > "${lcache_dir}/cognitive-core.conf" << 'CONFEOF'
+CC_LINT_COMMAND="echo run >> runs; echo issues in \$1; exit 1"
+CC_LINT_EXTENSIONS=".py"
+CONFEOF
+lcache_out=$(CC_PROJECT_DIR="$lcache_dir" _portable_timeout 20 python3 -c "
+import json, subprocess, sys
+def call(i, name, arguments):
+    return json.dumps({'jsonrpc': '2.0', 'id': i, 'method': 'tools/call', 'params': {'name': name, 'arguments': arguments}}) + '\n'
+p = subprocess.Popen([sys.executable, '${MCP_SERVER}'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+def text(i, name, arguments):
+    p.stdin.write(call(i, name, arguments)); p.stdin.flush()
+    return json.loads(p.stdout.readline())['result']['content'][0]['text']
+first = text(1, 'cc_lint_check', {'path': 'src/a.py'})
+second = text(2, 'cc_lint_check', {'path': 'src/a.py'})
+tree = [text(3, 'cc_lint_check', {'path': 'src'}) for _ in range(2)]
+open('${lcache_dir}/src/a.py', 'a').write('y = 2\n')
+third = text(4, 'cc_lint_check', {'path': 'src/a.py'})
+stats = json.loads(text(5, 'cc_server_stats', {}))['lint_cache']
+p.stdin.close(); p.wait()
+print('HIT', 'Cache: hit' in second and 'Exit code: 1' in second and 'issues in src/a.py' in second)
+print('TREE', 'Cache: hit' not in tree[0] and 'Cache: hit' in tree[1])
+print('CHANGED', 'Cache: hit' not in third)
+print('RUNS', len(open('${lcache_dir}/runs').read().split()), 'STATS', stats['hits'], stats['stores'])
+" 2>&1) || true
+assert_contains "lint cache: unchanged file answered from cache (same exit code/output)" "$lcache_out" "HIT True"
+assert_contains "lint cache: unchanged directory answered from cache" "$lcache_out" "TREE True"
+assert_contains "lint cache: edited file re-linted" "$lcache_out" "CHANGED True"
+assert_contains "lint cache: linter ran only on misses; stats reported" "$lcache_out" "RUNS 3 STATS 2 3"
+memo_out=$(python3 -c "
+import os, sys
+sys.path.insert(0, '${ROOT_DIR}/adapters/_shared/mcp-server')
+from tools.lint_cache import LintCache
+cache = LintCache(max_memo_entries=3)
+paths = []
+for i in range(5):
+    paths.append(os.path.join('${lcache_dir}', f'memo{i}.py'))
+    with open(paths[-1], 'w') as fh:
+        fh.write(str(i))
+    cache.file_digest(paths[-1])
+os.unlink(paths[-1])
+cache.file_digest(paths[-1])
+stats = cache.stats()
+print('MEMO', stats['memo_entries'], stats['memo_evictions'], cache.memo_entries('${lcache_dir}'))
+" 2>&1) || true
+assert_contains "lint cache: file hash memo bounded, deleted files dropped" "$memo_out" "MEMO 2 2 2"
+rm -rf "$lcache_dir"
+
+# ---- Test: sharded directory lint merges shard output deterministically ----
+shard_dir=$(create_test_dir)
+mkdir -p "${shard_dir}/src/sub"
+for f in a b c sub/d sub/e; do printf 'ok\nbad %s\nok\nbad again\n' "$f" > "${shard_dir}/src/${f}.sh"; done
+echo 'bad' > "${shard_dir}/src/notes.txt"
+cat > "${shard_dir}/cognitive-core.conf" << 'CONFEOF'
+CC_LINT_COMMAND="grep -Hn bad \$1"
+CC_LINT_EXTENSIONS=".sh"
+CC_LINT_CACHE="false"
+CC_LINT_SHARDS="3"
+CONFEOF
+shard_out=$(CC_PROJECT_DIR="$shard_dir" _portable_timeout 20 python3 -c "
+import json, subprocess, sys
+def call(i, name, arguments):
+    return json.dumps({'jsonrpc': '2.0', 'id': i, 'method': 'tools/call', 'params': {'name': name, 'arguments': arguments}}) + '\n'
+p = subprocess.Popen([sys.executable, '${MCP_SERVER}'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+def text(i, arguments):
+    p.stdin.write(call(i, 'cc_lint_check', arguments)); p.stdin.flush()
+    return json.loads(p.stdout.readline())['result']['content'][0]['text']
+three = text(1, {'path': 'src'})
+one = text(2, {'path': 'src', 'shards': 1})
+single = text(3, {'path': 'src/a.sh', 'shards': 0})
+p.stdin.close(); p.wait()
+body = lambda t: t.split('--- stdout ---')[1].split('--- stderr ---')[0]
+print('SAME', body(three) == body(one))
+print('ORDER', [l.split(':')[0] for l in body(three).split()[::2]])
+print('SHARDS', three.count('files, 1 run(s)'), 'wall' in three, 'Exit code: 0' in three)
+print('SINGLE', '--- shards ---' not in single and 'src/a.sh:2:bad a' in single)
+" 2>&1) || true
+assert_contains "lint shards: merged output independent of shard count" "$shard_out" "SAME True"
+assert_contains "lint shards: diagnostics ordered by file then line" "$shard_out" "ORDER ['src/a.sh', 'src/a.sh', 'src/b.sh', 'src/b.sh', 'src/c.sh', 'src/c.sh', 'src/sub/d.sh', 'src/sub/d.sh', 'src/sub/e.sh', 'src/sub/e.sh']"
+assert_contains "lint shards: per-shard timing reported" "$shard_out" "SHARDS 3 True True"
+assert_contains "lint shards: single file runs unsharded" "$shard_out" "SINGLE True"
+rm -rf "$shard_dir"
+
+# ---- Test: affected-tests runs only tests importing changed files ----
+impact_dir=$(create_test_dir)
+mkdir -p "${impact_dir}/src/pkg" "${impact_dir}/tests" "${impact_dir}/web"
+touch "${impact_dir}/src/pkg/__init__.py"
+echo 'def f(): return 1' > "${impact_dir}/src/pkg/core.py"
+printf 'from .core import f\n' > "${impact_dir}/src/pkg/api.py"
+printf 'from pkg.api import f\n' > "${impact_dir}/tests/test_api.py"
+printf 'import os\n' > "${impact_dir}/tests/test_other.py"
+echo 'export const x = 1;' > "${impact_dir}/web/util.ts"
+echo "import { x } from './util';" > "${impact_dir}/web/a.test.ts"
+cat > "${impact_dir}/cognitive-core.conf" << 'CONFEOF'
+CC_TEST_COMMAND="echo full suite"
+CC_TEST_FILES_COMMAND="echo ran \$1"
+CONFEOF
+(cd "$impact_dir" && git init -q -b main && git add -A \
+    && git -c user.email=t@t -c user.name=t commit -qm init && git checkout -qb feat)
+echo '# edit' >> "${impact_dir}/src/pkg/core.py"
+impact_out=$(CC_PROJECT_DIR="$impact_dir" _portable_timeout 30 python3 -c "
+import json, os, subprocess, sys
+p = subprocess.Popen([sys.executable, '${MCP_SERVER}'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+def run(i):
+    p.stdin.write(json.dumps({'jsonrpc': '2.0', 'id': i, 'method': 'tools/call',
+        'params': {'name': 'cc_lint_check', 'arguments': {'mode': 'affected-tests'}}}) + '\n'); p.stdin.flush()
+    return json.loads(json.loads(p.stdout.readline())['result']['content'][0]['text'])
+first = run(1)
+print('FIRST', first['tail'], first['affected']['base'], first['affected']['graph']['parsed'])
+second = run(2)['affected']
+print('GREEN', second['base'], second.get('skipped'), second['graph']['parsed'])
+open('${impact_dir}/web/util.ts', 'a').write('// edit\n')
+print('JS', run(3)['tail'])
+os.makedirs('${impact_dir}/docs')
+for doc in ('README.md', 'docs/guide.md', '.claude/sessions.json'):
+    open(os.path.join('${impact_dir}', doc), 'w').write('x\n')
+docs = run(31)['affected']
+print('DOCS', docs.get('skipped'), docs['full_run'], docs['no_tests'])
+open('${impact_dir}/pyproject.toml', 'w').write('[tool.x]\n')
+full = run(4)
+print('FULL', full['tail'], full['affected']['full_run'])
+open('${impact_dir}/tests/data.json', 'w').write('{}\\n')
+open('${impact_dir}/main.go', 'w').write('package main\\n')
+open('${impact_dir}/tests/notes.md', 'w').write('fixture\\n')
+data = run(5)
+print('UNMAPPED', data['tail'], data['affected']['full_run'], data['affected']['unmapped'])
+p.stdin.close(); p.wait()
+" 2>&1) || true
+assert_contains "affected-tests: changed module selects its importing tests only" "$impact_out" "FIRST ran tests/test_api.py main 7"
+assert_contains "affected-tests: nothing to run after a green run; graph reused" "$impact_out" "GREEN last-green no affected tests 0"
+assert_contains "affected-tests: JS/TS relative imports tracked" "$impact_out" "JS ran web/a.test.ts"
+assert_contains "affected-tests: project config change runs the full suite" "$impact_out" "FULL full suite pyproject.toml changed"
+assert_contains "affected-tests: changes outside the import graph run the full suite" "$impact_out" "UNMAPPED full suite 3 changed files outside the import graph ['main.go', 'tests/data.json', 'tests/notes.md']"
+assert_contains "affected-tests: docs and hook state select no tests" "$impact_out" "DOCS no affected tests None ['.claude/sessions.json', 'README.md', 'docs/guide.md']"
+rm -rf "$impact_dir"
+
+# ---- Test: background watcher pre-lints; cc_lint_check reads the snapshot ----
+watch_dir=$(create_test_dir)
+mkdir -p "${watch_dir}/src"
+printf 'ok\nbad\n' > "${watch_dir}/src/a.py"
+cat > "${watch_dir}/cognitive-core.conf" << 'CONFEOF'
+CC_LINT_COMMAND="echo run >> runs; grep -Hn bad \$1"
+CC_LINT_EXTENSIONS=".py"
+CC_LINT_WATCH="true"
+CC_LINT_WATCH_DEBOUNCE_MS="50"
+CONFEOF
+watch_out=$(CC_PROJECT_DIR="$watch_dir" _portable_timeout 30 python3 -c "
+import json, subprocess, sys, time
+p = subprocess.Popen([sys.executable, '${MCP_SERVER}'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+def text(i, name, arguments):
+    p.stdin.write(json.dumps({'jsonrpc': '2.0', 'id': i, 'method': 'tools/call',
+        'params': {'name': name, 'arguments': arguments}}) + '\n'); p.stdin.flush()
+    return json.loads(p.stdout.readline())['result']['content'][0]['text']
+def wait_fresh(i):
+    for _ in range(100):
+        out = text(i, 'cc_lint_check', {'path': 'src/a.py'})
+        if 'Snapshot: fresh' in out:
+            return out
+        time.sleep(0.1)
+    return out
+first = wait_fresh(1)
+print('SNAPSHOT', 'src/a.py:2:bad' in first)
+open('${watch_dir}/src/a.py', 'a').write('bad again\n')
+stale = text(2, 'cc_lint_check', {'path': 'src/a.py'})
+print('STALE', 'Snapshot: stale' in stale or 'src/a.py:3:' in stale)
+relinted = wait_fresh(3)
+print('RELINT', 'src/a.py:3:bad again' in relinted)
+forced = text(4, 'cc_lint_check', {'path': 'src/a.py', 'fresh': True})
+print('FORCED', 'Snapshot:' not in forced)
+print('STATS', json.loads(text(5, 'cc_server_stats', {}))['lint_watch']['files'])
+p.stdin.close(); p.wait()
+" 2>&1) || true
+assert_contains "lint watch: cc_lint_check answered from the background snapshot" "$watch_out" "SNAPSHOT True"
+assert_contains "lint watch: edited file reported stale until re-linted" "$watch_out" "STALE True"
+assert_contains "lint watch: watcher re-lints changed files" "$watch_out" "RELINT True"
+assert_contains "lint watch: fresh=true bypasses the snapshot" "$watch_out" "FORCED True"
+assert_contains "lint watch: cc_server_stats reports watched files" "$watch_out" "STATS 1"
+poll_out=$(python3 -c "
+import os, sys, time
+sys.path.insert(0, '${ROOT_DIR}/adapters/_shared/mcp-server')
+from tools.lint_watch import _Poller
+poller = _Poller(['${watch_dir}/src'], ['.py'])
+time.sleep(0.01)
+open('${watch_dir}/src/new.py', 'w').write('x\n')
+print('POLL', sorted(os.path.basename(p) for p in poller.read(0)))
+" 2>&1) || true
+assert_contains "lint watch: polling fallback detects new files" "$poll_out" "POLL ['new.py']"
+rm -rf "$watch_dir"
+
+# ---- Test: output=delta lists only added/resolved findings ----
+delta_dir=$(create_test_dir)
+mkdir -p "${delta_dir}/bin" "${delta_dir}/src"
+cat > "${delta_dir}/bin/ruff" << 'PYEOF'
+#!/usr/bin/env python3
+# Fake ruff: one finding per line containing "bad"; JSON when asked
+import json, os, sys
+path = [a for a in sys.argv[2:] if not a.startswith("-")][0]
+found = [
+    {"code": "X1", "message": line.strip(), "filename": os.path.abspath(path), "location": {"row": n, "column": 1}}
+    for n, line in enumerate(open(path), 1) if "bad" in line
+]
+if "--output-format=json" in sys.argv:
+    print(json.dumps(found))
+else:
+    for d in found:
+        print(f"{path}:{d['location']['row']}:1: X1 {d['message']}")
+sys.exit(1 if found else 0)
+PYEOF
+chmod +x "${delta_dir}/bin/ruff"
+printf 'bad one\nok\nbad two\n' > "${delta_dir}/src/a.py"
+cat > "${delta_dir}/cognitive-core.conf" << CONFEOF
+CC_LINT_COMMAND="${delta_dir}/bin/ruff check \\\$1"
+CC_LINT_EXTENSIONS=".py"
+CONFEOF
+delta_out=$(CC_PROJECT_DIR="$delta_dir" _portable_timeout 20 python3 -c "
+import json, subprocess, sys
+p = subprocess.Popen([sys.executable, '${MCP_SERVER}'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+def text(i, arguments):
+    p.stdin.write(json.dumps({'jsonrpc': '2.0', 'id': i, 'method': 'tools/call',
+        'params': {'name': 'cc_lint_check', 'arguments': arguments}}) + '\n'); p.stdin.flush()
+    return json.loads(p.stdout.readline())['result']['content'][0]['text']
+first = text(1, {'path': 'src/a.py', 'output': 'delta'})
+print('FIRST', 'Parser: ruff' in first, 'Delta: 2 added, 0 resolved, 0 unchanged' in first)
+open('${delta_dir}/src/a.py', 'w').write('new line\\nbad one\\nok\\nbad three\\n')
+second = text(2, {'path': 'src/a.py', 'output': 'delta'})
+print('SECOND', 'Delta: 1 added, 1 resolved, 1 unchanged' in second)
+print('ADDED', second.split('--- added ---')[1].split('--- resolved ---')[0].strip())
+print('RESOLVED', second.split('--- resolved ---')[1].strip())
+print('FULL', 'src/a.py:2:1: X1 bad one' in text(3, {'path': 'src/a.py'}))
+p.stdin.close(); p.wait()
+" 2>&1) || true
+assert_contains "lint delta: first run lists every finding, parsed from JSON" "$delta_out" "FIRST True True"
+assert_contains "lint delta: moved findings unchanged, new/fixed ones reported" "$delta_out" "SECOND True"
+assert_contains "lint delta: added finding with its new position" "$delta_out" "ADDED src/a.py:4:1: error X1 bad three"
+assert_contains "lint delta: resolved finding listed" "$delta_out" "RESOLVED src/a.py:3:1: error X1 bad two"
+assert_contains "lint delta: full output unchanged by default" "$delta_out" "FULL True"
+delta_text=$(python3 -c "
+import sys
+sys.path.insert(0, '${ROOT_DIR}/adapters/_shared/mcp-server')
+from tools.diagnostics import parse, structured_command
+print(structured_command('npx eslint src | head')[1], structured_command('cargo clippy -- -D warnings')[0])
+found, parser = parse(None, 'a.go:3:2: ineffectual assignment (ineffassign)\\nsrc/x.ts(4,5): error TS2322: Bad type\\n', '', '.')
+print(parser, [(d['file'], d['line'], d['code']) for d in found])
+" 2>&1) || true
+assert_contains "lint delta: only simple commands rewritten for JSON" "$delta_text" "None cargo clippy --message-format=json -- -D warnings"
+assert_contains "lint delta: regex fallback parses gcc- and tsc-style output" "$delta_text" "text [('a.go', 3, ''), ('src/x.ts', 4, 'TS2322')]"
+rm -rf "$delta_dir"
+
+# ---- Test: tool subprocesses supervised (process group, rlimits, usage) ----
+proc_dir=$(create_test_dir)
+cat > "${proc_dir}/cognitive-core.conf" << CONFEOF
+CC_LINT_COMMAND="sleep 30 & echo \\\$! > ${proc_dir}/lint.pid; echo nofile=\\\$(ulimit -n)"
+CC_LINT_CACHE="false"
+CC_TEST_COMMAND="sleep 30 & echo \\\$! > ${proc_dir}/test.pid; wait"
+CC_TEST_TIMEOUT="1"
+CC_MCP_LIMIT_OPEN_FILES="64"
+CONFEOF
+proc_out=$(CC_PROJECT_DIR="$proc_dir" _portable_timeout 20 python3 -c "
+import json, os, subprocess, sys, time
+p = subprocess.Popen([sys.executable, '${MCP_SERVER}'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+def text(i, name, arguments):
+    p.stdin.write(json.dumps({'jsonrpc': '2.0', 'id': i, 'method': 'tools/call',
+        'params': {'name': name, 'arguments': arguments}}) + '\n'); p.stdin.flush()
+    return json.loads(p.stdout.readline())['result']['content'][0]['text']
+def alive(name):
+    # Killed orphans may linger as zombies when pid 1 does not reap them
+    time.sleep(0.2)
+    pid = open(os.path.join('${proc_dir}', name)).read().strip()
+    state = subprocess.run(['ps', '-o', 'stat=', '-p', pid], capture_output=True, text=True).stdout.strip()
+    return bool(state) and not state.startswith('Z')
+started = time.monotonic()
+lint = text(1, 'cc_lint_check', {'path': '.'})
+print('LINT', 'nofile=64' in lint, time.monotonic() - started < 10, 'Usage: cpu' in lint)
+print('LINT_ORPHAN', alive('lint.pid'))
+test = json.loads(text(2, 'cc_lint_check', {'mode': 'test'}))
+print('TEST', test['timed_out'], sorted(test['usage']))
+print('TEST_ORPHAN', alive('test.pid'))
+print('STATS', json.loads(text(3, 'cc_server_stats', {}))['processes']['timeouts'])
+p.stdin.close(); p.wait()
+" 2>&1) || true
+assert_contains "process supervision: rlimit applied, lint returns without waiting for its background child" "$proc_out" "LINT True True True"
+assert_contains "process supervision: children left behind by lint are killed" "$proc_out" "LINT_ORPHAN False"
+assert_contains "process supervision: test summary reports usage" "$proc_out" "TEST True ['cpu_s', 'max_rss_kb', 'sys_s', 'user_s']"
+assert_contains "process supervision: timeout kills the whole process group" "$proc_out" "TEST_ORPHAN False"
+assert_contains "process supervision: cc_server_stats counts timeouts" "$proc_out" "STATS 1"
+rm -rf "$proc_dir"
+
+# ---- Test: admission control queues heavy calls, never interactive ones ----
+adm_dir=$(create_test_dir)
+cat > "${adm_dir}/cognitive-core.conf" << CONFEOF
+CC_TEST_COMMAND="sleep 2; echo done"
+CC_MCP_MAX_TEST_JOBS="1"
+CC_MCP_MAX_HEAVY_JOBS="4"
+CONFEOF
+adm_out=$(CC_PROJECT_DIR="$adm_dir" _portable_timeout 20 python3 -c "
+import json, subprocess, sys, time
+p = subprocess.Popen([sys.executable, '${MCP_SERVER}'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+def send(i, method, params):
+    p.stdin.write(json.dumps({'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params}) + '\n'); p.stdin.flush()
+def call(i, name, arguments):
+    send(i, 'tools/call', {'name': name, 'arguments': arguments})
+# Wait for the server to be up, so the first run is still going at call 3
+send(0, 'ping', {})
+p.stdout.readline()
+call(1, 'cc_lint_check', {'mode': 'test'})
+call(2, 'cc_lint_check', {'mode': 'test'})
+time.sleep(0.3)
+call(3, 'cc_server_jobs', {})
+send(4, 'ping', {})
+start = time.monotonic()
+responses = {}
+while len(responses) < 4:
+    msg = json.loads(p.stdout.readline())
+    responses[msg['id']] = (msg, time.monotonic() - start)
+jobs = json.loads(responses[3][0]['result']['content'][0]['text'])['jobs']
+print('STATES', sorted(j['state'] for j in jobs))
+print('PING', responses[4][1] < 0.5)
+print('SERIAL', responses[2][1] - responses[1][1] > 0.5)
+call(5, 'cc_server_stats', {})
+test = json.loads(p.stdout.readline())['result']['content'][0]['text']
+test = json.loads(test)['admission']['classes']['test']
+print('STATS', test['limit'], test['admitted'], test['queued'], test['wait_s_max'] > 0.5)
+p.stdin.close(); p.wait()
+" 2>&1) || true
+assert_contains "admission: second test run queued behind the first" "$adm_out" "STATES ['queued', 'running']"
+assert_contains "admission: ping answered while heavy calls queue" "$adm_out" "PING True"
+assert_contains "admission: test runs serialized by CC_MCP_MAX_TEST_JOBS" "$adm_out" "SERIAL True"
+assert_contains "admission: cc_server_stats reports queue and wait time" "$adm_out" "STATS 1 2 1 True"
+prio_out=$(python3 -c "
+import asyncio, sys
+sys.path.insert(0, '${ROOT_DIR}/adapters/_shared/mcp-server')
+from tools.admission import Admission
+async def main():
+    admission, order = Admission(), []
+    admission.configure({'CC_MCP_MAX_HEAVY_JOBS': '1'})
+    async def job(name, tag):
+        async with admission.slot(name):
+            order.append(tag)
+            await asyncio.sleep(0.05)
+    tasks = [asyncio.create_task(job('test', 'test1'))]
+    await asyncio.sleep(0.01)
+    tasks += [asyncio.create_task(job(n, n)) for n in ('test', 'lint', 'hook')]
+    await asyncio.gather(*tasks)
+    print('ORDER', order)
+asyncio.run(main())
+" 2>&1) || true
+assert_contains "admission: queued calls admitted by priority" "$prio_out" "ORDER ['test1', 'hook', 'lint', 'test']"
+zero_out=$(python3 -c "
+import os, sys
+sys.path.insert(0, '${ROOT_DIR}/adapters/_shared/mcp-server')
+from tools.admission import Admission
+admission = Admission()
+admission.configure({'CC_MCP_MAX_HEAVY_JOBS': '0', 'CC_MCP_MAX_TEST_JOBS': '0'})
+print('ZERO', admission.total == (os.cpu_count() or 1), admission.limits['test'])
+" 2>&1) || true
+assert_contains "admission: \"0\" is the CPU count for the total, unlimited per class" "$zero_out" "ZERO True 0"
+rm -rf "$adm_dir"
+
+# ---- Test: request metrics (stats, Prometheus endpoint and textfile) ----
+met_dir=$(create_test_dir)
+met_port=$(python3 -c "import socket; s = socket.socket(); s.bind(('127.0.0.1', 0)); print(s.getsockname()[1])")
+cat > "${met_dir}/cognitive-core.conf" << CONFEOF
+CC_TEST_COMMAND="sleep 2"
+CC_TEST_TIMEOUT="1"
+CC_MCP_METRICS_PORT="${met_port}"
+CC_MCP_METRICS_TEXTFILE="metrics/cc.prom"
+CONFEOF
+met_out=$(CC_PROJECT_DIR="$met_dir" _portable_timeout 20 python3 -c "
+import json, subprocess, sys, urllib.request
+p = subprocess.Popen([sys.executable, '${MCP_SERVER}'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+def send(i, method, params):
+    p.stdin.write(json.dumps({'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params}) + '\n'); p.stdin.flush()
+    return json.loads(p.stdout.readline())
+send(1, 'ping', {})
+send(2, 'tools/call', {'name': 'cc_security_validate', 'arguments': {'command': 'ls'}})
+send(3, 'tools/call', {'name': 'cc_lint_check', 'arguments': {'mode': 'test'}})
+send(4, 'tools/call', {'name': 'no_such_tool', 'arguments': {}})
+stats = json.loads(send(5, 'tools/call', {'name': 'cc_server_stats', 'arguments': {}})['result']['content'][0]['text'])['metrics']
+lint = stats['tools']['cc_lint_check']
+print('TOOL', lint['count'], lint['errors'], lint['timeouts'], lint['p50_s'] >= 1, lint['bytes_out'] > 0)
+print('METHOD', stats['methods']['ping']['count'], stats['methods']['tools/call']['count'], sorted(stats['tools']))
+body = urllib.request.urlopen('http://127.0.0.1:${met_port}/metrics', timeout=5).read().decode()
+print('PROM', 'cc_mcp_tool_timeouts_total{project=' in body and 'tool=\"cc_lint_check\"} 1' in body)
+print('HIST', 'cc_mcp_tool_duration_seconds_bucket{' in body and 'le=\"+Inf\"} 1' in body)
+p.stdin.close(); p.wait()
+print('TEXTFILE', 'cc_mcp_request_total' in open('${met_dir}/metrics/cc.prom').read())
+" 2>&1) || true
+assert_contains "metrics: per-tool count, errors, timeouts, latency and bytes" "$met_out" "TOOL 1 1 1 True True"
+assert_contains "metrics: per-method counts, unknown tools grouped" "$met_out" "METHOD 1 3 ['cc_lint_check', 'cc_security_validate', 'unknown']"
+assert_contains "metrics: Prometheus endpoint serves counters" "$met_out" "PROM True"
+assert_contains "metrics: Prometheus endpoint serves latency histograms" "$met_out" "HIST True"
+assert_contains "metrics: textfile written for node_exporter" "$met_out" "TEXTFILE True"
+rm -rf "$met_dir"
+
+# ---- Test: JSONL trace spans (MCP calls, bash hooks, rotation, report) ----
+trc_dir=$(create_test_dir)
+cat > "${trc_dir}/cognitive-core.conf" << CONFEOF
+CC_TRACE="1"
+CC_LINT_COMMAND="echo lint"
+CONFEOF
+trc_out=$(CC_PROJECT_DIR="$trc_dir" _portable_timeout 20 python3 -c "
+import json, subprocess, sys
+p = subprocess.Popen([sys.executable, '${MCP_SERVER}'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+def send(i, method, params):
+    p.stdin.write(json.dumps({'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params}) + '\n'); p.stdin.flush()
+    return json.loads(p.stdout.readline())
+send(1, 'tools/call', {'name': 'cc_security_validate', 'arguments': {'command': 'rm -rf /'}})
+send(2, 'tools/call', {'name': 'cc_lint_check', 'arguments': {'mode': 'lint'}})
+p.stdin.close(); p.wait()
+spans = {s['name']: s for s in map(json.loads, open('${trc_dir}/.claude/cognitive-core/trace.jsonl'))}
+lint, sec = spans['cc_lint_check'], spans['cc_security_validate']
+print('MCP', lint['kind'], lint['exit'], lint['subprocesses'], lint['bytes_out'] > 0, lint['dur_ms'] > 0)
+print('DECISION', sec['decision'], sec['subprocesses'])
+" 2>&1) || true
+assert_contains "trace: MCP span has exit code, subprocesses and bytes" "$trc_out" "MCP mcp 0 1 True True"
+assert_contains "trace: cc_security_validate span records the decision" "$trc_out" "DECISION deny 0"
+
+echo '{"session_id":"trace-s1","tool_name":"Bash","tool_input":{"command":"rm -rf /"}}' | \
+    CC_PROJECT_DIR="$trc_dir" CLAUDE_PROJECT_DIR="$trc_dir" bash "${ROOT_DIR}/core/hooks/validate-bash.sh" >/dev/null 2>&1 || true
+trc_hook=$(grep '"source":"bash"' "${trc_dir}/.claude/cognitive-core/trace.jsonl" | python3 -c "
+import json, sys
+for line in sys.stdin:
+    s = json.loads(line)
+    print('HOOK', s['name'], s['session'], s['decision'], s['exit'], s['bytes_in'] > 0)
+" 2>&1) || true
+if [ -n "${EPOCHREALTIME:-}" ]; then
+    assert_contains "trace: bash hook appends its own span" "$trc_hook" "HOOK validate-bash trace-s1 deny 0 True"
+fi
+
+trc_rep=$(python3 "${ROOT_DIR}/adapters/_shared/mcp-server/tools/trace_report.py" --project-dir "$trc_dir" 2>&1) || true
+assert_contains "trace: report lists percentiles per tool" "$trc_rep" "cc_lint_check"
+assert_contains "trace: report lists time per session" "$trc_rep" "Time per session"
+
+trc_rot=$(python3 -c "
+import sys
+sys.path.insert(0, '${ROOT_DIR}/adapters/_shared/mcp-server')
+import os
+from tools.trace import TraceSink, span
+sink = TraceSink('${trc_dir}/rot/trace.jsonl', max_bytes=400)
+for i in range(12):
+    sink.emit(span('mcp', 'mcp', 'ping', 0.0, 0.001))
+    sink.flush()
+sink.close()
+print('ROTATED', sorted(os.listdir('${trc_dir}/rot')), os.path.getsize('${trc_dir}/rot/trace.jsonl') <= 400)
+" 2>&1) || true
+assert_contains "trace: file rotated by size, three rotations kept" "$trc_rot" "ROTATED ['trace.jsonl', 'trace.jsonl.1', 'trace.jsonl.2', 'trace.jsonl.3'] True"
+rm -rf "$trc_dir"
+
+# ---- Test: daemon serves socket clients (bridge) and streamable HTTP ----
+dmn_dir=$(create_test_dir)
+dmn_port=$(python3 -c "import socket; s = socket.socket(); s.bind(('127.0.0.1', 0)); print(s.getsockname()[1])")
+cat > "${dmn_dir}/cognitive-core.conf" << CONFEOF
+CC_LINT_COMMAND="sleep 1; echo lint"
+CC_TEST_COMMAND="echo ok 1; sleep 0.3; echo ok 2"
+CC_MCP_HTTP_PORT="${dmn_port}"
+CONFEOF
+dmn_out=$(CC_PROJECT_DIR="$dmn_dir" _portable_timeout 30 python3 -c "
+import json, os, socket, subprocess, sys, time, urllib.request
+sock_path = '${dmn_dir}/mcp.sock'
+bridge = '${ROOT_DIR}/adapters/_shared/mcp-server/tools/mcp_bridge.py'
+d = subprocess.Popen([sys.executable, '${MCP_SERVER}', '--daemon', '--socket', sock_path, '--idle-timeout', '60'])
+for _ in range(200):
+    if os.path.exists(sock_path):
+        break
+    time.sleep(0.05)
+print('MODE', oct(os.stat(sock_path).st_mode & 0o077))
+
+def conn():
+    s = socket.socket(socket.AF_UNIX)
+    s.connect(sock_path)
+    return s, s.makefile('r')
+def send(s, msg):
+    s.sendall((json.dumps(msg) + '\n').encode())
+a, af = conn()
+b, bf = conn()
+# Same request id on two clients: B's cancel must not reach A's call
+send(a, {'jsonrpc': '2.0', 'id': 7, 'method': 'tools/call', 'params': {'name': 'cc_lint_check', 'arguments': {'mode': 'lint'}}})
+send(b, {'jsonrpc': '2.0', 'method': 'notifications/cancelled', 'params': {'requestId': 7}})
+send(b, {'jsonrpc': '2.0', 'id': 7, 'method': 'ping'})
+print('PING', json.loads(bf.readline()))
+print('ISOLATED', 'Exit code: 0' in json.loads(af.readline())['result']['content'][0]['text'])
+
+msgs = '\n'.join(json.dumps(m) for m in [
+    {'jsonrpc': '2.0', 'id': 1, 'method': 'initialize', 'params': {}},
+    {'jsonrpc': '2.0', 'id': 2, 'method': 'tools/call', 'params': {'name': 'cc_server_stats', 'arguments': {}}},
+]) + '\n'
+out = subprocess.run([sys.executable, bridge, '--socket', sock_path], input=msgs, capture_output=True, text=True, timeout=20).stdout
+replies = {m['id']: m for m in map(json.loads, out.splitlines())}
+stats = json.loads(replies[2]['result']['content'][0]['text'])['daemon']
+print('BRIDGE', replies[1]['result']['serverInfo']['name'], stats['transport'], stats['clients'], stats['connections'])
+
+url = 'http://127.0.0.1:${dmn_port}/mcp'
+print('CREDS_MODE', oct(os.stat(sock_path + '.http').st_mode & 0o077))
+config = json.loads(subprocess.run([sys.executable, bridge, '--socket', sock_path, '--http-config'], capture_output=True, text=True, timeout=20).stdout)
+auth = config['headers']['Authorization']
+print('HTTP_CONFIG', config['url'] == url, auth.startswith('Bearer '))
+def post(msg, session=None, accept='application/json, text/event-stream', extra=None):
+    headers = {'Content-Type': 'application/json', 'Accept': accept, 'Authorization': auth}
+    if session:
+        headers['Mcp-Session-Id'] = session
+    headers.update(extra or {})
+    return urllib.request.urlopen(urllib.request.Request(url, json.dumps(msg).encode(), headers), timeout=20)
+def status(msg, session=None, extra=None):
+    try:
+        return post(msg, session, extra=extra).status
+    except urllib.error.HTTPError as e:
+        return e.code
+ping = {'jsonrpc': '2.0', 'id': 9, 'method': 'ping'}
+print('NO_TOKEN', status(ping, extra={'Authorization': ''}), status(ping, extra={'Authorization': 'Bearer wrong'}))
+print('NO_SESSION', status(ping))
+print('BAD_HOST', status(ping, extra={'Host': 'evil.example:${dmn_port}'}))
+import http.client
+big = http.client.HTTPConnection('127.0.0.1', ${dmn_port}, timeout=20)
+big.putrequest('POST', '/mcp')
+big.putheader('Authorization', auth)
+big.putheader('Content-Type', 'application/json')
+big.putheader('Content-Length', str(1 << 40))
+big.endheaders()
+print('TOO_LARGE', big.getresponse().status)
+big.close()
+r = post({'jsonrpc': '2.0', 'id': 1, 'method': 'initialize', 'params': {}}, accept='application/json')
+session = r.headers['Mcp-Session-Id']
+print('HTTP_INIT', r.headers['Content-Type'], json.loads(r.read())['result']['serverInfo']['name'], bool(session))
+r = post({'jsonrpc': '2.0', 'id': 2, 'method': 'tools/call', 'params': {'name': 'cc_lint_check', 'arguments': {'mode': 'test'}, '_meta': {'progressToken': 'p'}}}, session)
+events = [json.loads(line[6:]) for line in r.read().decode().splitlines() if line.startswith('data: ')]
+print('SSE', r.headers['Content-Type'], events[0]['method'], events[-1]['id'])
+print('UNKNOWN_SESSION', status({'jsonrpc': '2.0', 'id': 3, 'method': 'ping'}, 'no-such-session'))
+print('ORIGIN', status(ping, session, extra={'Origin': 'http://evil.example'}))
+a.close(); b.close()
+d.terminate(); d.wait(10)
+print('CLEANUP', os.path.exists(sock_path), os.path.exists(sock_path + '.http'))
+" 2>&1) || true
+assert_contains "daemon: socket is private to the user" "$dmn_out" "MODE 0o0"
+assert_contains "daemon: clients answered independently" "$dmn_out" "PING {'jsonrpc': '2.0', 'id': 7, 'result': {}}"
+assert_contains "daemon: cancel only reaches the sender's calls" "$dmn_out" "ISOLATED True"
+assert_contains "daemon: stdio bridge relays to the shared daemon" "$dmn_out" "BRIDGE cognitive-core daemon 3 3"
+assert_contains "daemon: streamable HTTP initialize issues a session" "$dmn_out" "HTTP_INIT application/json cognitive-core True"
+assert_contains "daemon: streamable HTTP streams progress then the response" "$dmn_out" "SSE text/event-stream notifications/progress 2"
+assert_contains "daemon: unknown HTTP session rejected" "$dmn_out" "UNKNOWN_SESSION 404"
+assert_contains "daemon: non-local Origin rejected" "$dmn_out" "ORIGIN 403"
+assert_contains "daemon: HTTP credentials file is private to the user" "$dmn_out" "CREDS_MODE 0o0"
+assert_contains "daemon: bridge prints HTTP client config with token" "$dmn_out" "HTTP_CONFIG True True"
+assert_contains "daemon: HTTP without the bearer token rejected" "$dmn_out" "NO_TOKEN 401 401"
+assert_contains "daemon: HTTP call without initialize session rejected" "$dmn_out" "NO_SESSION 400"
+assert_contains "daemon: non-local Host rejected" "$dmn_out" "BAD_HOST 403"
+assert_contains "daemon: oversized HTTP body refused before reading" "$dmn_out" "TOO_LARGE 413"
+assert_contains "daemon: socket and credentials removed on SIGTERM" "$dmn_out" "CLEANUP False False"
+rm -rf "$dmn_dir"
+
+# ---- Test: daemon socket and HTTP credentials only trusted when private ----
+sqt_dir=$(create_test_dir)
+mkdir -m 777 "${sqt_dir}/shared" "${sqt_dir}/xdg" "${sqt_dir}/xdg/cc-$(id -u)"
+mkdir -m 700 "${sqt_dir}/private"
+echo 'CC_PROJECT_NAME="squat"' > "${sqt_dir}/cognitive-core.conf"
+sqt_out=$(CC_PROJECT_DIR="$sqt_dir" _portable_timeout 30 python3 -c "
+import json, os, socket, subprocess, sys
+sys.path.insert(0, '${ROOT_DIR}/adapters/_shared/mcp-server')
+from tools.transport import read_http_credentials
+bridge = '${ROOT_DIR}/adapters/_shared/mcp-server/tools/mcp_bridge.py'
+shared = '${sqt_dir}/shared/mcp.sock'
+d = subprocess.run([sys.executable, '${MCP_SERVER}', '--daemon', '--socket', shared, '--idle-timeout', '1'], capture_output=True, text=True, timeout=20)
+print('SERVE', 'failed to start' in d.stderr, os.path.exists(shared))
+# A listener squatting a shared directory never gets the bridge's traffic
+squat = socket.socket(socket.AF_UNIX)
+squat.bind(shared)
+squat.listen(1)
+squat.settimeout(0.5)
+msg = json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': 'initialize', 'params': {}}) + '\\n'
+out = subprocess.run([sys.executable, bridge, '--socket', shared], input=msg, capture_output=True, text=True, timeout=20).stdout
+try:
+    squat.accept()
+    reached = True
+except socket.timeout:
+    reached = False
+print('BRIDGE', json.loads(out)['result']['serverInfo']['name'], reached)
+creds = '${sqt_dir}/private/mcp.sock.http'
+with open(creds, 'w') as fh:
+    json.dump({'url': 'http://127.0.0.1:1/mcp', 'token': 't'}, fh)
+os.chmod(creds, 0o644)
+loose = read_http_credentials('${sqt_dir}/private/mcp.sock')
+os.chmod(creds, 0o600)
+print('CREDS', loose, read_http_credentials('${sqt_dir}/private/mcp.sock')['token'])
+env = dict(os.environ, XDG_RUNTIME_DIR='${sqt_dir}/xdg')
+r = subprocess.run([sys.executable, bridge, '--http-config'], env=env, capture_output=True, text=True, timeout=20)
+print('XDG', r.returncode, 'MCP daemon disabled' in r.stderr)
+" 2>&1) || true
+assert_contains "daemon: refuses to serve from a shared directory" "$sqt_out" "SERVE True False"
+assert_contains "daemon: bridge ignores a socket in a shared directory" "$sqt_out" "BRIDGE cognitive-core False"
+assert_contains "daemon: HTTP credentials readable by others are ignored" "$sqt_out" "CREDS None t"
+assert_contains "daemon: squatted runtime directory disables the daemon" "$sqt_out" "XDG 1 True"
+rm -rf "$sqt_dir"
+
+# ---- Test: one server serves several projects (project_dir, roots, LRU) ----
+prj_dir=$(create_test_dir)
+prj_outside=$(create_test_dir)
+mkdir -p "${prj_dir}/b" "${prj_dir}/c/.cognitive-core" "${prj_dir}/plain" "${prj_dir}/shared"
+chmod 755 "$prj_dir" "${prj_dir}/b" "${prj_dir}/c" "${prj_dir}/c/.cognitive-core"
+printf 'CC_LINT_COMMAND="echo pwned"\n' > "${prj_dir}/shared/cognitive-core.conf"
+printf 'CC_LINT_COMMAND="echo pwned"\n' > "${prj_outside}/cognitive-core.conf"
+chmod 777 "${prj_dir}/shared"
+cat > "${prj_dir}/cognitive-core.conf" << CONFEOF
+CC_LINT_COMMAND="echo lint-main"
+CC_MCP_MAX_PROJECTS="2"
+CONFEOF
+cat > "${prj_dir}/b/cognitive-core.conf" << CONFEOF
+CC_LINT_COMMAND="echo lint-b \\\$1"
+CONFEOF
+prj_out=$(CC_PROJECT_DIR="$prj_dir" _portable_timeout 30 python3 -c "
+import json, subprocess, sys
+p = subprocess.Popen([sys.executable, '${MCP_SERVER}'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+def send(msg):
+    p.stdin.write(json.dumps(msg) + '\n')
+    p.stdin.flush()
+def recv():
+    return json.loads(p.stdout.readline())
+def call(i, name, arguments):
+    send({'jsonrpc': '2.0', 'id': i, 'method': 'tools/call', 'params': {'name': name, 'arguments': arguments}})
+    return recv()['result']
+send({'jsonrpc': '2.0', 'id': 1, 'method': 'initialize', 'params': {'capabilities': {'roots': {}}}})
+recv()
+send({'jsonrpc': '2.0', 'method': 'notifications/initialized'})
+ask = recv()
+print('ASKED', ask['method'])
+roots = ['plain', 'shared', 'b', 'c']
+send({'jsonrpc': '2.0', 'id': ask['id'], 'result': {'roots': [{'uri': 'file://${prj_dir}/' + r} for r in roots]}})
+print('ROOTS', call(2, 'cc_lint_check', {'path': 'x.py'})['content'][0]['text'].split('\n')[0])
+print('ARG', call(3, 'cc_lint_check', {'path': 'x.py', 'project_dir': '${prj_dir}'})['content'][0]['text'].split('\n')[0])
+r = call(4, 'cc_lint_check', {'path': 'x.py', 'project_dir': 'plain'})
+print('REFUSED', r.get('isError'), r['content'][0]['text'])
+r = call(41, 'cc_lint_check', {'path': 'x.py', 'project_dir': '${prj_outside}'})
+print('OUTSIDE', r.get('isError'), r['content'][0]['text'])
+r = call(42, 'cc_lint_check', {'path': 'x.py', 'project_dir': 'shared'})
+print('WRITABLE', r.get('isError'), r['content'][0]['text'])
+call(5, 'cc_security_validate', {'command': 'ls', 'project_dir': 'b'})
+entries = json.loads(call(51, 'cc_server_stats', {})['content'][0]['text'])['projects']['entries']
+print('PER_PROJECT', [(e['root'].endswith('/b'), e['decision_cache']['entries'], 'rebuilds' in e['doc_bundle']) for e in entries])
+stats = json.loads(call(6, 'cc_server_stats', {'project_dir': 'c'})['content'][0]['text'])
+print('DECISIONS', stats['decision_cache']['entries'])
+call(7, 'cc_project_info', {'project_dir': 'c'})
+projects = json.loads(call(8, 'cc_server_stats', {'project_dir': '.'})['content'][0]['text'])['projects']
+print('LRU', projects['projects'], projects['evictions'], [e['root'].endswith('/b') for e in projects['entries']])
+p.stdin.close()
+p.wait(10)
+" 2>&1) || true
+assert_contains "projects: server asks roots/list of clients with roots" "$prj_out" "ASKED roots/list"
+assert_contains "projects: first cognitive-core root selects the project" "$prj_out" "ROOTS Command: echo lint-b x.py"
+assert_contains "projects: project_dir argument overrides roots" "$prj_out" "ARG Command: echo lint-main"
+assert_contains "projects: non-project directory refused" "$prj_out" "REFUSED True Error: not a cognitive-core project: plain"
+assert_contains "projects: project outside server project and roots refused" "$prj_out" "OUTSIDE True Error: not the server's project or one of the client's roots: ${prj_outside}"
+assert_contains "projects: world-writable project refused" "$prj_out" "WRITABLE True Error: project is writable by other users"
+assert_contains "projects: each project has its own decision cache" "$prj_out" "DECISIONS 0"
+assert_contains "projects: stats report decision cache and doc bundle per project" "$prj_out" "PER_PROJECT [(False, 0, True), (True, 1, True)]"
+assert_contains "projects: least recently used project evicted" "$prj_out" "LRU 2 1 [False, False]"
+rm -rf "$prj_dir" "$prj_outside"
+
+# ---- Test: MCP resources (list, read, subscribe, updates only on change) ----
+res_dir=$(create_test_dir)
+mkdir -p "${res_dir}/.cognitive-core/agents" "${res_dir}/.cognitive-core/skills/review"
+cat > "${res_dir}/cognitive-core.conf" << CONFEOF
+CC_PROJECT_NAME="res"
+CONFEOF
+printf -- '---\nname: helper\ndescription: Helps out\n---\nbody\n' > "${res_dir}/.cognitive-core/agents/helper.md"
+printf -- '---\nname: review\ndescription: Reviews code\n---\nskill\n' > "${res_dir}/.cognitive-core/skills/review/SKILL.md"
+res_out=$(CC_PROJECT_DIR="$res_dir" _portable_timeout 30 python3 -c "
+import json, os, subprocess, sys, time
+agent = '${res_dir}/.cognitive-core/agents/helper.md'
+conf = '${res_dir}/cognitive-core.conf'
+p = subprocess.Popen([sys.executable, '${MCP_SERVER}'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+def send(msg):
+    p.stdin.write(json.dumps(msg) + '\n')
+    p.stdin.flush()
+def recv():
+    return json.loads(p.stdout.readline())
+send({'jsonrpc': '2.0', 'id': 1, 'method': 'initialize', 'params': {}})
+print('CAPS', recv()['result']['capabilities']['resources'])
+send({'jsonrpc': '2.0', 'id': 2, 'method': 'resources/list'})
+print('LIST', [(r['uri'], r['description']) for r in recv()['result']['resources']][1:])
+send({'jsonrpc': '2.0', 'id': 3, 'method': 'resources/read', 'params': {'uri': 'cc://config'}})
+print('CONFIG', json.loads(recv()['result']['contents'][0]['text'])['CC_PROJECT_NAME'])
+send({'jsonrpc': '2.0', 'id': 4, 'method': 'resources/read', 'params': {'uri': 'cc://agents/missing'}})
+print('MISSING', recv()['error']['code'])
+send({'jsonrpc': '2.0', 'id': 5, 'method': 'resources/subscribe', 'params': {'uri': 'cc://agents/helper'}})
+send({'jsonrpc': '2.0', 'id': 6, 'method': 'resources/subscribe', 'params': {'uri': 'cc://config'}})
+recv(); recv()
+time.sleep(1)
+# No notification: same bytes, same effective config
+os.utime(agent)
+with open(conf, 'a') as fh:
+    fh.write('# comment only\n')
+time.sleep(1)
+# Replaced whole, so the watcher never sees a truncated file (one update)
+with open(agent + '.tmp', 'w') as fh:
+    fh.write('changed\n')
+os.replace(agent + '.tmp', agent)
+print('UPDATED', recv())
+with open(conf, 'a') as fh:
+    fh.write('CC_LANGUAGE=\"go\"\n')
+print('UPDATED', recv())
+send({'jsonrpc': '2.0', 'id': 7, 'method': 'tools/call', 'params': {'name': 'cc_server_stats', 'arguments': {}}})
+stats = json.loads(recv()['result']['content'][0]['text'])['resources']
+print('STATS', stats['subscriptions'], stats['notified'])
+p.stdin.close()
+p.wait(10)
+" 2>&1) || true
+assert_contains "resources: subscribe capability advertised" "$res_out" "CAPS {'subscribe': True, 'listChanged': False}"
+assert_contains "resources: agents and skills listed with descriptions" "$res_out" "LIST [('cc://agents/helper', 'Helps out'), ('cc://skills/review', 'Reviews code')]"
+assert_contains "resources: config readable as JSON" "$res_out" "CONFIG res"
+assert_contains "resources: unknown resource is an error" "$res_out" "MISSING -32002"
+assert_contains "resources: changed agent notifies subscribers" "$res_out" "UPDATED {'jsonrpc': '2.0', 'method': 'notifications/resources/updated', 'params': {'uri': 'cc://agents/helper'}}"
+assert_contains "resources: changed config value notifies subscribers" "$res_out" "'params': {'uri': 'cc://config'}}"
+assert_contains "resources: touch and comment edits send nothing" "$res_out" "STATS 2 2"
+rm -rf "$res_dir"
+
+# ---- Test: agent/skill doc bundle (mmap index, served, rebuilt on change) ----
+bdl_dir=$(create_test_dir)
+mkdir -p "${bdl_dir}/.cognitive-core/agents" "${bdl_dir}/.cognitive-core/skills/review"
+cat > "${bdl_dir}/cognitive-core.conf" << CONFEOF
+CC_PROJECT_NAME="bundle"
+CONFEOF
+printf -- '---\ndescription: Helps out\n---\nfirst\n' > "${bdl_dir}/.cognitive-core/agents/helper.md"
+printf -- '---\ndescription: Reviews code\n---\nskill\n' > "${bdl_dir}/.cognitive-core/skills/review/SKILL.md"
+bdl_build=$(python3 "${ROOT_DIR}/adapters/_shared/mcp-server/tools/doc_bundle.py" --install-dir "${bdl_dir}/.cognitive-core" 2>&1) || true
+assert_contains "doc bundle: install step packs agents and skills" "$bdl_build" "Bundled 2 documents"
+bdl_out=$(CC_PROJECT_DIR="$bdl_dir" _portable_timeout 30 python3 -c "
+import json, os, subprocess, sys
+sys.path.insert(0, '${ROOT_DIR}/adapters/_shared/mcp-server')
+from tools.doc_bundle import DocBundle
+index = DocBundle('${bdl_dir}/.cognitive-core').index()
+print('INDEX', sorted(index), index['agents/helper.md']['frontmatter'], len(index['agents/helper.md']['sha256']))
+p = subprocess.Popen([sys.executable, '${MCP_SERVER}'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+def call(i, name, arguments):
+    p.stdin.write(json.dumps({'jsonrpc': '2.0', 'id': i, 'method': 'tools/call', 'params': {'name': name, 'arguments': arguments}}) + '\n')
+    p.stdin.flush()
+    return json.loads(p.stdout.readline())['result']['content'][0]['text']
+print('SERVED', call(1, 'cc_agent_context', {'agent_name': 'helper'}).splitlines()[-1])
+with open('${bdl_dir}/.cognitive-core/agents/helper.md', 'w') as fh:
+    fh.write('second version\n')
+with open('${bdl_dir}/.cognitive-core/agents/added.md', 'w') as fh:
+    fh.write('added\n')
+print('CHANGED', call(2, 'cc_agent_context', {'agent_name': 'helper'}).strip())
+print('ADDED', call(3, 'cc_agent_context', {'agent_name': 'added'}).strip())
+stats = json.loads(call(4, 'cc_server_stats', {}))['doc_bundle']
+print('STATS', stats['docs'], stats['hits'], stats['rebuilds'])
+p.stdin.close()
+p.wait(10)
+" 2>&1) || true
+assert_contains "doc bundle: index maps names to hash and frontmatter" "$bdl_out" "INDEX ['agents/helper.md', 'skills/review/SKILL.md'] {'description': 'Helps out'} 64"
+assert_contains "doc bundle: agent served from the bundle" "$bdl_out" "SERVED first"
+assert_contains "doc bundle: changed source rebuilds the bundle" "$bdl_out" "CHANGED second version"
+assert_contains "doc bundle: new source picked up" "$bdl_out" "ADDED added"
+assert_contains "doc bundle: server stats count hits and rebuilds" "$bdl_out" "STATS 3 3 1"
+rm -rf "$bdl_dir"
+
+# ---- Test: doc bundle falls back to the file (read-only install dir, corrupt bundle) ----
+bro_dir=$(create_test_dir)
+mkdir -p "${bro_dir}/.cognitive-core/agents"
+printf 'bundled\n' > "${bro_dir}/.cognitive-core/agents/helper.md"
+python3 "${ROOT_DIR}/adapters/_shared/mcp-server/tools/doc_bundle.py" --install-dir "${bro_dir}/.cognitive-core" >/dev/null 2>&1 || true
+chmod 555 "${bro_dir}/.cognitive-core"
+bro_out=$(_portable_timeout 30 python3 -c "
+import os, sys
+sys.path.insert(0, '${ROOT_DIR}/adapters/_shared/mcp-server')
+from tools.projects import Project
+from tools.security_validate import DecisionCache
+install = '${bro_dir}/.cognitive-core'
+# root ignores the directory mode: also block the rebuild's temp file
+os.mkdir(os.path.join(install, f'docs.bundle.{os.getpid()}.tmp')) if os.geteuid() == 0 else None
+agent = os.path.join(install, 'agents', 'helper.md')
+with open(agent, 'w') as fh:
+    fh.write('edited\\n')
+project = Project('${bro_dir}', install, DecisionCache())
+print('STALE', project.doc(agent).strip(), project.doc(agent).strip(), project.bundle.stats()['failures'])
+with open(os.path.join(install, 'docs.bundle'), 'wb') as fh:
+    fh.write(b'not a bundle')
+project = Project('${bro_dir}', install, DecisionCache())
+print('CORRUPT', project.doc(agent).strip())
+" 2>&1) || true
+chmod 755 "${bro_dir}/.cognitive-core"
+assert_contains "doc bundle: stale bundle in read-only install dir falls back to the file" "$bro_out" "STALE edited edited 1"
+assert_contains "doc bundle: corrupt bundle falls back to the file" "$bro_out" "CORRUPT edited"
+rm -rf "$bro_dir"
+
+# ---- Test: validator tools share the one tools.security_validate module ----
+mod_dir=$(create_test_dir)
+mod_out=$(CC_PROJECT_DIR="$mod_dir" _portable_timeout 30 python3 -c "
+import sys
+sys.path.insert(0, '${ROOT_DIR}/adapters/_shared/mcp-server')
+import server
+server.handle_cc_security_validate({'command': 'ls'})
+server.handle_cc_security_validate_batch({'commands': ['ls']})
+print('MODULES', sorted(name for name in sys.modules if name.endswith('security_validate')))
+" 2>&1) || true
+assert_contains "security validate: one module object (shared rule sets and caches)" "$mod_out" "MODULES ['tools.security_validate']"
+rm -rf "$mod_dir"
+
+# ---- Test: config snapshot cache (stat-keyed, hit/miss counters) ----
+cache_dir=$(create_test_dir)
+printf 'CC_PROJECT_NAME="first"\n' > "${cache_dir}/cognitive-core.conf"
+cache_test=$(python3 -c "
+import os, sys
+sys.path.insert(0, '${ROOT_DIR}/adapters/_shared/mcp-server')
+from tools.utils import ConfigCache
+cache = ConfigCache()
+assert cache.get('${cache_dir}')['CC_PROJECT_NAME'] == 'first'
+assert cache.get('${cache_dir}')['CC_PROJECT_NAME'] == 'first'
+assert (cache.hits, cache.misses) == (1, 1), cache.stats()
+with open('${cache_dir}/cognitive-core.conf', 'w') as f:
+    f.write('CC_PROJECT_NAME="second-name"\\n')
+assert cache.get('${cache_dir}')['CC_PROJECT_NAME'] == 'second-name'
+assert cache.stats()['misses'] == 2, cache.stats()
+assert cache.get('/nonexistent-cc-dir') == {}
+print('ALL_PASS')
+" 2>&1)
+if echo "$cache_test" | grep -q "ALL_PASS"; then
+    _pass "config cache: hits on unchanged conf, reloads on edit"
+else
+    _fail "config cache: hits on unchanged conf, reloads on edit" "$cache_test"
+fi
+stats_out=$(mcp_request '{"jsonrpc":"2.0","id":3,"method":"tools/call","params":{"name":"cc_server_stats","arguments":{}}}')
+assert_contains "MCP: cc_server_stats reports config cache" "$stats_out" 'config_cache'
+assert_contains "MCP: cc_server_stats reports decision cache" "$stats_out" 'decision_cache'
+rm -rf "$cache_dir"
+
 # ---- Test: security_validate.py standalone ----
 sv_test=$(python3 -c "
 import sys
@@ -183,6 +1133,22 @@ assert r5['decision'] == 'deny', f'Expected deny for chmod 777, got {r5}'
 # Test DROP TABLE
 r6 = validate_command('DROP TABLE users')
 assert r6['decision'] == 'deny', f'Expected deny for DROP TABLE, got {r6}'
+# Batch: one rule set, optional segment split
+from security_validate import split_segments, validate_batch
+segs = split_segments('echo \"a && b\" | grep \$(ls | wc) && cd /tmp; rm x || true')
+assert segs == ['echo \"a && b\"', 'grep \$(ls | wc)', 'cd /tmp', 'rm x', 'true'], segs
+b = validate_batch(['git status', 'ls; rm -rf /etc', ''], split=True)
+assert [r['decision'] for r in b['results']] == ['allow', 'deny', 'allow'], b
+assert b['summary'] == {'total': 3, 'allowed': 2, 'denied': 1}, b
+assert b['results'][1]['segments'][1] == {'segment': 'rm -rf /etc', 'decision': 'deny', 'rule': 'rm-system-path'}, b
+# Batch: one rule set, optional segment split
+from security_validate import split_segments, validate_batch
+segs = split_segments('echo \"a && b\" | grep \$(ls | wc) && cd /tmp; rm x || true')
+assert segs == ['echo \"a && b\"', 'grep \$(ls | wc)', 'cd /tmp', 'rm x', 'true'], segs
+b = validate_batch(['git status', 'ls; rm -rf /etc', ''], split=True)
+assert [r['decision'] for r in b['results']] == ['allow', 'deny', 'allow'], b
+assert b['summary'] == {'total': 3, 'allowed': 2, 'denied': 1}, b
+assert b['results'][1]['segments'][1] == {'segment': 'rm -rf /etc', 'decision': 'deny', 'rule': 'rm-system-path'}, b
 print('ALL_PASS')
 " 2>&1)
 if echo "$sv_test" | grep -q "ALL_PASS"; then
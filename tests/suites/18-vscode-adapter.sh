@@ -118,6 +118,9 @@ assert_file_exists "vscode install: .vscode/mcp.json generated" "${test_dir}/.vs
 # Verify MCP server was installed
 assert_file_exists "vscode install: mcp server.py installed" "${test_dir}/.cognitive-core/mcp-server/server.py"
 assert_file_exists "vscode install: security_validate.py installed" "${test_dir}/.cognitive-core/mcp-server/tools/security_validate.py"
+assert_file_exists "vscode install: agent/skill doc bundle built" "${test_dir}/.cognitive-core/docs.bundle"
+bundle_index=$(python3 "${test_dir}/.cognitive-core/mcp-server/tools/doc_bundle.py" --install-dir "${test_dir}/.cognitive-core" --list 2>&1) || true
+assert_contains "vscode install: doc bundle indexes installed agents" "$bundle_index" "agents/project-coordinator.md"
 
 # Verify copilot-instructions.md contains safety rules
 instructions=$(cat "${test_dir}/.github/copilot-instructions.md")
@@ -0,0 +1,112 @@
+#!/bin/bash
+# Test suite 26: Native cognitive-core.conf parser parity
+# generate_utils.parse_conf() must produce exactly what sourcing the conf in
+# bash produces, for every conf shipped in the repo, and must decline (return
+# None → bash fallback) on syntax outside its supported subset.
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+ROOT_DIR="$(cd "${SCRIPT_DIR}/../.." && pwd)"
+
+# shellcheck disable=SC1091
+source "${SCRIPT_DIR}/../lib/test-helpers.sh"
+
+suite_start "26 — Conf Parser Parity"
+
+if ! command -v python3 &>/dev/null; then
+    _skip "Python3 not available — skipping conf parser tests"
+    suite_end || true
+    exit 0
+fi
+
+SHARED_DIR="${ROOT_DIR}/adapters/_shared"
+
+# Compare native parse against bash sourcing for one conf file.
+# Prints PARITY, FALLBACK (native declined) or DIFF <details>.
+_parity() {
+    python3 - "$SHARED_DIR" "$1" << 'PYEOF'
+import sys
+sys.path.insert(0, sys.argv[1])
+from generate_utils import load_config_bash, parse_conf
+path = sys.argv[2]
+with open(path, encoding="utf-8") as f:
+    native = parse_conf(f.read())
+if native is None:
+    print("FALLBACK")
+    sys.exit(0)
+bash = load_config_bash(path)
+if native == bash:
+    print("PARITY")
+else:
+    diff = sorted(k for k in set(native) | set(bash) if native.get(k) != bash.get(k))
+    print("DIFF " + ", ".join(f"{k}: native={native.get(k)!r} bash={bash.get(k)!r}" for k in diff))
+PYEOF
+}
+
+# ---- Shipped confs: native parser must handle them with exact parity ----
+for conf in \
+    "${ROOT_DIR}/cognitive-core.conf.example" \
+    "${ROOT_DIR}/cognitive-core.conf" \
+    "${ROOT_DIR}"/language-packs/*/pack.conf \
+    "${ROOT_DIR}"/database-packs/*/pack.conf; do
+    [ -f "$conf" ] || continue
+    label="${conf#"${ROOT_DIR}"/}"
+    assert_eq "parity: ${label}" "PARITY" "$(_parity "$conf")"
+done
+
+# ---- Synthetic conf exercising the supported subset ----
+test_dir=$(create_test_dir)
+cat > "${test_dir}/subset.conf" << 'CONFEOF'
+#!/bin/false
+# comment line
+CC_LINT_COMMAND="ruff check \$1"
+CC_SINGLE='literal $HOME \n'
+CC_UNQUOTED=plain\ word   # trailing comment
+CC_HASH=a#b
+CC_COMPACT_RULES="
+1. First rule with \"quotes\"
+2. Second rule
+"
+export CC_EXPORTED="${HOME}/x"
+CC_DEFAULTED="${CC_NOT_SET_ANYWHERE:-fallback}"
+CC_BLOCKED_PATTERNS="${CC_BLOCKED_PATTERNS:-} drop\s+table"
+CC_REF="$CC_DEFAULTED-suffix"
+CC_CONT="one \
+two"
+CC_EMPTY=
+CC_PORT=5432
+CONFEOF
+assert_eq "parity: synthetic subset conf" "PARITY" "$(_parity "${test_dir}/subset.conf")"
+
+multi=$(python3 -c "
+import sys
+sys.path.insert(0, '${SHARED_DIR}')
+from generate_utils import load_config
+c = load_config('${test_dir}/subset.conf')
+print(repr(c['CC_COMPACT_RULES']))
+")
+assert_eq "multi-line CC_COMPACT_RULES preserved" "'\\n1. First rule with \"quotes\"\\n2. Second rule\\n'" "$multi"
+
+# ---- Unsupported constructs: native declines, load_config still works via bash ----
+_fallback_case() {
+    local label="$1" body="$2" key="$3" expected="$4"
+    printf '%s\n' "$body" > "${test_dir}/fallback.conf"
+    assert_eq "fallback: ${label} → bash" "FALLBACK" "$(_parity "${test_dir}/fallback.conf")"
+    local got
+    got=$(python3 -c "
+import sys
+sys.path.insert(0, '${SHARED_DIR}')
+from generate_utils import load_config
+print(load_config('${test_dir}/fallback.conf').get('${key}', '<unset>'))
+")
+    assert_eq "fallback: ${label} value via bash" "$expected" "$got"
+}
+
+_fallback_case "command substitution" 'CC_X="$(echo sub)"' "CC_X" "sub"
+_fallback_case "conditional" 'if true; then CC_Y="cond"; fi' "CC_Y" "cond"
+_fallback_case "multiple assignments" 'CC_A=1 CC_B=two' "CC_B" "two"
+_fallback_case "assign-default expansion" 'CC_P="${CC_UNSET_P:=assigned}"' "CC_P" "assigned"
+
+rm -rf "$test_dir"
+
+suite_end